@@ -1,27 +1,114 @@
 """
 API路由
 """
-from flask import Flask, request, jsonify
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any
+from flask import Flask, request, jsonify, g
+import time
 import traceback
 
-from models.resume_parser import ResumeParser
-from models.big_company_checker import BigCompanyChecker
-from models.ipo_checker import IPOChecker
-from models.negative_checker import NegativeChecker
-from models.report_generator import ReportGenerator
-from utils.config_loader import config
+from api import warmup
+from pipeline.analyzer import analyze_coalesced, coalescing_report
+from utils.admission import LANES, AdmissionRejected, get_admission_controller
+from utils.circuit_breaker import breaker_report
+from utils.llm_router import endpoint_report
+from utils.metrics import metrics
+from utils.profiler import SORT_KEYS, get_profiler, hot_functions, sample_stacks
+from utils.tenants import QuotaExceeded, UnknownTenant, charge_tenant, current_tenant, get_tenant_manager, resolve_tenant
 
 
 app = Flask(__name__)
 
+# 需要识别租户并执行配额的接口（会调用模型的接口）
+TENANT_ENDPOINTS = {'analyze_resume', 'rank_resumes', 'submit_job'}
 
-def create_app():
-    """创建Flask应用"""
+
+def create_app(background_warmup: bool = True):
+    """
+    创建Flask应用
+
+    Args:
+        background_warmup: 是否在后台线程中预热（生产模式由主进程在fork前同步预热）
+    """
+    if background_warmup and not warmup.state.is_ready:
+        warmup.start_background_warmup()
     return app
 
 
+@app.before_request
+def identify_tenant():
+    """按请求头 X-Tenant-ID 识别租户，租户在本次请求内对模型调用可见（配额在请求校验通过后由 charge_quota 扣除）"""
+    if request.endpoint not in TENANT_ENDPOINTS:
+        return None
+    try:
+        tenant = resolve_tenant(request.headers.get('X-Tenant-ID'))
+    except UnknownTenant as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 403
+
+    g.tenant = tenant
+    g.tenant_token = current_tenant.set(tenant)
+    g.tenant_started = time.perf_counter()
+    return None
+
+
+def charge_quota():
+    """
+    扣除当前租户的一次请求配额（在请求校验通过后调用）
+
+    Returns:
+        超出配额时返回 429 响应，否则返回 None
+    """
+    try:
+        charge_tenant(g.tenant)
+    except QuotaExceeded as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 429, {'Retry-After': str(e.retry_after)}
+    return None
+
+
+@app.teardown_request
+def release_tenant(error=None):
+    """记录租户的请求耗时并恢复上下文"""
+    token = g.pop('tenant_token', None)
+    if token is None:
+        return
+    metrics.observe('tenant_latency_seconds', time.perf_counter() - g.tenant_started,
+                    tenant=g.tenant, endpoint=request.endpoint)
+    current_tenant.reset(token)
+
+
+@app.before_request
+def start_profile():
+    """按采样率或请求头 X-Profile: 1 剖析本次请求（剖析未启用时只有一次判断）"""
+    profiler = get_profiler()
+    if not profiler.enabled or request.endpoint == 'debug_profile':
+        return None
+    trigger = profiler.should_profile(request.headers.get('X-Profile'), request.headers.get('X-Debug-Token'))
+    if trigger:
+        g.profile_handle = profiler.start(request.endpoint, trigger)
+    return None
+
+
+@app.after_request
+def finish_profile(response):
+    """结束剖析，响应头 X-Profile-Id 可用于在 /debug/profile?id=... 中查看本次请求的剖析结果"""
+    handle = g.pop('profile_handle', None)
+    if handle is not None:
+        response.headers['X-Profile-Id'] = get_profiler().finish(handle).id
+    return response
+
+
+@app.teardown_request
+def discard_profile(error=None):
+    """未正常返回响应的请求同样结束剖析"""
+    handle = g.pop('profile_handle', None)
+    if handle is not None:
+        get_profiler().finish(handle)
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """健康检查接口"""
@@ -31,6 +118,126 @@ def health_check():
     })
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """就绪检查接口（预热完成前返回503）"""
+    status = warmup.state.to_dict()
+    return jsonify(status), (200 if status['ready'] else 503)
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """运行指标接口"""
+    from models.base_model import cascade_report, prompt_cache_report
+
+    return jsonify({
+        "success": True,
+        "data": {
+            "cascade": cascade_report(),
+            "prompt_cache": prompt_cache_report(),
+            "coalescing": coalescing_report(),
+            "admission": get_admission_controller().stats(),
+            "tenants": tenant_report(),
+            "circuit_breakers": breaker_report(),
+            "llm_endpoints": endpoint_report(),
+            "metrics": metrics.snapshot()
+        }
+    })
+
+
+def tenant_report():
+    """各租户的配额、当前用量、请求耗时和模型调用排队情况"""
+    from utils.fair_scheduler import get_scheduler
+
+    snapshot = metrics.snapshot()
+    report = get_tenant_manager().report()
+    for tenant, entry in report.items():
+        label = f"tenant={tenant}"
+        entry["latency"] = {
+            labels.split('endpoint=')[1].split(',')[0]: summary
+            for labels, summary in snapshot['summaries'].get('tenant_latency_seconds', {}).items()
+            if label in labels.split(',')
+        }
+        entry["model_call_wait"] = snapshot['summaries'].get('tenant_queue_wait_seconds', {}).get(label)
+    return {
+        "tenants": report,
+        "scheduler": get_scheduler().stats(),
+    }
+
+
+@app.route('/debug/profile', methods=['GET'])
+def debug_profile():
+    """
+    性能剖析接口（profiling.enabled 开启时可用）
+
+    查询参数:
+        mode: requests（默认，汇总最近被剖析的请求）/ sample（对所有线程做栈采样）
+        window: requests 模式汇总最近多少秒内的请求，默认 profiling.window_seconds
+        endpoint: requests 模式只汇总该接口（如 analyze_resume）
+        id: 查看单个请求的剖析结果（响应头 X-Profile-Id）
+        sort: tottime（默认）/ cumtime / calls
+        limit: 返回的函数数量，默认30
+        seconds: sample 模式的采样时长，默认5，不超过 profiling.max_sample_seconds
+        interval_ms: sample 模式的采样间隔，默认 profiling.sample_interval_ms
+
+    请求头 X-Debug-Token: 配置了 profiling.token 时必须携带
+    """
+    from utils.config_loader import config
+
+    profiler = get_profiler()
+    if not profiler.enabled:
+        return jsonify({
+            "success": False,
+            "message": "性能剖析未启用"
+        }), 404
+    if not profiler.authorized(request.headers.get('X-Debug-Token')):
+        return jsonify({
+            "success": False,
+            "message": "X-Debug-Token 无效"
+        }), 403
+
+    profiling_config = config.get('profiling', {}) or {}
+    args = request.args
+    sort = args.get('sort', 'tottime')
+    limit = max(1, args.get('limit', default=30, type=int))
+    if sort not in SORT_KEYS:
+        return jsonify({
+            "success": False,
+            "message": f"sort 只能是 {', '.join(SORT_KEYS)}"
+        }), 400
+
+    if args.get('mode', 'requests') == 'sample':
+        seconds = min(
+            max(0.1, args.get('seconds', default=5.0, type=float)),
+            profiling_config.get('max_sample_seconds', 30)
+        )
+        interval = args.get('interval_ms', default=profiling_config.get('sample_interval_ms', 5), type=float) / 1000
+        return jsonify({
+            "success": True,
+            "data": sample_stacks(seconds, max(0.001, interval), limit)
+        })
+
+    if args.get('id'):
+        profile = profiler.get(args['id'])
+        if profile is None:
+            return jsonify({
+                "success": False,
+                "message": "剖析结果不存在或已被淘汰"
+            }), 404
+        return jsonify({
+            "success": True,
+            "data": dict(profile.summary(), functions=hot_functions(profile.stats, sort, limit))
+        })
+
+    window = args.get('window', default=profiling_config.get('window_seconds', 300), type=float)
+    data = profiler.aggregate(window, sort, limit, args.get('endpoint'))
+    data["recent"] = [profile.summary() for profile in profiler.recent(window)[-20:]]
+    return jsonify({
+        "success": True,
+        "data": data
+    })
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_resume():
     """
@@ -43,6 +250,9 @@ def analyze_resume():
         "resume": "简历内容"
     }
 
+    请求头 X-Priority: interactive（默认）或 batch，批量导入等非交互调用应使用 batch
+    请求头 X-Tenant-ID: 租户ID（默认 default），用于配额和模型调用的加权公平调度
+
     返回:
     {
         "success": true/false,
@@ -75,96 +285,162 @@ def analyze_resume():
         print("开始分析简历...")
         print("=" * 80)
 
-        # 步骤1: 解析简历
-        parser = ResumeParser()
-        parse_result = parser.process(resume_text)
-
-        if not parse_result['success']:
-            return jsonify(parse_result), 500
-
-        resume_data = parse_result['data']
-        personal_info = resume_data.get('personal_info', {})
-        work_experience = resume_data.get('work_experience', [])
-
-        # 步骤2-4: 并发执行三个判断模块
-        print("\n并发执行分析模块...")
-
-        concurrent_config = config.get_concurrent_config()
-        max_workers = concurrent_config.get('max_workers', 3)
-
-        big_company_result = None
-        ipo_result = None
-        negative_result = None
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交任务
-            future_big_company = executor.submit(
-                BigCompanyChecker().process,
-                work_experience
-            )
-            future_ipo = executor.submit(
-                IPOChecker().process,
-                work_experience
-            )
-            future_negative = executor.submit(
-                NegativeChecker().process,
-                personal_info,
-                work_experience
-            )
-
-            # 收集结果
-            futures = {
-                'big_company': future_big_company,
-                'ipo': future_ipo,
-                'negative': future_negative
-            }
-
-            for name, future in futures.items():
-                try:
-                    result = future.result()
-                    if name == 'big_company':
-                        big_company_result = result['data']
-                    elif name == 'ipo':
-                        ipo_result = result['data']
-                    elif name == 'negative':
-                        negative_result = result['data']
-                except Exception as e:
-                    print(f"模块 {name} 执行失败: {e}")
-                    return jsonify({
-                        "success": False,
-                        "message": f"模块 {name} 执行失败: {str(e)}"
-                    }), 500
-
-        # 步骤5: 生成最终报告
-        generator = ReportGenerator()
-        report_result = generator.process(
-            job_description=job_description,
-            exploration_direction=exploration_direction,
-            resume_data=resume_data,
-            big_company_result=big_company_result,
-            ipo_result=ipo_result,
-            negative_result=negative_result
-        )
+        lane = request.headers.get('X-Priority', 'interactive').strip().lower()
+        if lane not in LANES:
+            return jsonify({
+                "success": False,
+                "message": f"X-Priority 只能是 {', '.join(LANES)}"
+            }), 400
+
+        quota_error = charge_quota()
+        if quota_error:
+            return quota_error
 
-        if not report_result['success']:
-            return jsonify(report_result), 500
+        # 相同请求正在分析时直接等待其结果，响应头 X-Coalesced 标记合并的请求
+        try:
+            result, coalesced = analyze_coalesced(job_description, exploration_direction, resume_text, lane)
+        except AdmissionRejected as e:
+            print(f"请求被拒绝: {e}")
+            return jsonify({
+                "success": False,
+                "message": str(e)
+            }), 429, {'Retry-After': str(e.retry_after)}
+        headers = {'X-Coalesced': 'true' if coalesced else 'false'}
+        if not result['success']:
+            return jsonify(result), 500, headers
 
         print("\n" + "=" * 80)
         print("分析完成！")
         print("=" * 80 + "\n")
 
         # 返回完整结果
+        return jsonify(result), 200, headers
+
+    except Exception as e:
+        print(f"\n错误: {str(e)}")
+        print(traceback.format_exc())
         return jsonify({
-            "success": True,
-            "data": {
-                "resume_info": resume_data,
-                "big_company_analysis": big_company_result,
-                "ipo_analysis": ipo_result,
-                "negative_analysis": negative_result,
-                "final_report": report_result['data']
-            },
-            "message": "简历分析完成"
-        })
+            "success": False,
+            "message": f"服务器内部错误: {str(e)}"
+        }), 500
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    提交异步分析任务（由 python -m pipeline.jobs work 启动的 worker 执行）
+
+    请求体与 /api/analyze 相同；相同租户的相同请求返回同一个任务ID，不会重复分析
+
+    返回:
+    {
+        "success": true,
+        "data": {"job_id": "...", "status": "queued/running/done/failed"},
+        "message": "..."
+    }
+    """
+    from pipeline.jobs import submit_analysis
+    from storage.job_queue import get_job_queue
+
+    data = request.get_json(silent=True) or {}
+    job_description = data.get('job_description', '')
+    exploration_direction = data.get('exploration_direction', '')
+    resume_text = data.get('resume', '')
+    if not job_description or not exploration_direction or not resume_text:
+        return jsonify({
+            "success": False,
+            "message": "job_description, exploration_direction 和 resume 字段为必填项"
+        }), 400
+
+    quota_error = charge_quota()
+    if quota_error:
+        return quota_error
+
+    job_id = submit_analysis(job_description, exploration_direction, resume_text)
+    return jsonify({
+        "success": True,
+        "data": {"job_id": job_id, "status": get_job_queue().get(job_id)['status']},
+        "message": "任务已提交"
+    }), 202
+
+
+@app.route('/api/jobs', methods=['GET'])
+def job_queue_stats():
+    """任务队列统计：各状态的任务数、租约已过期的任务数和最早排队任务的等待时间"""
+    from storage.job_queue import get_job_queue
+
+    return jsonify({"success": True, "data": get_job_queue().stats()})
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询异步分析任务的状态，完成后 data.result 为与 /api/analyze 响应体相同结构的结果"""
+    from storage.job_queue import get_job_queue
+
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "message": "任务不存在"
+        }), 404
+    return jsonify({"success": True, "data": job})
+
+
+def _top_k_error(top_k):
+    """校验请求中的 top_k（可省略，否则须为非负整数），不合法时返回 400 响应"""
+    if top_k is None or (isinstance(top_k, int) and not isinstance(top_k, bool) and top_k >= 0):
+        return None
+    return jsonify({
+        "success": False,
+        "message": "top_k 必须是非负整数"
+    }), 400
+
+
+@app.route('/api/rank', methods=['POST'])
+def rank_resumes():
+    """
+    候选人排序接口
+
+    请求体:
+    {
+        "job_description": "职位描述",
+        "exploration_direction": "探索方向",
+        "resumes": ["简历内容", ...] 或 [{"id": "...", "resume": "..."}, ...],
+        "top_k": 10
+    }
+
+    请求头 X-Tenant-ID: 租户ID（默认 default）
+    """
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                "success": False,
+                "message": "请求体不能为空"
+            }), 400
+
+        job_description = data.get('job_description', '')
+        exploration_direction = data.get('exploration_direction', '')
+        resumes = data.get('resumes') or []
+        top_k = data.get('top_k')
+
+        if not job_description or not exploration_direction or not resumes:
+            return jsonify({
+                "success": False,
+                "message": "job_description, exploration_direction 和 resumes 字段为必填项"
+            }), 400
+        top_k_error = _top_k_error(top_k)
+        if top_k_error:
+            return top_k_error
+
+        quota_error = charge_quota()
+        if quota_error:
+            return quota_error
+
+        from pipeline.ranking import rank_candidates
+
+        return jsonify(rank_candidates(job_description, exploration_direction, resumes, top_k))
 
     except Exception as e:
         print(f"\n错误: {str(e)}")
@@ -175,6 +451,168 @@ def analyze_resume():
         }), 500
 
 
+@app.route('/api/score', methods=['POST'])
+def score_resumes():
+    """
+    结构化特征打分接口（不调用GPT）
+
+    请求体:
+    {
+        "job_description": "职位描述",
+        "candidates": [{"id": "...", "resume_data": {...解析结果}, "check_results": {"big_company": {...}, ...}}, ...],
+        "weights": {"keyword_overlap": 0.4, ...},
+        "top_k": 100
+    }
+
+    candidates 中的元素也可以直接使用 /api/analyze 响应的 data（含 resume_info 和各检查项结果）
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({
+            "success": False,
+            "message": "请求体不能为空"
+        }), 400
+
+    candidates = data.get('candidates') or []
+    if not data.get('job_description') or not candidates:
+        return jsonify({
+            "success": False,
+            "message": "job_description 和 candidates 字段为必填项"
+        }), 400
+    if not all(isinstance(candidate, dict) for candidate in candidates):
+        return jsonify({
+            "success": False,
+            "message": "candidates 中的每一项必须是对象"
+        }), 400
+    top_k_error = _top_k_error(data.get('top_k'))
+    if top_k_error:
+        return top_k_error
+
+    from pipeline.ranking import score_candidates
+
+    try:
+        return jsonify(score_candidates(
+            data['job_description'], candidates, data.get('weights'), data.get('top_k')
+        ))
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+
+
+@app.route('/api/corpus/search', methods=['GET'])
+def search_corpus():
+    """
+    简历语料库检索接口（不调用GPT）
+
+    查询参数: company, position, education, text, start_year, end_year, limit
+    例如: /api/corpus/search?company=美团&position=架构师&start_year=2015&end_year=2018
+    """
+    from index.corpus import get_corpus
+
+    corpus = get_corpus()
+    if corpus is None:
+        return jsonify({
+            "success": False,
+            "message": "简历语料库未启用"
+        }), 404
+
+    try:
+        args = request.args
+        result = corpus.search(
+            company=args.get('company'),
+            position=args.get('position'),
+            education=args.get('education'),
+            text=args.get('text'),
+            start_year=args.get('start_year', type=int),
+            end_year=args.get('end_year', type=int),
+            limit=args.get('limit', default=20, type=int)
+        )
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+
+    return jsonify({
+        "success": True,
+        "data": result,
+        "message": "检索完成"
+    })
+
+
+def _analysis_store_or_404():
+    """获取历史结果库，未启用时返回错误响应"""
+    from storage.analysis_store import get_analysis_store
+
+    store = get_analysis_store()
+    if store is None:
+        return None, (jsonify({
+            "success": False,
+            "message": "历史结果库未启用"
+        }), 404)
+    return store, None
+
+
+@app.route('/api/analyses/<analysis_id>', methods=['GET'])
+def get_analysis(analysis_id):
+    """读取一次历史分析的完整结果"""
+    store, error = _analysis_store_or_404()
+    if error:
+        return error
+
+    payload = store.get(analysis_id)
+    if payload is None:
+        return jsonify({
+            "success": False,
+            "message": "分析结果不存在"
+        }), 404
+    return jsonify({"success": True, "data": payload})
+
+
+@app.route('/api/analytics/score_distribution', methods=['GET', 'POST'])
+def score_distribution():
+    """
+    匹配分数分布
+
+    参数: job_description（可选，POST请求体或查询参数）, bins（1~100，默认10）
+    """
+    store, error = _analysis_store_or_404()
+    if error:
+        return error
+
+    body = request.get_json(silent=True) or {}
+    job_description = body.get('job_description') or request.args.get('job_description')
+    try:
+        bins = int(body.get('bins') or request.args.get('bins', 10))
+    except (TypeError, ValueError):
+        bins = 0
+    if not 1 <= bins <= 100:
+        return jsonify({
+            "success": False,
+            "message": "bins 必须是 1 到 100 之间的整数"
+        }), 400
+
+    return jsonify({
+        "success": True,
+        "data": store.score_distribution(job_description, bins=bins)
+    })
+
+
+@app.route('/api/analytics/reject_rate', methods=['GET'])
+def reject_rate():
+    """按负面舆情风险等级统计不推荐比例"""
+    store, error = _analysis_store_or_404()
+    if error:
+        return error
+
+    return jsonify({
+        "success": True,
+        "data": store.reject_rate_by_risk_level()
+    })
+
+
 @app.errorhandler(404)
 def not_found(error):
     """404错误处理"""
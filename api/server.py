@@ -0,0 +1,73 @@
+"""
+生产环境服务
+功能：基于gunicorn的多进程服务，主进程预加载应用和模型模块后fork出多个worker，
+worker之间通过共享缓存复用LLM/搜索结果，收到HUP信号时平滑重载
+"""
+import multiprocessing
+from typing import Dict, Any
+
+from gunicorn.app.base import BaseApplication
+
+from utils.config_loader import config
+
+
+def preload_models():
+    """
+    在fork之前预加载模型模块和共享缓存
+
+    只预加载模块和配置，不在主进程中创建OpenAI客户端：
+    HTTP连接池不能安全地跨fork复用，客户端由每个worker在处理请求时创建。
+    预热在主进程中同步完成，fork出的worker一启动即为就绪状态
+    """
+    from api.warmup import warm_up
+
+    warm_up()
+
+
+def build_server_options(host: str, port: int, workers: int = 0) -> Dict[str, Any]:
+    """
+    根据配置生成gunicorn参数
+
+    Args:
+        host: 监听地址
+        port: 监听端口
+        workers: worker进程数，0表示使用配置或CPU核数
+
+    Returns:
+        gunicorn配置字典
+    """
+    server_config = config.get_server_config()
+    workers = workers or server_config.get('workers', 0) or multiprocessing.cpu_count()
+
+    return {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': server_config.get('threads', 16),
+        'preload_app': True,
+        'timeout': server_config.get('timeout', 300),
+        # 平滑重载时旧worker会等待进行中的分析完成后再退出
+        'graceful_timeout': server_config.get('graceful_timeout', 300),
+        'max_requests': server_config.get('max_requests', 1000),
+        'max_requests_jitter': 50,
+    }
+
+
+class ProductionServer(BaseApplication):
+    """gunicorn多进程服务"""
+
+    def __init__(self, app, options: Dict[str, Any]):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        """将参数写入gunicorn配置"""
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        """返回WSGI应用（preload_app时在主进程中调用一次）"""
+        preload_models()
+        return self.application
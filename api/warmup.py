@@ -0,0 +1,83 @@
+"""
+服务预热模块
+功能：加载配置、导入模型模块及重量级依赖、初始化共享缓存，
+预热完成前就绪检查接口返回503，避免冷启动的实例接收流量
+"""
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+class WarmupState:
+    """预热状态"""
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """就绪状态描述"""
+        duration = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration = round(self.finished_at - self.started_at, 3)
+        return {
+            "ready": self.is_ready,
+            "warmup_seconds": duration,
+            "error": self.error
+        }
+
+
+state = WarmupState()
+
+
+def warm_up() -> bool:
+    """
+    执行预热（幂等，多次调用只执行一次）
+
+    Returns:
+        是否预热成功
+    """
+    with state._lock:
+        if state._started:
+            return state.is_ready
+        state._started = True
+        state.started_at = time.time()
+
+    try:
+        from utils.config_loader import config
+        from utils.cache import get_cache
+        import models
+
+        config.get('openai')
+        for name in models.__all__:
+            getattr(models, name)
+
+        # 导入重量级第三方依赖，使第一个请求无需再等待
+        import openai  # noqa: F401
+
+        get_cache()
+        state.finished_at = time.time()
+        state._ready.set()
+        print(f"服务预热完成，耗时 {state.finished_at - state.started_at:.2f}s")
+        return True
+
+    except Exception as e:
+        state.finished_at = time.time()
+        state.error = str(e)
+        print(f"服务预热失败: {e}")
+        return False
+
+
+def start_background_warmup() -> threading.Thread:
+    """在后台线程中执行预热"""
+    thread = threading.Thread(target=warm_up, name='warmup', daemon=True)
+    thread.start()
+    return thread
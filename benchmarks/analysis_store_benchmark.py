@@ -0,0 +1,97 @@
+"""
+历史分析结果库性能测试
+功能：批量导入合成分析结果，测量写入速度、列文件大小和聚合查询耗时
+
+用法：
+    python benchmarks/analysis_store_benchmark.py [--size 1000000]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index.bm25 import load_numpy
+from storage.analysis_store import AnalysisStore
+
+JOB_DESCRIPTIONS = [f"职位{i}：Java架构师，{i + 3}年以上经验" for i in range(20)]
+RECOMMENDATIONS = ['推荐', '谨慎推荐', '不推荐']
+RISK_LEVELS = ['none', 'low', 'medium', 'high']
+
+
+def synthetic_item(rng: random.Random):
+    """生成一条合成分析结果（完整结果只保留报告部分，避免测试被压缩耗时主导）"""
+    risk = rng.choice(RISK_LEVELS)
+    score = max(0, min(100, rng.gauss(65 - 10 * RISK_LEVELS.index(risk), 15)))
+    recommendation = RECOMMENDATIONS[0] if score >= 75 else RECOMMENDATIONS[1] if score >= 55 else RECOMMENDATIONS[2]
+    data = {
+        "big_company_analysis": {"has_big_company_experience": rng.random() < 0.6},
+        "ipo_analysis": {"has_ipo_experience": rng.random() < 0.3},
+        "negative_analysis": {"has_negative_info": risk in ('medium', 'high'), "risk_level": risk},
+        "final_report": {"match_score": round(score), "final_recommendation": recommendation},
+        "stage_stats": {
+            stage: {"latency": rng.uniform(1, 8), "prompt_tokens": rng.randint(300, 3000), "completion_tokens": rng.randint(100, 800)}
+            for stage in ('resume_parser', 'big_company', 'ipo', 'negative', 'report')
+        },
+        "total_latency": rng.uniform(10, 40),
+    }
+    return rng.choice(JOB_DESCRIPTIONS), "1. 大厂 2. 上市 3. 负面舆情", data
+
+
+def timed(fn, repeat):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史分析结果库性能测试")
+    parser.add_argument('--size', type=int, default=1000000, help='分析结果数量')
+    parser.add_argument('--batch', type=int, default=50000, help='每批导入数量')
+    parser.add_argument('--repeat', type=int, default=10, help='每个查询的执行次数')
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix='analysis_store_bench_')
+    store = AnalysisStore(path)
+    rng = random.Random(7)
+
+    t0 = time.perf_counter()
+    written = 0
+    while written < args.size:
+        batch = [synthetic_item(rng) for _ in range(min(args.batch, args.size - written))]
+        store.save_many(batch)
+        written += len(batch)
+    load_seconds = time.perf_counter() - t0
+
+    column_bytes = sum(
+        os.path.getsize(os.path.join(store.columns_path, name))
+        for name in os.listdir(store.columns_path)
+    )
+
+    print(json.dumps({
+        "rows": store.row_count(),
+        "numpy": load_numpy() is not None,
+        "load_seconds": round(load_seconds, 1),
+        "column_mb": round(column_bytes / 1024 / 1024, 1),
+        "column_bytes_per_row": round(column_bytes / args.size, 1),
+        "score_distribution_all_ms": timed(lambda: store.score_distribution(), args.repeat),
+        "score_distribution_per_jd_ms": timed(lambda: store.score_distribution(JOB_DESCRIPTIONS[3]), args.repeat),
+        "reject_rate_by_risk_level_ms": timed(lambda: store.reject_rate_by_risk_level(), args.repeat),
+        "reject_rate_by_risk_level": store.reject_rate_by_risk_level(),
+    }, ensure_ascii=False, indent=2))
+
+    shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+公司实体识别性能测试
+功能：生成大量带地名、括号、公司类型后缀、大小写变化和错别字的公司名称，
+测量识别吞吐量（冷启动逐条识别 / 带识别结果缓存）和识别准确率，
+并与逐个别名做子串比较的朴素做法对比
+
+用法：
+    python benchmarks/company_resolver_benchmark.py [--size 2000000] [--distinct 50000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index.company_resolver import CompanyResolver, normalize
+from utils.config_loader import config
+
+LOCATIONS = ['北京', '上海市', '深圳市', '杭州', '广州', '']
+SUFFIXES = ['有限公司', '科技有限公司', '网络技术有限公司', '（中国）有限公司', '集团', ' Inc.', ' Co., Ltd.', '']
+UNRELATED = ['星河', '远景', '云帆', '鼎盛', '恒通', '启明', '华信', '博远', '天成', '新锐']
+UNRELATED_INDUSTRIES = ['软件', '信息', '数据', '智能', '咨询', '物流', '教育', '医疗']
+# 以大厂别名开头或与其只差一两个字母、但不是同一家公司的名称
+HARD_NEGATIVES = ['京东方科技集团股份有限公司', '苹果树科技有限公司', '华为达', '百度外卖', '小米粒教育',
+                  'JDB Group', 'Amazonia', 'Metadata Inc']
+
+
+def decorate(rng: random.Random, alias: str) -> str:
+    """给别名加上注册名常见的修饰，并以一定概率制造一个错别字"""
+    name = alias
+    if rng.random() < 0.3 and len(name) >= 4:
+        i = rng.randrange(1, len(name) - 1)
+        name = name[:i] + rng.choice('的了在和') + name[i + 1:]
+    if rng.random() < 0.5:
+        name = rng.choice(LOCATIONS) + name
+    if rng.random() < 0.6:
+        name = name + rng.choice(SUFFIXES)
+    if rng.random() < 0.2:
+        name = name.upper()
+    return name
+
+
+def generate_names(entities, distinct: int, seed: int = 7):
+    """
+    生成不重复的带标注公司名称
+
+    Returns:
+        [(名称, 期望的规范ID或None)]
+    """
+    rng = random.Random(seed)
+    aliases = [
+        (alias, company_id)
+        for company_id, entity in entities.items()
+        for alias in [entity.get('name', company_id), *(entity.get('aliases') or []), *(entity.get('products') or [])]
+    ]
+    names, seen = [], set()
+    while len(names) < distinct:
+        if rng.random() < 0.7:
+            alias, company_id = rng.choice(aliases)
+            name = decorate(rng, alias)
+        else:
+            company_id = None
+            name = (rng.choice(LOCATIONS) + rng.choice(UNRELATED) + rng.choice(UNRELATED_INDUSTRIES)
+                    + str(rng.randrange(1000)) + rng.choice(SUFFIXES))
+        if name not in seen:
+            seen.add(name)
+            names.append((name, company_id))
+    return names
+
+
+def naive_resolve(name: str, aliases):
+    """朴素做法：逐个别名做子串比较，取最长的命中"""
+    text = normalize(name)
+    best = None
+    for alias, company_id in aliases:
+        if alias in text and (best is None or len(alias) > len(best[0])):
+            best = (alias, company_id)
+    return best[1] if best else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="公司实体识别性能测试")
+    parser.add_argument('--size', type=int, default=2000000, help='识别的名称总数（按真实分布重复）')
+    parser.add_argument('--distinct', type=int, default=50000, help='不重复的名称数')
+    parser.add_argument('--naive-sample', type=int, default=20000, help='朴素做法的采样条数')
+    args = parser.parse_args()
+
+    company_config = config.get('companies', {}) or {}
+    entities = company_config.get('entities', {})
+    resolver = CompanyResolver(
+        entities=entities,
+        known_companies=config.get_big_company_config().get('known_companies', []),
+        fuzzy_threshold=company_config.get('fuzzy_threshold', 0.8)
+    )
+
+    labeled = generate_names(entities, args.distinct)
+
+    # 冷启动：每个名称都是第一次出现，完整走 精确 -> 扫描 -> 模糊 流程
+    t0 = time.perf_counter()
+    methods = {}
+    correct = false_positive = missed = 0
+    for name, expected in labeled:
+        match = resolver.resolve(name)
+        methods[match.method if match else 'none'] = methods.get(match.method if match else 'none', 0) + 1
+        actual = match.id if match else None
+        if actual == expected:
+            correct += 1
+        elif expected is None:
+            false_positive += 1
+        else:
+            missed += 1
+    cold_seconds = time.perf_counter() - t0
+
+    # 按 Zipf 分布重复抽样，模拟大量简历中公司名称的重复
+    rng = random.Random(11)
+    weights = [1 / (rank + 1) for rank in range(len(labeled))]
+    stream = [name for name, _ in rng.choices(labeled, weights=weights, k=args.size)]
+    t0 = time.perf_counter()
+    for name in stream:
+        resolver.resolve(name)
+    warm_seconds = time.perf_counter() - t0
+
+    hard_negatives = [name for name in HARD_NEGATIVES if resolver.resolve(name) is not None]
+
+    naive_aliases = [
+        (normalize(alias), company_id)
+        for company_id, entity in entities.items()
+        for alias in [entity.get('name', company_id), *(entity.get('aliases') or []), *(entity.get('products') or [])]
+    ]
+    sample = labeled[:args.naive_sample]
+    t0 = time.perf_counter()
+    naive_correct = sum(naive_resolve(name, naive_aliases) == expected for name, expected in sample)
+    naive_seconds = time.perf_counter() - t0
+
+    print(json.dumps({
+        "entities": len(entities),
+        "aliases": len(naive_aliases),
+        "distinct_names": len(labeled),
+        "cold_names_per_second": round(len(labeled) / cold_seconds),
+        "methods": methods,
+        "accuracy": round(correct / len(labeled), 4),
+        "false_positive_rate": round(false_positive / len(labeled), 4),
+        "missed_rate": round(missed / len(labeled), 4),
+        "hard_negative_false_positives": hard_negatives,
+        "stream_size": args.size,
+        "stream_seconds": round(warm_seconds, 2),
+        "stream_names_per_second": round(args.size / warm_seconds),
+        "naive_names_per_second": round(len(sample) / naive_seconds),
+        "naive_accuracy": round(naive_correct / len(sample), 4),
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+简历语料库性能测试
+功能：批量写入合成解析结果，测量建索引耗时、磁盘占用和典型查询延迟
+
+用法：
+    python benchmarks/corpus_benchmark.py [--size 1000000] [--path /tmp/corpus_bench]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_parsed_resumes
+from index.corpus import ResumeCorpus
+
+QUERIES = [
+    {"company": "美团", "position": "架构师", "start_year": 2015, "end_year": 2018},
+    {"company": "字节跳动", "position": "技术专家"},
+    {"position": "算法工程师", "text": "推荐系统", "start_year": 2020},
+    {"education": "清华大学", "company": "腾讯"},
+    {"company": "阿里巴巴", "text": "Kafka 高并发", "start_year": 2010, "end_year": 2012},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历语料库性能测试")
+    parser.add_argument('--size', type=int, default=1000000, help='简历数量')
+    parser.add_argument('--flush-every', type=int, default=100000, help='每写入多少份简历落盘一次')
+    parser.add_argument('--path', default=None, help='语料库目录，默认使用临时目录')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询的执行次数')
+    args = parser.parse_args()
+
+    path = args.path or tempfile.mkdtemp(prefix='corpus_bench_')
+    if os.path.exists(path):
+        shutil.rmtree(path)
+
+    corpus = ResumeCorpus(path, max_segments=64)
+    build_seconds = 0.0
+    written = 0
+    while written < args.size:
+        batch = generate_parsed_resumes(min(args.flush_every, args.size - written), seed=written)
+        t0 = time.perf_counter()
+        for resume in batch:
+            corpus.add(resume)
+        corpus.flush()
+        build_seconds += time.perf_counter() - t0
+        written += len(batch)
+
+    t0 = time.perf_counter()
+    corpus.compact()
+    compact_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reopened = ResumeCorpus(path)
+    reopened.search(company="腾讯", limit=1)
+    open_seconds = time.perf_counter() - t0
+
+    stats = reopened.stats()
+    queries = []
+    for query in QUERIES:
+        reopened.search(**query)
+        latencies = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            result = reopened.search(**query)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        queries.append({
+            "query": query,
+            "hits": result['total'],
+            "ms_median": round(statistics.median(latencies), 2),
+            "ms_max": round(max(latencies), 2),
+        })
+
+    print(json.dumps({
+        "resumes": stats['resumes'],
+        "jobs": stats['jobs'],
+        "build_seconds": round(build_seconds, 1),
+        "compact_seconds": round(compact_seconds, 1),
+        "open_seconds": round(open_seconds, 2),
+        "size_mb": round(stats['size_bytes'] / 1024 / 1024, 1),
+        "bytes_per_resume": round(stats['size_bytes'] / max(1, stats['resumes'])),
+        "queries": queries,
+    }, ensure_ascii=False, indent=2))
+
+    if not args.path:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+网页摘录抓取测试
+功能：在本地启动两个模拟站点（每个网页有固定延迟、导航/脚本/页脚等模板内容并支持 ETag，
+另有超大网页、持续慢速输出的网页和非文本内容），对比：
+    naive       逐个 requests.get 完整下载
+    cold        PageFetcher 并发抓取（每个站点并发数有上限，超时和大小上限生效）
+    warm        再次抓取，全部命中缓存
+    revalidate  缓存过期后再次抓取，服务端按 ETag 返回 304
+并输出选出的段落长度与网页正文总长度的对比
+
+用法：
+    python benchmarks/evidence_fetch_benchmark.py [--pages 20] [--latency 0.2] [--per-host 4]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.cache as cache_module
+from index.passages import top_passages
+from utils.cache import SharedCache
+from utils.metrics import metrics
+from utils.page_fetcher import PageFetcher, extract_text
+
+BOILERPLATE = """
+<header><div class="logo">新闻网</div><nav><a href="/">首页</a><a href="/tech">科技</a><a href="/finance">财经</a></nav></header>
+<script>window.analytics = {track: function () {}}; var ads = [1, 2, 3];</script>
+<style>body { font-family: sans-serif; } .ad { display: none; }</style>
+"""
+
+FOOTER = """
+<aside><h3>热门推荐</h3><ul><li><a href="/1">今日热点新闻一则</a></li><li><a href="/2">另一条推荐新闻</a></li></ul></aside>
+<footer>版权所有 © 2024 新闻网 | 京ICP备00000000号 | 联系我们</footer>
+"""
+
+
+def article(index: int) -> str:
+    relevant = index % 3 == 0
+    paragraphs = [
+        f"第{index}篇报道：某科技公司发布了新一代产品，市场反响良好，多家机构上调了该公司的评级。",
+        "业内人士表示，行业整体竞争加剧，头部企业的研发投入持续增长，中小企业面临更大的压力。",
+    ]
+    if relevant:
+        paragraphs.append(f"据报道，张三在腾讯任职期间曾卷入一起劳动纠纷诉讼，案件已于去年调解结案（报道{index}）。")
+    paragraphs.extend(f"这是与主题无关的第{k}段填充内容，用于模拟真实网页中较长的正文篇幅和其他栏目文字。" for k in range(20))
+    body = ''.join(f"<p>{p}</p>" for p in paragraphs)
+    return (f"<html><head><meta charset=\"utf-8\"><title>报道 {index}</title></head><body>"
+            f"{BOILERPLATE}<article>{body}</article>{FOOTER}</body></html>")
+
+
+class FixtureSite:
+    """模拟站点"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.active = 0
+        self.max_active = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with site.lock:
+                    site.active += 1
+                    site.max_active = max(site.max_active, site.active)
+                try:
+                    site.handle(self)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with site.lock:
+                        site.active -= 1
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def handle(self, handler):
+        time.sleep(self.latency)
+        path = handler.path
+        if path.startswith('/large'):
+            # 约5MB的网页
+            self.send(handler, 200, ('<p>' + '很长的网页内容。' * 50 + '</p>\n') * 4000, 'text/html; charset=utf-8')
+        elif path.startswith('/slow'):
+            # 持续慢速输出，超过单个网页的总耗时上限
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/html; charset=utf-8')
+            handler.end_headers()
+            for _ in range(100):
+                handler.wfile.write(('<p>' + '慢速内容' * 100 + '</p>').encode('utf-8'))
+                handler.wfile.flush()
+                time.sleep(0.2)
+        elif path.startswith('/file'):
+            self.send(handler, 200, '%PDF-1.4 binary', 'application/pdf')
+        else:
+            html = article(int(path.rsplit('/', 1)[-1]))
+            etag = '"' + hashlib.md5(html.encode('utf-8')).hexdigest() + '"'
+            if handler.headers.get('If-None-Match') == etag:
+                with self.lock:
+                    self.not_modified += 1
+                handler.send_response(304)
+                handler.send_header('ETag', etag)
+                handler.end_headers()
+                return
+            self.send(handler, 200, html, 'text/html; charset=utf-8', {'ETag': etag})
+
+    @staticmethod
+    def send(handler, status, text, content_type, headers=None):
+        data = text.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def naive(urls, timeout):
+    """逐个完整下载并提取正文"""
+    import requests
+
+    pages, size = [], 0
+    for url in urls:
+        try:
+            response = requests.get(url, timeout=timeout)
+        except Exception:
+            continue
+        size += len(response.content)
+        if response.headers.get('Content-Type', '').startswith('text/'):
+            pages.append(dict(extract_text(response.text), url=url))
+    return pages, size
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, {"mode": label, "wall_seconds": round(time.perf_counter() - start, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='网页摘录抓取测试')
+    parser.add_argument('--pages', type=int, default=20, help='普通网页数（平均分布在两个站点）')
+    parser.add_argument('--latency', type=float, default=0.2, help='每个网页的服务端延迟（秒）')
+    parser.add_argument('--per-host', type=int, default=4, help='同一站点同时进行的请求数')
+    parser.add_argument('--skip-naive', action='store_true', help='不测试逐个下载（包含慢速网页时耗时较长）')
+    args = parser.parse_args()
+
+    sites = [FixtureSite(args.latency), FixtureSite(args.latency)]
+    urls = [sites[i % 2].url(f"/news/{i}") for i in range(args.pages)]
+    urls += [sites[0].url('/large'), sites[1].url('/slow'), sites[0].url('/file')]
+
+    temp_dir = tempfile.mkdtemp()
+    cache = cache_module._cache_instance = SharedCache(os.path.join(temp_dir, 'cache.sqlite3'))
+    fetcher = PageFetcher(max_workers=16, per_host=args.per_host, connect_timeout=2, read_timeout=2,
+                          page_deadline=2, max_bytes=1_000_000, allow_private_hosts=True)
+    query = '张三 腾讯 负面 纠纷 诉讼 违规 处罚'
+    results = []
+
+    if not args.skip_naive:
+        (pages, size), row = timed('naive', lambda: naive(urls, timeout=30))
+        row.update(pages=len(pages), bytes=size)
+        results.append(row)
+
+    for label in ('cold', 'warm', 'revalidate'):
+        if label == 'revalidate':
+            # 模拟缓存过期
+            cache._connect().execute("UPDATE cache SET expires_at = 0 WHERE namespace = 'page'")
+        before = metrics.snapshot()['counters'].get('page_fetches', {})
+        pages, row = timed(label, lambda: fetcher.fetch_all(urls))
+        after = metrics.snapshot()['counters'].get('page_fetches', {})
+        row.update(pages=len(pages), outcomes={
+            key.split('=', 1)[1]: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)
+        })
+        results.append(row)
+
+    passages = top_passages(query, pages, top_k=6)
+    summary = {
+        "results": results,
+        "max_concurrent_per_site": [site.max_active for site in sites],
+        "not_modified_responses": sum(site.not_modified for site in sites),
+        "page_text_chars": sum(len(page['text']) for page in pages),
+        "passages": len(passages),
+        "passage_chars": sum(len(item['text']) for item in passages),
+        "relevant_passages": sum(1 for item in passages if '张三' in item['text']),
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
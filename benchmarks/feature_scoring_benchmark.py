@@ -0,0 +1,91 @@
+"""
+结构化特征打分性能测试
+功能：在合成候选池上测量特征提取速度，以及按权重一次性打分并取前 top_k 名的耗时
+
+用法：
+    python benchmarks/feature_scoring_benchmark.py [--size 200000] [--queries 10] [--top-k 100]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_parsed_resumes
+from index.bm25 import load_numpy
+from index.company_resolver import CompanyResolver
+from index.features import FeatureMatrix, FeatureScorer, extract_features, job_terms
+
+KNOWN_COMPANIES = ['腾讯', '阿里巴巴', '字节跳动', '百度', '京东', '美团', '拼多多', '网易', '小米', '华为']
+
+JOB_DESCRIPTION = "Java架构师，5年以上Java开发经验，熟悉微服务架构、Spring Cloud、分布式系统和高并发，有团队管理经验"
+
+
+def synthetic_check_results(resume, rng: random.Random):
+    """按简历中的公司生成与检查项输出结构一致的结果"""
+    companies = list(dict.fromkeys(job['company'] for job in resume['work_experience']))
+    return {
+        "big_company": {
+            "has_big_company_experience": any(c in KNOWN_COMPANIES for c in companies),
+            "big_companies": [
+                {"company_name": c, "is_big_company": c in KNOWN_COMPANIES} for c in companies
+            ],
+        },
+        "ipo": {
+            "has_ipo_experience": rng.random() < 0.2,
+            "ipo_experiences": [
+                {"company_name": c, "experienced_ipo": rng.random() < 0.15} for c in companies
+            ],
+        },
+        "negative": {"risk_level": rng.choices(['none', 'low', 'medium', 'high'], [85, 10, 4, 1])[0]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="结构化特征打分性能测试")
+    parser.add_argument('--size', type=int, default=200000, help='候选池大小')
+    parser.add_argument('--queries', type=int, default=10, help='打分次数（每次使用不同的权重）')
+    parser.add_argument('--top-k', type=int, default=100, help='返回的候选人数量')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    resumes = generate_parsed_resumes(args.size, args.seed)
+    checks = [synthetic_check_results(resume, rng) for resume in resumes]
+    generate_seconds = time.perf_counter() - t0
+
+    resolver = CompanyResolver(known_companies=KNOWN_COMPANIES)
+    terms = job_terms(JOB_DESCRIPTION)
+    matrix = FeatureMatrix()
+    t0 = time.perf_counter()
+    for i, (resume, check) in enumerate(zip(resumes, checks)):
+        matrix.add(str(i), extract_features(resume, check, terms, resolver))
+    extract_seconds = time.perf_counter() - t0
+
+    latencies = []
+    for i in range(args.queries):
+        scorer = FeatureScorer(weights={'keyword_overlap': 0.2 + 0.02 * i, 'negative_risk': -0.3 - 0.02 * i})
+        t0 = time.perf_counter()
+        top = scorer.rank(matrix, args.top_k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    print(json.dumps({
+        "size": args.size,
+        "numpy": load_numpy() is not None,
+        "generate_seconds": round(generate_seconds, 2),
+        "extract_seconds": round(extract_seconds, 2),
+        "extract_per_second": round(args.size / extract_seconds),
+        "rank_ms_median": round(statistics.median(latencies), 1),
+        "rank_ms_max": round(max(latencies), 1),
+        "ranked_per_second": round(args.size / (statistics.median(latencies) / 1000)),
+        "top_score": round(top[0][1], 2) if top else None,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+分布式任务队列测试
+功能：
+    scaling  向队列提交一批任务，分别用 1、2、4、8 个 worker 进程执行，输出吞吐量、相对 1 个 worker 的加速比和扩展效率。
+             任务为模拟的分析（固定延迟，模拟模型调用等待，加少量CPU计算），每个任务执行一个通过 run_once 记录的副作用步骤
+    crash    一个 worker 在执行若干任务后、写入结果前直接退出（模拟崩溃），另一个 worker 在租约过期后重新领取这些任务，
+             检查所有任务最终完成、每个任务的副作用步骤只执行一次
+
+用法：
+    python benchmarks/job_queue_benchmark.py [--jobs 200] [--latency 0.2] [--workers 1,2,4,8] [--threads 1]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.jobs import Worker
+from storage.job_queue import JobQueue, run_once
+
+
+def simulated_analysis(job, effects_path: str, crash_after: int = 0, state=None):
+    """模拟一次分析：等待（模型调用）+ 少量计算 + 只执行一次的副作用步骤"""
+    payload = job.payload
+    time.sleep(payload['latency'])
+    sum(i * i for i in range(payload['cpu_loops']))
+
+    def effect():
+        with open(effects_path, 'a', encoding='utf-8') as f:
+            f.write(job.job_id + '\n')
+        return job.job_id
+
+    run_once('effect', effect)
+    if crash_after:
+        state['done'] += 1
+        if state['done'] >= crash_after:
+            # 副作用已记录、结果尚未写入时崩溃
+            os._exit(1)
+    return {"success": True, "data": {"job": payload['index']}, "message": "ok"}
+
+
+def worker_process(queue_path: str, effects_path: str, worker_id: str, threads: int,
+                   lease_seconds: float, crash_after: int = 0):
+    queue = JobQueue(queue_path, lease_seconds=lease_seconds, retry_delay=0.1)
+    state = {'done': 0}
+    worker = Worker(
+        queue=queue,
+        handler=lambda job: simulated_analysis(job, effects_path, crash_after, state),
+        worker_id=worker_id,
+        threads=threads,
+        heartbeat_interval=lease_seconds / 4,
+        poll_interval=0.05
+    )
+    sys.stdout = open(os.devnull, 'w')
+    worker.run(exit_when_idle=True)
+
+
+def submit_jobs(queue: JobQueue, count: int, latency: float, cpu_loops: int):
+    return [
+        queue.submit({"index": i, "latency": latency, "cpu_loops": cpu_loops})
+        for i in range(count)
+    ]
+
+
+def effect_counts(effects_path: str):
+    counts = {}
+    if os.path.exists(effects_path):
+        with open(effects_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                counts[line.strip()] = counts.get(line.strip(), 0) + 1
+    return counts
+
+
+def run_scaling(workers: int, jobs: int, latency: float, cpu_loops: int, threads: int):
+    directory = tempfile.mkdtemp()
+    queue_path = os.path.join(directory, 'jobs.sqlite3')
+    effects_path = os.path.join(directory, 'effects.txt')
+    queue = JobQueue(queue_path, lease_seconds=10)
+    submit_jobs(queue, jobs, latency, cpu_loops)
+
+    started = time.perf_counter()
+    processes = [
+        multiprocessing.Process(
+            target=worker_process, args=(queue_path, effects_path, f"worker-{i}", threads, 10.0)
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    wall = time.perf_counter() - started
+
+    stats = queue.stats()
+    return {
+        "workers": workers,
+        "threads_per_worker": threads,
+        "jobs": jobs,
+        "done": stats['jobs']['done'],
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(stats['jobs']['done'] / wall, 2),
+        "side_effects": sum(effect_counts(effects_path).values()),
+    }
+
+
+def run_crash(jobs: int, latency: float, cpu_loops: int, lease_seconds: float):
+    directory = tempfile.mkdtemp()
+    queue_path = os.path.join(directory, 'jobs.sqlite3')
+    effects_path = os.path.join(directory, 'effects.txt')
+    queue = JobQueue(queue_path, lease_seconds=lease_seconds)
+    job_ids = submit_jobs(queue, jobs, latency, cpu_loops)
+
+    started = time.perf_counter()
+    # 2 个执行线程的 worker 完成 3 个任务的副作用后崩溃，另一个线程正在执行的任务同样中断
+    crashing = multiprocessing.Process(
+        target=worker_process, args=(queue_path, effects_path, 'crashing', 2, lease_seconds, 3)
+    )
+    crashing.start()
+    crashing.join()
+    orphaned = queue.stats()['jobs']['running']
+    survivor = multiprocessing.Process(
+        target=worker_process, args=(queue_path, effects_path, 'survivor', 2, lease_seconds)
+    )
+    survivor.start()
+    survivor.join()
+    wall = time.perf_counter() - started
+
+    jobs_after = queue.get_many(job_ids)
+    counts = effect_counts(effects_path)
+    return {
+        "jobs": jobs,
+        "crashed_worker_exit_code": crashing.exitcode,
+        "orphaned_leases": orphaned,
+        "done": sum(1 for job in jobs_after.values() if job['status'] == 'done'),
+        "retried_jobs": sum(1 for job in jobs_after.values() if job['attempts'] > 1),
+        "side_effects": sum(counts.values()),
+        "duplicate_side_effects": sum(count - 1 for count in counts.values() if count > 1),
+        "wall_seconds": round(wall, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分布式任务队列测试')
+    parser.add_argument('--jobs', type=int, default=200, help='每轮提交的任务数')
+    parser.add_argument('--latency', type=float, default=0.2, help='每个任务的模拟模型调用延迟（秒）')
+    parser.add_argument('--cpu-loops', type=int, default=20000, help='每个任务的模拟计算量')
+    parser.add_argument('--workers', default='1,2,4,8', help='逗号分隔的 worker 进程数')
+    parser.add_argument('--threads', type=int, default=1, help='每个 worker 的执行线程数')
+    parser.add_argument('--lease', type=float, default=1.0, help='crash 测试的租约期限（秒）')
+    args = parser.parse_args()
+
+    scaling = [
+        run_scaling(int(workers), args.jobs, args.latency, args.cpu_loops, args.threads)
+        for workers in args.workers.split(',')
+    ]
+    base = scaling[0]['throughput_per_second'] / scaling[0]['workers']
+    for row in scaling:
+        row['speedup'] = round(row['throughput_per_second'] / scaling[0]['throughput_per_second'], 2)
+        row['efficiency'] = round(row['throughput_per_second'] / (base * row['workers']), 2)
+
+    crash = run_crash(min(args.jobs, 20), args.latency, args.cpu_loops, args.lease)
+    print(json.dumps({"scaling": scaling, "crash": crash}, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+模型接口路由测试
+功能：在本地启动若干个模拟 OpenAI 兼容接口的HTTP服务（各自的延迟、错误率和每分钟请求数上限不同），
+通过 openai 客户端并发调用，对比以下几种选择方式的吞吐量、延迟和失败数：
+    single   只配置第一个接口（原来的单客户端方式）
+    random   每次随机选择接口，失败时切换（不看延迟和错误率）
+    router   按延迟EWMA、错误率和剩余额度选择，失败时切换
+
+运行到一半时第一个接口开始返回503，用于观察故障切换
+
+用法：
+    python benchmarks/llm_router_benchmark.py [--calls 400] [--concurrency 16] [--strategies single,random,router]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.llm_router import Endpoint, LLMRouter
+
+# 模拟接口：名称、延迟（秒）、错误率、每分钟请求数上限（超过后返回429）
+STAND_INS = [
+    {"name": "region-a", "latency": 0.05, "error_rate": 0.0, "rpm": 0},
+    {"name": "region-b", "latency": 0.30, "error_rate": 0.0, "rpm": 0},
+    {"name": "flaky", "latency": 0.06, "error_rate": 0.2, "rpm": 0},
+    {"name": "throttled", "latency": 0.03, "error_rate": 0.0, "rpm": 60},
+]
+
+RESPONSE_CONTENT = json.dumps({"has_big_company_experience": True, "summary": "ok"}, ensure_ascii=False)
+
+
+class StandIn:
+    """一个模拟接口"""
+
+    def __init__(self, name: str, latency: float, error_rate: float, rpm: int):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.down = False
+        self.requests = []
+        self.lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                status, payload, headers = stand_in.respond(body)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def respond(self, body):
+        now = time.monotonic()
+        with self.lock:
+            self.requests = [t for t in self.requests if now - t < 60]
+            throttled = self.rpm and len(self.requests) >= self.rpm
+            if not throttled:
+                self.requests.append(now)
+        if self.down:
+            return 503, {"error": {"message": "unavailable", "type": "server_error"}}, {}
+        if throttled:
+            return 429, {"error": {"message": "rate limited", "type": "rate_limit"}}, {"Retry-After": "1"}
+        time.sleep(self.latency * random.uniform(0.8, 1.2))
+        if random.random() < self.error_rate:
+            return 500, {"error": {"message": "internal error", "type": "server_error"}}, {}
+        return 200, {
+            "id": "chatcmpl-local",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model', 'gpt-4o'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": RESPONSE_CONTENT}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 200, "completion_tokens": 20, "total_tokens": 220},
+        }, {}
+
+    def close(self):
+        self.server.shutdown()
+
+
+def build_router(strategy: str, stand_ins):
+    selected = stand_ins[:1] if strategy == 'single' else stand_ins
+    endpoints = [
+        Endpoint(s.name, api_key='local', base_url=s.base_url, requests_per_minute=s.rpm, timeout=10)
+        for s in selected
+    ]
+    return LLMRouter(
+        endpoints,
+        explore_rate=1.0 if strategy == 'random' else 0.05,
+        max_attempts=len(endpoints),
+        cooldown_seconds=2.0,
+        max_wait_seconds=1.0
+    )
+
+
+def run(strategy: str, calls: int, concurrency: int):
+    stand_ins = [StandIn(**spec) for spec in STAND_INS]
+    router = build_router(strategy, stand_ins)
+    messages = [{"role": "user", "content": "判断候选人是否有大厂经历"}]
+    served = {}
+    served_lock = threading.Lock()
+
+    def one(index):
+        if index == calls // 2:
+            # 运行到一半时第一个接口故障
+            stand_ins[0].down = True
+
+        def complete(client):
+            response = client.chat.completions.create(model='gpt-4o', messages=messages, max_tokens=100)
+            with served_lock:
+                served[str(client.base_url)] = served.get(str(client.base_url), 0) + 1
+            return response.choices[0].message.content
+
+        start = time.perf_counter()
+        try:
+            router.call('gpt-4o', complete, tokens=300)
+            return time.perf_counter() - start, True
+        except Exception:
+            return time.perf_counter() - start, False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(calls)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, ok in outcomes if ok)
+    by_url = {s.base_url: s.name for s in stand_ins}
+    result = {
+        "strategy": strategy,
+        "calls": calls,
+        "succeeded": len(latencies),
+        "failed": calls - len(latencies),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(latencies) / wall, 1),
+        "latency_ms_p50": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "latency_ms_p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+        "served_by": {by_url.get(url.rstrip('/'), url): count for url, count in sorted(served.items())},
+        "endpoints": router.report(),
+    }
+    for stand_in in stand_ins:
+        stand_in.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模型接口路由测试')
+    parser.add_argument('--calls', type=int, default=400, help='每种方式的调用次数')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发调用数')
+    parser.add_argument('--strategies', default='single,random,router', help='逗号分隔的选择方式')
+    args = parser.parse_args()
+
+    results = [run(strategy, args.calls, args.concurrency) for strategy in args.strategies.split(',')]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+长简历分段解析模拟
+功能：生成多页的合成简历，用模拟的解析模型（按输入/输出token数计算耗时，输出超过 max_tokens 时截断）
+对比整份解析与分段并发解析的耗时和解析出的工作经历数
+
+用法：
+    python benchmarks/long_resume_benchmark.py [--jobs 12] [--description-chars 400] [--chunk-chars 2000] [--time-scale 0.01]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.resume_chunker import SECTION_HEADINGS, merge_partials, split_resume
+from utils.batch import parallel_map
+
+COMPANIES = ['腾讯科技', '阿里巴巴', '字节跳动', '美团', '京东', '百度', '网易', '小米', '快手', '滴滴出行', '华为', '拼多多']
+POSITIONS = ['高级工程师', '技术专家', '架构师', '技术总监', '研发经理']
+
+ENTRY = re.compile(r'^((?:19|20)\d{2}\.\d{2})\s*-\s*((?:19|20)\d{2}\.\d{2}|至今)\s+(\S+)\s+(\S+)\s*$')
+
+# 模拟模型的速度：每秒处理的输入token数、每秒生成的输出token数、每次调用的固定开销（秒）
+INPUT_TOKENS_PER_SECOND = 5000
+OUTPUT_TOKENS_PER_SECOND = 50
+CALL_OVERHEAD = 0.5
+# 约每1.5个字符1个token
+CHARS_PER_TOKEN = 1.5
+
+
+def build_resume(jobs: int, description_chars: int, rng: random.Random):
+    """生成合成简历，返回 (文本, 真实的工作经历列表)"""
+    lines = ['张三', '电话：13800000000  邮箱：zhangsan@example.com', '', '个人信息', '男，38岁，北京', '']
+    lines.append('工作经历')
+    truth = []
+    year = 2024
+    for i in range(jobs):
+        start, end = year - 2, year
+        company = f"{COMPANIES[i % len(COMPANIES)]}{i // len(COMPANIES) or ''}"
+        position = rng.choice(POSITIONS)
+        end_text = '至今' if i == 0 else f"{end}.02"
+        lines.append(f"{start}.03 - {end_text}  {company}  {position}")
+        sentences = []
+        while sum(len(s) for s in sentences) < description_chars:
+            sentences.append(rng.choice([
+                '负责核心交易系统的架构设计与性能优化，', '带领十余人团队完成服务化改造，',
+                '主导数据平台从离线到实时的迁移，', '推动研发流程规范化并建设质量体系，',
+            ]))
+        lines.extend(''.join(sentences[j:j + 4]) for j in range(0, len(sentences), 4))
+        lines.append('')
+        truth.append({"company": company, "position": position, "start_date": f"{start}.03", "end_date": end_text})
+        year = start
+    lines.extend(['项目经历', '2020.01 - 2021.06  支付系统重构  负责人', '重构支付链路，降低延迟40%。', ''])
+    lines.extend(['教育背景', '2004 - 2008  北京大学  计算机科学 本科'])
+    return '\n'.join(lines), truth
+
+
+def simulated_parse(text: str, max_tokens: int, time_scale: float):
+    """
+    模拟解析模型：提取工作经历章节中的条目，输出超过 max_tokens 时截断，并按token数休眠
+
+    Returns:
+        (解析结果, 模拟耗时秒数)
+    """
+    section = None
+    jobs = []
+    for line in text.splitlines():
+        stripped = re.sub(r'[\s（）()续]+', '', line).lower()
+        if stripped in SECTION_HEADINGS:
+            section = stripped
+            continue
+        match = ENTRY.match(line.strip())
+        if match and section == '工作经历':
+            jobs.append({"company": match.group(3), "position": match.group(4),
+                         "start_date": match.group(1), "end_date": match.group(2), "description": ""})
+        elif jobs and section == '工作经历' and line.strip():
+            jobs[-1]['description'] += line.strip()
+
+    # 按输出长度截断：超出 max_tokens 之后的经历无法完整输出
+    output_tokens, kept = 50, []
+    for job in jobs:
+        tokens = len(json.dumps(job, ensure_ascii=False)) / CHARS_PER_TOKEN
+        if output_tokens + tokens > max_tokens:
+            break
+        output_tokens += tokens
+        kept.append(job)
+
+    input_tokens = len(text) / CHARS_PER_TOKEN
+    seconds = CALL_OVERHEAD + input_tokens / INPUT_TOKENS_PER_SECOND + output_tokens / OUTPUT_TOKENS_PER_SECOND
+    time.sleep(seconds * time_scale)
+    return {"personal_info": {"name": "张三"}, "work_experience": kept}, seconds
+
+
+def recovered(truth, jobs) -> int:
+    keys = {(job['company'], job['start_date']) for job in jobs}
+    return sum((job['company'], job['start_date']) in keys for job in truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长简历分段解析模拟")
+    parser.add_argument('--jobs', type=int, default=12, help='工作经历段数')
+    parser.add_argument('--description-chars', type=int, default=400, help='每段工作描述的字数')
+    parser.add_argument('--chunk-chars', type=int, default=2000, help='分段的最大字符数')
+    parser.add_argument('--max-tokens', type=int, default=2000, help='每次解析的最大输出token数')
+    parser.add_argument('--workers', type=int, default=8, help='并发解析的分段数')
+    parser.add_argument('--time-scale', type=float, default=0.01, help='实际休眠时间与模拟耗时的比例')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    text, truth = build_resume(args.jobs, args.description_chars, random.Random(args.seed))
+
+    started = time.perf_counter()
+    single, single_seconds = simulated_parse(text, args.max_tokens, args.time_scale)
+    single_wall = time.perf_counter() - started
+
+    # 不限制输出长度时整份解析的模拟耗时
+    _, unbounded_seconds = simulated_parse(text, 10 ** 9, 0)
+
+    started = time.perf_counter()
+    chunks = split_resume(text, args.chunk_chars)
+    outcomes = parallel_map(lambda chunk: simulated_parse(chunk, args.max_tokens, args.time_scale), chunks, args.workers)
+    merged = merge_partials([partial for partial, _ in outcomes])
+    chunked_wall = time.perf_counter() - started
+    chunk_seconds = [seconds for _, seconds in outcomes]
+
+    print(json.dumps({
+        "resume_chars": len(text),
+        "true_jobs": len(truth),
+        "single": {
+            "jobs_parsed": recovered(truth, single['work_experience']),
+            "simulated_seconds": round(single_seconds, 2),
+            "simulated_seconds_without_truncation": round(unbounded_seconds, 2),
+            "wall_seconds": round(single_wall, 3),
+        },
+        "chunked": {
+            "chunks": len(chunks),
+            "chunk_chars_max": max(len(chunk) for chunk in chunks),
+            "jobs_parsed": recovered(truth, merged['work_experience']),
+            "duplicate_jobs": len(merged['work_experience']) - recovered(truth, merged['work_experience']),
+            "simulated_seconds_longest_chunk": round(max(chunk_seconds), 2),
+            "simulated_seconds_sum": round(sum(chunk_seconds), 2),
+            "wall_seconds": round(chunked_wall, 3),
+        },
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+解析与检查重叠执行的端到端延迟对比
+功能：模拟流式返回的简历解析（时间线和个人信息在前，长篇工作描述在后）和三个检查项，
+对比先解析完再检查（原流程）与检查项在时间线解析完成后立即开始的端到端耗时
+
+用法：
+    python benchmarks/pipeline_overlap_benchmark.py [--runs 5] [--jobs 5] [--chars-per-second 400] [--check-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.registry import CheckRegistry, CheckSpec
+from pipeline.streaming import parse_and_check
+from utils.json_stream import IncrementalJSONParser
+
+
+class SimulatedCheck(CheckSpec):
+    """按固定耗时返回的检查项"""
+
+    def __init__(self, name: str, inputs, seconds: float):
+        super().__init__(name, 'Simulated', inputs, f'{name}_result')
+        self.seconds = seconds
+
+    def run(self, context):
+        missing = [key for key in self.inputs if key not in context]
+        if missing:
+            raise RuntimeError(f"缺少输入 {missing}")
+        time.sleep(self.seconds)
+        return {"success": True, "data": {"companies": len(context['work_experience'])}, "usage": {}}
+
+
+def build_resume(jobs: int, description_chars: int) -> dict:
+    work_experience = [
+        {
+            "company": f"公司{i}",
+            "position": "高级工程师",
+            "start_date": f"{2010 + 2 * i}-03",
+            "end_date": f"{2012 + 2 * i}-02",
+            "description": "负责核心系统的设计与开发。" * (description_chars // 13),
+            "is_current": False,
+        }
+        for i in range(jobs)
+    ]
+    timeline = [
+        {key: exp[key] for key in ('company', 'position', 'start_date', 'end_date', 'is_current')}
+        for exp in work_experience
+    ]
+    return {
+        "timeline": timeline,
+        "personal_info": {"name": "张三", "contact": "13800000000", "education": "本科"},
+        "work_experience": work_experience,
+    }
+
+
+def simulated_parser(content: str, chars_per_second: float, chunk_chars: int = 20):
+    """按给定的输出速度逐段返回模型输出的解析函数"""
+    delay = chunk_chars / chars_per_second
+
+    def parse(on_member):
+        parser = IncrementalJSONParser()
+        for start in range(0, len(content), chunk_chars):
+            time.sleep(delay)
+            for key, value in parser.feed(content[start:start + chunk_chars]):
+                if on_member is not None:
+                    on_member(key, value)
+        data = json.loads(content)
+        data.pop('timeline', None)
+        return {"success": True, "data": data, "message": "简历解析成功"}
+
+    return parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析与检查重叠执行的端到端延迟对比")
+    parser.add_argument('--runs', type=int, default=5, help='每种方式的运行次数')
+    parser.add_argument('--jobs', type=int, default=5, help='工作经历段数')
+    parser.add_argument('--description-chars', type=int, default=300, help='每段工作描述的字数')
+    parser.add_argument('--chars-per-second', type=float, default=400, help='模拟的模型输出速度（字符/秒）')
+    parser.add_argument('--check-ms', type=float, default=1500, help='每个检查项的耗时（毫秒）')
+    args = parser.parse_args()
+
+    registry = CheckRegistry()
+    check_seconds = args.check_ms / 1000
+    registry.register(SimulatedCheck('big_company', ('work_experience',), check_seconds))
+    registry.register(SimulatedCheck('ipo', ('work_experience',), check_seconds))
+    registry.register(SimulatedCheck('negative', ('personal_info', 'work_experience'), check_seconds))
+    names = registry.names()
+
+    content = json.dumps(build_resume(args.jobs, args.description_chars), ensure_ascii=False)
+    parse = simulated_parser(content, args.chars_per_second)
+
+    # 时间线和个人信息在输出中所占的比例
+    early_chars = content.index('"work_experience"')
+
+    results = {}
+    for mode, stream in (('sequential', False), ('pipelined', True)):
+        latencies = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            parse_result, check_results, _ = parse_and_check(parse, names, registry, len(names), stream=stream)
+            latencies.append(time.perf_counter() - started)
+            assert parse_result['success'] and set(check_results) == set(names)
+        results[mode] = {
+            "latency_s_p50": round(statistics.median(latencies), 3),
+            "latency_s_min": round(min(latencies), 3),
+        }
+
+    sequential = results['sequential']['latency_s_p50']
+    pipelined = results['pipelined']['latency_s_p50']
+    print(json.dumps({
+        "output_chars": len(content),
+        "early_fields_chars": early_chars,
+        "parse_seconds": round(len(content) / args.chars_per_second, 3),
+        "check_seconds": check_seconds,
+        **results,
+        "saved_seconds": round(sequential - pipelined, 3),
+        "saved_ratio": round(1 - pipelined / sequential, 3) if sequential else None,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+性能剖析开销测试
+功能：模拟一次分析请求的本地计算部分（三个检查项经 run_in_context 提交到线程池，结果序列化后
+按评分公式构建报告），对比以下几种情况下每个请求的耗时：
+    baseline  没有剖析钩子（旧的 run_in_context 包装）
+    disabled  剖析钩子已接入但未启用（profiling.enabled: false）
+    sampled   启用剖析，按 --sample-rate 随机剖析请求
+    always    每个请求都剖析
+
+用法：
+    python benchmarks/profiling_overhead_benchmark.py [--requests 2000] [--trials 5] [--sample-rate 0.01]
+"""
+import argparse
+import contextvars
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_parsed_resumes
+from models.report_builder import build_structured_report
+from utils.profiler import Profiler
+from utils.tenants import run_in_context
+
+CHECK_RESULTS = {
+    "big_company": {
+        "has_big_company_experience": True,
+        "big_companies": [{"company_name": "腾讯", "is_big_company": True, "confidence": "high"}],
+        "summary": "曾在腾讯工作",
+    },
+    "ipo": {"has_ipo_experience": False, "ipo_experiences": [], "summary": "未经历上市"},
+    "negative": {"has_negative_info": False, "risk_level": "low", "findings": [], "summary": "无明显负面"},
+}
+
+
+def plain_run_in_context(fn):
+    """接入剖析钩子之前的 run_in_context"""
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+def check(name, resume):
+    """检查项的本地部分：拼接提示词并解析模型返回的JSON"""
+    prompt = json.dumps(resume['work_experience'], ensure_ascii=False, indent=2)
+    return json.loads(json.dumps(CHECK_RESULTS[name], ensure_ascii=False)), len(prompt)
+
+
+def handle(resume, executor, wrap, profiler):
+    """一次请求：与 api.routes 中的 start_profile/finish_profile 相同的判断"""
+    handle = None
+    if profiler is not None and profiler.enabled:
+        trigger = profiler.should_profile(None)
+        if trigger:
+            handle = profiler.start('analyze_resume', trigger)
+    try:
+        futures = [executor.submit(wrap(check), name, resume) for name in CHECK_RESULTS]
+        results = {name: future.result()[0] for name, future in zip(CHECK_RESULTS, futures)}
+        report = build_structured_report(results['big_company'], results['ipo'], results['negative'])
+        return json.dumps({"resume_info": resume, "final_report": report}, ensure_ascii=False)
+    finally:
+        if handle is not None:
+            profiler.finish(handle)
+
+
+def run_mode(resumes, executor, wrap, profiler) -> float:
+    """返回每个请求的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for resume in resumes:
+        handle(resume, executor, wrap, profiler)
+    return (time.perf_counter() - start) / len(resumes) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="性能剖析开销测试")
+    parser.add_argument('--requests', type=int, default=2000, help='每轮的请求数')
+    parser.add_argument('--trials', type=int, default=5, help='轮数（各模式交替执行，取中位数）')
+    parser.add_argument('--sample-rate', type=float, default=0.01, help='sampled 模式的采样率')
+    args = parser.parse_args()
+
+    resumes = generate_parsed_resumes(args.requests)
+    modes = {
+        "baseline": (plain_run_in_context, None),
+        "disabled": (run_in_context, Profiler(enabled=False)),
+        "sampled": (run_in_context, Profiler(enabled=True, sample_rate=args.sample_rate)),
+        "always": (run_in_context, Profiler(enabled=True, sample_rate=1.0)),
+    }
+
+    timings = {mode: [] for mode in modes}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        run_mode(resumes[:200], executor, run_in_context, None)  # 预热
+        for _ in range(args.trials):
+            for mode, (wrap, profiler) in modes.items():
+                timings[mode].append(run_mode(resumes, executor, wrap, profiler))
+
+    baseline = statistics.median(timings['baseline'])
+    print(json.dumps({
+        "requests": args.requests,
+        "trials": args.trials,
+        "sample_rate": args.sample_rate,
+        "us_per_request": {mode: round(statistics.median(values), 1) for mode, values in timings.items()},
+        "overhead_percent": {
+            mode: round((statistics.median(values) / baseline - 1) * 100, 2)
+            for mode, values in timings.items() if mode != 'baseline'
+        },
+        "profiled_requests": {
+            mode: len(profiler.recent()) for mode, (_, profiler) in modes.items() if profiler is not None
+        },
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
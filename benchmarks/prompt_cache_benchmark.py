@@ -0,0 +1,205 @@
+"""
+提示词前缀缓存测试
+功能：在本地启动一个模拟 OpenAI 兼容接口的HTTP服务，按接口端提示词缓存的规则计算每个请求命中缓存的输入token数
+（与之前请求的最长公共前缀达到 --min-tokens 后按 --block 取整，按字符近似token），通过 usage.prompt_tokens_details.cached_tokens 返回；
+用同一个职位描述依次评估若干个合成候选人，直接调用五个模型，输出：
+    - 各阶段的输入token数、命中缓存的token数和命中比例（prompt_cache_report）
+    - 各阶段相邻两次请求的公共前缀占请求长度的比例（固定内容越多、越靠前，比例越高）
+    - 按 openai.pricing 估算的费用（命中缓存的部分按 cached_input 计价）
+
+用法：
+    python benchmarks/prompt_cache_benchmark.py [--candidates 20] [--jd-chars 1500] [--min-tokens 1024] [--block 128]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.cache as cache_module
+import utils.llm_router as llm_router
+from models import BigCompanyChecker, IPOChecker, NegativeChecker, ReportGenerator, ResumeParser
+from models.base_model import prompt_cache_report
+from utils.cache import SharedCache
+from utils.llm_router import Endpoint, LLMRouter
+
+COMPANIES = ['腾讯科技', '阿里巴巴', '字节跳动', '美团', '京东', '百度', '网易', '小米', '快手', '某创业公司']
+POSITIONS = ['高级工程师', '技术专家', '架构师', '技术总监', '研发经理']
+NAMES = ['张伟', '王芳', '李娜', '刘洋', '陈静', '杨磊', '赵敏', '黄强', '周杰', '吴婷']
+
+# 按系统提示词中的关键词识别阶段，返回固定的模型输出
+RESPONSES = [
+    ('resume_parser', '简历解析', {"timeline": [], "personal_info": {"name": "候选人"}, "work_experience": []}),
+    ('big_company', '企业分析专家', {"has_big_company_experience": True, "big_companies": [], "summary": "有大厂经历"}),
+    ('ipo', '上市分析专家', {"has_ipo_experience": False, "ipo_experiences": [], "summary": "无上市经历"}),
+    ('negative', '背景调查专家', {"has_negative_info": False, "risk_level": "none", "findings": [], "summary": "未发现负面信息"}),
+    ('report', '人才评估报告', {"candidate_summary": "候选人概况", "final_recommendation": "推荐", "recommendation_reason": "匹配"}),
+]
+
+
+class CachingStandIn:
+    """模拟接口端的提示词前缀缓存"""
+
+    def __init__(self, min_tokens: int, block: int):
+        self.min_tokens = min_tokens
+        self.block = block
+        self.seen = {}
+        self.by_stage = {}
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                data = json.dumps(stand_in.respond(body), ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def cached_tokens(self, model: str, prompt: str) -> int:
+        """与同一模型之前请求的最长公共前缀（字符数近似token数）"""
+        with self.lock:
+            previous = self.seen.setdefault(model, [])
+            longest = max((len(os.path.commonprefix([prompt, text])) for text in previous), default=0)
+            previous.append(prompt)
+        return longest // self.block * self.block if longest >= self.min_tokens else 0
+
+    def respond(self, body):
+        messages = body.get('messages', [])
+        prompt = ''.join(f"<{message['role']}>{message['content']}" for message in messages)
+        system = messages[0]['content'] if messages else ''
+        stage, content = next(((stage, output) for stage, keyword, output in RESPONSES if keyword in system), ('unknown', {}))
+        with self.lock:
+            self.by_stage.setdefault(stage, []).append(prompt)
+        return {
+            "id": "chatcmpl-local",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get('model', 'gpt-4o'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content, ensure_ascii=False)},
+                         "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(prompt),
+                "completion_tokens": 50,
+                "total_tokens": len(prompt) + 50,
+                "prompt_tokens_details": {"cached_tokens": self.cached_tokens(body.get('model', ''), prompt)},
+            },
+        }
+
+    def close(self):
+        self.server.shutdown()
+
+
+class OfflineNegativeChecker(NegativeChecker):
+    """使用合成检索结果的负面舆情检索（不调用搜索接口）"""
+
+    def web_search(self, query):
+        return {"organic_results": [
+            {"title": f"{query} 相关报道 {i}", "snippet": f"关于 {query} 的第 {i} 条公开报道摘要。"} for i in range(5)
+        ]}
+
+
+def build_candidate(index: int, rng: random.Random):
+    name = NAMES[index % len(NAMES)] + str(index)
+    work_experience = []
+    year = 2024
+    for _ in range(rng.randint(2, 4)):
+        start = year - rng.randint(1, 4)
+        work_experience.append({
+            "company": rng.choice(COMPANIES),
+            "position": rng.choice(POSITIONS),
+            "start_date": f"{start}.03",
+            "end_date": f"{year}.02",
+            "description": "负责核心系统的架构设计与性能优化，带领团队完成服务化改造。",
+        })
+        year = start
+    resume_text = '\n'.join(
+        [name, '工作经历'] + [f"{e['start_date']} - {e['end_date']} {e['company']} {e['position']}\n{e['description']}"
+                             for e in work_experience]
+    )
+    return name, resume_text, work_experience
+
+
+def common_prefix_ratio(stand_in: CachingStandIn):
+    """各阶段相邻两次请求的平均公共前缀比例"""
+    ratios = {}
+    for stage, prompts in stand_in.by_stage.items():
+        pairs = list(zip(prompts, prompts[1:]))
+        if pairs:
+            ratios[stage] = round(sum(len(os.path.commonprefix([a, b])) / len(b) for a, b in pairs) / len(pairs), 4)
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description='提示词前缀缓存测试')
+    parser.add_argument('--candidates', type=int, default=20, help='评估的候选人数')
+    parser.add_argument('--jd-chars', type=int, default=1500, help='职位描述长度（字符）')
+    parser.add_argument('--min-tokens', type=int, default=1024, help='接口端缓存生效的最短前缀（token）')
+    parser.add_argument('--block', type=int, default=128, help='缓存前缀的取整粒度（token）')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cache_module._cache_instance = SharedCache(os.path.join(tempfile.mkdtemp(), 'cache.sqlite3'), enabled=False)
+    stand_in = CachingStandIn(args.min_tokens, args.block)
+    llm_router._router_instance = LLMRouter([Endpoint('stand-in', api_key='local', base_url=stand_in.base_url, timeout=10)])
+
+    job_description = ('高级后端工程师：负责交易系统的架构设计与性能优化，要求熟悉分布式系统、数据库和缓存，'
+                       '有大规模在线服务的研发经验。') * (args.jd_chars // 60 + 1)
+    job_description = job_description[:args.jd_chars]
+    direction = '大厂、上市、负面舆情'
+
+    models = {
+        'resume_parser': ResumeParser(),
+        'big_company': BigCompanyChecker(),
+        'ipo': IPOChecker(),
+        'negative': OfflineNegativeChecker(),
+        'report': ReportGenerator(),
+    }
+    for model in models.values():
+        # 关闭模型级联和影子对比，每个阶段每个候选人只请求一次
+        model.cascade_config = {}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(args.candidates):
+            name, resume_text, work_experience = build_candidate(index, rng)
+            models['resume_parser'].process(resume_text)
+            big_company = models['big_company'].process(work_experience)['data']
+            ipo = models['ipo'].process(work_experience)['data']
+            negative = models['negative'].process({"name": name}, work_experience)['data']
+            models['report'].process(
+                job_description, direction, {"personal_info": {"name": name}, "work_experience": work_experience},
+                big_company, ipo, negative
+            )
+
+    summary = {
+        "candidates": args.candidates,
+        "stages": prompt_cache_report(),
+        "common_prefix_ratio": common_prefix_ratio(stand_in),
+        "cost_usd": {name: round(model.usage['cost_usd'], 6) for name, model in models.items()},
+    }
+    stand_in.close()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
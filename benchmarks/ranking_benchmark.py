@@ -0,0 +1,66 @@
+"""
+本地排序性能测试
+功能：在合成候选池上测量 BM25 + 结构化信号排序器的建索引速度和查询速度
+
+用法：
+    python benchmarks/ranking_benchmark.py [--size 100000] [--queries 20]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_resumes
+from index.bm25 import load_numpy
+from index.ranker import CandidateRanker
+
+KNOWN_COMPANIES = ['腾讯', '阿里巴巴', '字节跳动', '百度', '京东', '美团', '拼多多', '网易', '小米', '华为']
+
+JOB_DESCRIPTIONS = [
+    "Java架构师，5年以上Java开发经验，熟悉微服务架构、Spring Cloud、分布式系统和高并发，有团队管理经验",
+    "推荐算法工程师，熟悉机器学习、推荐系统、Spark、Flink，有大型互联网公司经验",
+    "前端技术专家，精通React、Vue，有性能优化和架构设计经验",
+    "数据工程师，熟悉数据仓库、Kafka、Flink、Spark，负责实时数据链路建设",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地排序性能测试")
+    parser.add_argument('--size', type=int, default=100000, help='候选池大小')
+    parser.add_argument('--queries', type=int, default=20, help='查询次数')
+    parser.add_argument('--top-k', type=int, default=10, help='返回的候选人数量')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    resumes = generate_resumes(args.size)
+    generate_seconds = time.perf_counter() - t0
+
+    ranker = CandidateRanker(known_companies=KNOWN_COMPANIES)
+    t0 = time.perf_counter()
+    for i, text in enumerate(resumes):
+        ranker.add(str(i), text)
+    index_seconds = time.perf_counter() - t0
+
+    latencies = []
+    for i in range(args.queries):
+        t0 = time.perf_counter()
+        ranker.rank(JOB_DESCRIPTIONS[i % len(JOB_DESCRIPTIONS)], limit=args.top_k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    print(json.dumps({
+        "size": args.size,
+        "numpy": load_numpy() is not None,
+        "generate_seconds": round(generate_seconds, 2),
+        "index_seconds": round(index_seconds, 2),
+        "index_docs_per_second": round(args.size / index_seconds),
+        "query_ms_median": round(statistics.median(latencies), 1),
+        "query_ms_max": round(max(latencies), 1),
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+冷启动性能测试
+功能：在全新的Python进程中测量各入口的导入耗时、首个请求耗时以及预热完成耗时
+
+用法：
+    python benchmarks/startup_benchmark.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各入口的导入语句
+ENTRY_POINTS = {
+    'api': 'import api.routes',
+    'cli': 'import main',
+    'worker': 'import api.server',
+}
+
+# 在子进程中执行：创建应用并发起第一个请求，再等待就绪
+FIRST_REQUEST_SCRIPT = r'''
+import json, time
+t0 = time.perf_counter()
+from api.routes import create_app
+from api import warmup
+app = create_app()
+t_import = time.perf_counter()
+client = app.test_client()
+client.get('/health')
+t_first = time.perf_counter()
+while client.get('/ready').status_code != 200 and warmup.state.error is None:
+    time.sleep(0.005)
+t_ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t_import - t0) * 1000,
+    "first_request_ms": (t_first - t0) * 1000,
+    "ready_ms": (t_ready - t0) * 1000,
+    "warmup_error": warmup.state.error,
+}))
+'''
+
+
+def run_python(code: str) -> str:
+    """在全新的Python进程中执行代码并返回标准输出"""
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def measure_import(statement: str) -> float:
+    """测量单个导入语句耗时（毫秒）"""
+    code = (
+        "import time\n"
+        "t0 = time.perf_counter()\n"
+        f"{statement}\n"
+        "print((time.perf_counter() - t0) * 1000)"
+    )
+    return float(run_python(code))
+
+
+def summarize(samples):
+    """统计中位数和最小值"""
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动性能测试")
+    parser.add_argument('--runs', type=int, default=5, help='每项测量的次数')
+    args = parser.parse_args()
+
+    report = {}
+    for name, statement in ENTRY_POINTS.items():
+        samples = [measure_import(statement) for _ in range(args.runs)]
+        report[f"import_{name}"] = summarize(samples)
+
+    first_request = [json.loads(run_python(FIRST_REQUEST_SCRIPT)) for _ in range(args.runs)]
+    for key in ('import_ms', 'first_request_ms', 'ready_ms'):
+        report[f"app_{key[:-3]}"] = summarize([r[key] for r in first_request])
+    errors = {r['warmup_error'] for r in first_request if r['warmup_error']}
+    if errors:
+        report['warmup_errors'] = sorted(errors)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+合成简历数据
+功能：为性能测试批量生成结构相似的中文简历文本和解析结果
+"""
+import random
+from typing import Dict, Any, List
+
+COMPANIES = [
+    '腾讯', '阿里巴巴', '字节跳动', '百度', '京东', '美团', '拼多多', '网易', '小米', '华为',
+    '快手', '滴滴', '携程', '蚂蚁集团', '贝壳', '哔哩哔哩', '知乎', '小红书', '蔚来', '理想汽车',
+    '创业公司ABC', '某软件外包公司', '某银行科技部', '某国企信息中心', '某游戏工作室',
+]
+POSITIONS = [
+    'Java开发工程师', 'Java高级工程师', '高级Java架构师', '技术专家', '前端工程师',
+    '算法工程师', '数据工程师', '测试工程师', '产品经理', '技术总监', 'Go开发工程师', '运维工程师',
+]
+SKILLS = [
+    'Java', 'Spring Cloud', '微服务', 'Kafka', 'Redis', 'MySQL', '分布式系统', '高并发',
+    'Kubernetes', 'Docker', 'Go', 'Python', 'React', 'Vue', '机器学习', '推荐系统',
+    '数据仓库', 'Flink', 'Spark', '性能优化', '团队管理', '架构设计', '订单系统', '支付系统',
+]
+SCHOOLS = ['北京大学', '清华大学', '浙江大学', '复旦大学', '上海交通大学', '华中科技大学', '某理工学院']
+
+
+def generate_parsed_resume(rng: random.Random, index: int) -> Dict[str, Any]:
+    """生成一份与 ResumeParser 输出结构一致的解析结果"""
+    year = rng.randint(2003, 2021)
+    jobs = []
+    for _ in range(rng.randint(1, 5)):
+        start = year
+        end = min(2025, start + rng.randint(1, 5))
+        jobs.append({
+            "company": rng.choice(COMPANIES),
+            "position": rng.choice(POSITIONS),
+            "start_date": f"{start}.{rng.randint(1, 12):02d}",
+            "end_date": f"{end}.{rng.randint(1, 12):02d}" if end < 2025 else "至今",
+            "description": "负责" + "、".join(rng.sample(SKILLS, 4)) + "相关工作",
+            "is_current": end >= 2025,
+        })
+        year = end
+        if year >= 2025:
+            break
+    jobs.reverse()
+    graduated = jobs[-1]["start_date"][:4]
+    return {
+        "personal_info": {
+            "name": f"候选人{index}",
+            "contact": f"138{index:08d}"[-11:],
+            "education": f"{int(graduated) - 4}-{graduated} {rng.choice(SCHOOLS)} 计算机科学 本科",
+        },
+        "work_experience": jobs,
+    }
+
+
+def render_resume(parsed: Dict[str, Any]) -> str:
+    """将解析结果渲染为简历文本"""
+    info = parsed["personal_info"]
+    lines = [f"姓名：{info['name']}", f"联系方式：{info['contact']}", "教育背景：", info["education"], "工作经历："]
+    for position, job in enumerate(parsed["work_experience"], start=1):
+        lines.append(f"{position}. {job['company']}（{job['start_date']} - {job['end_date']}）")
+        lines.append(f"   职位：{job['position']}")
+        lines.append(f"   {job['description']}")
+    return "\n".join(lines)
+
+
+def generate_resumes(count: int, seed: int = 42) -> List[str]:
+    """批量生成简历文本"""
+    rng = random.Random(seed)
+    return [render_resume(generate_parsed_resume(rng, i)) for i in range(count)]
+
+
+def generate_parsed_resumes(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """批量生成解析结果"""
+    rng = random.Random(seed)
+    return [generate_parsed_resume(rng, i) for i in range(count)]
@@ -0,0 +1,123 @@
+"""
+多租户公平调度模拟
+功能：模拟一个租户大批量筛选、其他租户少量交互请求同时调用模型的场景，
+对比先来先服务和加权公平调度下各租户获得的模型调用份额和排队耗时
+
+用法：
+    python benchmarks/tenant_fairness_benchmark.py [--seconds 5] [--capacity 4] [--service-ms 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fair_scheduler import FairScheduler
+
+# 租户 -> (权重, 并发发起调用的线程数, 每次调用后的思考时间毫秒)
+TENANTS = {
+    'bulk_screening': (1, 32, 0),
+    'recruiting': (2, 4, 0),
+    'hiring_manager': (1, 2, 20),
+}
+
+
+class FifoScheduler:
+    """先来先服务的基线调度器"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queue = deque()
+
+    def acquire(self, tenant: str, cost: float = 1.0):
+        with self._lock:
+            if self._running < self.capacity and not self._queue:
+                self._running += 1
+                return
+            event = threading.Event()
+            self._queue.append(event)
+        event.wait()
+
+    def release(self):
+        with self._lock:
+            if self._queue:
+                self._queue.popleft().set()
+            else:
+                self._running -= 1
+
+
+def simulate(scheduler, seconds: float, service_seconds: float):
+    """运行模拟，返回各租户的完成数和排队耗时"""
+    stop = time.monotonic() + seconds
+    waits = {tenant: [] for tenant in TENANTS}
+    lock = threading.Lock()
+
+    def client(tenant, think_seconds):
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            scheduler.acquire(tenant, cost=1.0)
+            waited = time.monotonic() - started
+            try:
+                time.sleep(service_seconds)
+            finally:
+                scheduler.release()
+            with lock:
+                waits[tenant].append(waited)
+            if think_seconds:
+                time.sleep(think_seconds)
+
+    threads = [
+        threading.Thread(target=client, args=(tenant, think / 1000))
+        for tenant, (_, count, think) in TENANTS.items()
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = sum(len(w) for w in waits.values())
+    return {
+        tenant: {
+            "calls": len(w),
+            "share": round(len(w) / total, 3) if total else 0.0,
+            "wait_ms_p50": round(statistics.median(w) * 1000, 1) if w else None,
+            "wait_ms_p95": round(sorted(w)[int(0.95 * (len(w) - 1))] * 1000, 1) if w else None,
+        }
+        for tenant, w in waits.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多租户公平调度模拟")
+    parser.add_argument('--seconds', type=float, default=5, help='每种调度方式的模拟时长')
+    parser.add_argument('--capacity', type=int, default=4, help='同时进行的模型调用数')
+    parser.add_argument('--service-ms', type=float, default=10, help='每次模型调用的耗时（毫秒）')
+    args = parser.parse_args()
+
+    weights = {tenant: weight for tenant, (weight, _, _) in TENANTS.items()}
+    service_seconds = args.service_ms / 1000
+
+    print(json.dumps({
+        "capacity": args.capacity,
+        "tenants": {
+            tenant: {"weight": weight, "clients": count, "think_ms": think}
+            for tenant, (weight, count, think) in TENANTS.items()
+        },
+        "fifo": simulate(FifoScheduler(args.capacity), args.seconds, service_seconds),
+        "weighted_fair": simulate(
+            FairScheduler(args.capacity, weight=lambda tenant: weights.get(tenant, 1)),
+            args.seconds, service_seconds
+        ),
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
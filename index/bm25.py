@@ -0,0 +1,163 @@
+"""
+BM25 倒排索引
+功能：在本地对简历文本建立倒排索引，按职位描述计算 BM25 相关性分数。
+安装了 NumPy 时使用向量化打分，否则使用纯 Python 实现（NumPy 在第一次打分时才导入）
+"""
+import math
+from array import array
+from collections import Counter
+from typing import Dict, List, Tuple, Optional
+
+from index.tokenizer import tokenize
+
+_numpy = None
+_numpy_checked = False
+
+
+def load_numpy():
+    """
+    按需导入 NumPy（可选依赖，未安装时返回 None）
+
+    不在模块顶层导入，避免 api.routes 等导入索引和结果库模块时在启动阶段加载 NumPy
+    """
+    global _numpy, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = None
+        _numpy_checked = True
+    return _numpy
+
+
+class BM25Index:
+    """BM25 倒排索引（支持增量添加文档）"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lengths = array('I')
+        self.total_length = 0
+        # 词项 -> (文档序号数组, 词频数组)
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        # 向量化打分用的冻结数据，添加文档后失效
+        self._frozen = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_id: str, text: str):
+        """添加一篇文档"""
+        self.add_tokens(doc_id, tokenize(text))
+
+    def add_tokens(self, doc_id: str, tokens: List[str]):
+        """添加一篇已分词的文档"""
+        index = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+
+        for term, tf in Counter(tokens).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array('I'), array('I'))
+            postings[0].append(index)
+            postings[1].append(tf)
+
+        self._frozen = None
+
+    def idf(self, term: str) -> float:
+        """逆文档频率（BM25+ 形式，保证非负）"""
+        postings = self._postings.get(term)
+        df = len(postings[0]) if postings else 0
+        n = len(self.doc_ids)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _freeze(self):
+        """将倒排表转换为 NumPy 数组，供向量化打分使用"""
+        if self._frozen is None:
+            np = load_numpy()
+            lengths = np.array(self.doc_lengths, dtype=np.float32)
+            self._frozen = {'lengths': lengths, 'postings': {}}
+        return self._frozen
+
+    def _term_arrays(self, term: str):
+        frozen = self._freeze()
+        cached = frozen['postings'].get(term)
+        if cached is None:
+            docs, tfs = self._postings[term]
+            np = load_numpy()
+            cached = (np.array(docs, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            frozen['postings'][term] = cached
+        return cached
+
+    def score_all(self, query: str) -> List[float]:
+        """
+        计算查询对所有文档的 BM25 分数
+
+        Returns:
+            与文档添加顺序一致的分数列表（安装 NumPy 时为 ndarray）
+        """
+        n = len(self.doc_ids)
+        terms = [term for term in set(tokenize(query)) if term in self._postings]
+        if n == 0:
+            return []
+
+        avg_length = self.total_length / n or 1.0
+        k1, b = self.k1, self.b
+
+        np = load_numpy()
+        if np is not None:
+            scores = np.zeros(n, dtype=np.float32)
+            lengths = self._freeze()['lengths']
+            for term in terms:
+                docs, tfs = self._term_arrays(term)
+                norm = k1 * (1 - b + b * lengths[docs] / avg_length)
+                scores[docs] += self.idf(term) * tfs * (k1 + 1) / (tfs + norm)
+            return scores
+
+        scores = [0.0] * n
+        lengths = self.doc_lengths
+        for term in terms:
+            idf = self.idf(term)
+            docs, tfs = self._postings[term]
+            for doc, tf in zip(docs, tfs):
+                norm = k1 * (1 - b + b * lengths[doc] / avg_length)
+                scores[doc] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        检索与查询最相关的文档
+
+        Args:
+            query: 查询文本
+            top_k: 返回数量，None 表示全部
+
+        Returns:
+            (文档ID, 分数) 列表，按分数降序
+        """
+        scores = self.score_all(query)
+        n = len(scores)
+        if n == 0:
+            return []
+
+        top_k = n if top_k is None else min(top_k, n)
+        np = load_numpy()
+        if np is not None:
+            if top_k < n:
+                order = np.argpartition(-scores, top_k - 1)[:top_k]
+            else:
+                order = np.arange(n)
+            order = order[np.argsort(-scores[order], kind='stable')]
+            return [(self.doc_ids[i], float(scores[i])) for i in order]
+
+        order = sorted(range(n), key=lambda i: -scores[i])[:top_k]
+        return [(self.doc_ids[i], scores[i]) for i in order]
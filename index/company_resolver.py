@@ -0,0 +1,493 @@
+"""
+公司实体识别模块
+功能：把简历中各种写法的公司名称（全称、简称、英文名、产品名、带地名和公司类型后缀的注册名）
+归一到同一个规范ID，供大厂判断、上市判断、负面舆情检索和本地排序共用
+
+识别顺序：
+1. 精确匹配：归一化后的名称（或去掉地名、括号和公司类型后缀后的主体）在别名词典中
+2. 别名扫描：用 Aho-Corasick 自动机在名称（去掉地名和括号，保留公司类型后缀）中一次扫描所有别名，取最长的命中
+   （中文别名须位于开头，且其后只剩公司类型、组织后缀或地名，避免"京东方科技集团""百度外卖"这类误识别）
+3. 模糊匹配：按字符二元组召回候选别名，相似度达到阈值时采用（别名和名称都不能太短，
+   名称中已经包含该别名时以别名扫描的结论为准，避免"JDB""Amazonia"这类误识别）
+"""
+import difflib
+import re
+import threading
+import unicodedata
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# 注册名中常见的地名前缀
+_LOCATIONS = (
+    '北京', '上海', '深圳', '广州', '杭州', '南京', '成都', '武汉', '西安', '苏州', '天津', '重庆',
+    '香港', '中国', '浙江', '广东', '江苏',
+)
+# 公司类型和行业后缀
+_CJK_SUFFIXES = (
+    '股份有限公司', '有限责任公司', '有限公司', '集团公司', '控股集团', '集团', '控股', '公司',
+    '网络技术', '信息技术', '计算机系统', '科技', '技术', '网络', '软件', '信息', '电子商务',
+)
+_LATIN_SUFFIXES = (
+    'co ltd', 'co', 'ltd', 'limited', 'inc', 'incorporated', 'corp', 'corporation', 'group',
+    'holdings', 'holding', 'llc', 'technology', 'technologies',
+)
+# 无法识别的公司的缓存键前缀
+UNRESOLVED_PREFIX = 'name:'
+# 行业和机构类型通称：去掉地名或后缀后只剩这些词时不再去掉（"北京银行" 与 "上海银行" 是两家公司）
+_GENERIC_NAMES = frozenset((
+    '银行', '农商银行', '商业银行', '农村商业银行', '证券', '保险', '人寿', '财险', '信托', '基金', '期货',
+    '汽车', '电信', '移动', '联通', '电力', '电网', '石油', '石化', '燃气', '水务', '烟草', '钢铁', '航空',
+    '铁路', '地铁', '机场', '港口', '邮政', '建设', '建筑', '建工', '地产', '置业', '城投', '交通', '能源',
+    '移动通信', '医药', '医院', '人民医院', '大学', '学院', '中学', '小学', '研究院', '研究所', '日报', '电视台',
+    '广播电视台', '传媒', '出版社', '文化', '教育', '物流', '贸易', '实业', '投资', '电子', '通信',
+    '网络科技', '信息科技',
+) + _CJK_SUFFIXES)
+# 别名扫描时中文别名之后允许出现的组织后缀（公司类型后缀之外）
+_ORG_SUFFIXES = ('股份', '分公司', '子公司', '事业群', '事业部', '研究院', '中国区', '总部')
+
+
+def _longest_first(words) -> str:
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+_PREFIX_PATTERN = re.compile(rf'^(?:{_longest_first(_LOCATIONS)})[市省]?(?=.)')
+_LOCATION_PATTERN = re.compile(rf'^(?:{_longest_first(_LOCATIONS)})[市省]?$')
+# 英文后缀必须是独立的单词
+_SUFFIX_PATTERN = re.compile(rf'(?<=.)(?:{_longest_first(_CJK_SUFFIXES)}| (?:{_longest_first(_LATIN_SUFFIXES)}))$')
+_BRACKETS_PATTERN = re.compile(r'[（(\[【][^）)\]】]*[）)\]】]')
+_SEPARATOR_PATTERN = re.compile(r'[^0-9a-z一-鿿]+')
+# 中文两侧的空格没有分词意义，只保留英文单词之间的空格
+_CJK_SPACE_PATTERN = re.compile(r' (?=[一-鿿])|(?<=[一-鿿]) ')
+# 中文别名之后的剩余部分只由公司类型、组织后缀和地名组成（如 "科技集团股份有限公司"、"co ltd"）
+_REMAINDER_PATTERN = re.compile(
+    rf'^(?:{_longest_first(_CJK_SUFFIXES + _ORG_SUFFIXES + _LOCATIONS)}|[市省 ]'
+    rf'|(?:{_longest_first(_LATIN_SUFFIXES)})(?![0-9a-z]))*$'
+)
+
+
+def normalize(name: str) -> str:
+    """
+    名称归一化：全角转半角、小写，标点统一为空格，中文两侧不保留空格
+
+    Args:
+        name: 原始名称
+
+    Returns:
+        归一化后的名称
+    """
+    text = unicodedata.normalize('NFKC', str(name or '')).lower()
+    text = _SEPARATOR_PATTERN.sub(' ', text).strip()
+    return _CJK_SPACE_PATTERN.sub('', text)
+
+
+def body_name(name: str) -> str:
+    """
+    去掉括号内容和地名前缀、保留公司类型后缀的名称（别名扫描在其中进行），例如
+    "北京京东方科技集团股份有限公司" -> "京东方科技集团股份有限公司"
+
+    Args:
+        name: 原始名称
+
+    Returns:
+        归一化后的名称
+    """
+    text = normalize(_BRACKETS_PATTERN.sub(' ', unicodedata.normalize('NFKC', str(name or ''))))
+    while True:
+        stripped = _PREFIX_PATTERN.sub('', text).lstrip()
+        if stripped == text or not stripped:
+            return text
+        text = stripped
+
+
+def core_name(name: str) -> str:
+    """
+    公司主体名称：去掉括号内容、地名前缀和公司类型后缀，例如
+    "阿里巴巴（中国）网络技术有限公司" -> "阿里巴巴"
+
+    去掉后只剩地名或行业、机构类型通称时保留这一部分（"北京银行有限公司" -> "北京银行"，
+    "上海网络科技有限公司" -> "上海网络"），避免不相关的公司得到同一个主体名称
+
+    Args:
+        name: 原始名称
+
+    Returns:
+        归一化后的主体名称
+    """
+    text = normalize(_BRACKETS_PATTERN.sub(' ', unicodedata.normalize('NFKC', str(name or ''))))
+    changed = True
+    while changed:
+        changed = False
+        for pattern in (_SUFFIX_PATTERN, _PREFIX_PATTERN):
+            stripped = pattern.sub('', text).strip()
+            if stripped and stripped != text and not _is_generic(stripped):
+                text, changed = stripped, True
+                # 先去完后缀再去地名（"上海汽车集团" -> "上海汽车"，而不是 "汽车集团"）
+                break
+    return text
+
+
+def _is_generic(text: str) -> bool:
+    """是否只是行业、机构类型通称或地名"""
+    return text in _GENERIC_NAMES or _LOCATION_PATTERN.match(text) is not None
+
+
+def _is_latin(text: str) -> bool:
+    return bool(text) and text[0] < '一' and text[-1] < '一'
+
+
+def _one_substitution(text: str, alias: str) -> bool:
+    """两个等长中文名称是否只在首字之后的一个位置不同（"阿里在巴" 与 阿里巴巴）"""
+    if len(text) != len(alias) or _is_latin(alias) or text[0] != alias[0]:
+        return False
+    return sum(a != b for a, b in zip(text, alias)) == 1
+
+
+def _word_boundary(text: str, start: int, end: int) -> bool:
+    """英文别名两侧不能紧挨英文字母或数字（避免 meta 命中 metadata）"""
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isalnum() and before < '一') and not (after.isalnum() and after < '一')
+
+
+class AhoCorasick:
+    """多模式串匹配自动机"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value: Any):
+        """添加模式串（需在 build 之前调用）"""
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), value))
+        self._built = False
+
+    def build(self):
+        """按广度优先计算失败指针，并把失败链上的输出合并到每个状态"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """
+        扫描文本中出现的所有模式串
+
+        Returns:
+            [(起始位置, 结束位置, 值)]
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        found = []
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                found.extend((end - length, end, value) for length, value in output[state])
+        return found
+
+
+class CompanyMatch:
+    """公司识别结果"""
+
+    __slots__ = ('id', 'name', 'alias', 'method', 'score')
+
+    def __init__(self, company_id: str, name: str, alias: str, method: str, score: float = 1.0):
+        """
+        Args:
+            company_id: 规范ID
+            name: 规范名称
+            alias: 命中的别名（归一化后）
+            method: 识别方式 exact/alias/fuzzy
+            score: 相似度（模糊匹配时小于1）
+        """
+        self.id = company_id
+        self.name = name
+        self.alias = alias
+        self.method = method
+        self.score = score
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "company_id": self.id,
+            "canonical_name": self.name,
+            "alias": self.alias,
+            "method": self.method,
+            "score": round(self.score, 4),
+        }
+
+
+class CompanyResolver:
+    """公司实体识别器"""
+
+    # 识别结果缓存的条目上限（简历中的公司名称重复度很高）
+    MEMO_SIZE = 100000
+    # 模糊匹配时计算相似度的候选别名数
+    FUZZY_CANDIDATES = 8
+    # 参与模糊匹配的最短长度（中文按字、英文按字母计）：短名称差一两个字就是另一家公司
+    FUZZY_MIN_LENGTH = 4
+    FUZZY_MIN_LATIN_LENGTH = 6
+    # 在自由文本中扫描时英文别名的最短长度（"JD" 在简历中多指职位描述）
+    TEXT_MIN_LATIN_LENGTH = 3
+
+    def __init__(
+        self,
+        entities: Optional[Dict[str, Dict[str, Any]]] = None,
+        known_companies: Optional[Iterable[str]] = None,
+        fuzzy_threshold: float = 0.8
+    ):
+        """
+        Args:
+            entities: 规范ID -> {"name": 规范名称, "aliases": [别名], "products": [产品名]}（companies.entities）
+            known_companies: 知名大厂列表，词典中没有的名称自动登记为新实体
+            fuzzy_threshold: 模糊匹配的相似度阈值，0 表示关闭模糊匹配
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.names: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        self._products: set = set()
+        self._automaton = AhoCorasick()
+        self._bigrams: Dict[str, List[str]] = {}
+        self._memo: Dict[str, Optional[CompanyMatch]] = {}
+        self._lock = threading.Lock()
+
+        for company_id, entity in (entities or {}).items():
+            entity = entity or {}
+            name = entity.get('name') or company_id
+            self.add_entity(str(company_id), name, [name, *(entity.get('aliases') or [])], entity.get('products') or [])
+
+        self.known_ids = set()
+        for name in known_companies or []:
+            match = self.resolve(name)
+            if match is None or match.method == 'fuzzy':
+                company_id = core_name(name)
+                self.add_entity(company_id, name, [name])
+                match = self.resolve(name)
+            self.known_ids.add(match.id)
+
+    def add_entity(self, company_id: str, name: str, aliases: Iterable[str], products: Iterable[str] = ()):
+        """
+        登记实体及其别名（同一别名以先登记的实体为准）
+
+        Args:
+            aliases: 公司名称的各种写法
+            products: 产品名（作为公司名称出现时识别为该公司，但不在自由文本中识别）
+        """
+        self.names.setdefault(company_id, name)
+        aliases = [(alias, False) for alias in aliases] + [(product, True) for product in products]
+        for alias, is_product in aliases:
+            for key in {normalize(alias), core_name(alias)}:
+                if not key or key in self._aliases:
+                    continue
+                if is_product:
+                    self._products.add(key)
+                self._aliases[key] = company_id
+                self._automaton.add(key, key)
+                for bigram in {key[i:i + 2] for i in range(max(1, len(key) - 1))}:
+                    self._bigrams.setdefault(bigram, []).append(key)
+        self._memo.clear()
+
+    def _match(self, company_id: str, alias: str, method: str, score: float = 1.0) -> CompanyMatch:
+        return CompanyMatch(company_id, self.names[company_id], alias, method, score)
+
+    def _scan(self, body: str) -> Optional[str]:
+        """
+        在名称中扫描别名，返回最长的有效命中
+
+        英文别名两侧须是单词边界；中文别名须位于开头，且其后只剩公司类型、组织后缀或地名
+        （"京东科技集团" 命中 京东，"京东方科技集团" 不命中）
+        """
+        best = None
+        for start, end, alias in self._automaton.find_all(body):
+            if _is_latin(alias):
+                if not _word_boundary(body, start, end):
+                    continue
+            elif start != 0 or not _REMAINDER_PATTERN.match(body[end:]):
+                continue
+            if best is None or len(alias) > len(best):
+                best = alias
+        return best
+
+    def _min_fuzzy_length(self, text: str) -> int:
+        return self.FUZZY_MIN_LATIN_LENGTH if _is_latin(text) else self.FUZZY_MIN_LENGTH
+
+    def _fuzzy(self, core: str) -> Optional[Tuple[str, float]]:
+        """按二元组重合度召回候选别名，返回相似度最高且达到阈值的别名"""
+        if self.fuzzy_threshold <= 0 or len(core) < self._min_fuzzy_length(core):
+            return None
+        overlap: Dict[str, int] = {}
+        for bigram in {core[i:i + 2] for i in range(len(core) - 1)}:
+            for alias in self._bigrams.get(bigram, ()):
+                overlap[alias] = overlap.get(alias, 0) + 1
+        if not overlap:
+            return None
+
+        candidates = sorted(overlap, key=overlap.get, reverse=True)[:self.FUZZY_CANDIDATES]
+        best, best_score = None, 0.0
+        for alias in candidates:
+            # 名称包含该别名（"Amazonia" 与 amazon）时是否同一家公司已由别名扫描判断，不再模糊匹配
+            if len(alias) < self._min_fuzzy_length(alias) or alias in core:
+                continue
+            matcher = difflib.SequenceMatcher(None, core, alias)
+            # 四字中文名称错一个字时相似度只有 0.75，单独放行
+            if _one_substitution(core, alias):
+                score = max(matcher.ratio(), self.fuzzy_threshold)
+            # 先用开销小的上界过滤
+            elif matcher.real_quick_ratio() < self.fuzzy_threshold or matcher.quick_ratio() < self.fuzzy_threshold:
+                continue
+            else:
+                score = matcher.ratio()
+            if score > best_score:
+                best, best_score = alias, score
+        return (best, best_score) if best_score >= self.fuzzy_threshold else None
+
+    def resolve(self, name: str) -> Optional[CompanyMatch]:
+        """
+        识别公司名称
+
+        Args:
+            name: 原始公司名称
+
+        Returns:
+            识别结果，无法识别时返回 None
+        """
+        raw = str(name or '').strip()
+        if raw in self._memo:
+            return self._memo[raw]
+        text = normalize(raw)
+        if not text:
+            return None
+
+        match = None
+        core = core_name(raw)
+        for key in (text, core):
+            if key in self._aliases:
+                match = self._match(self._aliases[key], key, 'exact')
+                break
+        if match is None:
+            alias = self._scan(body_name(raw))
+            if alias is not None:
+                match = self._match(self._aliases[alias], alias, 'alias')
+        if match is None:
+            fuzzy = self._fuzzy(core)
+            if fuzzy is not None:
+                match = self._match(self._aliases[fuzzy[0]], fuzzy[0], 'fuzzy', fuzzy[1])
+
+        with self._lock:
+            if len(self._memo) >= self.MEMO_SIZE:
+                self._memo.clear()
+            self._memo[raw] = match
+        return match
+
+    def company_key(self, name: str) -> str:
+        """公司的缓存键：能识别时为规范ID，否则为完整的归一化名称（不去掉地名和后缀）"""
+        match = self.resolve(name)
+        return match.id if match is not None else f"{UNRESOLVED_PREFIX}{normalize(name)}"
+
+    def canonical_name(self, name: str) -> str:
+        """规范名称，无法识别时返回原始名称"""
+        match = self.resolve(name)
+        return match.name if match is not None else str(name or '').strip()
+
+    def is_known(self, name: str) -> bool:
+        """是否在知名大厂列表中"""
+        match = self.resolve(name)
+        return match is not None and match.id in self.known_ids
+
+    def find_in_text(self, text: str) -> List[str]:
+        """
+        在自由文本（如整份简历）中找出出现的所有实体
+
+        只识别公司名称：产品名（"QQ"、"支付宝"、"阿里云"）多是联系方式或技术栈，不算，
+        落在产品名内部的公司别名（"阿里云" 中的 阿里）也不算；过短的英文别名不算
+
+        Returns:
+            按首次出现顺序排列的规范ID
+        """
+        normalized = normalize(text)
+        matches = []
+        for start, end, alias in self._automaton.find_all(normalized):
+            if _is_latin(alias) and (len(alias) < self.TEXT_MIN_LATIN_LENGTH
+                                     or not _word_boundary(normalized, start, end)):
+                continue
+            matches.append((start, end, alias))
+        product_spans = [(start, end) for start, end, alias in matches if alias in self._products]
+
+        found = []
+        for start, end, alias in matches:
+            if alias in self._products or any(s <= start and end <= e for s, e in product_spans):
+                continue
+            company_id = self._aliases[alias]
+            if company_id not in found:
+                found.append(company_id)
+        return found
+
+
+def resolve_work_experience(
+    work_experience: List[Dict[str, Any]],
+    resolver: Optional[CompanyResolver] = None
+) -> List[Dict[str, Any]]:
+    """
+    为工作经历中的每家公司附加规范ID和规范名称
+
+    Returns:
+        工作经历副本，每条增加 company_id（无法识别时为 None）和 canonical_name
+    """
+    resolver = resolver or get_resolver()
+    resolved = []
+    for exp in work_experience or []:
+        exp = dict(exp)
+        match = resolver.resolve(exp.get('company', ''))
+        exp['company_id'] = match.id if match is not None else None
+        exp['canonical_name'] = match.name if match is not None else exp.get('company', '')
+        resolved.append(exp)
+    return resolved
+
+
+_resolver_instance = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> CompanyResolver:
+    """获取全局公司识别器（按 companies 和 big_company.known_companies 配置懒加载）"""
+    global _resolver_instance
+    if _resolver_instance is None:
+        with _resolver_lock:
+            if _resolver_instance is None:
+                from utils.config_loader import config
+
+                company_config = config.get('companies', {}) or {}
+                _resolver_instance = CompanyResolver(
+                    entities=company_config.get('entities', {}),
+                    known_companies=config.get_big_company_config().get('known_companies', []),
+                    fuzzy_threshold=company_config.get('fuzzy_threshold', 0.8)
+                )
+    return _resolver_instance
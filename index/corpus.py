@@ -0,0 +1,650 @@
+"""
+简历语料库索引
+功能：持久化保存 ResumeParser 的解析结果，对公司、职位、教育背景和工作描述建立倒排索引，
+支持"某段时间在某公司担任某职位"这类查询，无需调用 GPT。
+
+存储结构：
+    manifest.json       段列表与下一个可用的简历/工作经历编号
+    seg_<name>.idx      段索引（倒排表以差值编码的 uint32 数组存储，整体 zlib 压缩）
+    seg_<name>.docs     段内简历原文（按块 zlib 压缩，按需解压）
+
+写入先进入内存缓冲区，flush 时在文件锁保护下分配全局编号并写出一个不可变的段，
+段数量超过 max_segments 时自动合并，多个进程可以共享同一个语料库目录
+"""
+import bisect
+import fcntl
+import json
+import os
+import pickle
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, Any, List, Optional, Tuple
+
+from index.tokenizer import tokenize
+
+# 职位/描述/教育背景使用分词索引，公司额外保留完整名称索引
+JOB_FIELDS = ('company', 'company_tokens', 'position', 'description')
+RESUME_FIELDS = ('education',)
+
+_DATE_PATTERN = re.compile(r'((?:19|20)\d{2})(?:\s*[.\-/年]\s*(\d{1,2}))?')
+_CURRENT_MARKERS = ('至今', '现在', '今', 'present', 'now', 'current')
+
+# 无法解析的结束时间视为"至今"
+OPEN_END = 9999 * 12
+
+
+def parse_month(value: Any, is_end: bool = False) -> Optional[int]:
+    """
+    将日期字符串转换为月份序号（年 * 12 + 月 - 1）
+
+    Args:
+        value: 日期，如 "2015.07"、"2018年6月"、"至今"
+        is_end: 是否为结束时间（只有年份时取12月，"至今"取开放区间）
+
+    Returns:
+        月份序号，无法解析时返回 None
+    """
+    text = str(value or '').strip().lower()
+    if is_end and (not text or any(marker in text for marker in _CURRENT_MARKERS)):
+        return OPEN_END
+    match = _DATE_PATTERN.search(text)
+    if not match:
+        return None
+    month = int(match.group(2)) if match.group(2) and 1 <= int(match.group(2)) <= 12 else (12 if is_end else 1)
+    return int(match.group(1)) * 12 + month - 1
+
+
+def normalize_company(name: str) -> str:
+    """公司名称归一化（去空白、小写）"""
+    return re.sub(r'\s+', '', str(name or '')).lower()
+
+
+def _encode_postings(ids: List[int]) -> bytes:
+    """差值编码升序编号列表"""
+    deltas = array('I', ids)
+    for i in range(len(deltas) - 1, 0, -1):
+        deltas[i] -= deltas[i - 1]
+    return deltas.tobytes()
+
+
+def _decode_postings(data: bytes) -> array:
+    """解码差值编码的编号列表"""
+    deltas = array('I')
+    deltas.frombytes(data)
+    return array('I', accumulate(deltas))
+
+
+def _intersect(lists: List[array]) -> List[int]:
+    """
+    求多个升序编号列表的交集
+
+    从最短的列表开始，对长列表使用二分查找，代价约为 O(m·log n)，
+    不需要遍历常见词项的长倒排表
+    """
+    lists = sorted(lists, key=len)
+    result = list(lists[0])
+    for ids in lists[1:]:
+        if not result:
+            break
+        if len(ids) > 8 * len(result):
+            n = len(ids)
+            kept = []
+            lo = 0
+            for value in result:
+                lo = bisect.bisect_left(ids, value, lo)
+                if lo == n:
+                    break
+                if ids[lo] == value:
+                    kept.append(value)
+            result = kept
+        else:
+            other = set(ids)
+            result = [value for value in result if value in other]
+    return result
+
+
+class _Buffer:
+    """内存写缓冲区"""
+
+    def __init__(self):
+        self.resumes: List[Dict[str, Any]] = []
+        self.job_resume = array('I')
+        self.job_start = array('i')
+        self.job_end = array('i')
+        self.postings: Dict[str, Dict[str, List[int]]] = {
+            field: {} for field in JOB_FIELDS + RESUME_FIELDS
+        }
+
+    def __len__(self) -> int:
+        return len(self.resumes)
+
+    def _post(self, field: str, terms, local_id: int):
+        index = self.postings[field]
+        for term in set(terms):
+            ids = index.get(term)
+            if ids is None:
+                index[term] = [local_id]
+            elif ids[-1] != local_id:
+                ids.append(local_id)
+
+    def add(self, resume: Dict[str, Any]):
+        local_resume = len(self.resumes)
+        self.resumes.append(resume)
+
+        education = (resume.get('personal_info') or {}).get('education', '')
+        self._post('education', tokenize(str(education)), local_resume)
+
+        for job in resume.get('work_experience') or []:
+            local_job = len(self.job_resume)
+            self.job_resume.append(local_resume)
+            start = parse_month(job.get('start_date'))
+            end = parse_month(job.get('end_date'), is_end=True)
+            self.job_start.append(start if start is not None else 0)
+            self.job_end.append(end if end is not None else OPEN_END)
+
+            company = str(job.get('company', ''))
+            self._post('company', [normalize_company(company)], local_job)
+            self._post('company_tokens', tokenize(company), local_job)
+            self._post('position', tokenize(str(job.get('position', ''))), local_job)
+            self._post('description', tokenize(str(job.get('description', ''))), local_job)
+
+
+class Segment:
+    """不可变的磁盘段"""
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        with open(self.index_path, 'rb') as f:
+            meta = pickle.loads(zlib.decompress(f.read()))
+
+        self.base_resume = meta['base_resume']
+        self.num_resumes = meta['num_resumes']
+        self.base_job = meta['base_job']
+        self.postings: Dict[str, Dict[str, bytes]] = meta['postings']
+        self.doc_blocks: List[Tuple[int, int, int]] = meta['doc_blocks']
+        self._block_starts = [block[0] for block in self.doc_blocks]
+
+        self.job_resume = array('I')
+        self.job_resume.frombytes(meta['job_resume'])
+        self.job_start = array('i')
+        self.job_start.frombytes(meta['job_start'])
+        self.job_end = array('i')
+        self.job_end.frombytes(meta['job_end'])
+
+        self._decoded: Dict[Tuple[str, str], array] = {}
+        self._blocks: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # 每个段缓存的已解压简历块数量
+    BLOCK_CACHE_SIZE = 64
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, f"seg_{self.name}.idx")
+
+    @property
+    def docs_path(self) -> str:
+        return os.path.join(self.directory, f"seg_{self.name}.docs")
+
+    @property
+    def num_jobs(self) -> int:
+        return len(self.job_resume)
+
+    def posting(self, field: str, term: str) -> array:
+        """读取某个词项的倒排表（段内编号）"""
+        key = (field, term)
+        ids = self._decoded.get(key)
+        if ids is None:
+            data = self.postings[field].get(term)
+            ids = _decode_postings(data) if data else array('I')
+            with self._lock:
+                self._decoded[key] = ids
+        return ids
+
+    def load_resumes(self, local_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """按段内编号读取简历原文"""
+        by_block: Dict[int, List[int]] = {}
+        for local_id in local_ids:
+            by_block.setdefault(bisect.bisect_right(self._block_starts, local_id) - 1, []).append(local_id)
+
+        result = {}
+        with open(self.docs_path, 'rb') as f:
+            for block_index, ids in by_block.items():
+                first, offset, length = self.doc_blocks[block_index]
+                with self._lock:
+                    block = self._blocks.get(block_index)
+                    if block is not None:
+                        self._blocks.move_to_end(block_index)
+                if block is None:
+                    f.seek(offset)
+                    block = json.loads(zlib.decompress(f.read(length)))
+                    with self._lock:
+                        self._blocks[block_index] = block
+                        if len(self._blocks) > self.BLOCK_CACHE_SIZE:
+                            self._blocks.popitem(last=False)
+                for local_id in ids:
+                    result[local_id] = block[local_id - first]
+        return result
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.index_path) + os.path.getsize(self.docs_path)
+
+
+def _write_segment(
+    directory: str,
+    name: str,
+    base_resume: int,
+    base_job: int,
+    resumes_blocks: List[Tuple[int, bytes]],
+    job_resume: array,
+    job_start: array,
+    job_end: array,
+    postings: Dict[str, Dict[str, List[int]]]
+):
+    """写出一个段（先写临时文件再原子替换）"""
+    docs_path = os.path.join(directory, f"seg_{name}.docs")
+    doc_blocks = []
+    with open(docs_path + '.tmp', 'wb') as f:
+        offset = 0
+        for first, compressed in resumes_blocks:
+            f.write(compressed)
+            doc_blocks.append((first, offset, len(compressed)))
+            offset += len(compressed)
+    os.replace(docs_path + '.tmp', docs_path)
+
+    num_resumes = 0
+    if resumes_blocks:
+        last_first, last_block = resumes_blocks[-1]
+        num_resumes = last_first + len(json.loads(zlib.decompress(last_block)))
+
+    meta = {
+        'base_resume': base_resume,
+        'num_resumes': num_resumes,
+        'base_job': base_job,
+        'job_resume': job_resume.tobytes(),
+        'job_start': job_start.tobytes(),
+        'job_end': job_end.tobytes(),
+        'postings': {
+            field: {term: _encode_postings(ids) for term, ids in index.items()}
+            for field, index in postings.items()
+        },
+        'doc_blocks': doc_blocks,
+    }
+    index_path = os.path.join(directory, f"seg_{name}.idx")
+    with open(index_path + '.tmp', 'wb') as f:
+        f.write(zlib.compress(pickle.dumps(meta, protocol=pickle.HIGHEST_PROTOCOL), 6))
+    os.replace(index_path + '.tmp', index_path)
+
+
+class ResumeCorpus:
+    """可持久化、可增量写入的简历语料库"""
+
+    def __init__(self, path: str, block_size: int = 32, max_segments: int = 16):
+        """
+        Args:
+            path: 语料库目录
+            block_size: 简历原文每个压缩块包含的简历数
+            max_segments: 段数量上限，超过后自动合并
+        """
+        self.path = path
+        self.block_size = block_size
+        self.max_segments = max_segments
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._buffer = _Buffer()
+        self._segments: Dict[str, Segment] = {}
+        self._order: List[str] = []
+        self._manifest_mtime = None
+        self._refresh()
+
+    # ------------------------------------------------------------------
+    # 清单与文件锁
+    # ------------------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, 'manifest.json')
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segments": [], "next_resume_id": 0, "next_job_id": 0}
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _file_lock(self):
+        """跨进程写锁"""
+        corpus = self
+
+        class _Lock:
+            def __enter__(self):
+                self.handle = open(os.path.join(corpus.path, '.lock'), 'a+')
+                fcntl.flock(self.handle, fcntl.LOCK_EX)
+                return self
+
+            def __exit__(self, *exc):
+                fcntl.flock(self.handle, fcntl.LOCK_UN)
+                self.handle.close()
+
+        return _Lock()
+
+    def _refresh(self):
+        """清单变化时（其他进程写入或合并后）重新加载段列表"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._manifest_mtime:
+            return
+
+        with self._lock:
+            manifest = self._read_manifest()
+            segments = {}
+            for name in manifest['segments']:
+                segments[name] = self._segments.get(name) or Segment(self.path, name)
+            self._segments = segments
+            self._order = list(manifest['segments'])
+            self._manifest_mtime = mtime
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def add(self, resume: Dict[str, Any]):
+        """将一份解析结果加入写缓冲区（flush 后才对查询和其他进程可见）"""
+        with self._lock:
+            self._buffer.add(resume)
+
+    def insert(self, resume: Dict[str, Any]):
+        """写入一份解析结果并立即落盘"""
+        self.add(resume)
+        self.flush()
+
+    def flush(self) -> Optional[str]:
+        """
+        将写缓冲区落盘为一个新段
+
+        Returns:
+            新段名称，缓冲区为空时返回 None
+        """
+        with self._lock:
+            buffer = self._buffer
+            if not len(buffer):
+                return None
+            self._buffer = _Buffer()
+
+            blocks = [
+                (start, zlib.compress(json.dumps(
+                    buffer.resumes[start:start + self.block_size], ensure_ascii=False
+                ).encode('utf-8'), 6))
+                for start in range(0, len(buffer), self.block_size)
+            ]
+
+            with self._file_lock():
+                manifest = self._read_manifest()
+                name = f"{time.time_ns():x}_{os.getpid()}"
+                _write_segment(
+                    self.path, name,
+                    manifest['next_resume_id'], manifest['next_job_id'],
+                    blocks, buffer.job_resume, buffer.job_start, buffer.job_end,
+                    buffer.postings
+                )
+                manifest['segments'].append(name)
+                manifest['next_resume_id'] += len(buffer)
+                manifest['next_job_id'] += len(buffer.job_resume)
+                self._write_manifest(manifest)
+
+            self._refresh()
+            if len(self._order) > self.max_segments:
+                self.compact()
+            return name
+
+    def compact(self) -> Optional[str]:
+        """
+        将所有段合并为一个段
+
+        倒排表按段的全局编号偏移直接拼接，不需要重新分词
+
+        Returns:
+            合并后的段名称，不足两个段时返回 None
+        """
+        with self._lock, self._file_lock():
+            manifest = self._read_manifest()
+            names = manifest['segments']
+            if len(names) < 2:
+                return None
+            segments = [self._segments.get(n) or Segment(self.path, n) for n in names]
+
+            base = segments[0]
+            postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in JOB_FIELDS + RESUME_FIELDS}
+            job_resume, job_start, job_end = array('I'), array('i'), array('i')
+            blocks = []
+
+            for segment in segments:
+                resume_offset = segment.base_resume - base.base_resume
+                job_offset = segment.base_job - base.base_job
+                job_resume.extend(r + resume_offset for r in segment.job_resume)
+                job_start.extend(segment.job_start)
+                job_end.extend(segment.job_end)
+
+                for field, index in segment.postings.items():
+                    offset = resume_offset if field in RESUME_FIELDS else job_offset
+                    merged = postings[field]
+                    for term, data in index.items():
+                        merged.setdefault(term, []).extend(i + offset for i in _decode_postings(data))
+
+                with open(segment.docs_path, 'rb') as f:
+                    for first, offset_bytes, length in segment.doc_blocks:
+                        f.seek(offset_bytes)
+                        blocks.append((first + resume_offset, f.read(length)))
+
+            name = f"{time.time_ns():x}_{os.getpid()}"
+            _write_segment(self.path, name, base.base_resume, base.base_job,
+                           blocks, job_resume, job_start, job_end, postings)
+            manifest['segments'] = [name]
+            self._write_manifest(manifest)
+
+            for segment in segments:
+                for file_path in (segment.index_path, segment.docs_path):
+                    try:
+                        os.remove(file_path)
+                    except FileNotFoundError:
+                        pass
+
+        self._segments = {}
+        self._manifest_mtime = None
+        self._refresh()
+        return name
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _job_candidates(
+        self,
+        segment: Segment,
+        company: Optional[str],
+        company_exact: bool,
+        position: Optional[str],
+        text: Optional[str]
+    ) -> Optional[List[int]]:
+        """按工作经历级别的条件求交集（升序），没有条件时返回 None"""
+        lists = []
+        if company:
+            if company_exact:
+                lists.append(segment.posting('company', normalize_company(company)))
+            else:
+                lists.extend(segment.posting('company_tokens', t) for t in set(tokenize(company)))
+        if position:
+            lists.extend(segment.posting('position', t) for t in set(tokenize(position)))
+        if text:
+            lists.extend(segment.posting('description', t) for t in set(tokenize(text)))
+
+        if not lists:
+            return None
+        return _intersect(lists)
+
+    def _search_segment(
+        self,
+        segment: Segment,
+        company: Optional[str],
+        company_exact: bool,
+        position: Optional[str],
+        education: Optional[str],
+        text: Optional[str],
+        start: Optional[int],
+        end: Optional[int]
+    ) -> Dict[int, List[int]]:
+        """在单个段中检索，返回段内简历编号 -> 命中的段内工作经历编号"""
+        jobs = self._job_candidates(segment, company, company_exact, position, text)
+        has_date = start is not None or end is not None
+
+        if jobs is None and has_date:
+            jobs = range(segment.num_jobs)
+
+        matched: Dict[int, List[int]] = {}
+        if jobs is not None:
+            lo = start if start is not None else -1
+            hi = end if end is not None else OPEN_END
+            job_start, job_end, job_resume = segment.job_start, segment.job_end, segment.job_resume
+            for job in jobs:
+                if has_date and (job_start[job] > hi or job_end[job] < lo):
+                    continue
+                matched.setdefault(job_resume[job], []).append(job)
+
+        if education:
+            lists = [segment.posting('education', t) for t in set(tokenize(education))]
+            allowed = set(_intersect(lists)) if lists else set()
+            if jobs is None:
+                return {r: [] for r in allowed}
+            matched = {r: j for r, j in matched.items() if r in allowed}
+
+        return matched
+
+    def search(
+        self,
+        company: Optional[str] = None,
+        position: Optional[str] = None,
+        education: Optional[str] = None,
+        text: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        检索简历
+
+        公司、职位、工作描述和时间段作用于同一段工作经历，例如
+        search(company="美团", position="架构师", start_year=2015, end_year=2018)
+        表示 2015~2018 年间在美团担任过架构师（时间段有重叠即可）
+
+        Args:
+            company: 公司名称（优先完整匹配，没有时按分词匹配）
+            position: 职位关键词
+            education: 教育背景关键词
+            text: 工作描述关键词
+            start_year: 时间段起始年份
+            end_year: 时间段结束年份
+            limit: 返回的简历数量上限（按编号倒序，最新写入的优先）
+
+        Returns:
+            {"total": 命中总数, "results": [{"resume_id", "matched_jobs", "resume"}]}
+        """
+        if not any([company, position, education, text, start_year, end_year]):
+            raise ValueError("至少需要一个查询条件")
+
+        self._refresh()
+        start = start_year * 12 if start_year else None
+        end = end_year * 12 + 11 if end_year else None
+
+        with self._lock:
+            segments = [self._segments[name] for name in self._order]
+
+        # 任一段中存在完整公司名称时按完整名称匹配，否则按分词匹配
+        company_exact = bool(company) and any(
+            normalize_company(company) in segment.postings['company'] for segment in segments
+        )
+
+        hits: List[Tuple[Segment, int, List[int]]] = []
+        for segment in segments:
+            for local_resume, jobs in self._search_segment(
+                segment, company, company_exact, position, education, text, start, end
+            ).items():
+                hits.append((segment, local_resume, jobs))
+
+        hits.sort(key=lambda hit: hit[0].base_resume + hit[1], reverse=True)
+        selected = hits[:limit]
+
+        by_segment: Dict[str, List[int]] = {}
+        for segment, local_resume, _ in selected:
+            by_segment.setdefault(segment.name, []).append(local_resume)
+        documents = {
+            name: self._segments[name].load_resumes(ids)
+            for name, ids in by_segment.items()
+        }
+
+        results = []
+        for segment, local_resume, jobs in selected:
+            # 工作经历按简历顺序写入，第一个属于该简历的编号即为其在简历内的偏移基准
+            first_job = bisect.bisect_left(segment.job_resume, local_resume)
+            results.append({
+                "resume_id": segment.base_resume + local_resume,
+                "matched_jobs": [j - first_job for j in jobs],
+                "resume": documents[segment.name][local_resume]
+            })
+
+        return {"total": len(hits), "results": results}
+
+    def stats(self) -> Dict[str, Any]:
+        """语料库规模与磁盘占用"""
+        self._refresh()
+        with self._lock:
+            segments = [self._segments[name] for name in self._order]
+            buffered = len(self._buffer)
+        return {
+            "resumes": sum(s.num_resumes for s in segments),
+            "jobs": sum(s.num_jobs for s in segments),
+            "segments": len(segments),
+            "buffered": buffered,
+            "size_bytes": sum(s.size_bytes() for s in segments),
+        }
+
+
+_corpus_instance = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus() -> Optional[ResumeCorpus]:
+    """获取全局语料库实例（按配置懒加载，未启用时返回 None）"""
+    global _corpus_instance
+    from utils.config_loader import config
+
+    corpus_config = config.get('corpus', {}) or {}
+    if not corpus_config.get('enabled', False):
+        return None
+
+    if _corpus_instance is None:
+        with _corpus_lock:
+            if _corpus_instance is None:
+                path = corpus_config.get('path', 'data/corpus')
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+                _corpus_instance = ResumeCorpus(
+                    path,
+                    block_size=corpus_config.get('block_size', 32),
+                    max_segments=corpus_config.get('max_segments', 16)
+                )
+    return _corpus_instance
@@ -0,0 +1,293 @@
+"""
+结构化特征打分模块
+功能：把解析后的简历和各检查项结果转换为定长的数值特征向量（工作年限、大厂任职年限、上市经历、
+负面风险等级、职级、与职位描述的关键词重合度），再按可配置的权重一次性向量化打分，
+用于大批量筛选时在调用 GPT 之前（或代替 GPT 的 match_score）给出低成本的匹配分数。
+安装了 NumPy 时向量化打分，否则使用纯 Python 实现
+"""
+import datetime
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from index.bm25 import load_numpy
+from index.company_resolver import CompanyResolver, get_resolver
+from index.tokenizer import tokenize
+from models.resume_chunker import month_index
+
+# 特征名称，顺序即特征向量中的列顺序
+FEATURES = (
+    'years_experience',
+    'big_company_years',
+    'ipo_exposure',
+    'negative_risk',
+    'title_seniority',
+    'keyword_overlap',
+)
+
+# 各特征归一化到 0~1 时的封顶值
+DEFAULT_CAPS = {
+    'years_experience': 10,
+    'big_company_years': 5,
+    'ipo_exposure': 2,
+    'negative_risk': 3,
+    'title_seniority': 5,
+    'keyword_overlap': 1,
+}
+
+# 默认权重：正向特征的权重之和为1，负面风险为扣分项；匹配分数 = 100 * 加权和，限制在 0~100
+DEFAULT_WEIGHTS = {
+    'years_experience': 0.2,
+    'big_company_years': 0.25,
+    'ipo_exposure': 0.1,
+    'negative_risk': -0.5,
+    'title_seniority': 0.15,
+    'keyword_overlap': 0.3,
+}
+
+RISK_LEVELS = {'none': 0, 'low': 1, 'medium': 2, 'high': 3}
+
+# 职级关键词（按级别从高到低匹配，职位名称中命中的最高级别即该职位的职级）
+TITLE_LEVELS: List[Tuple[int, Tuple[str, ...]]] = [
+    (5, ('cto', 'ceo', 'vp', '副总裁', '合伙人', '首席')),
+    (4, ('总监', '负责人', 'head', 'director')),
+    (3, ('专家', '架构师', '经理', '主管', 'leader', 'manager', 'principal', 'staff')),
+    (2, ('高级', '资深', 'senior', 'sr.')),
+    (1, ('工程师', '开发', '分析师', '专员', '设计师', 'engineer', 'developer', 'analyst')),
+]
+
+# 以"至今"等结尾的工作经历按当前月份计算，ongoing 传给 month_index 的占位值
+_ONGOING = 10 ** 6
+
+
+def title_seniority(position: str) -> int:
+    """职位名称的职级（0~5，无法识别为0）"""
+    lowered = (position or '').lower()
+    for level, words in TITLE_LEVELS:
+        if any(word in lowered for word in words):
+            return level
+    return 0
+
+
+def _merged_months(intervals: List[Tuple[int, int]]) -> int:
+    """合并重叠的时间段，返回总月数"""
+    if not intervals:
+        return 0
+    intervals.sort()
+    months = 0
+    current_start, current_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start > current_end:
+            months += current_end - current_start + 1
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    return months + current_end - current_start + 1
+
+
+def _interval(exp: Dict[str, Any], now: int) -> Optional[Tuple[int, int]]:
+    start = month_index(exp.get('start_date'))
+    if start is None:
+        return None
+    end = month_index(exp.get('end_date'), ongoing=_ONGOING)
+    if end is None:
+        end = now if exp.get('is_current') else start
+    end = min(end, now)
+    return (start, end) if start <= end else None
+
+
+def _strings(value: Any) -> Iterable[str]:
+    """递归取出所有字符串值"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def job_terms(job_description: str) -> Set[str]:
+    """职位描述中的关键词（与简历分词方式相同）"""
+    return set(tokenize(job_description))
+
+
+def _big_company_keys(result: Optional[Dict[str, Any]], resolver: CompanyResolver) -> Optional[Set[str]]:
+    """大厂判断结果中判定为大厂的公司（公司键），检查项未执行或失败时为None"""
+    if not isinstance(result, dict) or result.get('skipped'):
+        return None
+    return {
+        resolver.company_key(entry.get('company_name') or '')
+        for entry in result.get('big_companies', []) or []
+        if isinstance(entry, dict) and entry.get('is_big_company')
+    }
+
+
+def extract_features(
+    resume_data: Dict[str, Any],
+    check_results: Optional[Dict[str, Any]] = None,
+    terms: Optional[Set[str]] = None,
+    resolver: Optional[CompanyResolver] = None,
+    today: Optional[datetime.date] = None
+) -> List[float]:
+    """
+    提取一份简历的特征向量（未归一化，列顺序见 FEATURES）
+
+    大厂判断结果缺失（检查项跳过或失败）时按 big_company.known_companies 识别大厂；
+    上市经历和负面舆情结果缺失时记为0
+
+    Args:
+        resume_data: ResumeParser 的解析结果
+        check_results: 检查项名称 -> 结果数据（big_company/ipo/negative）
+        terms: 职位描述的关键词（job_terms 的返回值），为空时关键词重合度为0
+        resolver: 公司实体识别器，默认为全局实例
+        today: 计算"至今"时使用的日期，默认为当天
+
+    Returns:
+        特征向量
+    """
+    check_results = check_results or {}
+    resolver = resolver or get_resolver()
+    today = today or datetime.date.today()
+    now = today.year * 12 + today.month - 1
+
+    big_keys = _big_company_keys(check_results.get('big_company'), resolver)
+    all_intervals, big_intervals = [], []
+    seniority = 0
+    for exp in resume_data.get('work_experience') or []:
+        if not isinstance(exp, dict):
+            continue
+        seniority = max(seniority, title_seniority(exp.get('position') or ''))
+        interval = _interval(exp, now)
+        if interval is None:
+            continue
+        all_intervals.append(interval)
+        company = exp.get('company') or ''
+        is_big = resolver.company_key(company) in big_keys if big_keys is not None else resolver.is_known(company)
+        if is_big:
+            big_intervals.append(interval)
+
+    ipo = check_results.get('ipo')
+    ipo_exposure = 0
+    if isinstance(ipo, dict) and not ipo.get('skipped'):
+        ipo_exposure = sum(
+            1 for entry in ipo.get('ipo_experiences', []) or []
+            if isinstance(entry, dict) and entry.get('experienced_ipo')
+        )
+        if ipo.get('has_ipo_experience') and not ipo_exposure:
+            ipo_exposure = 1
+
+    negative = check_results.get('negative')
+    risk = 0
+    if isinstance(negative, dict) and not negative.get('skipped'):
+        risk = RISK_LEVELS.get(str(negative.get('risk_level') or 'none').lower(), 0)
+
+    overlap = 0.0
+    if terms:
+        resume_terms = set()
+        for text in _strings(resume_data):
+            resume_terms.update(tokenize(text))
+        overlap = len(terms & resume_terms) / len(terms)
+
+    return [
+        round(_merged_months(all_intervals) / 12, 2),
+        round(_merged_months(big_intervals) / 12, 2),
+        float(ipo_exposure),
+        float(risk),
+        float(seniority),
+        round(overlap, 4),
+    ]
+
+
+class FeatureMatrix:
+    """候选人特征矩阵（按行追加，列顺序见 FEATURES）"""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self._values = array('f')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, candidate_id: str, features: List[float]):
+        if len(features) != len(FEATURES):
+            raise ValueError(f"特征向量长度应为 {len(FEATURES)}，实际为 {len(features)}")
+        self.ids.append(candidate_id)
+        self._values.extend(features)
+
+    def row(self, index: int) -> List[float]:
+        width = len(FEATURES)
+        return list(self._values[index * width:(index + 1) * width])
+
+    def to_numpy(self):
+        """转换为 (候选人数, 特征数) 的 float32 矩阵（不复制数据）"""
+        np = load_numpy()
+        return np.frombuffer(self._values, dtype=np.float32).reshape(len(self.ids), len(FEATURES))
+
+
+class FeatureScorer:
+    """按权重对特征矩阵打分"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, caps: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            weights: 各特征的权重，未指定的取 DEFAULT_WEIGHTS
+            caps: 各特征归一化的封顶值，未指定的取 DEFAULT_CAPS
+        """
+        unknown = set(weights or {}).union(caps or {}) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"未知的特征: {', '.join(sorted(unknown))}")
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.caps = dict(DEFAULT_CAPS, **(caps or {}))
+
+    def score(self, matrix: FeatureMatrix):
+        """
+        计算所有候选人的匹配分数（0~100）
+
+        Returns:
+            安装 NumPy 时为 ndarray，否则为列表
+        """
+        np = load_numpy()
+        if np is not None:
+            values = matrix.to_numpy()
+            caps = np.array([self.caps[name] for name in FEATURES], dtype=np.float32)
+            weights = np.array([self.weights[name] for name in FEATURES], dtype=np.float32)
+            normalized = np.clip(values / caps, 0, 1)
+            return np.clip(normalized @ weights * 100, 0, 100)
+
+        caps = [self.caps[name] for name in FEATURES]
+        weights = [self.weights[name] for name in FEATURES]
+        scores = []
+        for i in range(len(matrix)):
+            total = sum(
+                weight * min(max(value / cap, 0.0), 1.0)
+                for value, cap, weight in zip(matrix.row(i), caps, weights)
+            )
+            scores.append(min(100.0, max(0.0, total * 100)))
+        return scores
+
+    def rank(self, matrix: FeatureMatrix, top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        按匹配分数降序排列
+
+        Args:
+            top_k: 返回数量，None 表示全部
+
+        Returns:
+            [(行号, 匹配分数)]
+        """
+        n = len(matrix)
+        if n == 0:
+            return []
+        scores = self.score(matrix)
+        limit = n if top_k is None else max(0, min(top_k, n))
+        if limit == 0:
+            return []
+
+        np = load_numpy()
+        if np is not None:
+            order = np.argpartition(-scores, limit - 1)[:limit] if limit < n else np.arange(n)
+            order = order[np.argsort(-scores[order], kind='stable')].tolist()
+        else:
+            order = sorted(range(n), key=lambda i: -scores[i])[:limit]
+        return [(i, float(scores[i])) for i in order]
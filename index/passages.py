@@ -0,0 +1,79 @@
+"""
+段落检索模块
+功能：把抓取到的网页正文切分为长度相近的段落，按 BM25 选出与检索词最相关的若干段，
+只把这些段落交给模型，避免整页内容撑大提示词
+"""
+from typing import Dict, Any, List
+
+from index.bm25 import BM25Index
+
+
+def split_passages(text: str, max_chars: int = 300) -> List[str]:
+    """
+    按行把正文合并为不超过 max_chars 个字符的段落（单行过长时按长度切开）
+    """
+    passages, current = [], ''
+    for line in (text or '').split('\n'):
+        line = line.strip()
+        while len(line) > max_chars:
+            if current:
+                passages.append(current)
+                current = ''
+            passages.append(line[:max_chars])
+            line = line[max_chars:]
+        if not line:
+            continue
+        if current and len(current) + 1 + len(line) > max_chars:
+            passages.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        passages.append(current)
+    return passages
+
+
+def top_passages(
+    query: str,
+    pages: List[Dict[str, Any]],
+    top_k: int = 6,
+    max_chars: int = 300,
+    per_page: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    从多个网页中选出与查询最相关的段落
+
+    Args:
+        query: 检索词（姓名、公司、负面关键词等）
+        pages: PageFetcher 抓取的网页 [{"url", "title", "text"}]
+        top_k: 返回的段落数
+        max_chars: 段落长度上限
+        per_page: 每个网页最多选取的段落数
+
+    Returns:
+        [{"url", "title", "text", "score"}]，按相关性降序，只包含与查询有重合词的段落
+    """
+    index = BM25Index()
+    sources = []
+    for page in pages:
+        for passage in split_passages(page.get('text', ''), max_chars):
+            index.add(str(len(sources)), passage)
+            sources.append((page, passage))
+    if not sources:
+        return []
+
+    selected, counts = [], {}
+    for doc_id, score in index.search(query):
+        if score <= 0 or len(selected) >= top_k:
+            break
+        page, passage = sources[int(doc_id)]
+        if counts.get(page['url'], 0) >= per_page:
+            continue
+        counts[page['url']] = counts.get(page['url'], 0) + 1
+        selected.append({
+            "url": page['url'],
+            "title": page.get('title', ''),
+            "text": passage,
+            "score": round(float(score), 4),
+        })
+    return selected
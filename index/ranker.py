@@ -0,0 +1,185 @@
+"""
+候选人本地排序模块
+功能：结合 BM25 文本相关性、知名大厂经历和工作年限，在调用 GPT 之前对候选人做本地排序
+"""
+import datetime
+import re
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+from index.bm25 import BM25Index, load_numpy
+from index.company_resolver import CompanyResolver
+from index.tokenizer import tokenize
+
+# 时间段，例如 2015.07 - 2018.06、2018年7月-至今、2014-2015
+_DATE_RANGE_PATTERN = re.compile(
+    r'((?:19|20)\d{2})(?:\s*[.\-/年]\s*(\d{1,2}))?\s*月?\s*[-–—~至到]+\s*'
+    r'(?:((?:19|20)\d{2})(?:\s*[.\-/年]\s*(\d{1,2}))?|至今|现在|今|present|now)',
+    re.IGNORECASE
+)
+
+# 包含这些词的行视为教育经历，不计入工作年限
+_EDUCATION_MARKERS = ('大学', '学院', '本科', '硕士', '博士', '研究生', 'university', 'college', 'bachelor', 'master')
+
+DEFAULT_WEIGHTS = {
+    'bm25': 0.6,
+    'big_company': 0.25,
+    'experience': 0.15,
+}
+
+
+def _month_index(year: str, month: Optional[str], default_month: int) -> int:
+    month_value = int(month) if month and 1 <= int(month) <= 12 else default_month
+    return int(year) * 12 + month_value - 1
+
+
+def estimate_years_of_experience(text: str, today: Optional[datetime.date] = None) -> float:
+    """
+    从简历文本中估算工作年限
+
+    提取所有工作时间段并合并重叠部分，教育经历所在行的时间段不计入
+
+    Args:
+        text: 简历文本
+        today: 计算"至今"时使用的日期，默认为当天
+
+    Returns:
+        工作年限（年）
+    """
+    today = today or datetime.date.today()
+    now = today.year * 12 + today.month - 1
+
+    intervals = []
+    for line in (text or '').splitlines():
+        lowered = line.lower()
+        if any(marker in lowered for marker in _EDUCATION_MARKERS):
+            continue
+        for match in _DATE_RANGE_PATTERN.finditer(line):
+            start = _month_index(match.group(1), match.group(2), 1)
+            end = _month_index(match.group(3), match.group(4), 12) if match.group(3) else now
+            if start <= end <= now + 12:
+                intervals.append((start, end))
+
+    if not intervals:
+        return 0.0
+
+    intervals.sort()
+    months = 0
+    current_start, current_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start > current_end:
+            months += current_end - current_start + 1
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    months += current_end - current_start + 1
+    return round(months / 12, 1)
+
+
+def match_known_companies(text: str, resolver: CompanyResolver) -> List[str]:
+    """返回文本中出现的知名大厂（规范名称，同一公司的不同写法只算一次）"""
+    return [
+        resolver.names[company_id]
+        for company_id in resolver.find_in_text(text)
+        if company_id in resolver.known_ids
+    ]
+
+
+class CandidateRanker:
+    """候选人本地排序器"""
+
+    def __init__(
+        self,
+        known_companies: Optional[List[str]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        max_years: float = 10,
+        resolver: Optional[CompanyResolver] = None
+    ):
+        """
+        Args:
+            known_companies: 知名大厂列表（未指定 resolver 时使用）
+            weights: 各项信号的权重（bm25/big_company/experience）
+            max_years: 工作年限信号的封顶年数
+            resolver: 公司实体识别器（默认只登记 known_companies，不含别名词典）
+        """
+        self.resolver = resolver or CompanyResolver(known_companies=known_companies or [])
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.max_years = max_years
+        self.index = BM25Index()
+        self.known_counts = array('f')
+        self.years = array('f')
+        self.matched_companies: List[List[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add(self, candidate_id: str, text: str):
+        """添加候选人简历"""
+        companies = match_known_companies(text, self.resolver)
+        self.index.add_tokens(candidate_id, tokenize(text))
+        self.matched_companies.append(companies)
+        self.known_counts.append(len(companies))
+        self.years.append(estimate_years_of_experience(text))
+
+    def _combine(self, bm25_scores) -> Tuple[Any, Any, Any, Any]:
+        """计算综合分数，返回(综合分, 归一化BM25, 大厂信号, 年限信号)"""
+        w = self.weights
+        np = load_numpy()
+        if np is not None:
+            bm25 = np.asarray(bm25_scores, dtype=np.float32)
+            top = float(bm25.max()) if len(bm25) else 0.0
+            bm25_norm = bm25 / top if top > 0 else bm25
+            company = np.minimum(np.array(self.known_counts, dtype=np.float32), 2) / 2
+            experience = np.minimum(np.array(self.years, dtype=np.float32), self.max_years) / self.max_years
+            total = w['bm25'] * bm25_norm + w['big_company'] * company + w['experience'] * experience
+            return total, bm25_norm, company, experience
+
+        top = max(bm25_scores) if bm25_scores else 0.0
+        bm25_norm = [s / top for s in bm25_scores] if top > 0 else list(bm25_scores)
+        company = [min(c, 2) / 2 for c in self.known_counts]
+        experience = [min(y, self.max_years) / self.max_years for y in self.years]
+        total = [
+            w['bm25'] * b + w['big_company'] * c + w['experience'] * e
+            for b, c, e in zip(bm25_norm, company, experience)
+        ]
+        return total, bm25_norm, company, experience
+
+    def rank(self, job_description: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        按职位描述对候选人排序
+
+        Args:
+            job_description: 职位描述
+            limit: 返回数量，None 表示全部
+
+        Returns:
+            按本地分数降序排列的候选人列表
+        """
+        n = len(self.index)
+        if n == 0:
+            return []
+
+        total, bm25_norm, company, experience = self._combine(self.index.score_all(job_description))
+        limit = n if limit is None else min(limit, n)
+
+        np = load_numpy()
+        if np is not None:
+            order = np.argpartition(-total, limit - 1)[:limit] if limit < n else np.arange(n)
+            order = order[np.argsort(-total[order], kind='stable')].tolist()
+        else:
+            order = sorted(range(n), key=lambda i: -total[i])[:limit]
+
+        return [
+            {
+                "id": self.index.doc_ids[i],
+                "local_score": round(float(total[i]), 4),
+                "signals": {
+                    "bm25": round(float(bm25_norm[i]), 4),
+                    "big_company": round(float(company[i]), 4),
+                    "experience": round(float(experience[i]), 4),
+                },
+                "known_companies": self.matched_companies[i],
+                "years_of_experience": round(float(self.years[i]), 1),
+            }
+            for i in order
+        ]
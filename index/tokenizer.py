@@ -0,0 +1,41 @@
+"""
+文本分词模块
+功能：面向中英文混合简历的轻量分词，英文按单词切分，中文按字符二元组切分，
+不依赖第三方分词库
+"""
+import re
+from typing import List
+
+# 英文单词/数字（保留 c++、c#、node.js 这类技术词）与连续的中日韩字符
+_TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*|[一-鿿]+')
+
+STOPWORDS = {
+    'the', 'and', 'of', 'to', 'in', 'for', 'with', 'on', 'a', 'an', 'is', 'are',
+    '负责', '参与', '以及', '相关', '工作', '进行',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        词项列表（英文小写单词 + 中文二元组，单个汉字的片段保留为单字）
+    """
+    tokens = []
+    for piece in _TOKEN_PATTERN.findall((text or '').lower()):
+        if piece[0] < '一':
+            piece = piece.rstrip('.')
+            if piece and piece not in STOPWORDS:
+                tokens.append(piece)
+        elif len(piece) == 1:
+            tokens.append(piece)
+        else:
+            tokens.extend(
+                piece[i:i + 2] for i in range(len(piece) - 1)
+                if piece[i:i + 2] not in STOPWORDS
+            )
+    return tokens
@@ -3,6 +3,7 @@ ResumeSearch 主程序入口
 """
 import sys
 import os
+import argparse
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -11,8 +12,27 @@ from api.routes import create_app
 from utils.config_loader import config
 
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="ResumeSearch - 智能简历分析系统")
+    parser.add_argument(
+        '--production',
+        action='store_true',
+        help='以多进程生产模式启动（gunicorn）'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='生产模式下的worker进程数，默认使用配置或CPU核数'
+    )
+    return parser.parse_args()
+
+
 def main():
     """主程序入口"""
+    args = parse_args()
+
     print("=" * 80)
     print("ResumeSearch - 智能简历分析系统")
     print("=" * 80)
@@ -21,23 +41,40 @@ def main():
     api_config = config.get_api_config()
     host = api_config.get('host', '0.0.0.0')
     port = api_config.get('port', 8000)
-    debug = api_config.get('debug', True)
+    debug = api_config.get('debug', True) and not args.production
 
-    # 创建Flask应用
-    app = create_app()
+    # 创建Flask应用（生产模式在fork前由主进程同步预热）
+    app = create_app(background_warmup=not args.production)
 
-    print(f"\n服务启动配置:")
+    print("\n服务启动配置:")
     print(f"  - Host: {host}")
     print(f"  - Port: {port}")
     print(f"  - Debug: {debug}")
-    print(f"\n可用接口:")
+
+    options = None
+    if args.production:
+        from api.server import build_server_options
+
+        options = build_server_options(host, port, args.workers)
+        print("  - Mode: production")
+        print(f"  - Workers: {options['workers']} x {options['threads']} threads")
+
+    print("\n可用接口:")
     print(f"  - GET  http://{host}:{port}/health")
+    print(f"  - GET  http://{host}:{port}/ready")
     print(f"  - POST http://{host}:{port}/api/analyze")
     print("\n提示: 请确保在 config/config.yaml 中配置了有效的 OpenAI API Key")
+    if args.production:
+        print("提示: 发送 HUP 信号给主进程可平滑重载，进行中的分析不会中断")
     print("=" * 80 + "\n")
 
     # 启动服务
-    app.run(host=host, port=port, debug=debug)
+    if args.production:
+        from api.server import ProductionServer
+
+        ProductionServer(app, options).run()
+    else:
+        app.run(host=host, port=port, debug=debug)
 
 
 if __name__ == '__main__':
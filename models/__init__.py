@@ -0,0 +1,24 @@
+"""
+模型模块
+各模型类在第一次访问时才导入，避免导入models包时加载openai等重量级依赖
+"""
+import importlib
+
+_LAZY_CLASSES = {
+    'ResumeParser': '.resume_parser',
+    'BigCompanyChecker': '.big_company_checker',
+    'IPOChecker': '.ipo_checker',
+    'NegativeChecker': '.negative_checker',
+    'ReportGenerator': '.report_generator',
+}
+
+__all__ = list(_LAZY_CLASSES)
+
+
+def __getattr__(name):
+    if name in _LAZY_CLASSES:
+        module = importlib.import_module(_LAZY_CLASSES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
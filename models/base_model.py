@@ -1,34 +1,113 @@
 """
 基础模型类
 """
-from openai import OpenAI
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Optional, Tuple
+import hashlib
 import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from utils.batch import current_batch, estimate_cost
 from utils.config_loader import config
+from utils.cache import get_cache, get_cache_ttl
+from utils.cassette import get_cassette
+from utils.circuit_breaker import guarded_call
+from utils.fair_scheduler import get_scheduler
+from utils.json_stream import IncrementalJSONParser
+from utils.llm_router import get_llm_router
+from utils.metrics import metrics
+from utils.tenants import current_tenant, get_tenant_manager, run_in_context
+
+# 自报置信度到分数的映射
+CONFIDENCE_SCORES = {
+    'high': 1.0,
+    'medium': 0.6,
+    'low': 0.2,
+}
+
+
+def collect_confidences(data: Any) -> list:
+    """递归收集结果中所有 confidence 字段的值"""
+    found = []
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == 'confidence' and isinstance(value, str):
+                found.append(value.strip().lower())
+            else:
+                found.extend(collect_confidences(value))
+    elif isinstance(data, list):
+        for item in data:
+            found.extend(collect_confidences(item))
+    return found
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    输入token中命中接口端提示词缓存的数量（usage.prompt_tokens_details.cached_tokens）
+
+    兼容客户端返回的对象和批处理结果中的字典，接口不返回该字段时为0
+    """
+    details = usage.get('prompt_tokens_details') if isinstance(usage, dict) else getattr(usage, 'prompt_tokens_details', None)
+    if details is None:
+        return 0
+    cached = details.get('cached_tokens') if isinstance(details, dict) else getattr(details, 'cached_tokens', None)
+    return int(cached or 0)
+
+
+def config_fingerprint(config_inputs: Dict[str, Any]) -> str:
+    """配置输入的指纹（键顺序无关）"""
+    text = json.dumps(config_inputs, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
 
 
 class BaseModel:
     """所有模型的基类"""
 
+    # 阶段名称，对应 openai.cascade.stages 中的配置
+    stage = 'base'
+    # 结果中必须包含的字段，用于级联时校验快速模型的输出
+    required_fields: Tuple[str, ...] = ()
+    # 判断快速模型与强模型结论是否一致时比较的字段
+    agreement_fields: Tuple[str, ...] = ()
+
     def __init__(self):
-        """初始化OpenAI客户端"""
+        """初始化模型接口路由"""
         openai_config = config.get_openai_config()
         self.api_key = openai_config.get('api_key')
         self.model = openai_config.get('model', 'gpt-4o')
         self.temperature = openai_config.get('temperature', 0.7)
         self.max_tokens = openai_config.get('max_tokens', 2000)
 
-        if not self.api_key or self.api_key == 'your-openai-api-key-here':
-            raise ValueError("请在config/config.yaml中配置有效的OpenAI API密钥")
+        tiers = openai_config.get('tiers', {}) or {}
+        self.fast_model = tiers.get('fast')
+        self.strong_model = tiers.get('strong', self.model)
+        self.cascade_config = openai_config.get('cascade', {}) or {}
 
-        self.client = OpenAI(api_key=self.api_key)
+        # 当前实例累计的token用量和估算费用（共享缓存命中不计入）；
+        # cached_tokens 为输入token中命中接口端提示词缓存的部分
+        self.usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0, 'cost_usd': 0.0}
+        self._usage_lock = threading.Lock()
+        # 因后端熔断或调用失败而使用了过期缓存的后端
+        self.stale_sources = set()
+
+        # 回放录制带时不调用模型，不需要API密钥和客户端
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            self.router = None
+            return
+
+        # 按 openai.endpoints 在多个接口之间选择，没有有效的API密钥时抛出ValueError
+        self.router = get_llm_router()
 
     def call_gpt(
         self,
         system_prompt: str,
         user_prompt: str,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        on_member: Optional[Callable[[str, Any], None]] = None
     ) -> str:
         """
         调用GPT模型
@@ -38,27 +117,200 @@ class BaseModel:
             user_prompt: 用户提示词
             temperature: 温度参数
             max_tokens: 最大token数
+            model: 使用的模型，默认为 openai.model
+            on_member: 传入时以流式调用模型，返回的JSON顶层字段一旦完整就回调 (键, 值)，
+                缓存命中时按顺序立即回调
+
+        Raises:
+            CircuitOpenError: 模型接口已熔断且没有缓存结果
+            CassetteMiss: 回放模式下录制带中没有该请求
 
         Returns:
             模型返回的文本
         """
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature or self.temperature,
-                max_tokens=max_tokens or self.max_tokens
-            )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        model = model or self.model
+        temperature = temperature or self.temperature
+        max_tokens = max_tokens or self.max_tokens
+        cache_key = get_cache().make_key(model, messages, temperature, max_tokens)
+
+        # 回放模式直接返回录制的结果；录制模式记录每次调用的请求和结果（包括缓存命中）
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            content = cassette.replay('llm', cache_key)
+            self._replay_members(content, on_member)
+            return content
+
+        content = self._complete(model, messages, temperature, max_tokens, cache_key, on_member)
+        if cassette is not None and cassette.recording:
+            cassette.record('llm', cache_key, {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            }, content)
+        return content
+
+    @staticmethod
+    def _replay_members(content: str, on_member: Optional[Callable[[str, Any], None]]):
+        """非流式得到的结果按顺序回调顶层字段"""
+        if on_member is not None:
+            for key, value in IncrementalJSONParser().feed(content):
+                on_member(key, value)
+
+    def _complete(
+        self,
+        model: str,
+        messages: list,
+        temperature: float,
+        max_tokens: int,
+        cache_key: str,
+        on_member: Optional[Callable[[str, Any], None]]
+    ) -> str:
+        """依次尝试共享缓存、批处理和实际调用"""
+        # 相同的请求参数在所有worker进程间共享缓存结果
+        cache = get_cache()
+        cached = cache.get('llm', cache_key)
+        if cached is not None:
+            self._replay_members(cached, on_member)
+            return cached
+
+        collector = current_batch.get()
+        if collector is not None:
+            # 批处理模式：请求随同一阶段其他简历的请求一起提交，阻塞到整批完成
+            content = self._batch_completion(collector, model, messages, temperature, max_tokens)
+            cache.set('llm', cache_key, content, get_cache_ttl('llm'))
+            self._replay_members(content, on_member)
+            return content
+
+        def request() -> str:
+            # 按租户权重公平分配模型调用名额，成本按预估token数计（中文约每2个字符1个token）
+            estimated_tokens = sum(len(message['content']) for message in messages) // 2 + max_tokens
+            with get_scheduler().slot(current_tenant.get(), cost=estimated_tokens):
+                if on_member is not None:
+                    # 已经回调过部分字段的流式调用失败后不再切换接口重试
+                    emitted = []
+
+                    def forward(key, value):
+                        emitted.append(key)
+                        on_member(key, value)
+
+                    return self.router.call(
+                        model,
+                        lambda client: self._stream_completion(client, model, messages, temperature, max_tokens, forward),
+                        tokens=estimated_tokens,
+                        can_retry=lambda: not emitted
+                    )
 
-            return response.choices[0].message.content.strip()
+                def complete(client) -> str:
+                    response = client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                    self._record_usage(response)
+                    return response.choices[0].message.content.strip()
 
+                return self.router.call(model, complete, tokens=estimated_tokens)
+
+        try:
+            # 模型接口熔断或调用失败时，改用缓存中已过期的相同请求结果
+            content, stale = guarded_call('openai', request, lambda: cache.get_stale('llm', cache_key))
         except Exception as e:
             print(f"调用GPT模型时发生错误: {e}")
             raise
 
+        if stale:
+            self.mark_stale('openai')
+            self._replay_members(content, on_member)
+        else:
+            cache.set('llm', cache_key, content, get_cache_ttl('llm'))
+        return content
+
+    def mark_stale(self, backend: str):
+        """记录本实例的结果用到了某个后端的过期缓存"""
+        with self._usage_lock:
+            self.stale_sources.add(backend)
+
+    def _stream_completion(
+        self,
+        client,
+        model: str,
+        messages: list,
+        temperature: float,
+        max_tokens: int,
+        on_member: Callable[[str, Any], None]
+    ) -> str:
+        """流式调用模型，边接收边增量解析JSON并回调已完整的顶层字段"""
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        parser = IncrementalJSONParser()
+        parts = []
+        for chunk in stream:
+            if getattr(chunk, 'usage', None) is not None:
+                self._record_usage(chunk)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ''
+            if delta:
+                parts.append(delta)
+                for key, value in parser.feed(delta):
+                    on_member(key, value)
+        return ''.join(parts).strip()
+
+    def _batch_completion(self, collector, model: str, messages: list, temperature: float, max_tokens: int) -> str:
+        """通过批处理收集器调用模型"""
+        response = collector.request({
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })
+        usage = response.get('usage') or {}
+        self._record_usage(SimpleNamespace(
+            model=response.get('model', model),
+            usage=SimpleNamespace(
+                prompt_tokens=usage.get('prompt_tokens', 0),
+                completion_tokens=usage.get('completion_tokens', 0),
+                prompt_tokens_details=usage.get('prompt_tokens_details')
+            )
+        ), batch=True)
+        return response['choices'][0]['message']['content'].strip()
+
+    def _record_usage(self, response, batch: bool = False):
+        """累计一次调用的token用量和估算费用"""
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        cached_tokens = cached_prompt_tokens(usage)
+        cost = estimate_cost(getattr(response, 'model', None) or self.model, prompt_tokens, completion_tokens, batch,
+                             cached_tokens=cached_tokens)
+        with self._usage_lock:
+            self.usage['prompt_tokens'] += prompt_tokens
+            self.usage['completion_tokens'] += completion_tokens
+            self.usage['cached_tokens'] += cached_tokens
+            self.usage['cost_usd'] += cost
+        metrics.incr('llm_prompt_tokens', prompt_tokens, stage=self.stage)
+        metrics.incr('llm_completion_tokens', completion_tokens, stage=self.stage)
+        metrics.incr('llm_cached_tokens', cached_tokens, stage=self.stage)
+
+        tenant = current_tenant.get()
+        metrics.incr('tenant_tokens', prompt_tokens, tenant=tenant, kind='prompt')
+        metrics.incr('tenant_tokens', completion_tokens, tenant=tenant, kind='completion')
+        get_tenant_manager().record_tokens(tenant, prompt_tokens + completion_tokens)
+
     def parse_json_response(self, response: str) -> Dict[str, Any]:
         """
         解析JSON格式的响应
@@ -86,6 +338,157 @@ class BaseModel:
             print(f"原始响应: {response}")
             raise
 
+    def score_confidence(self, result: Any) -> float:
+        """
+        评估模型输出的置信度
+
+        输出不是字典或缺少必填字段时为0；否则取所有自报 confidence 字段中的最低分，
+        没有自报置信度时为1
+
+        Args:
+            result: 解析后的模型输出
+
+        Returns:
+            0~1之间的置信度分数
+        """
+        if not isinstance(result, dict):
+            return 0.0
+        if any(field not in result for field in self.required_fields):
+            return 0.0
+
+        scores = [
+            CONFIDENCE_SCORES.get(value, CONFIDENCE_SCORES['low'])
+            for value in collect_confidences(result)
+        ]
+        return min(scores) if scores else 1.0
+
+    def _cascade_enabled(self) -> bool:
+        """当前阶段是否启用模型级联"""
+        return (
+            bool(self.cascade_config.get('enabled', False))
+            and bool(self.fast_model)
+            and self.fast_model != self.strong_model
+            and self.stage in (self.cascade_config.get('stages') or [])
+        )
+
+    def _timed_call(
+        self,
+        tier: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int],
+        on_member: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """调用指定档位的模型并记录耗时"""
+        start = time.perf_counter()
+        try:
+            response = self.call_gpt(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                max_tokens=max_tokens,
+                model=model,
+                on_member=on_member
+            )
+            return self.parse_json_response(response)
+        finally:
+            metrics.observe('cascade_latency_seconds', time.perf_counter() - start,
+                            stage=self.stage, tier=tier)
+
+    def conclusion(self, result: Dict[str, Any]) -> Tuple:
+        """提取结果中的关键结论，用于比较快速模型与强模型是否一致"""
+        return tuple(result.get(field) for field in self.agreement_fields)
+
+    def _record_agreement(self, fast_result: Dict[str, Any], strong_result: Dict[str, Any]):
+        """比较快速模型与强模型的关键结论"""
+        agreed = self.conclusion(fast_result) == self.conclusion(strong_result)
+        metrics.incr('cascade_agreement_checks', stage=self.stage)
+        if agreed:
+            metrics.incr('cascade_agreements', stage=self.stage)
+
+    def _shadow_compare(
+        self,
+        fast_result: Dict[str, Any],
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int]
+    ):
+        """后台调用强模型，与未升级的快速模型结果对比（不增加请求耗时）"""
+        def run():
+            try:
+                strong_result = self._timed_call('strong', self.strong_model,
+                                                 system_prompt, user_prompt, max_tokens)
+                self._record_agreement(fast_result, strong_result)
+            except Exception as e:
+                print(f"影子对比调用失败: {e}")
+
+        threading.Thread(target=run_in_context(run), daemon=True).start()
+
+    def call_gpt_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None,
+        on_member: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        调用GPT模型并解析JSON结果，按配置执行模型级联
+
+        启用级联的阶段先调用快速模型，输出无效或置信度低于
+        openai.cascade.min_confidence 时再升级到强模型
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户提示词
+            max_tokens: 最大token数
+            on_member: 流式回调，只用于第一次调用（升级到强模型后的结果可能与已回调的字段不同，
+                调用方需以返回值为准）
+
+        Returns:
+            解析后的字典
+        """
+        if not self._cascade_enabled():
+            return self._timed_call('strong', self.strong_model, system_prompt, user_prompt, max_tokens, on_member)
+
+        metrics.incr('cascade_calls', stage=self.stage)
+        min_confidence = self.cascade_config.get('min_confidence', 0.5)
+
+        try:
+            fast_result = self._timed_call('fast', self.fast_model, system_prompt, user_prompt, max_tokens,
+                                           on_member)
+            confidence = self.score_confidence(fast_result)
+        except Exception as e:
+            print(f"快速模型调用失败，升级到强模型: {e}")
+            fast_result, confidence = None, 0.0
+
+        if confidence >= min_confidence:
+            # 批处理模式下不做影子对比（后台调用不属于任何批处理参与者）
+            if current_batch.get() is None and random.random() < self.cascade_config.get('shadow_rate', 0.0):
+                self._shadow_compare(fast_result, system_prompt, user_prompt, max_tokens)
+            return fast_result
+
+        print(f"  - [{self.stage}] 快速模型置信度 {confidence:.2f}，升级到 {self.strong_model}")
+        metrics.incr('cascade_escalations', stage=self.stage)
+        strong_result = self._timed_call('strong', self.strong_model, system_prompt, user_prompt, max_tokens)
+        if isinstance(fast_result, dict):
+            self._record_agreement(fast_result, strong_result)
+        return strong_result
+
+    @classmethod
+    def config_inputs(cls) -> Dict[str, Any]:
+        """
+        该阶段结论所依赖的业务配置（不含API密钥、模型档位等运行参数）
+
+        历史结果库按这些配置的指纹记录每次分析，配置变更后据此找出需要重新评估的分析
+        """
+        return {}
+
+    @classmethod
+    def stage_inputs(cls) -> Dict[str, Any]:
+        """当前配置下该阶段的配置输入及其指纹"""
+        inputs = cls.config_inputs()
+        return {"config": inputs, "fingerprint": config_fingerprint(inputs)}
+
     def process(self, *args, **kwargs) -> Dict[str, Any]:
         """
         处理逻辑（子类需要实现）
@@ -94,3 +497,65 @@ class BaseModel:
             处理结果字典
         """
         raise NotImplementedError("子类必须实现process方法")
+
+
+def cascade_report() -> Dict[str, Any]:
+    """
+    各阶段的模型级联统计
+
+    Returns:
+        阶段名 -> 调用次数、升级率、各档位耗时、与强模型的一致率
+    """
+    snapshot = metrics.snapshot()
+    counters = snapshot['counters']
+    latencies = snapshot['summaries'].get('cascade_latency_seconds', {})
+
+    stages = {
+        dict(item.split('=', 1) for item in labels.split(','))['stage']
+        for labels in latencies
+    }
+
+    report = {}
+    for stage in sorted(stages):
+        label = f"stage={stage}"
+        calls = counters.get('cascade_calls', {}).get(label, 0)
+        escalations = counters.get('cascade_escalations', {}).get(label, 0)
+        checks = counters.get('cascade_agreement_checks', {}).get(label, 0)
+        agreements = counters.get('cascade_agreements', {}).get(label, 0)
+        report[stage] = {
+            "cascade_calls": calls,
+            "escalations": escalations,
+            "escalation_rate": round(escalations / calls, 4) if calls else None,
+            "latency": {
+                tier: latencies[f"{label},tier={tier}"]
+                for tier in ('fast', 'strong')
+                if f"{label},tier={tier}" in latencies
+            },
+            "agreement_checks": checks,
+            "agreement_rate": round(agreements / checks, 4) if checks else None,
+        }
+    return report
+
+
+def prompt_cache_report() -> Dict[str, Any]:
+    """
+    各阶段的接口端提示词缓存命中情况
+
+    Returns:
+        阶段名 -> 输入token数、命中缓存的token数和命中比例
+    """
+    counters = metrics.snapshot()['counters']
+    prompt = counters.get('llm_prompt_tokens', {})
+    cached = counters.get('llm_cached_tokens', {})
+
+    report = {}
+    for label in sorted(prompt):
+        stage = label.split('=', 1)[1]
+        prompt_tokens = prompt[label]
+        cached_tokens = cached.get(label, 0)
+        report[stage] = {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "cached_rate": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else None,
+        }
+    return report
@@ -4,19 +4,44 @@
 """
 from typing import Dict, Any, List
 from .base_model import BaseModel
+from index.company_resolver import CompanyResolver, get_resolver, resolve_work_experience
+from utils.cache import get_cache, get_cache_ttl
 from utils.config_loader import config
+from utils.metrics import metrics
 
 
 class BigCompanyChecker(BaseModel):
     """大厂判断器"""
 
+    stage = 'big_company'
+    required_fields = ('has_big_company_experience', 'big_companies')
+    agreement_fields = ('has_big_company_experience',)
+
+    @classmethod
+    def config_inputs(cls) -> Dict[str, Any]:
+        """
+        大厂判断标准：知名大厂列表、员工人数阈值、是否要求上市，
+        以及决定公司名称归一到哪个规范ID的公司实体词典和模糊匹配阈值
+        """
+        big_company_config = config.get_big_company_config()
+        company_config = config.get('companies', {}) or {}
+        return {
+            "known_companies": list(big_company_config.get('known_companies', [])),
+            "employee_count_threshold": big_company_config.get('employee_count_threshold', 1000),
+            "require_listed": big_company_config.get('require_listed', True),
+            "company_entities": company_config.get('entities', {}) or {},
+            "fuzzy_threshold": company_config.get('fuzzy_threshold', 0.8),
+        }
+
     def __init__(self):
         super().__init__()
         self.big_company_config = config.get_big_company_config()
-        self.known_companies = self.big_company_config.get('known_companies', [])
-        self.employee_threshold = self.big_company_config.get('employee_count_threshold', 1000)
-        self.require_listed = self.big_company_config.get('require_listed', True)
+        criteria = self.config_inputs()
+        self.known_companies = criteria['known_companies']
+        self.employee_threshold = criteria['employee_count_threshold']
+        self.require_listed = criteria['require_listed']
 
+        # 知名大厂列表等判断标准来自配置，放在系统提示词中（配置不变时每次请求的前缀相同）
         self.system_prompt = f"""你是一个专业的企业分析专家。
 你的任务是判断候选人是否在大厂工作过。
 
@@ -48,6 +73,9 @@ class BigCompanyChecker(BaseModel):
         """
         判断是否有大厂经历
 
+        公司名称先归一到规范ID，同一公司的不同写法只判断一次；
+        每家公司的判断结论按(判断标准, 规范ID)缓存，全部命中时不调用模型
+
         Args:
             work_experience: 工作经历列表
 
@@ -59,29 +87,83 @@ class BigCompanyChecker(BaseModel):
         print("=" * 50)
 
         try:
-            companies_text = "\n".join([
-                f"- {exp.get('company', '未知')}: {exp.get('position', '未知')} ({exp.get('start_date', '')} - {exp.get('end_date', '')})"
-                for exp in work_experience
-            ])
-
-            user_prompt = f"""候选人的工作经历如下：
-{companies_text}
-
-请判断候选人是否有大厂工作经历。"""
-
-            response = self.call_gpt(
-                system_prompt=self.system_prompt,
-                user_prompt=user_prompt
-            )
-
-            result = self.parse_json_response(response)
-
-            has_big_company = result.get('has_big_company_experience', False)
-            big_companies = [
-                c.get('company_name')
-                for c in result.get('big_companies', [])
-                if c.get('is_big_company', False)
+            resolver = get_resolver()
+            companies: Dict[str, Dict[str, Any]] = {}
+            for exp in resolve_work_experience(work_experience, resolver):
+                key = resolver.company_key(exp.get('company', ''))
+                company = companies.setdefault(key, {
+                    "company_name": exp['canonical_name'] or '未知',
+                    "company_id": exp['company_id'],
+                    "raw_names": [],
+                })
+                if exp.get('company') and exp['company'] not in company['raw_names']:
+                    company['raw_names'].append(exp['company'])
+
+            cache = get_cache()
+            fingerprint = self.stage_inputs()['fingerprint']
+            verdicts = {}
+            for key in companies:
+                cached = cache.get('company', cache.make_key(self.stage, fingerprint, key))
+                if cached is not None:
+                    verdicts[key] = cached
+            pending = [key for key in companies if key not in verdicts]
+            metrics.incr('company_verdict_cache_hits', len(verdicts), stage=self.stage)
+            metrics.incr('company_verdict_cache_misses', len(pending), stage=self.stage)
+
+            summary = None
+            if pending:
+                companies_text = "\n".join(f"- {companies[key]['company_name']}" for key in pending)
+                user_prompt = f"""请判断候选人是否有大厂工作经历。
+
+候选人工作过的公司如下：
+{companies_text}"""
+
+                result = self.call_gpt_json(
+                    system_prompt=self.system_prompt,
+                    user_prompt=user_prompt
+                )
+                summary = result.get('summary')
+
+                # 按规范ID对应模型返回的公司，只缓存按公司键对应上的结论；
+                # 对应不上的按顺序补齐，只用于本次结果（顺序或名称被模型改动时可能张冠李戴，不能跨简历复用）
+                unmatched = []
+                for entry in result.get('big_companies', []) or []:
+                    if not isinstance(entry, dict):
+                        continue
+                    key = resolver.company_key(entry.get('company_name', ''))
+                    if key in companies and key not in verdicts:
+                        verdicts[key] = entry
+                    else:
+                        unmatched.append(entry)
+                matched = {key for key in pending if key in verdicts}
+                for key, entry in zip([key for key in pending if key not in verdicts], unmatched):
+                    verdicts[key] = entry
+                metrics.incr('company_verdict_positional',
+                             sum(key in verdicts for key in pending) - len(matched), stage=self.stage)
+
+                for key in pending:
+                    if key in verdicts:
+                        verdicts[key] = self._apply_known_list(key, companies[key], verdicts[key], resolver)
+                        if key in matched:
+                            cache.set('company', cache.make_key(self.stage, fingerprint, key),
+                                      verdicts[key], get_cache_ttl('company'))
+
+            big_company_entries = [
+                dict(verdicts[key], **companies[key])
+                for key in companies
+                if key in verdicts
             ]
+            has_big_company = any(entry.get('is_big_company', False) for entry in big_company_entries)
+            big_companies = [entry['company_name'] for entry in big_company_entries if entry.get('is_big_company')]
+
+            result = {
+                "has_big_company_experience": has_big_company,
+                "big_companies": big_company_entries,
+                "summary": summary or (
+                    f"曾在大厂工作：{', '.join(big_companies)}" if big_companies else "未发现大厂工作经历"
+                ),
+                "cached_companies": len(companies) - len(pending),
+            }
 
             print(f"✓ 大厂判断完成")
             print(f"  - 是否有大厂经历: {'是' if has_big_company else '否'}")
@@ -101,3 +183,18 @@ class BigCompanyChecker(BaseModel):
                 "data": None,
                 "message": f"大厂判断失败: {str(e)}"
             }
+
+    def _apply_known_list(
+        self,
+        key: str,
+        company: Dict[str, Any],
+        verdict: Dict[str, Any],
+        resolver: CompanyResolver
+    ) -> Dict[str, Any]:
+        """用规范ID确定是否在知名大厂列表中（不依赖模型对名称的字面比较）"""
+        verdict = {k: v for k, v in verdict.items() if k not in ('company_name', 'company_id', 'raw_names')}
+        known = key in resolver.known_ids
+        verdict['match_known_list'] = known
+        if known:
+            verdict['is_big_company'] = True
+        return verdict
@@ -4,14 +4,9 @@
 """
 from typing import Dict, Any, List
 from .base_model import BaseModel
+from index.company_resolver import get_resolver, resolve_work_experience
 
-
-class IPOChecker(BaseModel):
-    """上市经历判断器"""
-
-    def __init__(self):
-        super().__init__()
-        self.system_prompt = """你是一个专业的企业上市分析专家。
+SYSTEM_PROMPT = """你是一个专业的企业上市分析专家。
 你的任务是判断候选人在职期间，所在公司是否完成了上市（IPO）。
 
 分析要点：
@@ -19,7 +14,7 @@ class IPOChecker(BaseModel):
 2. 公司的上市时间
 3. 判断在职期间是否经历了公司上市过程
 
-请基于你的知识库和推理能力进行分析。如果无法确定，请明确说明。
+请基于你的知识库、公开信息和已知事实进行分析。如果无法确定，请明确说明。
 
 返回JSON格式：
 {
@@ -39,6 +34,18 @@ class IPOChecker(BaseModel):
 }
 """
 
+
+class IPOChecker(BaseModel):
+    """上市经历判断器"""
+
+    stage = 'ipo'
+    required_fields = ('has_ipo_experience', 'ipo_experiences')
+    agreement_fields = ('has_ipo_experience',)
+
+    def __init__(self):
+        super().__init__()
+        self.system_prompt = SYSTEM_PROMPT
+
     def process(self, work_experience: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         判断是否有上市经历
@@ -54,23 +61,28 @@ class IPOChecker(BaseModel):
         print("=" * 50)
 
         try:
+            # 使用规范名称，同一公司的不同写法得到相同的提示词（也能命中相同的缓存）
+            resolver = get_resolver()
             experiences_text = "\n".join([
-                f"- {exp.get('company', '未知')}: {exp.get('position', '未知')}\n  在职时间: {exp.get('start_date', '')} - {exp.get('end_date', '')}"
-                for exp in work_experience
+                f"- {exp['canonical_name'] or '未知'}: {exp.get('position', '未知')}\n  在职时间: {exp.get('start_date', '')} - {exp.get('end_date', '')}"
+                for exp in resolve_work_experience(work_experience, resolver)
             ])
 
-            user_prompt = f"""候选人的工作经历如下：
-{experiences_text}
+            # 固定的说明在前，工作经历在后
+            user_prompt = f"""请判断候选人在职期间，是否有公司完成了上市（IPO）。
 
-请判断候选人在职期间，是否有公司完成了上市（IPO）。
-请基于公开信息和已知事实进行分析。"""
+候选人的工作经历如下：
+{experiences_text}"""
 
-            response = self.call_gpt(
+            result = self.call_gpt_json(
                 system_prompt=self.system_prompt,
                 user_prompt=user_prompt
             )
 
-            result = self.parse_json_response(response)
+            for exp in result.get('ipo_experiences', []) or []:
+                if isinstance(exp, dict):
+                    match = resolver.resolve(exp.get('company_name', ''))
+                    exp['company_id'] = match.id if match is not None else None
 
             has_ipo = result.get('has_ipo_experience', False)
             ipo_companies = [
@@ -4,24 +4,37 @@
 """
 import json
 import os
-from typing import Dict, Any
-
-import requests
-from serpapi import GoogleSearch
+from typing import Dict, Any, List
 
 from .base_model import BaseModel
+from index.company_resolver import resolve_work_experience
+from index.passages import top_passages
 from utils.config_loader import config
+from utils.cache import get_cache, get_cache_ttl
+from utils.cassette import get_cassette
+from utils.circuit_breaker import guarded_call
+from utils.page_fetcher import get_page_fetcher
 
 
 class NegativeChecker(BaseModel):
     """负面舆情检索器"""
 
+    stage = 'negative'
+    required_fields = ('has_negative_info', 'risk_level')
+    agreement_fields = ('has_negative_info', 'risk_level')
+
+    @classmethod
+    def config_inputs(cls) -> Dict[str, Any]:
+        """负面舆情的检索关键词"""
+        return {"search_keywords": list(config.get_negative_check_config().get('search_keywords', []))}
+
     def __init__(self):
         super().__init__()
         self.negative_config = config.get_negative_check_config()
         self.google_config = config.get_google_config()
-        self.search_keywords = self.negative_config.get('search_keywords', [])
+        self.search_keywords = self.config_inputs()['search_keywords']
 
+        # 检索关键词放在系统提示词中，候选人相关的内容只出现在用户提示词里
         self.system_prompt = f"""你是一个专业的背景调查专家。
 你的任务是根据候选人的个人信息，分析是否存在负面舆情。
 
@@ -62,12 +75,29 @@ class NegativeChecker(BaseModel):
         # print(json.dumps(result, indent=2, ensure_ascii=False))
         # return result
 
-        search = GoogleSearch({
+        params = {
             "q": query,
             "location": "Austin,Texas",
             "api_key": self.google_config.get('api_key')
-        })
-        return search.get_dict()
+        }
+
+        def search():
+            # serpapi仅在缓存未命中、真正发起搜索时导入
+            from serpapi import GoogleSearch
+            return GoogleSearch(params).get_dict()
+
+        cache = get_cache()
+        cache_key = cache.make_key(params['q'], params['location'])
+
+        # 回放模式直接返回录制的检索结果；录制模式记录每次检索（包括缓存命中）
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            return cassette.replay('search', cache_key)
+
+        results = self._cached_search(cache, cache_key, search)
+        if cassette is not None and cassette.recording:
+            cassette.record('search', cache_key, {"q": params['q'], "location": params['location']}, results)
+        return results
 
 
         # url = "https://serpapi.com/search"
@@ -75,6 +105,48 @@ class NegativeChecker(BaseModel):
         # params = {"q": query, "mkt": "zh-CN"}
         # return requests.get(url, headers=headers, params=params).json()
 
+    def _cached_search(self, cache, cache_key: str, search):
+        """先查共享缓存，未命中时经过熔断器检索"""
+        # 搜索结果在所有worker进程间共享缓存
+        cached = cache.get('search', cache_key)
+        if cached is not None:
+            return cached
+
+        # 搜索接口熔断或调用失败时，改用缓存中已过期的相同检索结果
+        results, stale = guarded_call('serpapi', search, lambda: cache.get_stale('search', cache_key))
+        if stale:
+            self.mark_stale('serpapi')
+        else:
+            cache.set('search', cache_key, results, get_cache_ttl('search'))
+        return results
+
+    def gather_evidence(self, search_results: Any, query: str) -> List[Dict[str, Any]]:
+        """
+        抓取搜索结果中的网页，选出与检索词最相关的段落
+
+        Args:
+            search_results: web_search 的返回值
+            query: 段落检索词
+
+        Returns:
+            [{"url", "title", "text", "score"}]，未启用或没有可用网页时为空列表
+        """
+        evidence_config = self.negative_config.get('evidence', {}) or {}
+        if not evidence_config.get('enabled', False) or not isinstance(search_results, dict):
+            return []
+
+        links = [
+            item.get('link') for item in search_results.get('organic_results', []) or []
+            if isinstance(item, dict)
+        ][:evidence_config.get('max_pages', 5)]
+        pages = get_page_fetcher().fetch_all(links)
+        return top_passages(
+            query,
+            pages,
+            top_k=evidence_config.get('max_passages', 6),
+            max_chars=evidence_config.get('passage_chars', 300),
+            per_page=evidence_config.get('passages_per_page', 3)
+        )
 
     def process(self, personal_info: Dict[str, Any], work_experience: list) -> Dict[str, Any]:
         """
@@ -88,30 +160,58 @@ class NegativeChecker(BaseModel):
             检索结果
         """
         name = personal_info.get('name', '未知')
-        companies = [exp.get('company', '') for exp in work_experience]
+        # 按规范名称去重，同一公司的不同写法不重复检索，检索词也更稳定（便于命中搜索缓存）
+        resolved = resolve_work_experience(work_experience)
+        companies = list(dict.fromkeys(exp['canonical_name'] for exp in resolved if exp['canonical_name']))
+        company_ids = list(dict.fromkeys(exp['company_id'] for exp in resolved if exp['company_id']))
         print("=" * 50)
         print("【模型4】开始检索负面舆情...")
         query = f"员工 {name}, {', '.join(companies)}"
-        search_results = self.web_search(query)
 
         print("=" * 50)
 
         try:
-
-
-            user_prompt = f"""候选人信息：
+            # 搜索失败（包括搜索接口熔断）只影响本检查项，不中断整个分析
+            search_results = self.web_search(query)
+
+            # 网页抓取失败只是少了摘录，不影响基于搜索结果的分析
+            try:
+                evidence = self.gather_evidence(
+                    search_results, ' '.join([name, *companies, *self.search_keywords])
+                )
+            except Exception as e:
+                print(f"  - 网页摘录获取失败: {e}")
+                evidence = []
+            if evidence:
+                print(f"  - 网页摘录: {len(evidence)} 段，来自 {len({item['url'] for item in evidence})} 个网页")
+
+            # 固定的说明在前，候选人信息、搜索结果和网页摘录在后
+            user_prompt = f"""根据下面的搜索结果总结合分析员工有没有劣质舆论。
+如果附有从搜索结果网页中摘录的段落，source 请注明对应网址。
+
+候选人信息：
 姓名: {name}
 工作过的公司: {', '.join(companies)}
 
-根据下面的搜索结果总结合分析员工有没有劣质舆论。
+搜索结果：
 {search_results}"""
+            if evidence:
+                excerpts = '\n\n'.join(
+                    f"[{i}] {item['title']}（{item['url']}）\n{item['text']}"
+                    for i, item in enumerate(evidence, 1)
+                )
+                user_prompt += f"""
+
+以下是从搜索结果网页中摘录的相关段落：
+{excerpts}"""
 
-            response = self.call_gpt(
+            result = self.call_gpt_json(
                 system_prompt=self.system_prompt,
                 user_prompt=user_prompt
             )
 
-            result = self.parse_json_response(response)
+            result['company_ids'] = company_ids
+            result['evidence_sources'] = list(dict.fromkeys(item['url'] for item in evidence))
 
             has_negative = result.get('has_negative_info', False)
             risk_level = result.get('risk_level', 'none')
@@ -0,0 +1,184 @@
+"""
+确定性报告构建模块
+功能：根据各检查项的结果直接填写报告中的结构化部分（评估结果、优势、风险、匹配分数），
+匹配分数按可配置的公式计算，每一项加减分都记录在 score_breakdown 中。
+模型只需要撰写候选人概况和推荐理由
+"""
+from typing import Dict, Any, List, Optional, Tuple
+
+# 默认评分公式：基础分 + 各项加分 - 负面舆情扣分，结果限制在 0~100
+DEFAULT_SCORING = {
+    "base": 60,
+    "big_company": 15,
+    "ipo": 10,
+    "risk_penalty": {"high": 40, "medium": 20, "low": 5, "none": 0},
+    # 匹配分数不低于该值时推荐，不低于 cautious 时谨慎推荐，否则不推荐
+    "thresholds": {"recommend": 80, "cautious": 60},
+}
+
+RECOMMENDATIONS = ('推荐', '谨慎推荐', '不推荐')
+
+RISK_LEVEL_NAMES = {'high': '高', 'medium': '中', 'low': '低', 'none': '无'}
+
+# 风险点中最多列出的负面发现条数
+MAX_FINDINGS = 3
+
+
+def merge_scoring(scoring: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """合并配置中的评分公式和默认值（嵌套字典逐项覆盖）"""
+    merged = {
+        key: dict(value) if isinstance(value, dict) else value
+        for key, value in DEFAULT_SCORING.items()
+    }
+    for key, value in (scoring or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _status(result: Optional[Dict[str, Any]]) -> Tuple[str, Optional[str]]:
+    """
+    检查项结果的状态
+
+    Returns:
+        (ok/skipped/failed, 说明)
+    """
+    if not isinstance(result, dict):
+        return 'failed', "检查未完成"
+    if result.get('skipped'):
+        return 'skipped', result.get('reason') or "探索方向未涉及"
+    return 'ok', None
+
+
+def _not_evaluated(reason: str) -> Dict[str, str]:
+    return {"result": "未评估", "details": reason}
+
+
+def _big_company_section(result, scoring, breakdown, strengths, risks) -> Dict[str, str]:
+    status, reason = _status(result)
+    if status != 'ok':
+        if status == 'failed':
+            risks.append("大厂经历判断未完成，需人工核实")
+        return _not_evaluated(reason)
+
+    companies = [
+        entry.get('company_name') for entry in result.get('big_companies', []) or []
+        if isinstance(entry, dict) and entry.get('is_big_company')
+    ]
+    if result.get('has_big_company_experience'):
+        breakdown.append({"item": "big_company", "points": scoring['big_company'], "reason": "有大厂工作经历"})
+        strengths.append(f"曾在大厂工作：{'、'.join(companies)}" if companies else "有大厂工作经历")
+        return {"result": "符合", "details": result.get('summary') or f"曾在大厂工作：{'、'.join(companies)}"}
+    return {"result": "不符合", "details": result.get('summary') or "未发现大厂工作经历"}
+
+
+def _ipo_section(result, scoring, breakdown, strengths, risks) -> Dict[str, str]:
+    status, reason = _status(result)
+    if status != 'ok':
+        if status == 'failed':
+            risks.append("上市经历判断未完成，需人工核实")
+        return _not_evaluated(reason)
+
+    companies = [
+        exp.get('company_name') for exp in result.get('ipo_experiences', []) or []
+        if isinstance(exp, dict) and exp.get('experienced_ipo')
+    ]
+    if result.get('has_ipo_experience'):
+        breakdown.append({"item": "ipo", "points": scoring['ipo'], "reason": "在职期间经历公司上市"})
+        strengths.append(f"在职期间经历公司上市：{'、'.join(companies)}" if companies else "在职期间经历公司上市")
+        return {"result": "符合", "details": result.get('summary') or f"经历上市的公司：{'、'.join(companies)}"}
+    return {"result": "不符合", "details": result.get('summary') or "未发现在职期间经历公司上市"}
+
+
+def _negative_section(result, scoring, breakdown, strengths, risks) -> Dict[str, str]:
+    status, reason = _status(result)
+    if status != 'ok':
+        if status == 'failed':
+            risks.append("负面舆情检索未完成，需人工核实")
+        return _not_evaluated(reason)
+
+    risk_level = str(result.get('risk_level') or 'none').strip().lower()
+    if risk_level not in scoring['risk_penalty']:
+        risk_level = 'none' if not result.get('has_negative_info') else 'medium'
+    penalty = scoring['risk_penalty'][risk_level]
+
+    if not result.get('has_negative_info') and risk_level == 'none':
+        strengths.append("未发现负面舆情")
+        return {"result": "无风险", "details": result.get('summary') or "未发现负面舆情"}
+
+    if penalty:
+        breakdown.append({
+            "item": "negative",
+            "points": -penalty,
+            "reason": f"负面舆情风险等级：{RISK_LEVEL_NAMES.get(risk_level, risk_level)}",
+        })
+    findings = [
+        finding for finding in result.get('findings', []) or []
+        if isinstance(finding, dict) and finding.get('description')
+    ]
+    for finding in findings[:MAX_FINDINGS]:
+        category = finding.get('category')
+        risks.append(f"{category}：{finding['description']}" if category else finding['description'])
+    if not findings:
+        risks.append(f"负面舆情风险等级：{RISK_LEVEL_NAMES.get(risk_level, risk_level)}")
+    return {"result": "有风险", "details": result.get('summary') or "存在负面舆情"}
+
+
+def recommendation_for(score: float, scoring: Optional[Dict[str, Any]] = None) -> str:
+    """按分数阈值给出推荐意见"""
+    thresholds = merge_scoring(scoring)['thresholds']
+    if score >= thresholds['recommend']:
+        return RECOMMENDATIONS[0]
+    if score >= thresholds['cautious']:
+        return RECOMMENDATIONS[1]
+    return RECOMMENDATIONS[2]
+
+
+def build_structured_report(
+    big_company_result: Optional[Dict[str, Any]],
+    ipo_result: Optional[Dict[str, Any]],
+    negative_result: Optional[Dict[str, Any]],
+    extra_results: Optional[Dict[str, Any]] = None,
+    scoring: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    根据检查项结果构建报告的结构化部分
+
+    Args:
+        big_company_result: 大厂判断结果
+        ipo_result: 上市经历判断结果
+        negative_result: 负面舆情检索结果
+        extra_results: 其他检查项的结果（结果字段名 -> 结果），只列入评估结果，不计分
+        scoring: 评分公式，缺省项取 DEFAULT_SCORING
+
+    Returns:
+        match_score、evaluation_results、strengths、risks、score_breakdown 以及按分数给出的 score_recommendation
+    """
+    scoring = merge_scoring(scoring)
+    breakdown: List[Dict[str, Any]] = [{"item": "base", "points": scoring['base'], "reason": "基础分"}]
+    strengths: List[str] = []
+    risks: List[str] = []
+
+    evaluation_results = {
+        "big_company_experience": _big_company_section(big_company_result, scoring, breakdown, strengths, risks),
+        "ipo_experience": _ipo_section(ipo_result, scoring, breakdown, strengths, risks),
+        "negative_info": _negative_section(negative_result, scoring, breakdown, strengths, risks),
+    }
+    for name, result in (extra_results or {}).items():
+        status, reason = _status(result)
+        if status != 'ok':
+            evaluation_results[name] = _not_evaluated(reason)
+        else:
+            evaluation_results[name] = {"result": "见详情", "details": str(result.get('summary') or '')}
+
+    score = max(0, min(100, round(sum(entry['points'] for entry in breakdown))))
+    return {
+        "match_score": score,
+        "evaluation_results": evaluation_results,
+        "strengths": strengths,
+        "risks": risks,
+        "score_breakdown": breakdown,
+        "score_recommendation": recommendation_for(score, scoring),
+    }
@@ -1,18 +1,42 @@
 """
 报告整合模块（模型5）
 功能：整合所有分析结果，生成最终报告
+
+report.mode 为 hybrid 时评估结果、优势、风险和匹配分数由 report_builder 按评分公式确定性生成，
+模型只撰写候选人概况和推荐意见；为 llm 时整份报告由模型生成
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from utils.config_loader import config
 from .base_model import BaseModel
+from .report_builder import RECOMMENDATIONS, build_structured_report, merge_scoring
 import json
 
+REPORT_MODES = ('hybrid', 'llm')
 
-class ReportGenerator(BaseModel):
-    """报告生成器"""
+# 两种模式的系统提示词都是固定内容。用户提示词中固定的说明在最前，其后是同一职位的所有候选人共用的
+# 职位描述和探索方向，最后才是候选人的简历和检查结果，同一职位连续评估多个候选人时请求前缀相同
 
-    def __init__(self):
-        super().__init__()
-        self.system_prompt = """你是一个专业的人才评估报告专家。
+# hybrid 模式：模型只撰写概况和推荐意见
+NARRATIVE_PROMPT = """你是一个专业的人才评估报告专家。
+报告中的评估结果、优势、风险和匹配分数已经根据各项检查结果计算完成，
+你的任务是结合职位描述和候选人简历，撰写简短的候选人概况并给出推荐意见。
+
+要求：
+1. 候选人概况不超过150字
+2. 推荐意见只能是"推荐"、"谨慎推荐"、"不推荐"之一，参考匹配分数和按分数给出的建议，
+   但需结合职位描述判断候选人与岗位的契合度
+3. 推荐理由不超过200字，与建议不一致时说明原因
+
+返回JSON格式：
+{
+    "candidate_summary": "候选人概况",
+    "final_recommendation": "推荐/谨慎推荐/不推荐",
+    "recommendation_reason": "推荐理由"
+}
+"""
+
+# llm 模式：整份报告由模型生成
+SYSTEM_PROMPT = """你是一个专业的人才评估报告专家。
 你的任务是整合所有分析结果，生成一份专业的候选人匹配度评估报告。
 
 报告应包含：
@@ -23,6 +47,8 @@ class ReportGenerator(BaseModel):
 5. 最终推荐意见
 
 请以专业、客观的方式撰写报告。
+如果某项判断结果为 {"skipped": true}，说明探索方向未涉及该项、未执行检查，
+对应的 result 请填写"未评估"，不要据此加分或扣分。
 
 返回JSON格式：
 {
@@ -49,6 +75,52 @@ class ReportGenerator(BaseModel):
 }
 """
 
+
+class ReportGenerator(BaseModel):
+    """报告生成器"""
+
+    stage = 'report'
+    required_fields = ('match_score', 'final_recommendation')
+    agreement_fields = ('final_recommendation',)
+
+    @classmethod
+    def config_inputs(cls) -> Dict[str, Any]:
+        """报告模式和评分公式"""
+        report_config = config.get('report', {}) or {}
+        return {
+            "mode": report_config.get('mode', 'hybrid'),
+            "scoring": merge_scoring(report_config.get('scoring')),
+        }
+
+    def __init__(self, mode: Optional[str] = None):
+        """
+        Args:
+            mode: 报告模式 hybrid/llm，默认取 report.mode
+        """
+        super().__init__()
+        report_config = config.get('report', {}) or {}
+        self.mode = mode or report_config.get('mode', 'hybrid')
+        if self.mode not in REPORT_MODES:
+            raise ValueError(f"未知的报告模式: {self.mode}，可选值: {', '.join(REPORT_MODES)}")
+        self.scoring = merge_scoring(report_config.get('scoring'))
+        self.narrative_max_tokens = report_config.get('narrative_max_tokens', 600)
+        if self.mode == 'hybrid':
+            # 模型只返回概况和推荐意见，级联校验时不再要求 match_score
+            self.required_fields = ('final_recommendation',)
+        self.narrative_prompt = NARRATIVE_PROMPT
+        self.system_prompt = SYSTEM_PROMPT
+
+
+    @staticmethod
+    def _format_extra_results(extra_results: Optional[Dict[str, Any]]) -> str:
+        """格式化其他检查项的结果"""
+        if not extra_results:
+            return ''
+        return ''.join(
+            f"\n{name} 判断结果：\n{json.dumps(result, ensure_ascii=False, indent=2)}\n"
+            for name, result in extra_results.items()
+        )
+
     def process(
         self,
         job_description: str,
@@ -56,7 +128,8 @@ class ReportGenerator(BaseModel):
         resume_data: Dict[str, Any],
         big_company_result: Dict[str, Any],
         ipo_result: Dict[str, Any],
-        negative_result: Dict[str, Any]
+        negative_result: Dict[str, Any],
+        extra_results: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         生成最终报告
@@ -68,17 +141,63 @@ class ReportGenerator(BaseModel):
             big_company_result: 大厂判断结果
             ipo_result: 上市经历判断结果
             negative_result: 负面舆情检索结果
+            extra_results: 其他已注册检查项的结果（结果字段名 -> 结果）
 
         Returns:
             最终报告
         """
         print("=" * 50)
-        print("【模型5】开始生成最终报告...")
+        print(f"【模型5】开始生成最终报告（{self.mode}）...")
         print("=" * 50)
 
         try:
-            # 构建用户提示词
-            user_prompt = f"""职位描述：
+            if self.mode == 'hybrid':
+                result = self._hybrid_report(
+                    job_description, exploration_direction, resume_data,
+                    big_company_result, ipo_result, negative_result, extra_results
+                )
+            else:
+                result = self._llm_report(
+                    job_description, exploration_direction, resume_data,
+                    big_company_result, ipo_result, negative_result, extra_results
+                )
+            result['report_mode'] = self.mode
+
+            match_score = result.get('match_score', 0)
+            recommendation = result.get('final_recommendation', '未知')
+
+            print(f"✓ 报告生成完成")
+            print(f"  - 匹配分数: {match_score}")
+            print(f"  - 最终推荐: {recommendation}")
+
+            return {
+                "success": True,
+                "data": result,
+                "message": "报告生成完成"
+            }
+
+        except Exception as e:
+            print(f"✗ 报告生成失败: {e}")
+            return {
+                "success": False,
+                "data": None,
+                "message": f"报告生成失败: {str(e)}"
+            }
+
+    def _llm_report(
+        self,
+        job_description: str,
+        exploration_direction: str,
+        resume_data: Dict[str, Any],
+        big_company_result: Dict[str, Any],
+        ipo_result: Dict[str, Any],
+        negative_result: Dict[str, Any],
+        extra_results: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """整份报告由模型生成"""
+        user_prompt = f"""请整合以下所有信息，生成一份专业的候选人匹配度评估报告。
+
+职位描述：
 {job_description}
 
 探索方向：
@@ -95,34 +214,66 @@ class ReportGenerator(BaseModel):
 
 负面舆情检索结果：
 {json.dumps(negative_result, ensure_ascii=False, indent=2)}
+{self._format_extra_results(extra_results)}"""
 
-请整合以上所有信息，生成一份专业的候选人匹配度评估报告。"""
+        return self.call_gpt_json(
+            system_prompt=self.system_prompt,
+            user_prompt=user_prompt,
+            max_tokens=3000
+        )
 
-            response = self.call_gpt(
-                system_prompt=self.system_prompt,
-                user_prompt=user_prompt,
-                max_tokens=3000
-            )
+    def _hybrid_report(
+        self,
+        job_description: str,
+        exploration_direction: str,
+        resume_data: Dict[str, Any],
+        big_company_result: Dict[str, Any],
+        ipo_result: Dict[str, Any],
+        negative_result: Dict[str, Any],
+        extra_results: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """结构化部分按评分公式生成，模型只撰写概况和推荐意见"""
+        structured = build_structured_report(
+            big_company_result, ipo_result, negative_result, extra_results, self.scoring
+        )
 
-            result = self.parse_json_response(response)
+        user_prompt = f"""请根据以下信息撰写候选人概况并给出推荐意见。
 
-            match_score = result.get('match_score', 0)
-            recommendation = result.get('final_recommendation', '未知')
+职位描述：
+{job_description}
 
-            print(f"✓ 报告生成完成")
-            print(f"  - 匹配分数: {match_score}")
-            print(f"  - 最终推荐: {recommendation}")
+探索方向：
+{exploration_direction}
 
-            return {
-                "success": True,
-                "data": result,
-                "message": "报告生成完成"
-            }
+候选人简历信息：
+{json.dumps(resume_data, ensure_ascii=False, indent=2)}
 
-        except Exception as e:
-            print(f"✗ 报告生成失败: {e}")
-            return {
-                "success": False,
-                "data": None,
-                "message": f"报告生成失败: {str(e)}"
-            }
+评估结果：
+{json.dumps(structured['evaluation_results'], ensure_ascii=False, indent=2)}
+
+优势：{'；'.join(structured['strengths']) or '无'}
+风险：{'；'.join(structured['risks']) or '无'}
+匹配分数：{structured['match_score']}
+按分数给出的建议：{structured['score_recommendation']}"""
+
+        narrative = self.call_gpt_json(
+            system_prompt=self.narrative_prompt,
+            user_prompt=user_prompt,
+            max_tokens=self.narrative_max_tokens
+        )
+
+        recommendation = str(narrative.get('final_recommendation', '')).strip()
+        if recommendation not in RECOMMENDATIONS:
+            recommendation = structured['score_recommendation']
+
+        return {
+            "candidate_summary": narrative.get('candidate_summary', ''),
+            "match_score": structured['match_score'],
+            "evaluation_results": structured['evaluation_results'],
+            "strengths": structured['strengths'],
+            "risks": structured['risks'],
+            "final_recommendation": recommendation,
+            "recommendation_reason": narrative.get('recommendation_reason', ''),
+            "score_breakdown": structured['score_breakdown'],
+            "score_recommendation": structured['score_recommendation'],
+        }
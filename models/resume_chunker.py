@@ -0,0 +1,233 @@
+"""
+长简历分段模块
+功能：多页的长简历按章节标题和工作经历的起止时间行切分成若干段，各段分别解析后
+再合并为与单次解析相同的结构；同一段工作经历被切到两段中时，按公司和在职时间去重合并
+"""
+import re
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# 章节标题（去掉标点、空白后整行匹配，不区分大小写）
+SECTION_HEADINGS = {
+    '个人信息', '基本信息', '联系方式', '求职意向', '个人简介', '个人优势',
+    '教育背景', '教育经历', '工作经历', '工作经验', '职业经历', '实习经历',
+    '项目经历', '项目经验', '专业技能', '技能特长', '自我评价', '证书', '获奖情况', '语言能力', '培训经历',
+    'summary', 'profile', 'contact', 'education', 'experience', 'workexperience', 'employmenthistory',
+    'professionalexperience', 'projects', 'skills', 'certifications', 'awards', 'languages',
+}
+
+_HEADING_STRIP = re.compile(r'[\s#*:：【】\[\]()（）\-=_|·•]+')
+
+# 以起止时间开头或结尾的短行，通常是一段工作经历的第一行
+_DATE = r'(?:19|20)\d{2}(?:\s*[./年-]\s*\d{1,2}\s*月?)?'
+_DATE_RANGE = re.compile(
+    rf'{_DATE}\s*(?:至|到|-|–|—|~|～|to)\s*(?:{_DATE}|至今|现在|今|present|now)',
+    re.IGNORECASE
+)
+
+# 识别为工作经历起始行的最大行长
+MAX_ENTRY_LINE = 80
+
+_MONTH = re.compile(r'((?:19|20)\d{2})(?:\s*[./年-]\s*(\d{1,2}))?')
+_ONGOING = re.compile(r'至今|现在|^今$|present|now|current', re.IGNORECASE)
+
+
+def heading_of(line: str) -> Optional[str]:
+    """如果该行是章节标题则返回标题，否则为None"""
+    stripped = _HEADING_STRIP.sub('', line).lower()
+    if stripped and len(stripped) <= 24 and stripped in SECTION_HEADINGS:
+        return line.strip()
+    return None
+
+
+def is_entry_start(line: str) -> bool:
+    """该行是否像一段工作经历（或项目、教育经历）的第一行"""
+    stripped = line.strip()
+    return 0 < len(stripped) <= MAX_ENTRY_LINE and _DATE_RANGE.search(stripped) is not None
+
+
+def _blocks(text: str) -> List[Tuple[Optional[str], str]]:
+    """按章节标题和经历起始行切分，返回 [(所属章节标题, 文本块)]"""
+    blocks: List[Tuple[Optional[str], List[str]]] = []
+    section: Optional[str] = None
+    current: List[str] = []
+
+    for line in text.splitlines():
+        heading = heading_of(line)
+        if (heading or is_entry_start(line)) and current:
+            blocks.append((section, current))
+            current = []
+        if heading:
+            section = heading
+        current.append(line)
+    if current:
+        blocks.append((section, current))
+    return [(section, '\n'.join(lines)) for section, lines in blocks if ''.join(lines).strip()]
+
+
+def _split_long(block: str, max_chars: int) -> List[str]:
+    """超长的文本块按行（单行过长时按字符）切分"""
+    pieces, current, size = [], [], 0
+    for line in block.splitlines():
+        while len(line) > max_chars:
+            if current:
+                pieces.append('\n'.join(current))
+                current, size = [], 0
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if size + len(line) + 1 > max_chars and current:
+            pieces.append('\n'.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pieces.append('\n'.join(current))
+    return pieces
+
+
+def split_resume(text: str, chunk_chars: int = 3000) -> List[str]:
+    """
+    把长简历切分成不超过 chunk_chars 个字符的若干段（尽量在章节和经历边界切分）
+
+    不是从章节标题开始的段落前面会补上所属章节的标题，方便模型判断内容类型
+
+    Args:
+        text: 简历文本
+        chunk_chars: 每段的最大字符数（补上的章节标题不计入）
+
+    Returns:
+        分段列表
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_section: Optional[str] = None
+    size = 0
+
+    def emit():
+        nonlocal current, size
+        if current:
+            body = '\n'.join(current)
+            if chunks and current_section and not body.lstrip().startswith(current_section):
+                body = f"{current_section}（续）\n{body}"
+            chunks.append(body)
+        current, size = [], 0
+
+    for section, block in _blocks(text):
+        for piece in (_split_long(block, chunk_chars) if len(block) > chunk_chars else [block]):
+            if size + len(piece) + 1 > chunk_chars:
+                emit()
+            if not current:
+                current_section = section
+            current.append(piece)
+            size += len(piece) + 1
+    emit()
+    return chunks
+
+
+def month_index(value: Any, ongoing: Optional[int] = None) -> Optional[int]:
+    """
+    把入职/离职时间转成月份序号（年*12+月），无法识别时为None
+
+    Args:
+        ongoing: "至今"等表示仍在职的值对应的序号
+    """
+    text = str(value or '').strip()
+    if not text:
+        return None
+    if _ONGOING.search(text):
+        return ongoing
+    match = _MONTH.search(text)
+    if not match:
+        return None
+    month = int(match.group(2)) if match.group(2) else 1
+    return int(match.group(1)) * 12 + min(max(month, 1), 12) - 1
+
+
+def _period(exp: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    start = month_index(exp.get('start_date'))
+    end = month_index(exp.get('end_date'), ongoing=10 ** 6)
+    return start, end if end is not None else start
+
+
+def _same_position(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """职位相同（一方缺少职位时视为相同：被切断的记录常常只有公司和时间）"""
+    position_a = re.sub(r'\s+', '', str(a.get('position') or '')).lower()
+    position_b = re.sub(r'\s+', '', str(b.get('position') or '')).lower()
+    return not position_a or not position_b or position_a == position_b
+
+
+def same_job(a: Dict[str, Any], b: Dict[str, Any], company_key: Callable[[str], str]) -> bool:
+    """
+    两条工作经历是否为同一段：公司键相同、职位相同，且在职时间确实重叠（或一方缺少时间）
+
+    只在边界上相接（"2015-2018" 与 "2018-2020"，只写年份时同一年按相邻处理）不算重叠，
+    同一公司前后两段经历不会合并
+    """
+    if company_key(a.get('company') or '') != company_key(b.get('company') or ''):
+        return False
+    if not _same_position(a, b):
+        return False
+    (start_a, end_a), (start_b, end_b) = _period(a), _period(b)
+    if start_a is None or start_b is None:
+        return True
+    if (start_a, end_a) == (start_b, end_b):
+        return True
+    return max(start_a, start_b) < min(end_a, end_b)
+
+
+def merge_job(target: Dict[str, Any], other: Dict[str, Any]):
+    """把同一段工作经历的另一条记录合并到 target（补齐空字段，合并描述）"""
+    for field, value in other.items():
+        if field == 'description':
+            continue
+        if target.get(field) in (None, '') and value not in (None, ''):
+            target[field] = value
+    if other.get('is_current'):
+        target['is_current'] = True
+
+    description = (target.get('description') or '').strip()
+    extra = (other.get('description') or '').strip()
+    if extra and extra not in description:
+        target['description'] = extra if description in extra else f"{description}\n{extra}" if description else extra
+
+
+def merge_partials(
+    partials: List[Dict[str, Any]],
+    company_key: Optional[Callable[[str], str]] = None
+) -> Dict[str, Any]:
+    """
+    合并各段的解析结果
+
+    - 个人信息：按分段顺序取第一个非空值
+    - 工作经历：保持文中顺序，同一段经历（见 same_job）合并为一条；
+      没有公司和时间的条目视为上一条经历被切断的描述
+
+    Args:
+        partials: 各段的解析结果（与单次解析结构相同）
+        company_key: 公司名 -> 去重用的键，默认去掉首尾空白
+
+    Returns:
+        {"personal_info", "work_experience"}
+    """
+    company_key = company_key or (lambda name: name.strip())
+    personal_info: Dict[str, Any] = {}
+    jobs: List[Dict[str, Any]] = []
+
+    for partial in partials:
+        for field, value in (partial.get('personal_info') or {}).items():
+            if value not in (None, '', '未知') and personal_info.get(field) in (None, '', '未知'):
+                personal_info[field] = value
+
+        for exp in partial.get('work_experience') or []:
+            if not isinstance(exp, dict):
+                continue
+            if not exp.get('company') and not exp.get('start_date'):
+                if jobs and exp.get('description'):
+                    merge_job(jobs[-1], {'description': exp['description']})
+                continue
+            match = next((job for job in jobs if same_job(job, exp, company_key)), None)
+            if match is not None:
+                merge_job(match, exp)
+            else:
+                jobs.append(dict(exp))
+
+    return {"personal_info": personal_info, "work_experience": jobs}
@@ -2,29 +2,38 @@
 简历解析模块（模型1）
 功能：解析简历信息，提取个人信息和工作经历
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from index.company_resolver import get_resolver
+from utils.batch import parallel_map
+from utils.config_loader import config
 from .base_model import BaseModel
+from .resume_chunker import merge_partials, split_resume
 
-
-class ResumeParser(BaseModel):
-    """简历解析器"""
-
-    def __init__(self):
-        super().__init__()
-        self.system_prompt = """你是一个专业的简历解析专家。
+# 系统提示词只有固定的说明和输出格式，简历内容放在用户提示词末尾
+SYSTEM_PROMPT = """你是一个专业的简历解析专家。
 你的任务是从简历文本中提取关键信息。
 
 请提取以下信息：
-1. 个人基本信息：姓名、联系方式、教育背景等
-2. 工作经历：每段工作经历包括
+1. 工作时间线：每段工作经历的公司名称、职位、入职时间、离职时间
+2. 个人基本信息：姓名、联系方式、教育背景等
+3. 工作经历：每段工作经历包括
    - 公司名称
    - 职位
    - 入职时间
    - 离职时间（如果已离职）
    - 工作描述和主要成就
 
-请以JSON格式返回，格式如下：
+请以JSON格式返回，字段必须按以下顺序输出，时间线与工作经历中的公司、职位和时间必须一致：
 {
+    "timeline": [
+        {
+            "company": "公司名称",
+            "position": "职位",
+            "start_date": "入职时间",
+            "end_date": "离职时间或'至今'",
+            "is_current": true/false
+        }
+    ],
     "personal_info": {
         "name": "姓名",
         "contact": "联系方式",
@@ -43,12 +52,82 @@ class ResumeParser(BaseModel):
 }
 """
 
-    def process(self, resume_text: str) -> Dict[str, Any]:
+
+class ResumeParser(BaseModel):
+    """简历解析器"""
+
+    stage = 'resume_parser'
+    required_fields = ('personal_info', 'work_experience')
+
+    def __init__(self):
+        super().__init__()
+        # 长简历分段解析：超过 min_chars 个字符时切分成不超过 chunk_chars 的若干段并发解析
+        self.long_config = dict(
+            {'enabled': True, 'min_chars': 4000, 'chunk_chars': 2000, 'max_workers': 4},
+            **(config.get('resume_parser.long_document', {}) or {})
+        )
+        self.system_prompt = SYSTEM_PROMPT
+
+    def conclusion(self, result: Dict[str, Any]) -> Tuple:
+        """解析结果以工作经历中的公司列表作为关键结论"""
+        return tuple(
+            exp.get('company') for exp in result.get('work_experience', []) or []
+            if isinstance(exp, dict)
+        )
+
+    @staticmethod
+    def merge_timeline(parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """去掉时间线字段，工作经历缺失的公司、职位和时间用时间线补齐"""
+        timeline = parsed_data.pop('timeline', None) or []
+        work_experience = parsed_data.get('work_experience')
+        if not work_experience:
+            parsed_data['work_experience'] = [dict(entry) for entry in timeline if isinstance(entry, dict)]
+            return parsed_data
+
+        for exp, entry in zip(work_experience, timeline):
+            if isinstance(exp, dict) and isinstance(entry, dict):
+                for field, value in entry.items():
+                    if exp.get(field) in (None, ''):
+                        exp[field] = value
+        return parsed_data
+
+    def split_if_long(self, resume_text: str) -> List[str]:
+        """长简历按章节切分，短简历原样返回（一段）"""
+        if not self.long_config.get('enabled') or len(resume_text) < self.long_config['min_chars']:
+            return [resume_text]
+        return split_resume(resume_text, self.long_config['chunk_chars'])
+
+    def parse_chunks(self, chunks: List[str]) -> Dict[str, Any]:
+        """
+        并发解析各段并合并（不流式回调：结果要等所有分段合并后才确定）
+
+        Returns:
+            与单次解析相同结构的解析结果
+        """
+        print(f"  - 长简历分 {len(chunks)} 段并发解析")
+
+        def parse(item):
+            index, chunk = item
+            user_prompt = (
+                "以下是一份简历的其中一部分，只提取这一部分中出现的信息，"
+                "没有出现的字段留空（工作描述被截断时照原样提取）。\n\n"
+                f"第 {index + 1}/{len(chunks)} 部分：\n\n{chunk}"
+            )
+            return self.merge_timeline(self.call_gpt_json(
+                system_prompt=self.system_prompt,
+                user_prompt=user_prompt
+            ))
+
+        partials = parallel_map(parse, list(enumerate(chunks)), self.long_config['max_workers'])
+        return merge_partials(partials, get_resolver().company_key)
+
+    def process(self, resume_text: str, on_member: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
         """
         解析简历
 
         Args:
             resume_text: 简历文本内容
+            on_member: 传入时流式解析，timeline、personal_info 等顶层字段一旦完整就回调 (键, 值)
 
         Returns:
             解析后的简历信息
@@ -58,14 +137,17 @@ class ResumeParser(BaseModel):
         print("=" * 50)
 
         try:
-            user_prompt = f"请解析以下简历内容：\n\n{resume_text}"
-
-            response = self.call_gpt(
-                system_prompt=self.system_prompt,
-                user_prompt=user_prompt
-            )
+            chunks = self.split_if_long(resume_text)
+            if len(chunks) > 1:
+                parsed_data = self.parse_chunks(chunks)
+            else:
+                user_prompt = f"请解析以下简历内容：\n\n{resume_text}"
 
-            parsed_data = self.parse_json_response(response)
+                parsed_data = self.merge_timeline(self.call_gpt_json(
+                    system_prompt=self.system_prompt,
+                    user_prompt=user_prompt,
+                    on_member=on_member
+                ))
 
             print("✓ 简历解析完成")
             print(f"  - 候选人姓名: {parsed_data.get('personal_info', {}).get('name', '未知')}")
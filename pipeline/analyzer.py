@@ -0,0 +1,317 @@
+"""
+简历分析流水线
+功能：解析简历（检查项在所需字段流式解析完成后即开始）-> 按检查计划并发执行检查项 -> 生成最终报告
+"""
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import models
+from index.corpus import get_corpus
+from pipeline.dag import CheckFailedError, stage_usage
+from pipeline.memo import REUSED_USAGE, get_stage_memo
+from pipeline.planner import plan_checks, skipped_result
+from pipeline.registry import CheckRegistry, registry as default_registry
+from pipeline.streaming import parse_and_check
+from storage.analysis_store import get_analysis_store
+from storage.job_queue import run_once
+from utils.admission import get_admission_controller
+from utils.config_loader import config
+from utils.metrics import metrics
+from utils.singleflight import SingleFlight, normalize_text, request_key
+from utils.tenants import current_tenant
+
+# 进行中的分析：相同的职位描述、探索方向和简历只分析一次
+_in_flight = SingleFlight()
+
+# 报告生成器的固定参数与检查项的对应关系
+REPORT_ARGUMENTS = {
+    'big_company': 'big_company_result',
+    'ipo': 'ipo_result',
+    'negative': 'negative_result',
+}
+
+
+def save_to_corpus(resume_data: Dict[str, Any]):
+    """将解析结果写入简历语料库（写入失败不影响分析流程；任务重试时不重复写入）"""
+    try:
+        corpus = get_corpus()
+        if corpus is not None:
+            run_once('corpus', lambda: corpus.insert(resume_data))
+    except Exception as e:
+        print(f"简历写入语料库失败: {e}")
+
+
+def collect_stage_inputs(stages: List[str], registry: CheckRegistry) -> Dict[str, Dict[str, Any]]:
+    """
+    收集实际执行的阶段所依赖的配置及其指纹
+
+    Args:
+        stages: 执行过的阶段名称（resume_parser、检查项名称、report）
+
+    Returns:
+        阶段名 -> {"config": 配置输入, "fingerprint": 指纹}
+    """
+    model_names = {'resume_parser': 'ResumeParser', 'report': 'ReportGenerator'}
+    model_names.update({spec.name: spec.model for spec in registry.all()})
+    return {
+        stage: getattr(models, model_names[stage]).stage_inputs()
+        for stage in stages
+        if stage in model_names
+    }
+
+
+def save_analysis(
+    job_description: str,
+    exploration_direction: str,
+    result: Dict[str, Any],
+    stage_inputs: Dict[str, Dict[str, Any]] = None
+):
+    """
+    将分析结果写入历史结果库，并在结果中附加 analysis_id（写入失败不影响分析流程；
+    任务重试时沿用之前写入的 analysis_id）
+    """
+    try:
+        store = get_analysis_store()
+        if store is not None:
+            result['data']['analysis_id'] = run_once('analysis', lambda: store.save(
+                job_description, exploration_direction, result['data'], stage_inputs
+            ))
+    except Exception as e:
+        print(f"分析结果写入历史结果库失败: {e}")
+
+
+def run_stage(stage_stats: Dict[str, Dict[str, Any]], name: str, model, *args, **kwargs) -> Dict[str, Any]:
+    """执行一个模型阶段，并记录耗时和token用量"""
+    start = time.perf_counter()
+    result = model.process(*args, **kwargs)
+    stage_stats[name] = stage_usage(model.usage, time.perf_counter() - start, model.stale_sources)
+    return result
+
+
+def parse_resume(
+    stage_stats: Dict[str, Dict[str, Any]],
+    resume_text: str,
+    on_member: Optional[Callable[[str, Any], None]] = None
+) -> Dict[str, Any]:
+    """
+    解析简历；相同简历（忽略空白差异）在相同配置下的解析结果直接复用
+
+    Args:
+        on_member: 流式回调（复用结果时不回调，检查项在解析返回后按完整结果执行）
+    """
+    start = time.perf_counter()
+
+    def compute():
+        result = run_stage(stage_stats, 'resume_parser', models.ResumeParser(), resume_text, on_member=on_member)
+        return dict(result, stale_sources=stage_stats['resume_parser'].get('stale_sources', []))
+
+    result, reused = get_stage_memo().run(
+        'resume_parser', 'ResumeParser', {"resume_text": normalize_text(resume_text)}, compute
+    )
+    if reused:
+        stage_stats['resume_parser'] = stage_usage(REUSED_USAGE, time.perf_counter() - start, reused=True)
+    result.pop('stale_sources', None)
+    return result
+
+
+def generate_report(
+    stage_stats: Dict[str, Dict[str, Any]],
+    job_description: str,
+    exploration_direction: str,
+    resume_data: Dict[str, Any],
+    check_results: Dict[str, Any],
+    registry: CheckRegistry,
+    mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    根据各检查项结果生成最终报告
+
+    Args:
+        check_results: 检查项名称 -> 检查结果（包括跳过的占位结果）
+        mode: 报告模式 hybrid/llm，默认取 report.mode
+    """
+    report_arguments = {
+        argument: check_results.get(name)
+        for name, argument in REPORT_ARGUMENTS.items()
+    }
+    extra_results = {
+        registry.get(name).result_key: result
+        for name, result in check_results.items()
+        if name not in REPORT_ARGUMENTS
+    }
+
+    return run_stage(
+        stage_stats, 'report', models.ReportGenerator(mode),
+        job_description=job_description,
+        exploration_direction=exploration_direction,
+        resume_data=resume_data,
+        extra_results=extra_results,
+        **report_arguments
+    )
+
+
+def analyze(
+    job_description: str,
+    exploration_direction: str,
+    resume_text: str,
+    registry: CheckRegistry = None
+) -> Dict[str, Any]:
+    """
+    执行完整的简历分析流程
+
+    Args:
+        job_description: 职位描述
+        exploration_direction: 探索方向
+        resume_text: 简历内容
+        registry: 检查项注册表
+
+    Returns:
+        与 /api/analyze 响应体相同结构的结果字典
+    """
+    registry = registry or default_registry
+    started = time.perf_counter()
+    stage_stats: Dict[str, Dict[str, Any]] = {}
+
+    # 步骤1-4: 解析简历，同时按探索方向选择的检查项在所需字段解析完成后立即开始，按依赖关系并发执行
+    plan = plan_checks(exploration_direction, registry)
+    print(f"\n检查计划: 执行 {plan.selected}，跳过 {list(plan.skipped)}")
+
+    concurrent_config = config.get_concurrent_config()
+    max_workers = concurrent_config.get('max_workers', 3)
+    stream = (config.get('pipeline', {}) or {}).get('stream_parse', True)
+
+    def parse(on_member):
+        return parse_resume(stage_stats, resume_text, on_member)
+
+    try:
+        parse_result, check_results, pipeline_info = parse_and_check(
+            parse, plan.selected, registry, max_workers, stage_stats, stream
+        )
+    except CheckFailedError as e:
+        print(str(e))
+        return {
+            "success": False,
+            "message": str(e)
+        }
+
+    if not parse_result['success']:
+        return parse_result
+
+    resume_data = parse_result['data']
+    save_to_corpus(resume_data)
+
+    for name, reason in plan.skipped.items():
+        check_results[name] = skipped_result(reason)
+
+    # 步骤5: 生成最终报告
+    report_result = generate_report(
+        stage_stats, job_description, exploration_direction, resume_data, check_results, registry
+    )
+
+    if not report_result['success']:
+        return report_result
+
+    return finish_analysis(
+        job_description, exploration_direction, resume_data, check_results, plan,
+        report_result['data'], stage_stats, started, registry, pipeline=pipeline_info
+    )
+
+
+def finish_analysis(
+    job_description: str,
+    exploration_direction: str,
+    resume_data: Dict[str, Any],
+    check_results: Dict[str, Any],
+    plan,
+    report: Dict[str, Any],
+    stage_stats: Dict[str, Dict[str, Any]],
+    started: float,
+    registry: CheckRegistry,
+    **extra
+) -> Dict[str, Any]:
+    """
+    组装分析结果并写入历史结果库
+
+    Args:
+        check_results: 检查项名称 -> 检查结果（包括跳过的占位结果）
+        plan: 检查计划
+        report: 最终报告
+        started: 分析开始时的 time.perf_counter()
+        extra: 附加到结果 data 中的字段（如 pipeline、batch）
+
+    Returns:
+        与 /api/analyze 响应体相同结构的结果字典
+    """
+    data = {"resume_info": resume_data}
+    for spec in registry.all():
+        data[spec.result_key] = check_results.get(spec.name)
+    data["check_plan"] = plan.to_dict()
+    data.update(extra)
+    # 后端熔断或调用失败时部分阶段使用了过期缓存，报告中标记为陈旧数据
+    stale = {name: stats['stale_sources'] for name, stats in stage_stats.items() if stats.get('stale_sources')}
+    if stale and isinstance(report, dict):
+        report = dict(report, stale=True, stale_stages=stale)
+    data["degraded"] = bool(stale)
+    # 输入和配置与之前相同、直接复用了之前结果的阶段
+    data["reused_stages"] = [name for name, stats in stage_stats.items() if stats.get('reused')]
+    data["final_report"] = report
+    data["stage_stats"] = stage_stats
+    data["total_latency"] = round(time.perf_counter() - started, 3)
+
+    result = {
+        "success": True,
+        "data": data,
+        "message": "简历分析完成"
+    }
+    stage_inputs = collect_stage_inputs(['resume_parser', *plan.selected, 'report'], registry)
+    save_analysis(job_description, exploration_direction, result, stage_inputs)
+    return result
+
+
+def analyze_coalesced(
+    job_description: str,
+    exploration_direction: str,
+    resume_text: str,
+    lane: str = 'interactive'
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    执行简历分析，相同输入的分析正在进行时直接等待其结果
+
+    重复点击、调用方超时重试等场景下，同一份职位描述+简历会同时被多个线程分析，
+    合并后只调用一次模型。合并键为当前租户和归一化空白后的三个字段的哈希，不同租户的请求不会合并
+    （各自的结果和token用量只计入各自的租户）。
+    实际执行的分析需要先通过准入控制，合并到进行中分析的请求不占用名额
+
+    Args:
+        lane: 准入控制的优先级通道（interactive/batch）
+
+    Returns:
+        (结果字典, 是否合并到了进行中的分析)
+
+    Raises:
+        AdmissionRejected: 负载过高被拒绝（合并到同一分析的请求同样被拒绝）
+    """
+    key = request_key(current_tenant.get(), job_description, exploration_direction, resume_text)
+    metrics.incr('analyze_requests')
+
+    def run():
+        with get_admission_controller().admit(lane):
+            return analyze(job_description, exploration_direction, resume_text)
+
+    result, coalesced = _in_flight.do(key, run)
+    if coalesced:
+        metrics.incr('analyze_coalesced')
+        print(f"请求已合并到进行中的分析（{key[:12]}）")
+    return result, coalesced
+
+
+def coalescing_report() -> Dict[str, Any]:
+    """请求合并统计"""
+    requests = metrics.counter('analyze_requests')
+    coalesced = metrics.counter('analyze_coalesced')
+    return {
+        "requests": requests,
+        "coalesced": coalesced,
+        "coalesced_rate": round(coalesced / requests, 4) if requests else None,
+        "in_flight": _in_flight.in_flight(),
+    }
@@ -0,0 +1,313 @@
+"""
+离线批量分析
+功能：夜间重新筛选等不要求实时返回的场景，按阶段批处理：所有简历的解析请求作为一批提交，
+完成后所有简历的检查项请求（按依赖关系分层）作为下一批提交，最后是报告。
+批处理价格更低（batch.discount）且不占用同步调用的速率限额，代价是每个阶段都要等整批完成
+
+同样的输入可以用同步模式（逐份调用 analyze）运行，两种模式输出相同结构的吞吐量、单份费用和总耗时统计
+
+用法：
+    python -m pipeline.batch --jd jd.txt --direction "大厂、上市" --resumes resumes/ [--mode batch|sync|both] [--backend openai|local]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from pipeline.analyzer import analyze, finish_analysis, generate_report, parse_resume, save_to_corpus
+from pipeline.dag import CheckFailedError, dependency_layers, stage_usage
+from pipeline.planner import plan_checks, skipped_result
+from pipeline.registry import CheckRegistry, registry as default_registry
+from utils.batch import BatchBackend, BatchCollector, build_backend, current_batch
+from utils.config_loader import config
+from utils.metrics import metrics
+from utils.tenants import run_in_context
+
+MODES = ('batch', 'sync')
+
+
+def run_participants(
+    label: str,
+    items: List[Any],
+    fn: Callable[[Any], Any],
+    backend: BatchBackend
+) -> Tuple[List[Tuple[Any, Optional[Exception]]], Dict[str, Any]]:
+    """
+    每个条目在一个线程中执行 fn，其中的模型请求收集成批提交
+
+    条目按 batch.max_participants 分块依次执行，每块一个收集器（一个或多个批处理任务），
+    限制同时存在的线程数、同时进行的搜索和网页抓取数，以及单个批处理输入文件的请求数和大小
+
+    Returns:
+        ([(返回值, 异常)], 批处理统计)
+    """
+    batch_config = config.get('batch', {}) or {}
+    work_dir = batch_config.get('work_dir', 'data/batches')
+    if not os.path.isabs(work_dir):
+        work_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), work_dir)
+    chunk_size = max(1, batch_config.get('max_participants', 500))
+    stats = {"chunks": 0, "batches": 0, "requests": 0, "failed_requests": 0, "wait_seconds": 0.0}
+    outcomes: List[Tuple[Any, Optional[Exception]]] = []
+
+    for offset in range(0, len(items), chunk_size):
+        chunk = items[offset:offset + chunk_size]
+        collector = BatchCollector(
+            backend, len(chunk), work_dir, label,
+            poll_interval=batch_config.get('poll_interval_seconds', 30),
+            max_wait=batch_config.get('max_wait_hours', 24) * 3600
+        )
+
+        def participant(item, collector=collector):
+            token = current_batch.set(collector)
+            try:
+                return fn(item), None
+            except Exception as e:
+                return None, e
+            finally:
+                current_batch.reset(token)
+                collector.leave()
+
+        # 同一块的参与者必须同时在执行，否则收集器会一直等待尚未开始的参与者
+        with ThreadPoolExecutor(max_workers=len(chunk)) as executor:
+            outcomes.extend(executor.map(run_in_context(participant), chunk))
+
+        stats["chunks"] += 1
+        for key in ("batches", "requests", "failed_requests", "wait_seconds"):
+            stats[key] += collector.stats.get(key, 0)
+    stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+    return outcomes, stats
+
+
+def analyze_batch(
+    job_description: str,
+    exploration_direction: str,
+    resume_texts: List[str],
+    registry: CheckRegistry = None,
+    backend: Optional[BatchBackend] = None
+) -> Dict[str, Any]:
+    """
+    按阶段批处理分析多份简历
+
+    Args:
+        resume_texts: 简历文本列表
+        backend: 批处理接口，默认按 batch.backend 创建
+
+    Returns:
+        结果字典，data.results 中每份简历的结果与 analyze 的返回值结构相同，
+        data.stages 为各阶段的批处理统计
+    """
+    registry = registry or default_registry
+    backend = backend or build_backend()
+    started = time.perf_counter()
+    plan = plan_checks(exploration_direction, registry)
+    states = [
+        {"text": text, "stage_stats": {}, "check_results": {}, "error": None}
+        for text in resume_texts
+    ]
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    def alive():
+        return [state for state in states if state['error'] is None]
+
+    # 阶段1: 简历解析（批处理模式下不流式解析）
+    def parse(state):
+        return parse_resume(state['stage_stats'], state['text'])
+
+    outcomes, stages['resume_parser'] = run_participants('resume_parser', alive(), parse, backend)
+    for state, (result, error) in zip(alive(), outcomes):
+        if error is not None or not result['success']:
+            state['error'] = str(error) if error is not None else result['message']
+            continue
+        state['resume_data'] = result['data']
+        state['context'] = {
+            'personal_info': result['data'].get('personal_info', {}),
+            'work_experience': result['data'].get('work_experience', []),
+        }
+
+    # 阶段2: 检查项，同一层（互不依赖）的检查项合并为一批
+    def check(item):
+        state, name = item
+        start = time.perf_counter()
+        result = registry.get(name).run(dict(state['context']))
+        state['stage_stats'][name] = stage_usage(
+            result.get('usage') or {}, time.perf_counter() - start, result.get('stale_sources'), result.get('reused')
+        )
+        return result
+
+    for layer in dependency_layers(plan.selected, registry):
+        items = [(state, name) for state in alive() for name in layer]
+        label = '+'.join(layer)
+        outcomes, stages[label] = run_participants(label, items, check, backend)
+        for (state, name), (result, error) in zip(items, outcomes):
+            if error is not None:
+                state['error'] = state['error'] or str(CheckFailedError(name, error))
+                continue
+            state['check_results'][name] = result['data']
+            state['context'][name] = result['data']
+
+    for state in alive():
+        for name, reason in plan.skipped.items():
+            state['check_results'][name] = skipped_result(reason)
+
+    # 阶段3: 最终报告
+    def report(state):
+        return generate_report(
+            state['stage_stats'], job_description, exploration_direction,
+            state['resume_data'], state['check_results'], registry
+        )
+
+    outcomes, stages['report'] = run_participants('report', alive(), report, backend)
+    for state, (result, error) in zip(alive(), outcomes):
+        if error is not None or not result['success']:
+            state['error'] = str(error) if error is not None else result['message']
+        else:
+            state['report'] = result['data']
+
+    results = []
+    for state in states:
+        if state['error'] is not None:
+            results.append({"success": False, "message": state['error']})
+            continue
+        save_to_corpus(state['resume_data'])
+        results.append(finish_analysis(
+            job_description, exploration_direction, state['resume_data'], state['check_results'], plan,
+            state['report'], state['stage_stats'], started, registry, batch=True
+        ))
+
+    wall_seconds = time.perf_counter() - started
+    return {
+        "success": True,
+        "data": {
+            "results": results,
+            "stages": stages,
+            "summary": summarize_run('batch', results, wall_seconds),
+        },
+        "message": "批量分析完成"
+    }
+
+
+def analyze_sync(
+    job_description: str,
+    exploration_direction: str,
+    resume_texts: List[str],
+    max_workers: Optional[int] = None,
+    registry: CheckRegistry = None
+) -> Dict[str, Any]:
+    """
+    同步模式：逐份调用 analyze（用于与批处理模式对比）
+
+    Args:
+        max_workers: 同时分析的简历数，默认取 ranking.pipeline_workers
+    """
+    workers = max_workers or (config.get('ranking', {}) or {}).get('pipeline_workers', 2)
+    started = time.perf_counter()
+
+    def run(text):
+        try:
+            return analyze(job_description, exploration_direction, text, registry)
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(run_in_context(run), resume_texts))
+
+    wall_seconds = time.perf_counter() - started
+    return {
+        "success": True,
+        "data": {
+            "results": results,
+            "summary": summarize_run('sync', results, wall_seconds),
+        },
+        "message": "批量分析完成"
+    }
+
+
+def summarize_run(mode: str, results: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    """吞吐量、token用量（包括命中提示词缓存的输入token）、费用和总耗时"""
+    succeeded = [result for result in results if result.get('success')]
+    prompt_tokens = completion_tokens = cached_tokens = 0
+    cost = 0.0
+    for result in succeeded:
+        for stats in (result['data'].get('stage_stats') or {}).values():
+            prompt_tokens += stats.get('prompt_tokens', 0) or 0
+            completion_tokens += stats.get('completion_tokens', 0) or 0
+            cached_tokens += stats.get('cached_tokens', 0) or 0
+            cost += stats.get('cost_usd', 0.0) or 0.0
+
+    metrics.incr('bulk_resumes', len(succeeded), mode=mode)
+    metrics.observe('bulk_wall_seconds', wall_seconds, mode=mode)
+    return {
+        "mode": mode,
+        "resumes": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_minute": round(len(succeeded) / wall_seconds * 60, 2) if wall_seconds else None,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cached_tokens": cached_tokens,
+        "cached_rate": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else None,
+        "cost_usd": round(cost, 4),
+        "cost_per_resume_usd": round(cost / len(succeeded), 6) if succeeded else None,
+    }
+
+
+def load_resumes(path: str) -> List[Tuple[str, str]]:
+    """
+    读取简历：目录中的 .txt 文件（ID为文件名），或每行 {"id", "resume"} 的 .jsonl 文件
+
+    Returns:
+        [(ID, 简历文本)]
+    """
+    if os.path.isdir(path):
+        resumes = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.txt'):
+                with open(os.path.join(path, name), 'r', encoding='utf-8') as f:
+                    resumes.append((os.path.splitext(name)[0], f.read()))
+        return resumes
+
+    resumes = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for position, line in enumerate(f):
+            if line.strip():
+                item = json.loads(line)
+                resumes.append((str(item.get('id', position)), item.get('resume', '')))
+    return resumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线批量分析（批处理/同步模式对比）')
+    parser.add_argument('--jd', required=True, help='职位描述文件')
+    parser.add_argument('--direction', default='', help='探索方向')
+    parser.add_argument('--resumes', required=True, help='简历目录（.txt）或 .jsonl 文件')
+    parser.add_argument('--mode', choices=MODES + ('both',), default='batch', help='执行模式')
+    parser.add_argument('--backend', choices=('openai', 'local'), default=None, help='批处理接口（默认 batch.backend）')
+    parser.add_argument('--workers', type=int, default=None, help='同步模式同时分析的简历数')
+    parser.add_argument('--output', default=None, help='把每份简历的结果写入该 .jsonl 文件')
+    args = parser.parse_args()
+
+    with open(args.jd, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+    resumes = load_resumes(args.resumes)
+    ids, texts = [r[0] for r in resumes], [r[1] for r in resumes]
+
+    runs = {}
+    if args.mode in ('batch', 'both'):
+        runs['batch'] = analyze_batch(job_description, args.direction, texts, backend=build_backend(args.backend))
+    if args.mode in ('sync', 'both'):
+        runs['sync'] = analyze_sync(job_description, args.direction, texts, args.workers)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for mode, run in runs.items():
+                for resume_id, result in zip(ids, run['data']['results']):
+                    f.write(json.dumps({"id": resume_id, "mode": mode, "result": result}, ensure_ascii=False) + '\n')
+
+    print(json.dumps({mode: run['data']['summary'] for mode, run in runs.items()}, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
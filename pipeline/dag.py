@@ -0,0 +1,179 @@
+"""
+DAG执行模块
+功能：按依赖关系并发执行检查项，依赖已完成的检查项立即提交，最大化并行度。
+上下文可以在执行过程中通过 ContextFeed 逐步补充，输入字段齐全的检查项立即开始
+"""
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from pipeline.registry import CheckRegistry
+from utils.tenants import run_in_context
+
+
+class CheckFailedError(Exception):
+    """检查项执行失败"""
+
+    def __init__(self, name: str, error: Exception):
+        super().__init__(f"模块 {name} 执行失败: {error}")
+        self.name = name
+        self.error = error
+
+
+def stage_usage(usage: Dict[str, Any], latency: float, stale_sources=None, reused: bool = False) -> Dict[str, Any]:
+    """
+    阶段统计：token用量、估算费用和耗时
+
+    Args:
+        stale_sources: 该阶段使用了过期缓存的后端（后端熔断或调用失败时）
+        reused: 该阶段是否复用了之前的结果
+    """
+    stats = dict(usage, latency=round(latency, 3))
+    if 'cost_usd' in stats:
+        stats['cost_usd'] = round(stats['cost_usd'], 6)
+    if stale_sources:
+        stats['stale_sources'] = sorted(stale_sources)
+    if reused:
+        stats['reused'] = True
+    return stats
+
+
+def dependency_layers(names: List[str], registry: CheckRegistry) -> List[List[str]]:
+    """
+    按依赖关系把检查项分层：每层只依赖前面各层的检查项
+
+    Raises:
+        ValueError: 存在循环依赖
+    """
+    remaining = {name: set(registry.get(name).depends_on) & set(names) for name in names}
+    layers = []
+    while remaining:
+        layer = [name for name, deps in remaining.items() if not deps]
+        if not layer:
+            raise ValueError(f"检查项存在循环依赖: {', '.join(remaining)}")
+        for name in layer:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(layer)
+        layers.append(layer)
+    return layers
+
+
+class ContextFeed:
+    """执行过程中向检查上下文补充字段（例如简历解析流式返回的字段）"""
+
+    def __init__(self):
+        self._events = queue.Queue()
+
+    def put(self, key: str, value: Any):
+        """补充一个上下文字段"""
+        self._events.put(('context', key, value))
+
+    def close(self, error: Optional[BaseException] = None):
+        """
+        不再补充字段：此后缺少输入的检查项按缺失值执行
+
+        Args:
+            error: 传入时中止执行，run_checks 抛出该异常
+        """
+        self._events.put(('close', error, None))
+
+
+def run_checks(
+    names: List[str],
+    context: Dict[str, Any],
+    registry: CheckRegistry,
+    max_workers: int = 3,
+    stage_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    feed: Optional[ContextFeed] = None
+) -> Dict[str, Any]:
+    """
+    按依赖关系执行检查项
+
+    每个检查项的结果（process 返回值中的 data）会以检查项名称写回上下文，
+    供依赖它的检查项作为输入使用
+
+    Args:
+        names: 需要执行的检查项（依赖必须已包含在内）
+        context: 执行上下文（personal_info、work_experience 等）
+        registry: 检查项注册表
+        max_workers: 最大并发数
+        stage_stats: 传入时写入每个检查项的耗时和token用量
+        feed: 传入时上下文可以在执行过程中补充，检查项等到依赖完成且输入字段齐全（或 feed 关闭）后才执行
+
+    Returns:
+        检查项名称 -> 结果数据
+
+    Raises:
+        CheckFailedError: 任一检查项抛出异常
+    """
+    context = dict(context)
+    remaining = {name: set(registry.get(name).depends_on) & set(names) for name in names}
+    results: Dict[str, Any] = {}
+    # 检查项完成和上下文补充都通过同一个事件队列通知
+    events = feed._events if feed is not None else queue.Queue()
+    closed = feed is None
+
+    def inputs_ready(name: str) -> bool:
+        if closed:
+            return True
+        return all(
+            key in context
+            for key in registry.get(name).inputs
+            if registry.get(key) is None
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+
+        def timed_run(spec, snapshot):
+            start = time.perf_counter()
+            result = spec.run(snapshot)
+            result['latency'] = time.perf_counter() - start
+            return result
+
+        def submit_ready():
+            for name in [n for n, deps in remaining.items() if not deps and inputs_ready(n)]:
+                del remaining[name]
+                # 在提交者的上下文（当前租户等）中执行
+                future = executor.submit(run_in_context(timed_run), registry.get(name), dict(context))
+                running[future] = name
+                future.add_done_callback(lambda f: events.put(('done', f, None)))
+
+        def cancel_running():
+            for pending in running:
+                pending.cancel()
+
+        submit_ready()
+        while running or not closed:
+            kind, item, value = events.get()
+            if kind == 'context':
+                context[item] = value
+            elif kind == 'close':
+                closed = True
+                if item is not None:
+                    cancel_running()
+                    raise item
+            else:
+                name = running.pop(item)
+                try:
+                    result = item.result()
+                except Exception as e:
+                    cancel_running()
+                    raise CheckFailedError(name, e)
+
+                results[name] = result['data']
+                context[name] = result['data']
+                if stage_stats is not None:
+                    stage_stats[name] = stage_usage(
+                        result.get('usage') or {}, result['latency'], result.get('stale_sources'), result.get('reused')
+                    )
+                for deps in remaining.values():
+                    deps.discard(name)
+            submit_ready()
+
+    if remaining:
+        raise ValueError(f"检查项存在循环依赖: {', '.join(remaining)}")
+
+    return results
@@ -0,0 +1,312 @@
+"""
+分布式分析任务
+功能：提交方把分析任务写入共享任务队列（storage.job_queue），无状态的 worker 进程领取任务并执行 analyze，
+增加 worker 进程（可以在多台机器上）即可横向扩展：
+- 每个 worker 进程有若干执行线程，各自循环领取任务；执行中的任务由一个后台线程定期续约
+- worker 崩溃或失联时租约过期，任务由其他 worker 重新领取。重试时解析和检查项直接复用阶段结果（stage_memo），
+  其余模型调用命中共享缓存，写入语料库和历史结果库的步骤只执行一次（见 storage.job_queue.run_once）
+- 分析失败（success 为 false 或抛出异常）的任务延迟后重试，用完 job_queue.max_attempts 后标记为失败
+
+相同租户、职位描述、探索方向和简历的任务ID相同，重复提交不会重复分析
+
+用法：
+    python -m pipeline.jobs submit --jd jd.txt --direction "大厂、上市" --resumes resumes/ [--wait] [--output results.jsonl]
+    python -m pipeline.jobs work [--threads 4] [--worker-id host-1]
+    python -m pipeline.jobs status [--job-id ID]
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+from storage.job_queue import DONE, FAILED, Job, JobQueue, current_job, get_job_queue
+from utils.config_loader import config
+from utils.metrics import metrics
+from utils.singleflight import request_key
+from utils.tenants import current_tenant, tenant_scope
+
+
+def analysis_job_id(tenant: str, job_description: str, exploration_direction: str, resume_text: str) -> str:
+    """分析任务ID：租户和归一化空白后的三个字段的哈希"""
+    return request_key(tenant, job_description, exploration_direction, resume_text)
+
+
+def submit_analysis(
+    job_description: str,
+    exploration_direction: str,
+    resume_text: str,
+    tenant: Optional[str] = None,
+    queue: Optional[JobQueue] = None
+) -> str:
+    """
+    提交一个分析任务
+
+    Args:
+        tenant: 租户，默认为当前上下文中的租户
+
+    Returns:
+        任务ID
+    """
+    queue = queue or get_job_queue()
+    tenant = tenant or current_tenant.get()
+    return queue.submit(
+        {
+            "job_description": job_description,
+            "exploration_direction": exploration_direction,
+            "resume_text": resume_text,
+        },
+        job_id=analysis_job_id(tenant, job_description, exploration_direction, resume_text),
+        tenant=tenant
+    )
+
+
+def wait_for(
+    job_ids: List[str],
+    timeout: Optional[float] = None,
+    poll_interval: float = 1.0,
+    queue: Optional[JobQueue] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    等待任务结束（完成或失败）
+
+    Args:
+        timeout: 最长等待时间（秒），None 表示一直等待
+
+    Returns:
+        任务ID -> 任务（见 JobQueue.get），超时时包含未结束的任务的当前状态
+    """
+    queue = queue or get_job_queue()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    finished: Dict[str, Dict[str, Any]] = {}
+    pending = list(dict.fromkeys(job_ids))
+    while True:
+        jobs = queue.get_many(pending)
+        for job_id, job in jobs.items():
+            if job['status'] in (DONE, FAILED):
+                finished[job_id] = job
+        pending = [job_id for job_id in pending if job_id not in finished]
+        if not pending or (deadline is not None and time.monotonic() >= deadline):
+            finished.update({job_id: job for job_id, job in jobs.items() if job_id in pending})
+            return finished
+        time.sleep(poll_interval)
+
+
+def run_analysis_job(job: Job) -> Dict[str, Any]:
+    """执行一个分析任务（在任务所属租户的上下文中）"""
+    from pipeline.analyzer import analyze
+
+    payload = job.payload
+    with tenant_scope(job.tenant):
+        return analyze(payload['job_description'], payload['exploration_direction'], payload['resume_text'])
+
+
+class Worker:
+    """无状态 worker：循环领取任务并执行，执行期间定期续约"""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        handler: Callable[[Job], Dict[str, Any]] = run_analysis_job,
+        worker_id: Optional[str] = None,
+        threads: int = 1,
+        heartbeat_interval: Optional[float] = None,
+        poll_interval: float = 1.0
+    ):
+        """
+        Args:
+            queue: 任务队列，默认为全局队列
+            handler: 执行任务，返回 {"success", "data", "message"} 结构的结果
+            worker_id: worker 标识，默认为 主机名-进程ID
+            threads: 同时执行的任务数
+            heartbeat_interval: 续约间隔（秒），默认为租约期限的四分之一
+            poll_interval: 队列为空时的轮询间隔（秒）
+        """
+        self.queue = queue or get_job_queue()
+        self.handler = handler
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.threads = max(1, threads)
+        self.heartbeat_interval = heartbeat_interval or self.queue.lease_seconds / 4
+        self.poll_interval = poll_interval
+        self.processed = 0
+        self._claimed = 0
+        self._active: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        # 所有执行线程退出后才停止续约（停止领取后执行中的任务仍需续约）
+        self._exited = threading.Event()
+
+    def stop(self):
+        """不再领取新任务，执行中的任务完成后退出（SIGTERM / Ctrl+C 时调用）"""
+        self._stopping.set()
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False) -> int:
+        """
+        启动执行线程和续约线程，直到 stop() 被调用或处理完 max_jobs 个任务
+
+        Args:
+            max_jobs: 处理该数量的任务后退出（用于测试）
+            exit_when_idle: 队列中没有可执行的任务时退出
+
+        Returns:
+            处理的任务数
+        """
+        print(f"worker {self.worker_id} 启动，{self.threads} 个执行线程")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        workers = [
+            threading.Thread(target=self._loop, args=(max_jobs, exit_when_idle), daemon=True)
+            for _ in range(self.threads)
+        ]
+        for thread in workers:
+            thread.start()
+        while any(thread.is_alive() for thread in workers):
+            try:
+                for thread in workers:
+                    thread.join(timeout=0.5)
+            except KeyboardInterrupt:
+                print(f"worker {self.worker_id} 正在退出，等待执行中的任务完成")
+                self.stop()
+        self._exited.set()
+        heartbeat.join()
+        print(f"worker {self.worker_id} 退出，共处理 {self.processed} 个任务")
+        return self.processed
+
+    def _take_slot(self, max_jobs: Optional[int]) -> bool:
+        """预留一个任务名额（达到 max_jobs 后不再领取）"""
+        with self._lock:
+            if max_jobs is not None and self._claimed >= max_jobs:
+                return False
+            self._claimed += 1
+            return True
+
+    def _loop(self, max_jobs: Optional[int], exit_when_idle: bool):
+        while not self._stopping.is_set() and self._take_slot(max_jobs):
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                with self._lock:
+                    self._claimed -= 1
+                if exit_when_idle:
+                    return
+                self._stopping.wait(self.poll_interval)
+                continue
+            with self._lock:
+                self._active[job.job_id] = job
+            try:
+                self.process(job)
+            finally:
+                with self._lock:
+                    self._active.pop(job.job_id, None)
+                    self.processed += 1
+
+    def _heartbeat_loop(self):
+        while not self._exited.wait(self.heartbeat_interval):
+            with self._lock:
+                jobs = list(self._active.values())
+            for job in jobs:
+                try:
+                    if not job.heartbeat():
+                        print(f"任务 {job.job_id} 的租约已被收回，本次执行的结果将被丢弃")
+                except Exception as e:
+                    print(f"任务 {job.job_id} 续约失败: {e}")
+
+    def process(self, job: Job) -> bool:
+        """
+        执行一个任务并记录结果
+
+        Returns:
+            任务是否成功完成
+        """
+        start = time.perf_counter()
+        token = current_job.set(job)
+        try:
+            result = self.handler(job)
+        except Exception as e:
+            print(f"任务 {job.job_id} 执行失败（第 {job.attempt} 次）: {e}")
+            self.queue.fail(job, f"{type(e).__name__}: {e}")
+            return False
+        finally:
+            current_job.reset(token)
+            metrics.observe('job_seconds', time.perf_counter() - start)
+
+        if result.get('success'):
+            return self.queue.complete(job, result)
+        print(f"任务 {job.job_id} 分析失败（第 {job.attempt} 次）: {result.get('message')}")
+        self.queue.fail(job, result.get('message') or '分析失败', result=result)
+        return False
+
+
+def build_worker(threads: Optional[int] = None, worker_id: Optional[str] = None) -> Worker:
+    """按 job_queue 配置创建 worker"""
+    queue_config = config.get('job_queue', {}) or {}
+    return Worker(
+        worker_id=worker_id,
+        threads=threads or queue_config.get('threads', 4),
+        heartbeat_interval=queue_config.get('heartbeat_seconds', 15),
+        poll_interval=queue_config.get('poll_interval_seconds', 1)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分布式分析任务（提交 / worker / 状态）')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit = commands.add_parser('submit', help='提交分析任务')
+    submit.add_argument('--jd', required=True, help='职位描述文件')
+    submit.add_argument('--direction', default='', help='探索方向')
+    submit.add_argument('--resumes', required=True, help='简历目录（.txt）或 .jsonl 文件')
+    submit.add_argument('--tenant', default=None, help='租户（默认 default）')
+    submit.add_argument('--wait', action='store_true', help='等待所有任务结束')
+    submit.add_argument('--timeout', type=float, default=None, help='最长等待时间（秒）')
+    submit.add_argument('--output', default=None, help='等待结束后把每份简历的结果写入该 .jsonl 文件')
+
+    work = commands.add_parser('work', help='启动 worker')
+    work.add_argument('--threads', type=int, default=None, help='同时执行的任务数（默认 job_queue.threads）')
+    work.add_argument('--worker-id', default=None, help='worker 标识（默认 主机名-进程ID）')
+    work.add_argument('--exit-when-idle', action='store_true', help='队列中没有可执行的任务时退出')
+
+    status = commands.add_parser('status', help='查看队列或任务状态')
+    status.add_argument('--job-id', default=None, help='任务ID')
+
+    args = parser.parse_args()
+
+    if args.command == 'submit':
+        from pipeline.batch import load_resumes
+
+        with open(args.jd, 'r', encoding='utf-8') as f:
+            job_description = f.read()
+        resumes = load_resumes(args.resumes)
+        job_ids = [
+            submit_analysis(job_description, args.direction, text, tenant=args.tenant)
+            for _, text in resumes
+        ]
+        print(json.dumps({"submitted": len(job_ids), "job_ids": job_ids}, ensure_ascii=False, indent=2))
+        if not args.wait:
+            return
+        jobs = wait_for(job_ids, timeout=args.timeout)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                for (resume_id, _), job_id in zip(resumes, job_ids):
+                    f.write(json.dumps({"id": resume_id, "job": jobs.get(job_id)}, ensure_ascii=False) + '\n')
+        counts: Dict[str, int] = {}
+        for job in jobs.values():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        print(json.dumps(counts, ensure_ascii=False, indent=2))
+
+    elif args.command == 'work':
+        worker = build_worker(args.threads, args.worker_id)
+        # 收到 SIGTERM 时不再领取新任务，执行中的任务完成后退出（未完成的任务在租约过期后由其他 worker 重试）
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        worker.run(exit_when_idle=args.exit_when_idle)
+
+    else:
+        queue = get_job_queue()
+        report = queue.get(args.job_id) if args.job_id else queue.stats()
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+阶段结果复用模块
+功能：简历解析和各检查项只依赖简历内容（及其他检查项结果）和配置，与职位描述、探索方向无关。
+每个阶段以其声明的输入（解析为简历文本，检查项为 CheckSpec.inputs 中的字段在实际使用部分上的投影）、
+该阶段的配置指纹和模型档位为键，把成功的结果保存在共享缓存中；
+同一候选人换一个职位重新评估时，这些阶段直接复用之前的结果，只需重新生成报告
+"""
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from utils.cache import get_cache
+from utils.metrics import metrics
+
+# 复用的阶段不产生token用量
+REUSED_USAGE = {'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0, 'cost_usd': 0.0}
+
+
+def check_inputs(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    检查项输入在其实际使用的字段上的投影（工作经历只取时间线字段，个人信息只取姓名，
+    与流式解析判断提前写入的字段是否有效时使用的投影相同；其他检查项的结果原样保留）
+    """
+    from pipeline.streaming import PROJECTIONS
+
+    return {key: PROJECTIONS[key](value) if key in PROJECTIONS else value for key, value in fields.items()}
+
+
+class StageMemo:
+    """阶段结果复用（基于共享缓存的 stage 命名空间）"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        version: str = '1',
+        default_ttl: int = 604800,
+        ttl: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            enabled: 是否启用
+            version: 复用键的版本号，修改提示词后更换版本使之前的结果失效
+            default_ttl: 默认保留时间（秒）
+            ttl: 阶段名 -> 保留时间（秒），例如负面舆情的检索结果保留时间较短
+        """
+        self.enabled = enabled
+        self.version = str(version)
+        self.default_ttl = default_ttl
+        self.ttl = ttl or {}
+
+    def key(self, stage: str, model_name: str, inputs: Dict[str, Any]) -> str:
+        """复用键：版本号、阶段、该阶段的配置指纹、模型档位和输入"""
+        import models
+        from utils.config_loader import config
+
+        openai_config = config.get_openai_config()
+        return get_cache().make_key(
+            self.version,
+            stage,
+            getattr(models, model_name).stage_inputs()['fingerprint'],
+            openai_config.get('model'),
+            openai_config.get('tiers'),
+            openai_config.get('cascade'),
+            inputs
+        )
+
+    def run(
+        self,
+        stage: str,
+        model_name: str,
+        inputs: Dict[str, Any],
+        compute: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        复用之前的结果，没有时调用 compute 执行该阶段
+
+        只保存成功且没有使用过期缓存（stale_sources 为空）的结果
+
+        Args:
+            stage: 阶段名称
+            model_name: models 包中的模型类名（取其配置指纹）
+            inputs: 该阶段声明的全部输入
+            compute: 执行该阶段，返回 process 的结果
+
+        Returns:
+            (结果, 是否为复用的结果)
+        """
+        if not self.enabled:
+            return compute(), False
+
+        cache = get_cache()
+        key = self.key(stage, model_name, inputs)
+        cached = cache.get('stage', key)
+        if cached is not None:
+            metrics.incr('stage_memo_hits', stage=stage)
+            return cached, True
+
+        metrics.incr('stage_memo_misses', stage=stage)
+        result = compute()
+        if result.get('success') and not result.get('stale_sources'):
+            cache.set('stage', key, result, self.ttl.get(stage, self.default_ttl))
+        return result, False
+
+
+_memo_instance = None
+_memo_lock = threading.Lock()
+
+
+def get_stage_memo() -> StageMemo:
+    """获取全局阶段结果复用实例（按 stage_memo 配置懒加载）"""
+    global _memo_instance
+    if _memo_instance is None:
+        with _memo_lock:
+            if _memo_instance is None:
+                from utils.config_loader import config
+
+                memo_config = config.get('stage_memo', {}) or {}
+                ttl = dict(memo_config.get('ttl', {}) or {})
+                _memo_instance = StageMemo(
+                    enabled=memo_config.get('enabled', True),
+                    version=memo_config.get('version', '1'),
+                    default_ttl=ttl.pop('default', 604800),
+                    ttl=ttl
+                )
+    return _memo_instance
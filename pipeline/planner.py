@@ -0,0 +1,90 @@
+"""
+检查计划模块
+功能：根据探索方向选择需要执行的检查项，未涉及的检查项跳过以节省GPT/搜索调用
+"""
+from typing import Dict, Any, List
+
+from pipeline.registry import CheckRegistry, registry as default_registry
+from utils.config_loader import config
+
+
+class CheckPlan:
+    """检查计划"""
+
+    def __init__(self, selected: List[str], skipped: Dict[str, str]):
+        """
+        Args:
+            selected: 需要执行的检查项名称
+            skipped: 跳过的检查项名称 -> 跳过原因
+        """
+        self.selected = selected
+        self.skipped = skipped
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "executed": list(self.selected),
+            "skipped": [
+                {"check": name, "reason": reason}
+                for name, reason in self.skipped.items()
+            ]
+        }
+
+
+def skipped_result(reason: str) -> Dict[str, Any]:
+    """被跳过的检查项在报告输入和API响应中的占位结果"""
+    return {
+        "skipped": True,
+        "reason": reason
+    }
+
+
+def plan_checks(exploration_direction: str, registry: CheckRegistry = None) -> CheckPlan:
+    """
+    根据探索方向生成检查计划
+
+    探索方向命中某个检查项的关键词时执行该检查项（及其依赖）；
+    没有配置关键词的检查项总是执行；一个关键词都没命中时说明方向不明确，执行全部检查项
+
+    Args:
+        exploration_direction: 探索方向
+        registry: 检查项注册表
+
+    Returns:
+        检查计划
+    """
+    registry = registry or default_registry
+    planner_config = config.get('planner', {}) or {}
+    names = registry.names()
+
+    if not planner_config.get('enabled', True):
+        return CheckPlan(names, {})
+
+    keywords = planner_config.get('keywords', {}) or {}
+    direction = (exploration_direction or '').lower()
+
+    selected = set()
+    matched_any = False
+    for name in names:
+        check_keywords = keywords.get(name)
+        if not check_keywords:
+            selected.add(name)
+        elif any(str(keyword).lower() in direction for keyword in check_keywords):
+            selected.add(name)
+            matched_any = True
+
+    if not matched_any:
+        return CheckPlan(names, {})
+
+    # 补齐被选中检查项的依赖
+    pending = list(selected)
+    while pending:
+        spec = registry.get(pending.pop())
+        for dependency in spec.depends_on:
+            if dependency not in selected:
+                selected.add(dependency)
+                pending.append(dependency)
+
+    return CheckPlan(
+        [name for name in names if name in selected],
+        {name: "探索方向未涉及该检查项" for name in names if name not in selected}
+    )
@@ -0,0 +1,202 @@
+"""
+候选人排序流水线
+功能：先用本地 BM25 + 结构化信号对候选池排序，只有前 top_k 名进入完整的
+简历解析 -> 检查项 -> 报告流程，其余候选人只返回本地分数；
+已解析（并已检查）的候选人可以按结构化特征直接打分排序，不调用 GPT
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Union
+
+from index.company_resolver import get_resolver
+from index.features import FEATURES, FeatureMatrix, FeatureScorer, extract_features, job_terms
+from index.ranker import CandidateRanker
+from pipeline.analyzer import analyze_coalesced
+from pipeline.registry import registry
+from utils.admission import AdmissionRejected
+from utils.config_loader import config
+from utils.tenants import run_in_context
+
+
+def build_ranker() -> CandidateRanker:
+    """根据配置创建本地排序器"""
+    ranking_config = config.get('ranking', {}) or {}
+    return CandidateRanker(
+        weights=ranking_config.get('weights'),
+        max_years=ranking_config.get('max_years', 10),
+        resolver=get_resolver()
+    )
+
+
+def normalize_candidates(resumes: List[Union[str, Dict[str, Any]]]) -> List[Dict[str, str]]:
+    """
+    统一候选人输入格式
+
+    Args:
+        resumes: 简历文本列表，或 {"id": ..., "resume": ...} 列表
+
+    Returns:
+        [{"id": ..., "resume": ...}]
+    """
+    candidates = []
+    for position, item in enumerate(resumes):
+        if isinstance(item, dict):
+            candidates.append({
+                "id": str(item.get('id', position)),
+                "resume": item.get('resume', '')
+            })
+        else:
+            candidates.append({"id": str(position), "resume": str(item)})
+    return candidates
+
+
+def rank_candidates(
+    job_description: str,
+    exploration_direction: str,
+    resumes: List[Union[str, Dict[str, Any]]],
+    top_k: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    排序并分析候选人
+
+    Args:
+        job_description: 职位描述
+        exploration_direction: 探索方向
+        resumes: 候选人简历列表
+        top_k: 进入完整分析流程的候选人数量，默认取 ranking.top_k
+
+    Returns:
+        结果字典，data.candidates 中前 top_k 名按报告匹配分数排序并附带完整分析，
+        其余候选人按本地分数排序
+    """
+    ranking_config = config.get('ranking', {}) or {}
+    top_k = ranking_config.get('top_k', 10) if top_k is None else top_k
+
+    candidates = normalize_candidates(resumes)
+    texts = {c['id']: c['resume'] for c in candidates}
+
+    ranker = build_ranker()
+    for candidate in candidates:
+        ranker.add(candidate['id'], candidate['resume'])
+
+    ranked = ranker.rank(job_description)
+    shortlisted, rest = ranked[:top_k], ranked[top_k:]
+
+    print(f"本地排序完成: {len(ranked)} 名候选人，{len(shortlisted)} 名进入完整分析")
+
+    def run(entry):
+        # 排序请求中的分析走批量通道，让位于交互式的单份简历分析
+        try:
+            return analyze_coalesced(job_description, exploration_direction, texts[entry['id']], lane='batch')[0]
+        except AdmissionRejected as e:
+            return {
+                "success": False,
+                "message": str(e),
+                "retry_after": e.retry_after
+            }
+
+    workers = max(1, ranking_config.get('pipeline_workers', 2))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        analyses = list(executor.map(run_in_context(run), shortlisted))
+
+    for entry, analysis in zip(shortlisted, analyses):
+        entry['analyzed'] = True
+        entry['analysis'] = analysis
+        report = (analysis.get('data') or {}).get('final_report') or {}
+        entry['match_score'] = report.get('match_score')
+
+    shortlisted.sort(
+        key=lambda e: (e['match_score'] is not None, e['match_score'] or 0, e['local_score']),
+        reverse=True
+    )
+    for entry in rest:
+        entry['analyzed'] = False
+
+    result = shortlisted + rest
+    for rank, entry in enumerate(result, start=1):
+        entry['rank'] = rank
+
+    return {
+        "success": True,
+        "data": {
+            "total": len(result),
+            "analyzed": len(shortlisted),
+            "candidates": result
+        },
+        "message": "候选人排序完成"
+    }
+
+
+def build_feature_scorer(weights: Optional[Dict[str, float]] = None) -> FeatureScorer:
+    """根据配置创建特征打分器，weights 覆盖配置中的同名权重"""
+    feature_config = config.get('feature_scoring', {}) or {}
+    return FeatureScorer(
+        weights=dict(feature_config.get('weights') or {}, **(weights or {})),
+        caps=feature_config.get('caps')
+    )
+
+
+def check_results_of(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    取出候选人的检查项结果
+
+    支持 {"check_results": {检查项名称: 结果}}，或直接使用 /api/analyze 响应 data 中的
+    big_company_analysis、ipo_analysis 等字段
+    """
+    if isinstance(candidate.get('check_results'), dict):
+        return candidate['check_results']
+    return {
+        spec.name: candidate[spec.result_key]
+        for spec in registry.all()
+        if spec.result_key in candidate
+    }
+
+
+def score_candidates(
+    job_description: str,
+    candidates: List[Dict[str, Any]],
+    weights: Optional[Dict[str, float]] = None,
+    top_k: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    按结构化特征为已解析的候选人打分排序（不调用GPT）
+
+    Args:
+        job_description: 职位描述（用于计算关键词重合度）
+        candidates: [{"id", "resume_data", "check_results"}]，resume_data 也可以写作 resume_info
+            （即 /api/analyze 响应的 data）
+        weights: 覆盖配置的特征权重
+        top_k: 返回数量，None 表示全部
+
+    Returns:
+        结果字典，data.candidates 按特征分数降序排列
+    """
+    scorer = build_feature_scorer(weights)
+    terms = job_terms(job_description)
+    resolver = get_resolver()
+
+    matrix = FeatureMatrix()
+    for position, candidate in enumerate(candidates):
+        resume_data = candidate.get('resume_data') or candidate.get('resume_info') or {}
+        matrix.add(
+            str(candidate.get('id', position)),
+            extract_features(resume_data, check_results_of(candidate), terms, resolver)
+        )
+
+    ranked = scorer.rank(matrix, top_k)
+    return {
+        "success": True,
+        "data": {
+            "total": len(matrix),
+            "weights": scorer.weights,
+            "candidates": [
+                {
+                    "rank": rank,
+                    "id": matrix.ids[i],
+                    "feature_score": round(score, 2),
+                    "features": dict(zip(FEATURES, (round(v, 4) for v in matrix.row(i)))),
+                }
+                for rank, (i, score) in enumerate(ranked, start=1)
+            ]
+        },
+        "message": "特征打分完成"
+    }
@@ -0,0 +1,237 @@
+"""
+增量重新评估
+功能：大厂判断标准（知名大厂列表、员工人数阈值、是否要求上市）变更后，
+只找出结论可能受影响的历史分析，重新执行大厂判断和最终报告，其余阶段的结果直接复用
+
+用法：
+    python -m pipeline.reevaluate [--dry-run] [--limit N] [--workers N]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set
+
+import models
+from index.company_resolver import UNRESOLVED_PREFIX, CompanyResolver
+from pipeline.analyzer import collect_stage_inputs, generate_report, run_stage
+from pipeline.registry import CheckRegistry, registry as default_registry
+from storage.analysis_store import AnalysisStore, get_analysis_store
+from utils.config_loader import config
+
+# 需要重新评估的检查项
+STAGE = 'big_company'
+# 可以按公司索引精确定位影响范围的配置项，其他配置项变更时重新评估该配置下的全部分析
+INDEXED_KEYS = {'known_companies', 'employee_count_threshold', 'require_listed'}
+
+
+def changed_company_ids(
+    store: AnalysisStore,
+    fingerprint: str,
+    old_config: Dict[str, Any],
+    new_config: Dict[str, Any]
+) -> List[str]:
+    """
+    知名大厂列表增删涉及的公司键
+
+    新旧列表各建一个公司识别器（词典中没有的大厂会自动登记为新实体），取两边知名大厂规范ID的差集；
+    旧配置下无法识别的公司（键为 "name:归一化名称"）在任一识别器中归到这些规范ID时也算在内
+    """
+    resolvers = [
+        CompanyResolver(
+            entities=cfg.get('company_entities', {}),
+            known_companies=cfg.get('known_companies', []),
+            fuzzy_threshold=cfg.get('fuzzy_threshold', 0.8)
+        )
+        for cfg in (old_config, new_config)
+    ]
+    ids = resolvers[0].known_ids ^ resolvers[1].known_ids
+    keys = set(ids)
+    for key in store.unresolved_company_keys(STAGE, fingerprint):
+        name = key[len(UNRESOLVED_PREFIX):]
+        if any(resolver.company_key(name) in ids for resolver in resolvers):
+            keys.add(key)
+    return sorted(keys)
+
+
+def find_affected(
+    store: AnalysisStore,
+    fingerprint: str,
+    old_config: Dict[str, Any],
+    new_config: Dict[str, Any]
+) -> List[str]:
+    """
+    找出旧配置下结论可能因配置变更而改变的分析
+
+    - 知名大厂列表增删：工作经历中有增删的公司（按规范ID比较，"京东" 不会牵连 "京东方"）
+    - 员工人数阈值变化：有公司的员工人数估计落在新旧阈值之间（或无法解析）
+    - 是否要求上市变化：有未上市（或未知）且人数达到阈值的公司
+
+    Args:
+        store: 历史结果库
+        fingerprint: 旧配置指纹
+        old_config: 旧配置
+        new_config: 当前配置
+
+    Returns:
+        分析ID列表
+    """
+    changed = {key for key in set(old_config) | set(new_config) if old_config.get(key) != new_config.get(key)}
+    if changed - INDEXED_KEYS:
+        return store.find_by_fingerprint(STAGE, fingerprint)
+
+    affected: Set[str] = set()
+    if 'known_companies' in changed:
+        affected.update(store.find_by_companies(STAGE, fingerprint, changed_company_ids(store, fingerprint, old_config, new_config)))
+
+    old_threshold = old_config.get('employee_count_threshold', 1000)
+    new_threshold = new_config.get('employee_count_threshold', 1000)
+    if 'employee_count_threshold' in changed:
+        low, high = sorted((old_threshold, new_threshold))
+        affected.update(store.find_by_employee_count(STAGE, fingerprint, low, high))
+    if 'require_listed' in changed:
+        affected.update(store.find_by_employee_count(
+            STAGE, fingerprint, min(old_threshold, new_threshold), unlisted_only=True
+        ))
+    return sorted(affected)
+
+
+def reevaluate_analysis(
+    store: AnalysisStore,
+    payload: Dict[str, Any],
+    registry: CheckRegistry
+) -> bool:
+    """
+    重新执行一次分析的大厂判断和最终报告，其余检查项结果从结果库复用
+
+    Returns:
+        是否成功
+    """
+    data = payload['data']
+    resume_data = data.get('resume_info') or {}
+    stage_stats = dict(data.get('stage_stats') or {})
+
+    big_company_result = run_stage(
+        stage_stats, STAGE, models.BigCompanyChecker(), resume_data.get('work_experience', [])
+    )
+    if not big_company_result['success']:
+        return False
+
+    check_results = {spec.name: data.get(spec.result_key) for spec in registry.all()}
+    check_results[STAGE] = big_company_result['data']
+
+    report_result = generate_report(
+        stage_stats, payload['job_description'], payload['exploration_direction'],
+        resume_data, check_results, registry
+    )
+    if not report_result['success']:
+        return False
+
+    data[registry.get(STAGE).result_key] = big_company_result['data']
+    data['final_report'] = report_result['data']
+    data['stage_stats'] = stage_stats
+    data['reevaluated'] = {
+        "stages": [STAGE, 'report'],
+        "at": datetime.now().isoformat(timespec='seconds'),
+    }
+    return store.update(payload['analysis_id'], data, collect_stage_inputs([STAGE, 'report'], registry))
+
+
+def reevaluate(
+    store: Optional[AnalysisStore] = None,
+    registry: CheckRegistry = None,
+    dry_run: bool = False,
+    limit: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    对大厂判断配置变更影响的历史分析执行增量重新评估
+
+    未受影响的分析只更新配置指纹；失败或超出 limit 未处理的分析保留旧指纹，下次运行时继续处理
+
+    Args:
+        store: 历史结果库
+        registry: 检查项注册表
+        dry_run: 只统计影响范围，不调用模型
+        limit: 最多重新评估的分析数
+        max_workers: 并发数
+
+    Returns:
+        统计信息
+    """
+    store = store or get_analysis_store()
+    if store is None:
+        raise ValueError("历史结果库未启用（analysis_store.enabled）")
+    registry = registry or default_registry
+    if max_workers is None:
+        max_workers = config.get_concurrent_config().get('max_workers', 3)
+
+    current = models.BigCompanyChecker.stage_inputs()
+    started = time.perf_counter()
+    summary = {
+        "stage": STAGE,
+        "current_fingerprint": current['fingerprint'],
+        "stale_configs": [],
+        "affected": 0,
+        "reevaluated": 0,
+        "failed": 0,
+        "migrated": 0,
+    }
+
+    remaining = limit
+    for fingerprint, old_config, count in store.stale_configs(STAGE, current['fingerprint']):
+        affected = find_affected(store, fingerprint, old_config, current['config'])
+        summary["stale_configs"].append({
+            "fingerprint": fingerprint,
+            "analyses": count,
+            "affected": len(affected),
+        })
+        summary["affected"] += len(affected)
+        print(f"配置 {fingerprint}: {count} 个分析，其中 {len(affected)} 个可能受影响")
+        if dry_run:
+            continue
+
+        selected = affected if remaining is None else affected[:remaining]
+        if remaining is not None:
+            remaining -= len(selected)
+
+        def run(payload):
+            try:
+                return payload['analysis_id'], reevaluate_analysis(store, payload, registry)
+            except Exception as e:
+                print(f"重新评估 {payload['analysis_id']} 失败: {e}")
+                return payload['analysis_id'], False
+
+        succeeded = set()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for analysis_id, ok in executor.map(run, store.iter_payloads(selected)):
+                if ok:
+                    succeeded.add(analysis_id)
+                else:
+                    print(f"✗ 重新评估失败: {analysis_id}")
+        summary["reevaluated"] += len(succeeded)
+        summary["failed"] += len(selected) - len(succeeded)
+
+        summary["migrated"] += store.migrate_fingerprint(
+            STAGE, fingerprint, current['fingerprint'], current['config'],
+            exclude=[analysis_id for analysis_id in affected if analysis_id not in succeeded]
+        )
+
+    summary["latency"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='大厂判断配置变更后增量重新评估历史分析')
+    parser.add_argument('--dry-run', action='store_true', help='只统计受影响的分析数，不调用模型')
+    parser.add_argument('--limit', type=int, default=None, help='最多重新评估的分析数')
+    parser.add_argument('--workers', type=int, default=None, help='并发数（默认 concurrent.max_workers）')
+    args = parser.parse_args()
+
+    summary = reevaluate(dry_run=args.dry_run, limit=args.limit, max_workers=args.workers)
+    print(f"\n可能受影响: {summary['affected']}，重新评估成功: {summary['reevaluated']}，"
+          f"失败: {summary['failed']}，仅更新指纹: {summary['migrated']}，耗时 {summary['latency']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+检查项注册表
+功能：登记所有可插拔的检查模块，包括模型类、输入字段、依赖关系和结果字段名
+"""
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class CheckSpec:
+    """检查项描述"""
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        inputs: Tuple[str, ...],
+        result_key: str,
+        depends_on: Tuple[str, ...] = (),
+        description: str = ''
+    ):
+        """
+        Args:
+            name: 检查项名称（与 planner.keywords 中的键对应）
+            model: models 包中的模型类名
+            inputs: 按顺序传给 process 的上下文字段，可以是简历字段或其他检查项名称
+            result_key: 结果在API响应和报告输入中的字段名
+            depends_on: 依赖的其他检查项，依赖完成后才会执行
+            description: 检查项说明
+        """
+        self.name = name
+        self.model = model
+        self.inputs = inputs
+        self.result_key = result_key
+        self.depends_on = depends_on
+        self.description = description
+
+    def create_model(self):
+        """实例化模型"""
+        import models
+        return getattr(models, self.model)()
+
+    def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从上下文中取出输入并执行检查
+
+        输入和配置都与之前某次检查相同时直接复用之前的结果（见 pipeline.memo）
+
+        Returns:
+            模型 process 的返回值，附加 usage 字段记录本次检查的token用量，
+            stale_sources 字段记录使用了过期缓存的后端，reused 字段表示是否为复用的结果
+        """
+        from pipeline.memo import REUSED_USAGE, check_inputs, get_stage_memo
+
+        args = [context.get(key) for key in self.inputs]
+
+        def compute():
+            model = self.create_model()
+            result = model.process(*args)
+            result['usage'] = dict(model.usage)
+            result['stale_sources'] = sorted(model.stale_sources)
+            return result
+
+        result, reused = get_stage_memo().run(
+            self.name, self.model, check_inputs(dict(zip(self.inputs, args))), compute
+        )
+        if reused:
+            result['usage'] = dict(REUSED_USAGE)
+        result['reused'] = reused
+        return result
+
+
+class CheckRegistry:
+    """检查项注册表"""
+
+    def __init__(self):
+        self._checks: Dict[str, CheckSpec] = {}
+
+    def register(self, spec: CheckSpec) -> CheckSpec:
+        """注册检查项，同名检查项会被覆盖"""
+        for dependency in spec.depends_on:
+            if dependency not in self._checks:
+                raise ValueError(f"检查项 {spec.name} 依赖的 {dependency} 尚未注册")
+        self._checks[spec.name] = spec
+        return spec
+
+    def get(self, name: str) -> Optional[CheckSpec]:
+        return self._checks.get(name)
+
+    def names(self) -> List[str]:
+        """按注册顺序返回所有检查项名称"""
+        return list(self._checks)
+
+    def all(self) -> List[CheckSpec]:
+        return list(self._checks.values())
+
+
+registry = CheckRegistry()
+
+registry.register(CheckSpec(
+    name='big_company',
+    model='BigCompanyChecker',
+    inputs=('work_experience',),
+    result_key='big_company_analysis',
+    description='大厂经历判断'
+))
+registry.register(CheckSpec(
+    name='ipo',
+    model='IPOChecker',
+    inputs=('work_experience',),
+    result_key='ipo_analysis',
+    description='上市经历判断'
+))
+registry.register(CheckSpec(
+    name='negative',
+    model='NegativeChecker',
+    inputs=('personal_info', 'work_experience'),
+    result_key='negative_analysis',
+    description='负面舆情检索'
+))
@@ -0,0 +1,244 @@
+"""
+录制/回放回归测试
+功能：record 模式用真实的模型和搜索接口分析一组用例，把所有请求与结果写入录制带，并保存每个用例的输出作为基线；
+replay 模式从录制带回放（不调用外部接口），重跑同样的用例并与基线对比，检查修改提示词或编排逻辑后输出是否稳定，
+同时统计每个用例的纯编排耗时
+
+用例文件为 .jsonl，每行 {"id", "job_description", "exploration_direction", "resume"}；
+也可以用 --jd/--direction/--resumes 指定同一职位下的一组简历（格式同 pipeline.batch）
+
+提示词或请求参数有变化的调用在回放时找不到录制结果，对应的用例记为失败并给出原因，需要重新录制
+
+用法：
+    python -m pipeline.regression record --cassette data/cassettes/regression.jsonl --cases cases.jsonl --baseline baseline.jsonl
+    python -m pipeline.regression replay --cassette data/cassettes/regression.jsonl --cases cases.jsonl --baseline baseline.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from pipeline.analyzer import analyze
+from pipeline.batch import load_resumes
+from utils.cache import get_cache
+from utils.cassette import Cassette, use_cassette
+from utils.config_loader import config
+from utils.tenants import run_in_context
+
+# 每次运行都会变化的字段，对比输出时忽略
+VOLATILE_FIELDS = ('analysis_id', 'total_latency', 'stage_stats', 'pipeline')
+
+# 每个用例最多列出的差异路径数
+MAX_DIFFS = 10
+
+
+def load_cases(path: str) -> List[Dict[str, str]]:
+    """读取用例文件"""
+    cases = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for position, line in enumerate(f):
+            if line.strip():
+                item = json.loads(line)
+                cases.append({
+                    "id": str(item.get('id', position)),
+                    "job_description": item.get('job_description', ''),
+                    "exploration_direction": item.get('exploration_direction', ''),
+                    "resume": item.get('resume', ''),
+                })
+    return cases
+
+
+def stable_view(result: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉每次运行都会变化的字段后的分析结果"""
+    if not result.get('success'):
+        return {"success": False, "message": result.get('message')}
+    data = {key: value for key, value in (result.get('data') or {}).items() if key not in VOLATILE_FIELDS}
+    return {"success": True, "data": data}
+
+
+def diff_paths(expected: Any, actual: Any, path: str = '', limit: int = MAX_DIFFS) -> List[str]:
+    """列出两个JSON值不同的路径（最多 limit 条）"""
+    if type(expected) is not type(actual):
+        return [path or '.']
+    if isinstance(expected, dict):
+        diffs = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            if key not in expected or key not in actual:
+                diffs.append(f"{path}.{key}")
+            else:
+                diffs.extend(diff_paths(expected[key], actual[key], f"{path}.{key}", limit - len(diffs)))
+            if len(diffs) >= limit:
+                return diffs[:limit]
+        return diffs
+    if isinstance(expected, list):
+        if len(expected) != len(actual):
+            return [f"{path}[len {len(expected)} -> {len(actual)}]"]
+        diffs = []
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            diffs.extend(diff_paths(a, b, f"{path}[{i}]", limit - len(diffs)))
+            if len(diffs) >= limit:
+                return diffs[:limit]
+        return diffs
+    return [] if expected == actual else [path or '.']
+
+
+def run_cases(cases: List[Dict[str, str]], max_workers: int = 4) -> List[Dict[str, Any]]:
+    """
+    分析所有用例
+
+    Returns:
+        [{"id", "result", "seconds"}]
+    """
+    def run(case):
+        start = time.perf_counter()
+        try:
+            result = analyze(case['job_description'], case['exploration_direction'], case['resume'])
+        except Exception as e:
+            result = {"success": False, "message": str(e)}
+        return {"id": case['id'], "result": result, "seconds": time.perf_counter() - start}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(run_in_context(run), cases))
+
+
+def timing_summary(outcomes: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    seconds = sorted(outcome['seconds'] for outcome in outcomes)
+    if not seconds:
+        return {"cases": 0}
+    return {
+        "cases": len(seconds),
+        "succeeded": sum(1 for outcome in outcomes if outcome['result'].get('success')),
+        "wall_seconds": round(wall_seconds, 3),
+        "case_ms_p50": round(statistics.median(seconds) * 1000, 2),
+        "case_ms_p90": round(seconds[min(len(seconds) - 1, int(len(seconds) * 0.9))] * 1000, 2),
+        "case_ms_max": round(seconds[-1] * 1000, 2),
+    }
+
+
+def compare_with_baseline(outcomes: List[Dict[str, Any]], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    与基线输出对比
+
+    Returns:
+        一致、不一致和基线中缺失的用例数，以及不一致用例的差异路径
+    """
+    changed = {}
+    missing = []
+    for outcome in outcomes:
+        if outcome['id'] not in baseline:
+            missing.append(outcome['id'])
+            continue
+        diffs = diff_paths(baseline[outcome['id']], stable_view(outcome['result']))
+        if diffs:
+            changed[outcome['id']] = diffs
+    return {
+        "stable": len(outcomes) - len(changed) - len(missing),
+        "changed": len(changed),
+        "missing_from_baseline": missing,
+        "diffs": changed,
+    }
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return {item['id']: item['output'] for item in map(json.loads, filter(str.strip, f))}
+
+
+def write_baseline(path: str, outcomes: List[Dict[str, Any]]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for outcome in outcomes:
+            f.write(json.dumps({"id": outcome['id'], "output": stable_view(outcome['result'])}, ensure_ascii=False) + '\n')
+
+
+def run_regression(
+    mode: str,
+    cassette_path: str,
+    cases: List[Dict[str, str]],
+    baseline_path: Optional[str] = None,
+    max_workers: int = 4
+) -> Dict[str, Any]:
+    """
+    录制或回放一组用例
+
+    Args:
+        mode: record / replay
+        cassette_path: 录制带文件
+        baseline_path: record 模式写入基线输出，replay 模式与之对比（不传时只统计耗时）
+
+    Returns:
+        汇总结果
+    """
+    cassette = Cassette(cassette_path, mode)
+    use_cassette(cassette)
+    try:
+        started = time.perf_counter()
+        outcomes = run_cases(cases, max_workers)
+        wall_seconds = time.perf_counter() - started
+    finally:
+        use_cassette(None)
+
+    summary = {
+        "mode": mode,
+        "timing": timing_summary(outcomes, wall_seconds),
+        "cassette": cassette.stats(),
+        "failures": {
+            outcome['id']: outcome['result'].get('message')
+            for outcome in outcomes if not outcome['result'].get('success')
+        },
+    }
+    if baseline_path:
+        if mode == 'record':
+            write_baseline(baseline_path, outcomes)
+            summary['baseline'] = baseline_path
+        else:
+            summary['comparison'] = compare_with_baseline(outcomes, load_baseline(baseline_path))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='录制/回放回归测试')
+    parser.add_argument('mode', choices=('record', 'replay'), help='record：调用真实接口并录制；replay：从录制带回放')
+    parser.add_argument('--cassette', required=True, help='录制带文件（.jsonl）')
+    parser.add_argument('--cases', default=None, help='用例文件（.jsonl）')
+    parser.add_argument('--jd', default=None, help='职位描述文件（与 --resumes 一起使用）')
+    parser.add_argument('--direction', default='', help='探索方向（与 --resumes 一起使用）')
+    parser.add_argument('--resumes', default=None, help='简历目录（.txt）或 .jsonl 文件')
+    parser.add_argument('--baseline', default=None, help='基线输出文件：record 模式写入，replay 模式对比')
+    parser.add_argument('--workers', type=int, default=4, help='同时分析的用例数')
+    parser.add_argument('--use-cache', action='store_true', help='使用共享缓存（默认关闭，保证每次运行发出相同的请求）')
+    parser.add_argument('--keep-history', action='store_true', help='把结果写入历史结果库和简历语料库（默认不写入）')
+    args = parser.parse_args()
+
+    if args.cases:
+        cases = load_cases(args.cases)
+    elif args.jd and args.resumes:
+        with open(args.jd, 'r', encoding='utf-8') as f:
+            job_description = f.read()
+        cases = [
+            {"id": resume_id, "job_description": job_description,
+             "exploration_direction": args.direction, "resume": text}
+            for resume_id, text in load_resumes(args.resumes)
+        ]
+    else:
+        parser.error('需要 --cases，或同时指定 --jd 和 --resumes')
+
+    if not args.use_cache:
+        get_cache().enabled = False
+    if not args.keep_history:
+        for section in ('analysis_store', 'corpus'):
+            settings = config.get(section)
+            if isinstance(settings, dict):
+                settings['enabled'] = False
+
+    summary = run_regression(args.mode, args.cassette, cases, args.baseline, args.workers)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+报告模式A/B对比
+功能：对历史结果库中的分析，复用已保存的简历解析和检查项结果，分别用 llm 模式（整份报告由模型生成）
+和 hybrid 模式（结构化部分按评分公式生成，模型只写概况和推荐意见）重新生成报告，
+对比耗时、token用量、匹配分数和推荐意见的一致率
+
+用法：
+    python -m pipeline.report_ab [--limit 20] [--workers 2] [--no-cache]
+"""
+import argparse
+import json
+import statistics
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from pipeline.analyzer import generate_report
+from pipeline.registry import CheckRegistry, registry as default_registry
+from storage.analysis_store import get_analysis_store
+from utils.cache import get_cache
+
+MODES = ('llm', 'hybrid')
+
+
+def compare_analysis(payload: Dict[str, Any], registry: CheckRegistry) -> Optional[Dict[str, Any]]:
+    """
+    用两种模式为一次历史分析生成报告
+
+    Returns:
+        模式 -> {"latency", "prompt_tokens", "completion_tokens", "match_score", "recommendation"}；
+        任一模式失败时为None
+    """
+    data = payload['data']
+    resume_data = data.get('resume_info') or {}
+    check_results = {spec.name: data.get(spec.result_key) for spec in registry.all()}
+
+    outcome = {}
+    for mode in MODES:
+        stage_stats: Dict[str, Dict[str, Any]] = {}
+        report_result = generate_report(
+            stage_stats, payload['job_description'], payload['exploration_direction'],
+            resume_data, check_results, registry, mode
+        )
+        if not report_result['success']:
+            print(f"✗ {payload['analysis_id']} {mode} 模式报告生成失败: {report_result['message']}")
+            return None
+        report = report_result['data']
+        outcome[mode] = dict(
+            stage_stats['report'],
+            match_score=report.get('match_score'),
+            recommendation=report.get('final_recommendation'),
+        )
+    return outcome
+
+
+def _mode_summary(outcomes: List[Dict[str, Any]], mode: str) -> Dict[str, Any]:
+    latencies = [outcome[mode]['latency'] for outcome in outcomes]
+    completion = [outcome[mode].get('completion_tokens', 0) for outcome in outcomes]
+    prompt = [outcome[mode].get('prompt_tokens', 0) for outcome in outcomes]
+    return {
+        "latency_s_p50": round(statistics.median(latencies), 3),
+        "latency_s_mean": round(statistics.mean(latencies), 3),
+        "prompt_tokens_mean": round(statistics.mean(prompt), 1),
+        "completion_tokens_mean": round(statistics.mean(completion), 1),
+        "recommendations": dict(Counter(outcome[mode]['recommendation'] for outcome in outcomes)),
+    }
+
+
+def summarize(outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """汇总对比结果"""
+    if not outcomes:
+        return {"compared": 0}
+
+    agreed = sum(outcome['llm']['recommendation'] == outcome['hybrid']['recommendation'] for outcome in outcomes)
+    score_diffs = []
+    for outcome in outcomes:
+        try:
+            score_diffs.append(abs(float(outcome['llm']['match_score']) - float(outcome['hybrid']['match_score'])))
+        except (TypeError, ValueError):
+            pass
+
+    summary = {
+        "compared": len(outcomes),
+        "recommendation_agreement": round(agreed / len(outcomes), 4),
+        "match_score_abs_diff_mean": round(statistics.mean(score_diffs), 2) if score_diffs else None,
+        "disagreements": dict(Counter(
+            f"{outcome['llm']['recommendation']} -> {outcome['hybrid']['recommendation']}"
+            for outcome in outcomes
+            if outcome['llm']['recommendation'] != outcome['hybrid']['recommendation']
+        )),
+    }
+    for mode in MODES:
+        summary[mode] = _mode_summary(outcomes, mode)
+
+    llm_latency = summary['llm']['latency_s_mean']
+    if llm_latency:
+        summary['latency_saved_ratio'] = round(1 - summary['hybrid']['latency_s_mean'] / llm_latency, 3)
+    llm_completion = summary['llm']['completion_tokens_mean']
+    if llm_completion:
+        summary['completion_tokens_saved_ratio'] = round(
+            1 - summary['hybrid']['completion_tokens_mean'] / llm_completion, 3
+        )
+    return summary
+
+
+def run_ab(limit: int = 20, max_workers: int = 2, registry: CheckRegistry = None) -> Dict[str, Any]:
+    """
+    对最多 limit 次历史分析执行A/B对比
+
+    Returns:
+        汇总结果
+    """
+    registry = registry or default_registry
+    store = get_analysis_store()
+    if store is None:
+        raise RuntimeError("历史结果库未启用（analysis_store.enabled）")
+
+    payloads = []
+    for payload in store.iter_payloads():
+        if (payload.get('data') or {}).get('resume_info'):
+            payloads.append(payload)
+        if len(payloads) >= limit:
+            break
+
+    def run(payload):
+        try:
+            return compare_analysis(payload, registry)
+        except Exception as e:
+            print(f"✗ {payload['analysis_id']} 对比失败: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        outcomes = [outcome for outcome in executor.map(run, payloads) if outcome is not None]
+
+    summary = summarize(outcomes)
+    summary['failed'] = len(payloads) - len(outcomes)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="报告模式A/B对比")
+    parser.add_argument('--limit', type=int, default=20, help='参与对比的历史分析数')
+    parser.add_argument('--workers', type=int, default=2, help='并发数')
+    parser.add_argument('--no-cache', action='store_true', help='不使用模型结果缓存（否则命中缓存的调用耗时和token不具可比性）')
+    args = parser.parse_args()
+
+    if args.no_cache:
+        get_cache().enabled = False
+
+    print(json.dumps(run_ab(args.limit, args.workers), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+解析与检查重叠执行模块
+功能：简历解析以流式返回，工作经历的时间线（公司、职位、起止时间）和个人信息一旦解析完成就提前写入检查上下文，
+检查项不必等待包含长篇工作描述的完整解析结果。
+
+时间线是对工作经历的推测：解析结束后与最终的工作经历比较，不一致时用最终结果重新执行检查项
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from pipeline.dag import ContextFeed, run_checks
+from pipeline.registry import CheckRegistry
+from utils.metrics import metrics
+from utils.tenants import run_in_context
+
+# 检查项使用的简历字段
+CONTEXT_FIELDS = ('personal_info', 'work_experience')
+
+# 流式字段 -> 提前写入的上下文字段
+EARLY_FIELDS = {
+    'timeline': 'work_experience',
+    'personal_info': 'personal_info',
+}
+
+# 时间线中检查项实际使用的工作经历字段
+TIMELINE_FIELDS = ('company', 'position', 'start_date', 'end_date')
+
+
+class ParseFailed(Exception):
+    """简历解析失败，中止已经开始的检查"""
+
+
+def timeline_of(work_experience: Optional[List[Dict[str, Any]]]) -> Tuple:
+    """工作经历在检查项关心的字段上的投影"""
+    return tuple(
+        tuple(exp.get(field) for field in TIMELINE_FIELDS)
+        for exp in work_experience or []
+        if isinstance(exp, dict)
+    )
+
+
+# 上下文字段 -> 判断提前写入的值与最终结果是否一致时比较的投影
+PROJECTIONS: Dict[str, Callable[[Any], Any]] = {
+    'work_experience': timeline_of,
+    'personal_info': lambda info: (info or {}).get('name'),
+}
+
+
+def context_of(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """从解析结果中取出检查上下文"""
+    return {
+        'personal_info': resume_data.get('personal_info', {}),
+        'work_experience': resume_data.get('work_experience', []),
+    }
+
+
+def parse_and_check(
+    parse: Callable[[Optional[Callable[[str, Any], None]]], Dict[str, Any]],
+    names: List[str],
+    registry: CheckRegistry,
+    max_workers: int = 3,
+    stage_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    stream: bool = True
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    解析简历并执行检查项
+
+    Args:
+        parse: 解析函数，参数为流式回调 on_member(键, 值)（不流式时为None），返回 ResumeParser.process 的结果
+        names: 需要执行的检查项
+        registry: 检查项注册表
+        max_workers: 检查项最大并发数
+        stage_stats: 传入时写入检查项的耗时和token用量
+        stream: 是否流式解析并提前启动检查项（关闭时先解析完再检查）
+
+    Returns:
+        (解析结果, 检查项名称 -> 结果数据（解析失败时为None）, 流水线信息)
+
+    Raises:
+        CheckFailedError: 任一检查项抛出异常
+    """
+    if not stream:
+        parse_result = parse(None)
+        if not parse_result['success']:
+            return parse_result, None, {"stream_parse": False}
+        context = context_of(parse_result['data'])
+        return parse_result, run_checks(names, context, registry, max_workers, stage_stats), {"stream_parse": False}
+
+    feed = ContextFeed()
+    early: Dict[str, Any] = {}
+
+    def on_member(key: str, value: Any):
+        field = EARLY_FIELDS.get(key)
+        if field is not None and field not in early:
+            early[field] = value
+            feed.put(field, value)
+
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        checks = runner.submit(run_in_context(run_checks), names, {}, registry, max_workers, stage_stats, feed)
+        try:
+            parse_result = parse(on_member)
+        except BaseException as e:
+            feed.close(ParseFailed(str(e)))
+            raise
+
+        if not parse_result['success']:
+            feed.close(ParseFailed(parse_result['message']))
+            try:
+                checks.result()
+            except ParseFailed:
+                pass
+            return parse_result, None, {"stream_parse": True, "early_fields": list(early)}
+
+        final = context_of(parse_result['data'])
+        for field, value in final.items():
+            if field not in early:
+                feed.put(field, value)
+        feed.close()
+        check_results = checks.result()
+
+    # 提前写入的字段与最终结果不一致时，之前的检查结果作废
+    mismatched = [
+        field for field, value in early.items()
+        if PROJECTIONS[field](value) != PROJECTIONS[field](final[field])
+    ]
+    if mismatched:
+        metrics.incr('pipeline_speculation_misses')
+        print(f"提前写入的字段 {mismatched} 与最终解析结果不一致，按最终结果重新检查")
+        check_results = run_checks(names, final, registry, max_workers, stage_stats)
+    elif early:
+        metrics.incr('pipeline_speculation_hits')
+
+    return parse_result, check_results, {
+        "stream_parse": True,
+        "early_fields": list(early),
+        "speculation_miss": bool(mismatched),
+    }
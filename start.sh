@@ -29,4 +29,4 @@ fi
 # 启动服务
 echo "启动服务..."
 echo "=================================================="
-python main.py
+python main.py "$@"
@@ -0,0 +1,766 @@
+"""
+历史分析结果库
+功能：持久化每次 /api/analyze 的结果。匹配分数、推荐结论、风险等级、各阶段耗时和token数等
+扁平字段按列存储为定长数组文件，聚合查询只扫描需要的列；完整结果压缩后单独存放在 SQLite 中。
+
+存储结构：
+    columns/<列名>.col   定长列文件（第 N 行即第 N 次分析）
+    analyses.sqlite3     完整结果（payloads）与字符串列的字典编码（dictionary）
+"""
+import fcntl
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+# NumPy 为可选依赖，第一次扫描列时才导入，缺失时使用纯 Python 扫描
+from index.bm25 import load_numpy
+
+# 各阶段名称，与 stage_stats 中的键一致
+STAGES = ('resume_parser', 'big_company', 'ipo', 'negative', 'report')
+
+# 列名 -> array 类型码
+COLUMNS: List[Tuple[str, str]] = [
+    ('created_at', 'd'),
+    ('jd', 'i'),
+    ('match_score', 'f'),
+    ('recommendation', 'h'),
+    ('risk_level', 'h'),
+    ('has_big_company_experience', 'b'),
+    ('has_ipo_experience', 'b'),
+    ('has_negative_info', 'b'),
+    ('total_latency', 'f'),
+] + [(f'latency_{stage}', 'f') for stage in STAGES] \
+  + [(f'tokens_{stage}', 'i') for stage in STAGES]
+
+COLUMN_TYPES = dict(COLUMNS)
+
+# 以字典编码存储的字符串列
+DICTIONARY_COLUMNS = ('jd', 'recommendation', 'risk_level')
+
+# 布尔列中表示"未评估"（检查项被跳过或失败）的取值
+UNKNOWN = -1
+
+REJECT_RECOMMENDATION = '不推荐'
+
+
+def jd_hash(job_description: str) -> str:
+    """职位描述的归一化哈希，用于按职位聚合"""
+    normalized = ' '.join((job_description or '').split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def _flag(value: Any) -> int:
+    if isinstance(value, bool):
+        return int(value)
+    return UNKNOWN
+
+
+def _section(data: Dict[str, Any], key: str) -> Dict[str, Any]:
+    section = data.get(key)
+    return section if isinstance(section, dict) else {}
+
+
+def extract_row(job_description: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    从分析结果中提取扁平字段
+
+    Args:
+        job_description: 职位描述
+        data: /api/analyze 响应中的 data
+
+    Returns:
+        列名 -> 原始值（字典编码列为字符串）
+    """
+    report = _section(data, 'final_report')
+    negative = _section(data, 'negative_analysis')
+    stage_stats = data.get('stage_stats') or {}
+
+    score = report.get('match_score')
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        score = math.nan
+
+    row = {
+        'created_at': time.time(),
+        'jd': jd_hash(job_description),
+        'match_score': score,
+        'recommendation': str(report.get('final_recommendation', '') or '').strip(),
+        'risk_level': str(negative.get('risk_level', '') or '').strip().lower(),
+        'has_big_company_experience': _flag(_section(data, 'big_company_analysis').get('has_big_company_experience')),
+        'has_ipo_experience': _flag(_section(data, 'ipo_analysis').get('has_ipo_experience')),
+        'has_negative_info': _flag(negative.get('has_negative_info')),
+        'total_latency': float(data.get('total_latency') or 0.0),
+    }
+    for stage in STAGES:
+        stats = stage_stats.get(stage) or {}
+        row[f'latency_{stage}'] = float(stats.get('latency') or 0.0)
+        row[f'tokens_{stage}'] = int(stats.get('prompt_tokens', 0) or 0) + int(stats.get('completion_tokens', 0) or 0)
+    return row
+
+
+def parse_employee_count(value: Any) -> Optional[int]:
+    """
+    解析员工人数估计，例如 "约10万人"、"5000+"、"1-5万"、"200,000"
+
+    Returns:
+        人数（取第一个数字），无法解析时返回 None
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    match = re.search(r'(\d+(?:\.\d+)?)\s*(万|千|k|w)?', str(value or '').replace(',', '').lower())
+    if not match:
+        return None
+    number = float(match.group(1))
+    unit = match.group(2)
+    if unit is None:
+        # "1-5万" 这类区间写法，单位写在第二个数字后面
+        tail = re.search(r'^\d+(?:\.\d+)?\s*[-~至到]\s*\d+(?:\.\d+)?\s*(万|千|k|w)', str(value).replace(',', '').lower())
+        unit = tail.group(1) if tail else None
+    multiplier = {'万': 10000, 'w': 10000, '千': 1000, 'k': 1000}.get(unit, 1)
+    return int(number * multiplier)
+
+
+def extract_companies(data: Dict[str, Any]) -> List[Tuple[str, str, int, Optional[int], Optional[int]]]:
+    """
+    提取一次分析涉及的公司，以及大厂判断给出的员工人数估计和是否上市
+
+    同一公司的不同写法（工作经历中的注册名、大厂判断中的规范名称）按公司识别器的缓存键合并
+
+    Returns:
+        [(归一化公司名, 公司键（规范ID或 "name:归一化名称"）, 是否经过大厂判断, 员工人数, 是否上市)]
+    """
+    from index.company_resolver import get_resolver
+    from index.corpus import normalize_company
+
+    resolver = get_resolver()
+    companies = {}
+    for job in _section(data, 'resume_info').get('work_experience', []) or []:
+        name = normalize_company(job.get('company')) if isinstance(job, dict) else ''
+        if name:
+            companies.setdefault(resolver.company_key(job['company']), (name, 0, None, None))
+    for entry in _section(data, 'big_company_analysis').get('big_companies', []) or []:
+        name = normalize_company(entry.get('company_name')) if isinstance(entry, dict) else ''
+        if name:
+            key = resolver.company_key(entry['company_name'])
+            listed = entry.get('is_listed')
+            companies[key] = (
+                companies.get(key, (name,))[0],
+                1,
+                parse_employee_count(entry.get('employee_count')),
+                int(listed) if isinstance(listed, bool) else None
+            )
+    return [(name, key, *values) for key, (name, *values) in companies.items()]
+
+
+class AnalysisStore:
+    """历史分析结果库"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 结果库目录
+        """
+        self.path = path
+        self.columns_path = os.path.join(path, 'columns')
+        os.makedirs(self.columns_path, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connect()
+
+    # ------------------------------------------------------------------
+    # 底层存储
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（按进程和线程分别建立）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(os.path.join(self.path, 'analyses.sqlite3'), timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS payloads (
+                row_id INTEGER PRIMARY KEY,
+                analysis_id TEXT NOT NULL UNIQUE,
+                created_at REAL NOT NULL,
+                payload BLOB NOT NULL
+            )"""
+        )
+        # 各阶段依赖的配置指纹，用于配置变更后找出需要重新评估的分析
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS stage_inputs (
+                analysis_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (analysis_id, stage)
+            )"""
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stage_inputs_fingerprint ON stage_inputs (stage, fingerprint)"
+        )
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS stage_configs (
+                fingerprint TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                config TEXT NOT NULL
+            )"""
+        )
+        # 每次分析涉及的公司及大厂判断时的员工人数估计、是否上市
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS analysis_companies (
+                analysis_id TEXT NOT NULL,
+                company TEXT NOT NULL,
+                judged INTEGER NOT NULL,
+                employee_count INTEGER,
+                is_listed INTEGER,
+                company_id TEXT
+            )"""
+        )
+        # 早期的结果库没有 company_id 列，补上后由 backfill_company_ids 按完整结果回填
+        if 'company_id' not in {row[1] for row in conn.execute("PRAGMA table_info(analysis_companies)")}:
+            conn.execute("ALTER TABLE analysis_companies ADD COLUMN company_id TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_company ON analysis_companies (company)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_company_id ON analysis_companies (company_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_analysis ON analysis_companies (analysis_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_employee_count ON analysis_companies (employee_count)")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS dictionary (
+                column_name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                code INTEGER NOT NULL,
+                PRIMARY KEY (column_name, value)
+            )"""
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _column_file(self, name: str) -> str:
+        return os.path.join(self.columns_path, f"{name}.col")
+
+    def _file_lock(self):
+        """跨进程写锁"""
+        store = self
+
+        class _Lock:
+            def __enter__(self):
+                store._lock.acquire()
+                self.handle = open(os.path.join(store.path, '.lock'), 'a+')
+                fcntl.flock(self.handle, fcntl.LOCK_EX)
+                return self
+
+            def __exit__(self, *exc):
+                fcntl.flock(self.handle, fcntl.LOCK_UN)
+                self.handle.close()
+                store._lock.release()
+
+        return _Lock()
+
+    def _encode(self, column: str, value: str) -> int:
+        """字符串值的字典编码（需在写锁内调用）"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT code FROM dictionary WHERE column_name = ? AND value = ?", (column, value)
+        ).fetchone()
+        if row:
+            return row[0]
+        code = conn.execute(
+            "SELECT COALESCE(MAX(code) + 1, 0) FROM dictionary WHERE column_name = ?", (column,)
+        ).fetchone()[0]
+        conn.execute(
+            "INSERT INTO dictionary (column_name, value, code) VALUES (?, ?, ?)", (column, value, code)
+        )
+        return code
+
+    def dictionary(self, column: str) -> Dict[str, int]:
+        """读取某个字典编码列的 值 -> 编码 映射"""
+        rows = self._connect().execute(
+            "SELECT value, code FROM dictionary WHERE column_name = ?", (column,)
+        ).fetchall()
+        return dict(rows)
+
+    def row_count(self) -> int:
+        """已写入的行数（以最短的列为准，忽略写入中途失败的残留）"""
+        counts = []
+        for name, typecode in COLUMNS:
+            try:
+                size = os.path.getsize(self._column_file(name))
+            except FileNotFoundError:
+                return 0
+            counts.append(size // array(typecode).itemsize)
+        return min(counts)
+
+    def _encode_row(self, row: Dict[str, Any], memo: Optional[Dict[Tuple[str, str], int]] = None) -> Dict[str, Any]:
+        """对字典编码列编码（memo 用于批量写入时复用同一把锁内的编码结果）"""
+        encoded = dict(row)
+        for column in DICTIONARY_COLUMNS:
+            key = (column, str(row[column]))
+            if memo is not None and key in memo:
+                encoded[column] = memo[key]
+                continue
+            encoded[column] = self._encode(*key)
+            if memo is not None:
+                memo[key] = encoded[column]
+        return encoded
+
+    def _write_row(self, row_id: int, encoded: Dict[str, Any]):
+        """在指定行写入所有列（row_id 等于行数时为追加）"""
+        for name, typecode in COLUMNS:
+            file_path = self._column_file(name)
+            with open(file_path, 'r+b' if os.path.exists(file_path) else 'wb') as f:
+                f.seek(row_id * array(typecode).itemsize)
+                array(typecode, [encoded[name]]).tofile(f)
+
+    def _index_analysis(
+        self,
+        conn: sqlite3.Connection,
+        analysis_id: str,
+        data: Dict[str, Any],
+        stage_inputs: Optional[Dict[str, Dict[str, Any]]]
+    ):
+        """写入阶段配置指纹和公司索引（需在事务内调用）"""
+        conn.execute("DELETE FROM analysis_companies WHERE analysis_id = ?", (analysis_id,))
+        conn.executemany(
+            "INSERT INTO analysis_companies (analysis_id, company, company_id, judged, employee_count, is_listed) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(analysis_id, *entry) for entry in extract_companies(data)]
+        )
+
+        for stage, inputs in (stage_inputs or {}).items():
+            conn.execute(
+                "INSERT OR IGNORE INTO stage_configs (fingerprint, stage, config) VALUES (?, ?, ?)",
+                (inputs['fingerprint'], stage, json.dumps(inputs['config'], ensure_ascii=False, sort_keys=True))
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO stage_inputs (analysis_id, stage, fingerprint) VALUES (?, ?, ?)",
+                (analysis_id, stage, inputs['fingerprint'])
+            )
+
+    # ------------------------------------------------------------------
+    # 写入与读取
+    # ------------------------------------------------------------------
+
+    def save(
+        self,
+        job_description: str,
+        exploration_direction: str,
+        data: Dict[str, Any],
+        stage_inputs: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> str:
+        """
+        保存一次分析结果
+
+        Args:
+            job_description: 职位描述
+            exploration_direction: 探索方向
+            data: /api/analyze 响应中的 data
+            stage_inputs: 各阶段依赖的配置 {阶段: {"config": ..., "fingerprint": ...}}
+
+        Returns:
+            分析ID
+        """
+        return self.save_many([(job_description, exploration_direction, data, stage_inputs)])[0]
+
+    def save_many(self, items: List[Tuple]) -> List[str]:
+        """
+        批量保存分析结果（一次加锁、每列一次追加写，也用于历史数据导入）
+
+        Args:
+            items: [(职位描述, 探索方向, data)] 或 [(职位描述, 探索方向, data, stage_inputs)]
+
+        Returns:
+            分析ID列表
+        """
+        ids, rows, payloads, indexed = [], [], [], []
+        for item in items:
+            job_description, exploration_direction, data = item[:3]
+            stage_inputs = item[3] if len(item) > 3 else None
+            analysis_id = uuid.uuid4().hex
+            row = extract_row(job_description, data)
+            ids.append(analysis_id)
+            rows.append(row)
+            indexed.append((analysis_id, data, stage_inputs))
+            payloads.append(zlib.compress(json.dumps({
+                "analysis_id": analysis_id,
+                "job_description": job_description,
+                "exploration_direction": exploration_direction,
+                "data": data,
+                "stage_inputs": stage_inputs or {},
+            }, ensure_ascii=False).encode('utf-8')))
+
+        with self._file_lock():
+            start = self.row_count()
+            memo: Dict[Tuple[str, str], int] = {}
+            encoded = [self._encode_row(row, memo) for row in rows]
+            for name, typecode in COLUMNS:
+                with open(self._column_file(name), 'r+b' if os.path.exists(self._column_file(name)) else 'wb') as f:
+                    f.seek(start * array(typecode).itemsize)
+                    array(typecode, [row[name] for row in encoded]).tofile(f)
+            conn = self._connect()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO payloads (row_id, analysis_id, created_at, payload) VALUES (?, ?, ?, ?)",
+                [
+                    (start + i, ids[i], rows[i]['created_at'], payloads[i])
+                    for i in range(len(ids))
+                ]
+            )
+            for analysis_id, data, stage_inputs in indexed:
+                self._index_analysis(conn, analysis_id, data, stage_inputs)
+            conn.execute("COMMIT")
+        return ids
+
+    def update(
+        self,
+        analysis_id: str,
+        data: Dict[str, Any],
+        stage_inputs: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> bool:
+        """
+        原地更新一次分析的结果（列存储为定长格式，直接覆盖对应行）
+
+        Args:
+            analysis_id: 分析ID
+            data: 新的结果
+            stage_inputs: 重新执行的阶段依赖的配置，与已有记录合并
+
+        Returns:
+            是否找到并更新
+        """
+        with self._file_lock():
+            conn = self._connect()
+            found = conn.execute(
+                "SELECT row_id, payload FROM payloads WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+            if not found:
+                return False
+            row_id, blob = found
+            payload = json.loads(zlib.decompress(blob))
+            payload['data'] = data
+            payload['stage_inputs'] = dict(payload.get('stage_inputs') or {}, **(stage_inputs or {}))
+
+            row = extract_row(payload['job_description'], data)
+            row['created_at'] = self.read_column('created_at', start=row_id, stop=row_id + 1)[0]
+            self._write_row(row_id, self._encode_row(row))
+            conn.execute("BEGIN")
+            conn.execute(
+                "UPDATE payloads SET payload = ? WHERE row_id = ?",
+                (zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8')), row_id)
+            )
+            self._index_analysis(conn, analysis_id, data, stage_inputs)
+            conn.execute("COMMIT")
+        return True
+
+    # ------------------------------------------------------------------
+    # 配置变更影响分析
+    # ------------------------------------------------------------------
+
+    def stale_configs(self, stage: str, current_fingerprint: str) -> List[Tuple[str, Dict[str, Any], int]]:
+        """
+        找出某个阶段仍在使用旧配置的分析所对应的配置
+
+        Returns:
+            [(旧配置指纹, 旧配置, 使用该配置的分析数)]
+        """
+        rows = self._connect().execute(
+            """SELECT c.fingerprint, c.config, COUNT(*)
+               FROM stage_configs c JOIN stage_inputs s
+                 ON s.stage = c.stage AND s.fingerprint = c.fingerprint
+               WHERE c.stage = ? AND c.fingerprint != ?
+               GROUP BY c.fingerprint, c.config""",
+            (stage, current_fingerprint)
+        ).fetchall()
+        return [(fingerprint, json.loads(config_text), count) for fingerprint, config_text, count in rows]
+
+    def backfill_company_ids(self) -> int:
+        """
+        为早期写入、公司索引中还没有公司键的分析按完整结果重建公司索引
+
+        Returns:
+            重建的分析数
+        """
+        conn = self._connect()
+        analysis_ids = [row[0] for row in conn.execute(
+            "SELECT DISTINCT analysis_id FROM analysis_companies WHERE company_id IS NULL"
+        ).fetchall()]
+        if not analysis_ids:
+            return 0
+        with self._file_lock():
+            conn.execute("BEGIN")
+            for payload in self.iter_payloads(analysis_ids):
+                self._index_analysis(conn, payload['analysis_id'], payload['data'], None)
+            conn.execute("COMMIT")
+        print(f"✓ 已为 {len(analysis_ids)} 个分析回填公司键")
+        return len(analysis_ids)
+
+    def unresolved_company_keys(self, stage: str, fingerprint: str) -> List[str]:
+        """旧配置下公司识别器无法识别的公司键（"name:归一化名称"）"""
+        from index.company_resolver import UNRESOLVED_PREFIX
+
+        self.backfill_company_ids()
+        rows = self._connect().execute(
+            """SELECT DISTINCT a.company_id FROM analysis_companies a
+               JOIN stage_inputs s ON s.analysis_id = a.analysis_id
+               WHERE a.company_id >= ? AND a.company_id < ? AND s.stage = ? AND s.fingerprint = ?""",
+            (UNRESOLVED_PREFIX, UNRESOLVED_PREFIX + '\U0010ffff', stage, fingerprint)
+        ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def find_by_companies(self, stage: str, fingerprint: str, company_ids: List[str]) -> List[str]:
+        """旧配置下、工作经历中有给定公司（按公司识别器的缓存键）的分析"""
+        self.backfill_company_ids()
+        conn = self._connect()
+        found = set()
+        for company_id in company_ids:
+            rows = conn.execute(
+                """SELECT DISTINCT a.analysis_id FROM analysis_companies a
+                   JOIN stage_inputs s ON s.analysis_id = a.analysis_id
+                   WHERE a.company_id = ? AND s.stage = ? AND s.fingerprint = ?""",
+                (company_id, stage, fingerprint)
+            ).fetchall()
+            found.update(row[0] for row in rows)
+        return sorted(found)
+
+    def find_by_employee_count(self, stage: str, fingerprint: str, low: int, high: Optional[int] = None,
+                               unlisted_only: bool = False) -> List[str]:
+        """
+        旧配置下、有经过大厂判断的公司员工人数落在 [low, high) 或无法解析的分析
+
+        Args:
+            unlisted_only: 只看未上市或上市情况未知的公司
+        """
+        sql = """SELECT DISTINCT a.analysis_id FROM analysis_companies a
+                 JOIN stage_inputs s ON s.analysis_id = a.analysis_id
+                 WHERE s.stage = ? AND s.fingerprint = ? AND a.judged = 1
+                   AND (a.employee_count IS NULL OR (a.employee_count >= ? AND a.employee_count < ?))"""
+        if unlisted_only:
+            sql += " AND (a.is_listed IS NULL OR a.is_listed = 0)"
+        high = high if high is not None else 2 ** 62
+        rows = self._connect().execute(sql, (stage, fingerprint, low, high)).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def find_by_fingerprint(self, stage: str, fingerprint: str) -> List[str]:
+        """使用某个配置指纹的全部分析"""
+        rows = self._connect().execute(
+            "SELECT analysis_id FROM stage_inputs WHERE stage = ? AND fingerprint = ?",
+            (stage, fingerprint)
+        ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def migrate_fingerprint(self, stage: str, old: str, new: str, config: Dict[str, Any],
+                            exclude: Optional[List[str]] = None) -> int:
+        """
+        将仍使用旧配置指纹的分析标记为新指纹
+
+        用于重新评估之后：未受配置变更影响的分析结论不变，只需更新指纹记录
+
+        Args:
+            exclude: 不迁移的分析ID（重新评估失败或尚未处理的分析）
+
+        Returns:
+            迁移的分析数
+        """
+        conn = self._connect()
+        conn.execute("BEGIN")
+        conn.execute(
+            "INSERT OR IGNORE INTO stage_configs (fingerprint, stage, config) VALUES (?, ?, ?)",
+            (new, stage, json.dumps(config, ensure_ascii=False, sort_keys=True))
+        )
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS migrate_exclude (analysis_id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM migrate_exclude")
+        conn.executemany(
+            "INSERT OR IGNORE INTO migrate_exclude (analysis_id) VALUES (?)",
+            [(analysis_id,) for analysis_id in exclude or []]
+        )
+        cursor = conn.execute(
+            """UPDATE stage_inputs SET fingerprint = ?
+               WHERE stage = ? AND fingerprint = ?
+                 AND analysis_id NOT IN (SELECT analysis_id FROM migrate_exclude)""",
+            (new, stage, old)
+        )
+        conn.execute("COMMIT")
+        return cursor.rowcount
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """读取一次分析的完整结果"""
+        row = self._connect().execute(
+            "SELECT payload FROM payloads WHERE analysis_id = ?", (analysis_id,)
+        ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def iter_payloads(self, analysis_ids: Optional[List[str]] = None):
+        """遍历完整结果（可指定分析ID）"""
+        conn = self._connect()
+        if analysis_ids is None:
+            cursor = conn.execute("SELECT payload FROM payloads ORDER BY row_id")
+            for (blob,) in cursor:
+                yield json.loads(zlib.decompress(blob))
+            return
+        for analysis_id in analysis_ids:
+            payload = self.get(analysis_id)
+            if payload is not None:
+                yield payload
+
+    def read_column(self, name: str, start: int = 0, stop: Optional[int] = None):
+        """
+        读取一列（安装 NumPy 时返回 ndarray，否则返回 array）
+
+        Args:
+            name: 列名
+            start: 起始行
+            stop: 结束行（不含），默认为当前行数
+        """
+        typecode = COLUMN_TYPES[name]
+        itemsize = array(typecode).itemsize
+        stop = self.row_count() if stop is None else stop
+        count = max(0, stop - start)
+
+        with open(self._column_file(name), 'rb') as f:
+            f.seek(start * itemsize)
+            np = load_numpy()
+            if np is not None:
+                return np.fromfile(f, dtype=np.dtype(typecode), count=count)
+            values = array(typecode)
+            values.frombytes(f.read(count * itemsize))
+            return values
+
+    # ------------------------------------------------------------------
+    # 聚合查询
+    # ------------------------------------------------------------------
+
+    def score_distribution(self, job_description: Optional[str] = None, bins: int = 10) -> Dict[str, Any]:
+        """
+        匹配分数分布
+
+        Args:
+            job_description: 职位描述，传入时只统计该职位的分析结果
+            bins: 直方图分桶数（0~100 均分）
+
+        Returns:
+            数量、均值、分位数与直方图
+        """
+        rows = self.row_count()
+        if rows == 0:
+            return {"count": 0, "histogram": []}
+
+        scores = self.read_column('match_score', stop=rows)
+        jd_code = None
+        if job_description:
+            jd_code = self.dictionary('jd').get(jd_hash(job_description))
+            if jd_code is None:
+                return {"count": 0, "histogram": []}
+        edges = [100 * i / bins for i in range(bins + 1)]
+
+        np = load_numpy()
+        if np is not None:
+            mask = ~np.isnan(scores)
+            if jd_code is not None:
+                mask &= self.read_column('jd', stop=rows) == jd_code
+            selected = scores[mask]
+            if selected.size == 0:
+                return {"count": 0, "histogram": []}
+            counts, _ = np.histogram(np.clip(selected, 0, 100), bins=edges)
+            return {
+                "count": int(selected.size),
+                "mean": round(float(selected.mean()), 2),
+                "p50": round(float(np.percentile(selected, 50)), 2),
+                "p90": round(float(np.percentile(selected, 90)), 2),
+                "histogram": [
+                    {"from": edges[i], "to": edges[i + 1], "count": int(c)}
+                    for i, c in enumerate(counts)
+                ],
+            }
+
+        jds = self.read_column('jd', stop=rows) if jd_code is not None else None
+        selected = sorted(
+            s for i, s in enumerate(scores)
+            if not math.isnan(s) and (jds is None or jds[i] == jd_code)
+        )
+        if not selected:
+            return {"count": 0, "histogram": []}
+        counts = [0] * bins
+        for s in selected:
+            counts[min(bins - 1, max(0, int(s * bins / 100)))] += 1
+        return {
+            "count": len(selected),
+            "mean": round(sum(selected) / len(selected), 2),
+            "p50": round(selected[len(selected) // 2], 2),
+            "p90": round(selected[min(len(selected) - 1, int(len(selected) * 0.9))], 2),
+            "histogram": [
+                {"from": edges[i], "to": edges[i + 1], "count": c}
+                for i, c in enumerate(counts)
+            ],
+        }
+
+    def reject_rate_by_risk_level(self) -> Dict[str, Any]:
+        """
+        按负面舆情风险等级统计"不推荐"比例
+
+        Returns:
+            风险等级 -> {"count": 总数, "rejected": 不推荐数, "reject_rate": 比例}
+        """
+        rows = self.row_count()
+        if rows == 0:
+            return {}
+
+        risk_codes = {code: value or 'unknown' for value, code in self.dictionary('risk_level').items()}
+        reject_code = self.dictionary('recommendation').get(REJECT_RECOMMENDATION, -1)
+        risk = self.read_column('risk_level', stop=rows)
+        recommendation = self.read_column('recommendation', stop=rows)
+
+        np = load_numpy()
+        if np is not None:
+            totals = np.bincount(risk, minlength=len(risk_codes))
+            rejected = np.bincount(risk, weights=(recommendation == reject_code), minlength=len(risk_codes))
+            pairs = [(code, int(totals[code]), int(rejected[code])) for code in range(len(totals))]
+        else:
+            totals: Dict[int, int] = {}
+            rejected: Dict[int, int] = {}
+            for r, rec in zip(risk, recommendation):
+                totals[r] = totals.get(r, 0) + 1
+                if rec == reject_code:
+                    rejected[r] = rejected.get(r, 0) + 1
+            pairs = [(code, totals[code], rejected.get(code, 0)) for code in totals]
+
+        return {
+            risk_codes.get(code, str(code)): {
+                "count": total,
+                "rejected": rejects,
+                "reject_rate": round(rejects / total, 4),
+            }
+            for code, total, rejects in pairs if total
+        }
+
+
+_store_instance = None
+_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> Optional[AnalysisStore]:
+    """获取全局结果库实例（按配置懒加载，未启用时返回 None）"""
+    global _store_instance
+    from utils.config_loader import config
+
+    store_config = config.get('analysis_store', {}) or {}
+    if not store_config.get('enabled', False):
+        return None
+
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                path = store_config.get('path', 'data/analyses')
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+                _store_instance = AnalysisStore(path)
+    return _store_instance
@@ -0,0 +1,391 @@
+"""
+分析任务队列模块
+功能：提交方把分析任务写入共享队列，无状态的 worker 进程（可分布在多台机器上）领取任务执行：
+- 领取任务时获得一个有期限的租约，执行期间定期续约（心跳）
+- 租约过期的任务（worker 崩溃或失联）会被其他 worker 重新领取，超过最大尝试次数后标记为失败
+- 续约、完成和失败都以 (worker, 第几次尝试) 为凭据，租约被收回后原 worker 迟到的结果会被丢弃
+- 任务内有副作用的步骤（写入语料库、历史结果库）通过 run_once 记录在队列中，重试时不会重复执行
+
+当前实现基于SQLite（WAL模式），适用于单机多进程和测试；跨机器部署时按相同接口换成数据库服务实现
+"""
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Callable, List, Optional
+
+from utils.metrics import metrics
+
+# 任务状态
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+STATUSES = (QUEUED, RUNNING, DONE, FAILED)
+
+
+class Job:
+    """一次领取到的任务"""
+
+    def __init__(self, queue: 'JobQueue', row: sqlite3.Row, worker_id: str):
+        self.queue = queue
+        self.job_id = row['job_id']
+        self.tenant = row['tenant']
+        self.payload = json.loads(row['payload'])
+        self.attempt = row['attempts']
+        self.max_attempts = row['max_attempts']
+        self.worker_id = worker_id
+
+    def heartbeat(self, lease_seconds: Optional[float] = None) -> bool:
+        """续约，租约已被收回时返回 False"""
+        return self.queue.heartbeat(self, lease_seconds)
+
+    def run_once(self, step: str, fn: Callable[[], Any]) -> Any:
+        """
+        执行有副作用的步骤：之前的尝试中已完成时直接返回记录的结果
+
+        步骤完成后才写入记录，步骤执行中途崩溃的尝试在重试时会再执行一次
+        """
+        found, value = self.queue.step_result(self.job_id, step)
+        if found:
+            metrics.incr('job_steps_skipped', step=step)
+            return value
+        value = fn()
+        self.queue.record_step(self.job_id, step, value)
+        return value
+
+
+# 当前线程正在执行的任务（不在任务中执行时为 None）
+current_job: contextvars.ContextVar = contextvars.ContextVar('job', default=None)
+
+
+def run_once(step: str, fn: Callable[[], Any]) -> Any:
+    """在任务中执行时每个步骤只执行一次（见 Job.run_once），不在任务中时直接执行"""
+    job = current_job.get()
+    if job is None:
+        return fn()
+    return job.run_once(step, fn)
+
+
+class JobQueue:
+    """基于租约的共享任务队列"""
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 60,
+        max_attempts: int = 3,
+        retry_delay: float = 5
+    ):
+        """
+        Args:
+            path: SQLite队列文件路径
+            lease_seconds: 租约期限（秒），超过该时间没有续约的任务会被重新领取
+            max_attempts: 每个任务的最大尝试次数
+            retry_delay: 失败后重新排队的等待时间（秒），每次重试翻倍
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（按进程ID和线程分别建立）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                tenant TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                available_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at)")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS job_steps (
+                job_id TEXT NOT NULL,
+                step TEXT NOT NULL,
+                value TEXT,
+                PRIMARY KEY (job_id, step)
+            )"""
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        job_id: Optional[str] = None,
+        tenant: str = 'default',
+        max_attempts: Optional[int] = None
+    ) -> str:
+        """
+        提交任务
+
+        相同 job_id 的任务已存在时不重复提交（已失败的任务重新排队，已完成的步骤记录保留）
+
+        Args:
+            payload: 任务内容（可JSON序列化）
+            job_id: 任务ID，默认随机生成
+            tenant: 租户
+            max_attempts: 最大尝试次数，默认按队列配置
+
+        Returns:
+            任务ID
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            inserted = conn.execute(
+                """INSERT OR IGNORE INTO jobs
+                   (job_id, tenant, payload, status, max_attempts, available_at, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, tenant, json.dumps(payload, ensure_ascii=False), QUEUED,
+                 max_attempts or self.max_attempts, now, now)
+            ).rowcount
+            if not inserted:
+                conn.execute(
+                    """UPDATE jobs SET status = ?, attempts = 0, available_at = ?, error = NULL, finished_at = NULL
+                       WHERE job_id = ? AND status = ?""",
+                    (QUEUED, now, job_id, FAILED)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        metrics.incr('jobs_submitted' if inserted else 'jobs_resubmitted')
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[Job]:
+        """
+        领取最早可执行的任务：排队中的任务，或租约已过期的执行中任务
+
+        租约过期且已用完尝试次数的任务先标记为失败
+
+        Returns:
+            任务，没有可执行的任务时为 None
+        """
+        lease_seconds = lease_seconds or self.lease_seconds
+        conn = self._connect()
+        # BEGIN IMMEDIATE 取得写锁，多个 worker 同时领取时串行执行，同一任务只会被一个 worker 领到
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            expired = conn.execute(
+                """UPDATE jobs SET status = ?, finished_at = ?, lease_owner = NULL,
+                   error = '租约过期（worker 崩溃或失联）且已达到最大尝试次数'
+                   WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts""",
+                (FAILED, now, RUNNING, now)
+            ).rowcount
+            row = conn.execute(
+                """SELECT job_id, status FROM jobs
+                   WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?)
+                   ORDER BY available_at LIMIT 1""",
+                (QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                if expired:
+                    metrics.incr('jobs_failed', expired)
+                return None
+            conn.execute(
+                """UPDATE jobs SET status = ?, lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+                   WHERE job_id = ?""",
+                (RUNNING, worker_id, now + lease_seconds, row['job_id'])
+            )
+            claimed = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row['job_id'],)).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if expired:
+            metrics.incr('jobs_failed', expired)
+        if row['status'] == RUNNING:
+            metrics.incr('job_leases_reclaimed')
+            print(f"任务 {row['job_id']} 的租约已过期，由 {worker_id} 重新领取（第 {claimed['attempts']} 次尝试）")
+        metrics.incr('jobs_claimed')
+        return Job(self, claimed, worker_id)
+
+    def _fenced_update(self, job: Job, sql: str, params: tuple) -> bool:
+        """只有仍持有该任务本次尝试租约的 worker 才能更新"""
+        updated = self._connect().execute(
+            f"{sql} WHERE job_id = ? AND status = ? AND lease_owner = ? AND attempts = ?",
+            params + (job.job_id, RUNNING, job.worker_id, job.attempt)
+        ).rowcount
+        return bool(updated)
+
+    def heartbeat(self, job: Job, lease_seconds: Optional[float] = None) -> bool:
+        """续约，租约已被收回时返回 False"""
+        renewed = self._fenced_update(
+            job, "UPDATE jobs SET lease_expires_at = ?", (time.time() + (lease_seconds or self.lease_seconds),)
+        )
+        if not renewed:
+            metrics.incr('job_leases_lost')
+        return renewed
+
+    def complete(self, job: Job, result: Any) -> bool:
+        """
+        记录任务结果
+
+        Returns:
+            是否记录成功（租约已被收回时结果被丢弃）
+        """
+        completed = self._fenced_update(
+            job, "UPDATE jobs SET status = ?, finished_at = ?, lease_owner = NULL, result = ?, error = NULL",
+            (DONE, time.time(), json.dumps(result, ensure_ascii=False))
+        )
+        metrics.incr('jobs_completed' if completed else 'job_results_discarded')
+        return completed
+
+    def fail(self, job: Job, error: str, result: Any = None, retry: bool = True) -> bool:
+        """
+        记录一次失败的尝试：未用完尝试次数时延迟后重新排队，否则标记为失败
+
+        Args:
+            error: 失败原因
+            result: 最后一次尝试的结果（分析失败时的结果字典）
+            retry: 是否允许重试
+
+        Returns:
+            是否记录成功（租约已被收回时忽略）
+        """
+        now = time.time()
+        if retry and job.attempt < job.max_attempts:
+            updated = self._fenced_update(
+                job, "UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL, error = ?",
+                (QUEUED, now + self.retry_delay * 2 ** (job.attempt - 1), error)
+            )
+            if updated:
+                metrics.incr('job_retries')
+            return updated
+        updated = self._fenced_update(
+            job, "UPDATE jobs SET status = ?, finished_at = ?, lease_owner = NULL, error = ?, result = ?",
+            (FAILED, now, error, json.dumps(result, ensure_ascii=False) if result is not None else None)
+        )
+        if updated:
+            metrics.incr('jobs_failed')
+        return updated
+
+    def step_result(self, job_id: str, step: str):
+        """
+        Returns:
+            (是否已完成, 记录的结果)
+        """
+        row = self._connect().execute(
+            "SELECT value FROM job_steps WHERE job_id = ? AND step = ?", (job_id, step)
+        ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row['value']) if row['value'] is not None else None
+
+    def record_step(self, job_id: str, step: str, value: Any = None):
+        """记录任务内已完成的步骤"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO job_steps (job_id, step, value) VALUES (?, ?, ?)",
+            (job_id, step, json.dumps(value, ensure_ascii=False) if value is not None else None)
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查询任务
+
+        Returns:
+            {"job_id", "tenant", "status", "attempts", "max_attempts", "created_at", "finished_at", "result", "error"}，
+            任务不存在时为 None
+        """
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row['job_id'],
+            "tenant": row['tenant'],
+            "status": row['status'],
+            "attempts": row['attempts'],
+            "max_attempts": row['max_attempts'],
+            "created_at": row['created_at'],
+            "finished_at": row['finished_at'],
+            "result": json.loads(row['result']) if row['result'] is not None else None,
+            "error": row['error'],
+        }
+
+    def get_many(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量查询任务，不存在的任务不包含在结果中"""
+        jobs = {}
+        for job_id in job_ids:
+            job = self.get(job_id)
+            if job is not None:
+                jobs[job_id] = job
+        return jobs
+
+    def stats(self) -> Dict[str, Any]:
+        """各状态的任务数、租约已过期的执行中任务数和最早排队任务的等待时间"""
+        conn = self._connect()
+        now = time.time()
+        counts = {status: 0 for status in STATUSES}
+        for row in conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row['status']] = row['n']
+        expired = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND lease_expires_at < ?", (RUNNING, now)
+        ).fetchone()[0]
+        oldest = conn.execute(
+            "SELECT MIN(available_at) FROM jobs WHERE status = ? AND available_at <= ?", (QUEUED, now)
+        ).fetchone()[0]
+        return {
+            "jobs": counts,
+            "expired_leases": expired,
+            "oldest_queued_seconds": round(now - oldest, 3) if oldest is not None else None,
+        }
+
+
+_queue_instance = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """获取全局任务队列（按 job_queue 配置懒加载）"""
+    global _queue_instance
+    if _queue_instance is None:
+        with _queue_lock:
+            if _queue_instance is None:
+                from utils.config_loader import config
+
+                queue_config = config.get('job_queue', {}) or {}
+                path = queue_config.get('path', 'data/jobs.sqlite3')
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+                _queue_instance = JobQueue(
+                    path,
+                    lease_seconds=queue_config.get('lease_seconds', 60),
+                    max_attempts=queue_config.get('max_attempts', 3),
+                    retry_delay=queue_config.get('retry_delay_seconds', 5)
+                )
+    return _queue_instance
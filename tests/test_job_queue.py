@@ -0,0 +1,110 @@
+"""
+分析任务队列测试：检查租约过期后的重新领取、原 worker 迟到结果的丢弃、重试和只执行一次的步骤
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from storage.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+# 测试用的短租约（秒）
+LEASE = 0.2
+
+
+class JobQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.queue = JobQueue(os.path.join(self.directory, 'jobs.sqlite3'), lease_seconds=LEASE,
+                              max_attempts=3, retry_delay=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _expire(self):
+        time.sleep(LEASE * 2)
+
+    def test_live_lease_is_not_claimed_twice(self):
+        self.queue.submit({"n": 1}, job_id='job-1')
+        self.assertIsNotNone(self.queue.claim('worker-a', lease_seconds=60))
+        self.assertIsNone(self.queue.claim('worker-b'))
+
+    def test_reclaimed_lease_discards_late_complete(self):
+        self.queue.submit({"n": 1}, job_id='job-1')
+        stale = self.queue.claim('worker-a')
+        self._expire()
+
+        fresh = self.queue.claim('worker-b', lease_seconds=60)
+        self.assertIsNotNone(fresh)
+        self.assertEqual(fresh.job_id, 'job-1')
+        self.assertEqual(fresh.attempt, 2)
+
+        # 原 worker 失联后恢复：续约、完成和失败都被拒绝
+        self.assertFalse(stale.heartbeat())
+        self.assertFalse(self.queue.complete(stale, {"from": "worker-a"}))
+        self.assertFalse(self.queue.fail(stale, "late failure"))
+        self.assertEqual(self.queue.get('job-1')['status'], RUNNING)
+
+        self.assertTrue(self.queue.complete(fresh, {"from": "worker-b"}))
+        job = self.queue.get('job-1')
+        self.assertEqual(job['status'], DONE)
+        self.assertEqual(job['result'], {"from": "worker-b"})
+
+        # 完成之后迟到的结果也不会覆盖
+        self.assertFalse(self.queue.complete(stale, {"from": "worker-a"}))
+        self.assertEqual(self.queue.get('job-1')['result'], {"from": "worker-b"})
+
+    def test_same_worker_cannot_complete_an_earlier_attempt(self):
+        self.queue.submit({"n": 1}, job_id='job-1')
+        first = self.queue.claim('worker-a')
+        self._expire()
+        second = self.queue.claim('worker-a', lease_seconds=60)
+        self.assertFalse(self.queue.complete(first, "first"))
+        self.assertTrue(self.queue.complete(second, "second"))
+
+    def test_heartbeat_keeps_the_lease(self):
+        self.queue.submit({"n": 1}, job_id='job-1')
+        job = self.queue.claim('worker-a')
+        for _ in range(3):
+            time.sleep(LEASE / 4)
+            self.assertTrue(job.heartbeat())
+        self.assertIsNone(self.queue.claim('worker-b'))
+        self.assertTrue(self.queue.complete(job, "done"))
+
+    def test_expired_lease_after_last_attempt_marks_job_failed(self):
+        self.queue.submit({"n": 1}, job_id='job-1', max_attempts=1)
+        job = self.queue.claim('worker-a')
+        self._expire()
+        self.assertIsNone(self.queue.claim('worker-b'))
+        self.assertEqual(self.queue.get('job-1')['status'], FAILED)
+        self.assertFalse(self.queue.complete(job, "late"))
+
+    def test_failed_attempt_is_requeued_until_max_attempts(self):
+        self.queue.submit({"n": 1}, job_id='job-1', max_attempts=2)
+        job = self.queue.claim('worker-a')
+        self.assertTrue(self.queue.fail(job, "boom"))
+        self.assertEqual(self.queue.get('job-1')['status'], QUEUED)
+
+        job = self.queue.claim('worker-a')
+        self.assertEqual(job.attempt, 2)
+        self.assertTrue(self.queue.fail(job, "boom again"))
+        job = self.queue.get('job-1')
+        self.assertEqual(job['status'], FAILED)
+        self.assertEqual(job['error'], "boom again")
+
+    def test_completed_step_is_not_repeated_after_reclaim(self):
+        self.queue.submit({"n": 1}, job_id='job-1')
+        calls = []
+        first = self.queue.claim('worker-a')
+        self.assertEqual(first.run_once('save', lambda: calls.append('a') or 'saved-a'), 'saved-a')
+        self._expire()
+
+        second = self.queue.claim('worker-b', lease_seconds=60)
+        self.assertEqual(second.run_once('save', lambda: calls.append('b') or 'saved-b'), 'saved-a')
+        self.assertEqual(calls, ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
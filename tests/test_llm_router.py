@@ -0,0 +1,120 @@
+"""
+模型接口路由测试：用本地的假客户端代替真实接口，检查失败切换、请求错误不切换和额度选择
+"""
+import unittest
+
+from utils.llm_router import Endpoint, LLMRouter, NoEndpointAvailable
+
+
+class _StatusError(Exception):
+    """带 HTTP 状态码的接口错误（与 openai 异常一样通过 status_code 暴露）"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def _router(*endpoints, **options):
+    options.setdefault('explore_rate', 0.0)
+    options.setdefault('max_wait_seconds', 0.0)
+    return LLMRouter(list(endpoints), **options)
+
+
+class LLMRouterTest(unittest.TestCase):
+
+    def test_fails_over_to_next_endpoint(self):
+        calls = []
+
+        def fn(client):
+            calls.append(client)
+            if client == 'primary':
+                raise ConnectionError("connection reset")
+            return f"ok from {client}"
+
+        router = _router(
+            Endpoint('primary', 'key', weight=10, client='primary'),
+            Endpoint('backup', 'key', client='backup'),
+        )
+        self.assertEqual(router.call('gpt-4o', fn), "ok from backup")
+        self.assertEqual(calls, ['primary', 'backup'])
+
+        report = router.report()
+        self.assertEqual(report['primary']['failures'], 1)
+        self.assertEqual(report['primary']['state'], 'cooldown')
+        self.assertEqual(report['backup']['calls'], 1)
+        self.assertEqual(report['primary']['in_flight'], 0)
+
+    def test_cooling_endpoint_is_skipped_while_others_are_ready(self):
+        def fn(client):
+            if client == 'primary':
+                raise ConnectionError("connection reset")
+            return client
+
+        router = _router(
+            Endpoint('primary', 'key', weight=10, client='primary'),
+            Endpoint('backup', 'key', client='backup'),
+            cooldown_seconds=60,
+        )
+        router.call('gpt-4o', fn)
+        calls = []
+        router.call('gpt-4o', lambda client: calls.append(client) or client)
+        self.assertEqual(calls, ['backup'])
+
+    def test_request_error_is_not_retried_elsewhere(self):
+        calls = []
+
+        def fn(client):
+            calls.append(client)
+            raise _StatusError(400)
+
+        router = _router(
+            Endpoint('primary', 'key', weight=10, client='primary'),
+            Endpoint('backup', 'key', client='backup'),
+        )
+        with self.assertRaises(_StatusError):
+            router.call('gpt-4o', fn)
+        self.assertEqual(calls, ['primary'])
+        report = router.report()
+        self.assertEqual(report['primary']['state'], 'ok')
+        self.assertEqual(report['primary']['failures'], 0)
+        self.assertEqual(report['primary']['in_flight'], 0)
+
+    def test_last_error_is_raised_when_all_endpoints_fail(self):
+        def fn(client):
+            raise ConnectionError(client)
+
+        router = _router(
+            Endpoint('primary', 'key', client='primary'),
+            Endpoint('backup', 'key', client='backup'),
+        )
+        with self.assertRaises(ConnectionError):
+            router.call('gpt-4o', fn)
+
+    def test_only_endpoints_serving_the_model_are_used(self):
+        router = _router(
+            Endpoint('mini-only', 'key', models=['gpt-4o-mini'], weight=10, client='mini-only'),
+            Endpoint('full', 'key', client='full'),
+        )
+        self.assertEqual(router.call('gpt-4o', lambda client: client), 'full')
+
+        router = _router(Endpoint('mini-only', 'key', models=['gpt-4o-mini'], client='mini-only'))
+        with self.assertRaises(NoEndpointAvailable):
+            router.call('gpt-4o', lambda client: client)
+
+    def test_exhausted_quota_moves_calls_to_other_endpoint(self):
+        router = _router(
+            Endpoint('primary', 'key', requests_per_minute=1, weight=10, client='primary'),
+            Endpoint('backup', 'key', client='backup'),
+        )
+        used = [router.call('gpt-4o', lambda client: client) for _ in range(3)]
+        self.assertEqual(used, ['primary', 'backup', 'backup'])
+
+    def test_no_endpoint_within_quota_is_a_local_rejection(self):
+        router = _router(Endpoint('primary', 'key', requests_per_minute=1, client='primary'))
+        router.call('gpt-4o', lambda client: client)
+        with self.assertRaises(NoEndpointAvailable):
+            router.call('gpt-4o', lambda client: client)
+
+
+if __name__ == '__main__':
+    unittest.main()
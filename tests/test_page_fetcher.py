@@ -0,0 +1,144 @@
+"""
+网页抓取的安全检查测试：用假的域名解析和连接代替真实网络，检查非公网地址和重定向的每一跳都被拒绝
+"""
+import socket
+import unittest
+from unittest import mock
+
+from utils.page_fetcher import PageFetcher, UnsafeURLError, check_public_url
+
+# 测试用的域名解析结果
+_HOSTS = {
+    'news.example': '93.184.216.34',
+    'mirror.example': '93.184.216.35',
+    'intranet.example': '10.0.0.5',
+    'metadata.example': '169.254.169.254',
+}
+
+
+def _getaddrinfo(host, port, *args, **kwargs):
+    address = _HOSTS.get(host, host)
+    try:
+        socket.inet_pton(socket.AF_INET6, address)
+        family = socket.AF_INET6
+    except OSError:
+        family = socket.AF_INET
+    return [(family, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (address, port or 80))]
+
+
+class _Response:
+    """requests.Response 的替身（只实现抓取用到的部分）"""
+
+    def __init__(self, status_code=200, headers=None, body=b''):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+        self.closed = False
+
+    @property
+    def is_redirect(self):
+        return self.status_code in (301, 302, 303, 307, 308) and 'Location' in self.headers
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        yield self.body
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Session:
+    """按URL返回预设响应，并记录实际发出的请求"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        assert kwargs.get('allow_redirects') is False, "重定向必须由抓取器逐跳处理"
+        return self.routes[url]
+
+
+def _fetcher(routes):
+    fetcher = PageFetcher()
+    fetcher._session = _Session(routes)
+    return fetcher
+
+
+@mock.patch('utils.page_fetcher.socket.getaddrinfo', side_effect=_getaddrinfo)
+class CheckPublicURLTest(unittest.TestCase):
+
+    def test_public_host_is_allowed(self, _):
+        check_public_url('https://news.example/article')
+
+    def test_non_http_schemes_are_rejected(self, _):
+        for url in ('file:///etc/passwd', 'ftp://news.example/a', 'gopher://news.example/'):
+            with self.assertRaises(UnsafeURLError):
+                check_public_url(url)
+
+    def test_private_loopback_and_link_local_hosts_are_rejected(self, _):
+        for url in ('http://127.0.0.1:8000/', 'http://intranet.example/', 'http://metadata.example/latest/meta-data/',
+                    'http://[::1]/', 'http://192.168.1.1/', 'http://0.0.0.0/'):
+            with self.subTest(url=url), self.assertRaises(UnsafeURLError):
+                check_public_url(url)
+
+
+@mock.patch('utils.page_fetcher.socket.getaddrinfo', side_effect=_getaddrinfo)
+class FollowRedirectsTest(unittest.TestCase):
+
+    def test_redirect_to_non_public_host_is_blocked_before_request(self, _):
+        fetcher = _fetcher({
+            'https://news.example/a': _Response(302, {'Location': 'http://metadata.example/latest/meta-data/'}),
+        })
+        with self.assertRaises(UnsafeURLError):
+            fetcher._download('https://news.example/a', {}, {})
+        self.assertEqual(fetcher.session.requested, ['https://news.example/a'])
+
+    def test_relative_redirect_is_resolved_and_followed(self, _):
+        page = b'<html><title>t</title><body><p>Company fined for data breach</p></body></html>'
+        fetcher = _fetcher({
+            'https://news.example/a': _Response(301, {'Location': '/b'}),
+            'https://news.example/b': _Response(302, {'Location': 'https://mirror.example/c'}),
+            'https://mirror.example/c': _Response(200, {'Content-Type': 'text/html'}, page),
+        })
+        entry = fetcher._download('https://news.example/a', {}, {})
+        self.assertEqual(
+            fetcher.session.requested,
+            ['https://news.example/a', 'https://news.example/b', 'https://mirror.example/c']
+        )
+        self.assertIn('data breach', entry['page']['text'])
+
+    def test_redirect_to_other_scheme_is_blocked(self, _):
+        fetcher = _fetcher({
+            'https://news.example/a': _Response(302, {'Location': 'file:///etc/passwd'}),
+        })
+        with self.assertRaises(UnsafeURLError):
+            fetcher._download('https://news.example/a', {}, {})
+
+    def test_redirect_loop_is_cut_off(self, _):
+        fetcher = _fetcher({
+            'https://news.example/a': _Response(302, {'Location': 'https://news.example/a'}),
+        })
+        with self.assertRaises(UnsafeURLError):
+            fetcher._download('https://news.example/a', {}, {})
+        self.assertEqual(len(fetcher.session.requested), PageFetcher.MAX_REDIRECTS + 1)
+
+    def test_non_public_start_url_is_never_requested(self, _):
+        fetcher = _fetcher({})
+        with self.assertRaises(UnsafeURLError):
+            fetcher._download('http://intranet.example/admin', {}, {})
+        self.assertEqual(fetcher.session.requested, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+准入控制模块
+功能：限制同时进行的分析数，超出时在有界队列中按优先级排队；
+队列已满或等待超时时立即拒绝（HTTP 429），并根据当前吞吐量估算建议的重试时间
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from utils.metrics import metrics
+
+# 优先级从高到低：交互式单份简历分析优先于批量请求
+LANES = ('interactive', 'batch')
+
+
+class AdmissionRejected(Exception):
+    """请求被拒绝（负载过高）"""
+
+    def __init__(self, lane: str, reason: str, retry_after: int):
+        """
+        Args:
+            lane: 优先级通道
+            reason: 拒绝原因 queue_full/timeout
+            retry_after: 建议的重试等待秒数
+        """
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+        message = "排队请求已满" if reason == 'queue_full' else "排队等待超时"
+        super().__init__(f"服务繁忙（{message}），请 {retry_after} 秒后重试")
+
+
+class _Waiter:
+    """一个排队中的请求"""
+
+    __slots__ = ('event', 'granted')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    """准入控制器"""
+
+    # 用于估算吞吐量的时间窗口（秒）
+    THROUGHPUT_WINDOW = 60.0
+    # 建议重试时间的上下限（秒）
+    MIN_RETRY_AFTER = 1
+    MAX_RETRY_AFTER = 300
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: Optional[Dict[str, int]] = None,
+        max_wait: Optional[Dict[str, float]] = None,
+        enabled: bool = True
+    ):
+        """
+        Args:
+            max_concurrent: 同时进行的分析数上限
+            max_queue: 各通道排队请求数上限
+            max_wait: 各通道最长排队时间（秒）
+            enabled: 是否启用（关闭时所有请求直接放行）
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = dict({'interactive': 32, 'batch': 64}, **(max_queue or {}))
+        self.max_wait = dict({'interactive': 30.0, 'batch': 120.0}, **(max_wait or {}))
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queues = {lane: deque() for lane in LANES}
+        self._completions = deque()
+        self._avg_service_time: Optional[float] = None
+
+    def _check_lane(self, lane: str) -> str:
+        if lane not in self._queues:
+            raise ValueError(f"未知的优先级通道: {lane}，可选值: {', '.join(LANES)}")
+        return lane
+
+    def _ahead_of(self, lane: str) -> int:
+        """优先级不低于该通道的排队请求数"""
+        count = 0
+        for name in LANES:
+            count += len(self._queues[name])
+            if name == lane:
+                break
+        return count
+
+    def retry_after(self, lane: str = 'interactive') -> int:
+        """
+        估算建议的重试等待时间：排在前面的请求数 / 当前吞吐量
+
+        吞吐量取最近一段时间的完成速率；还没有完成记录时按平均耗时和并发上限估算
+        """
+        with self._lock:
+            return self._retry_after_locked(lane)
+
+    def _retry_after_locked(self, lane: str) -> int:
+        now = time.monotonic()
+        while self._completions and now - self._completions[0] > self.THROUGHPUT_WINDOW:
+            self._completions.popleft()
+
+        if len(self._completions) >= 2:
+            span = max(now - self._completions[0], 1e-3)
+            throughput = len(self._completions) / span
+        elif self._avg_service_time:
+            throughput = self.max_concurrent / self._avg_service_time
+        else:
+            return self.MIN_RETRY_AFTER
+
+        seconds = math.ceil((self._ahead_of(lane) + 1) / throughput)
+        return max(self.MIN_RETRY_AFTER, min(self.MAX_RETRY_AFTER, seconds))
+
+    def _update_gauges(self):
+        metrics.set_gauge('admission_running', self._running)
+        for lane in LANES:
+            metrics.set_gauge('admission_queued', len(self._queues[lane]), lane=lane)
+
+    def acquire(self, lane: str = 'interactive'):
+        """
+        申请执行一次分析，必要时排队等待
+
+        Raises:
+            AdmissionRejected: 队列已满或等待超时
+        """
+        self._check_lane(lane)
+        if not self.enabled:
+            return
+        started = time.monotonic()
+
+        with self._lock:
+            if self._running < self.max_concurrent and self._ahead_of(lane) == 0:
+                self._running += 1
+                self._update_gauges()
+                metrics.incr('admission_admitted', lane=lane)
+                metrics.observe('admission_wait_seconds', 0.0, lane=lane)
+                return
+            if len(self._queues[lane]) >= self.max_queue[lane]:
+                retry_after = self._retry_after_locked(lane)
+                metrics.incr('admission_shed', lane=lane, reason='queue_full')
+                raise AdmissionRejected(lane, 'queue_full', retry_after)
+            waiter = _Waiter()
+            self._queues[lane].append(waiter)
+            self._update_gauges()
+
+        waiter.event.wait(self.max_wait[lane])
+
+        with self._lock:
+            if not waiter.granted:
+                self._queues[lane].remove(waiter)
+                self._update_gauges()
+                retry_after = self._retry_after_locked(lane)
+                metrics.incr('admission_shed', lane=lane, reason='timeout')
+                raise AdmissionRejected(lane, 'timeout', retry_after)
+
+        metrics.incr('admission_admitted', lane=lane)
+        metrics.observe('admission_wait_seconds', time.monotonic() - started, lane=lane)
+
+    def release(self, service_time: Optional[float] = None):
+        """
+        一次分析结束，把空出的名额交给优先级最高的排队请求
+
+        Args:
+            service_time: 本次分析的耗时（秒），用于估算吞吐量
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._completions.append(time.monotonic())
+            if service_time is not None:
+                self._avg_service_time = (
+                    service_time if self._avg_service_time is None
+                    else 0.8 * self._avg_service_time + 0.2 * service_time
+                )
+
+            self._running -= 1
+            for lane in LANES:
+                if self._queues[lane]:
+                    waiter = self._queues[lane].popleft()
+                    waiter.granted = True
+                    self._running += 1
+                    waiter.event.set()
+                    break
+            self._update_gauges()
+
+    def admit(self, lane: str = 'interactive'):
+        """
+        上下文管理器形式的 acquire/release
+
+        例如：
+            with controller.admit('batch'):
+                analyze(...)
+        """
+        controller = self
+
+        class _Admission:
+            def __enter__(self):
+                controller.acquire(lane)
+                self.started = time.monotonic()
+                return self
+
+            def __exit__(self, *exc):
+                controller.release(time.monotonic() - self.started)
+                return False
+
+        return _Admission()
+
+    def stats(self) -> Dict[str, Any]:
+        """当前状态"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_concurrent": self.max_concurrent,
+                "running": self._running,
+                "queued": {lane: len(self._queues[lane]) for lane in LANES},
+                "avg_service_seconds": round(self._avg_service_time, 3) if self._avg_service_time else None,
+                "retry_after": {lane: self._retry_after_locked(lane) for lane in LANES},
+            }
+
+
+_controller_instance = None
+_controller_lock = threading.Lock()
+
+
+def admission_max_concurrent(configured: int, server_threads: int) -> int:
+    """
+    每个进程同时进行的分析数上限
+
+    生产模式下每个 gunicorn worker 最多同时处理 server.threads 个请求，超出的请求在 gunicorn 的连接队列中等待，
+    不会进入准入控制。上限必须小于线程数，多出的线程才能在准入队列中按优先级排队、超时拒绝
+
+    Args:
+        configured: admission.max_concurrent，0 表示取线程数的一半
+        server_threads: server.threads
+
+    Returns:
+        不超过线程数的上限
+    """
+    server_threads = max(1, server_threads)
+    if not configured:
+        return max(1, server_threads // 2)
+    if configured > server_threads:
+        print(f"admission.max_concurrent（{configured}）大于 server.threads（{server_threads}），按 {server_threads} 处理")
+        return server_threads
+    return configured
+
+
+def get_admission_controller() -> AdmissionController:
+    """获取全局准入控制器（按 admission 配置懒加载）"""
+    global _controller_instance
+    if _controller_instance is None:
+        with _controller_lock:
+            if _controller_instance is None:
+                from utils.config_loader import config
+
+                admission_config = config.get('admission', {}) or {}
+                _controller_instance = AdmissionController(
+                    max_concurrent=admission_max_concurrent(
+                        admission_config.get('max_concurrent', 0),
+                        config.get_server_config().get('threads', 16)
+                    ),
+                    max_queue=admission_config.get('max_queue'),
+                    max_wait=admission_config.get('max_wait_seconds'),
+                    enabled=admission_config.get('enabled', True)
+                )
+    return _controller_instance
@@ -0,0 +1,406 @@
+"""
+批处理调用模块
+功能：离线批量筛选时，把同一阶段多份简历的模型请求收集成一个批处理输入文件（JSONL），
+通过批处理接口提交，轮询完成后把结果分发回各个请求。批处理接口价格更低、不占用同步调用的速率限额，
+但要等整批完成才有结果
+
+模型代码不需要区分两种模式：当前上下文中设置了 BatchCollector 时，call_gpt 把请求交给它并阻塞等待结果。
+每个参与者（一份简历的一个阶段）在一个线程中执行，所有参与者都在等待结果或已经结束时提交一批
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Any, Callable, List, Optional
+
+from utils.metrics import metrics
+
+CHAT_ENDPOINT = '/v1/chat/completions'
+
+# 当前上下文使用的批处理收集器（None 表示同步调用）
+current_batch: contextvars.ContextVar = contextvars.ContextVar('batch', default=None)
+
+# 仍在处理中的批处理任务状态
+PENDING_STATUSES = ('validating', 'in_progress', 'finalizing', 'cancelling')
+
+
+class BatchRequestFailed(Exception):
+    """批处理中的单个请求失败"""
+
+
+def estimate_cost(
+    model: Optional[str],
+    prompt_tokens: int,
+    completion_tokens: int,
+    batch: bool = False,
+    cached_tokens: int = 0
+) -> float:
+    """
+    按 openai.pricing（美元/百万token）估算一次调用的费用
+
+    模型名按最长前缀匹配价格表（例如 gpt-4o-2024-08-06 匹配 gpt-4o）；
+    输入token中命中提示词缓存的部分按 cached_input 计价（未配置时按 input）；
+    批处理调用再乘以 batch.discount
+
+    Returns:
+        费用（美元），价格表中没有该模型时为0
+    """
+    from utils.config_loader import config
+
+    pricing = config.get('openai.pricing', {}) or {}
+    name = str(model or '')
+    matches = [key for key in pricing if name.startswith(key)]
+    if not matches:
+        return 0.0
+    price = pricing[max(matches, key=len)] or {}
+    input_price = float(price.get('input', 0))
+    cached_price = float(price.get('cached_input', input_price))
+    cost = (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * float(price.get('output', 0))
+    ) / 1e6
+    if batch:
+        cost *= float(config.get('batch.discount', 0.5))
+    return cost
+
+
+class BatchBackend:
+    """批处理接口"""
+
+    def submit(self, input_path: str) -> str:
+        """
+        提交批处理输入文件
+
+        Returns:
+            批处理任务ID
+        """
+        raise NotImplementedError("子类必须实现submit方法")
+
+    def poll(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        查询批处理任务
+
+        Returns:
+            未完成时为None；完成时为输出行列表 [{"custom_id", "response": {"status_code", "body"}, "error"}]
+
+        Raises:
+            RuntimeError: 任务失败、过期或被取消
+        """
+        raise NotImplementedError("子类必须实现poll方法")
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API"""
+
+    def __init__(self, client, completion_window: str = '24h'):
+        """
+        Args:
+            client: OpenAI 客户端
+            completion_window: 批处理完成时限
+        """
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def _read_lines(self, file_id: Optional[str]) -> List[Dict[str, Any]]:
+        if not file_id:
+            return []
+        text = self.client.files.content(file_id).text
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    def poll(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in PENDING_STATUSES:
+            return None
+        if batch.status != 'completed':
+            raise RuntimeError(f"批处理任务 {batch_id} 未完成，状态: {batch.status}")
+        return self._read_lines(batch.output_file_id) + self._read_lines(getattr(batch, 'error_file_id', None))
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    本地批处理（测试和没有批处理接口时使用）
+
+    在后台线程中逐行执行输入文件中的请求，输入输出文件格式与 OpenAI Batch API 相同
+    """
+
+    def __init__(self, responder: Callable[[Dict[str, Any]], Dict[str, Any]], workers: int = 4):
+        """
+        Args:
+            responder: 请求体 -> chat.completions 响应（字典）
+            workers: 并发执行的请求数
+        """
+        self.responder = responder
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._results: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+
+    def _respond(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            body = self.responder(line['body'])
+            return {"custom_id": line['custom_id'], "response": {"status_code": 200, "body": body}, "error": None}
+        except Exception as e:
+            return {"custom_id": line['custom_id'], "response": None, "error": {"message": str(e)}}
+
+    def submit(self, input_path: str) -> str:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with open(input_path, 'r', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._results[batch_id] = None
+
+        def run():
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                output = list(executor.map(self._respond, lines))
+            with self._lock:
+                self._results[batch_id] = output
+
+        threading.Thread(target=run, daemon=True).start()
+        return batch_id
+
+    def poll(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if batch_id not in self._results:
+                raise RuntimeError(f"未知的批处理任务: {batch_id}")
+            output = self._results[batch_id]
+            if output is not None:
+                del self._results[batch_id]
+            return output
+
+
+class _Pending:
+    """一个等待批处理结果的请求"""
+
+    __slots__ = ('custom_id', 'body', 'event', 'result', 'error')
+
+    def __init__(self, custom_id: str, body: Dict[str, Any]):
+        self.custom_id = custom_id
+        self.body = body
+        self.event = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+
+class BatchCollector:
+    """收集一个阶段所有参与者的模型请求，成批提交"""
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        participants: int,
+        work_dir: str,
+        label: str = 'batch',
+        poll_interval: float = 30.0,
+        max_wait: float = 24 * 3600.0
+    ):
+        """
+        Args:
+            backend: 批处理接口
+            participants: 参与者数量（每个参与者结束时需调用 leave）
+            work_dir: 批处理输入文件目录
+            label: 输入文件名前缀（通常为阶段名）
+            poll_interval: 轮询间隔（秒）
+            max_wait: 单批最长等待时间（秒）
+        """
+        self.backend = backend
+        self.work_dir = work_dir
+        self.label = label
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._active = participants
+        self._pending: List[_Pending] = []
+        self._rounds = 0
+        self.stats = {"batches": 0, "requests": 0, "failed_requests": 0, "wait_seconds": 0.0}
+
+    def request(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        提交一个 chat.completions 请求并等待批处理结果
+
+        Returns:
+            chat.completions 响应（字典）
+
+        Raises:
+            BatchRequestFailed: 请求失败
+        """
+        pending = _Pending(uuid.uuid4().hex, body)
+        with self._lock:
+            self._pending.append(pending)
+            ready = self._take_ready()
+        if ready:
+            self._flush(ready)
+
+        pending.event.wait()
+        if pending.error is not None:
+            raise BatchRequestFailed(pending.error)
+        return pending.result
+
+    def leave(self):
+        """一个参与者结束（不会再发出请求）"""
+        with self._lock:
+            self._active -= 1
+            ready = self._take_ready()
+        if ready:
+            self._flush(ready)
+
+    def fork(self, children: int):
+        """当前参与者把工作分给 children 个子线程（子线程结束时各自调用 leave），自己在 rejoin 前不发请求"""
+        with self._lock:
+            self._active += children - 1
+            ready = self._take_ready()
+        if ready:
+            self._flush(ready)
+
+    def rejoin(self):
+        """fork 的子线程全部结束，当前参与者继续执行"""
+        with self._lock:
+            self._active += 1
+
+    def _take_ready(self) -> List[_Pending]:
+        """所有仍在执行的参与者都在等待结果时取出待提交的请求（需持有锁）"""
+        if self._pending and len(self._pending) >= self._active:
+            ready, self._pending = self._pending, []
+            self._rounds += 1
+            return ready
+        return []
+
+    def _flush(self, batch: List[_Pending]):
+        """提交一批请求，轮询直到完成并分发结果"""
+        started = time.monotonic()
+        path = os.path.join(self.work_dir, f"{self.label}_{int(time.time())}_{uuid.uuid4().hex[:8]}.jsonl")
+        try:
+            os.makedirs(self.work_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                for pending in batch:
+                    f.write(json.dumps({
+                        "custom_id": pending.custom_id,
+                        "method": "POST",
+                        "url": CHAT_ENDPOINT,
+                        "body": pending.body,
+                    }, ensure_ascii=False) + '\n')
+
+            batch_id = self.backend.submit(path)
+            print(f"批处理 {self.label}: 已提交 {len(batch)} 个请求（{batch_id}）")
+            output = None
+            while output is None:
+                if time.monotonic() - started > self.max_wait:
+                    raise RuntimeError(f"批处理任务 {batch_id} 等待超时")
+                time.sleep(self.poll_interval)
+                output = self.backend.poll(batch_id)
+
+            by_id = {line.get('custom_id'): line for line in output}
+            for pending in batch:
+                line = by_id.get(pending.custom_id)
+                response = (line or {}).get('response') or {}
+                if line is None:
+                    pending.error = "批处理输出中缺少该请求的结果"
+                elif line.get('error') or response.get('status_code') != 200:
+                    pending.error = str(line.get('error') or response.get('body'))
+                else:
+                    pending.result = response.get('body')
+        except Exception as e:
+            print(f"批处理 {self.label} 失败: {e}")
+            for pending in batch:
+                pending.error = pending.error or str(e)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+        waited = time.monotonic() - started
+        failed = sum(1 for pending in batch if pending.error is not None)
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(batch)
+            self.stats["failed_requests"] += failed
+            self.stats["wait_seconds"] += waited
+        metrics.incr('batch_requests', len(batch), stage=self.label)
+        metrics.incr('batch_failed_requests', failed, stage=self.label)
+        metrics.observe('batch_wait_seconds', waited, stage=self.label)
+
+        for pending in batch:
+            pending.event.set()
+
+
+def parallel_map(fn: Callable[[Any], Any], items: List[Any], max_workers: int = 4) -> List[Any]:
+    """
+    在线程池中对每个条目执行 fn（在调用者的上下文中），返回结果列表
+
+    批处理模式下所有子线程都作为参与者同时执行，各自的请求与其他简历的请求合并到同一批
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.tenants import run_in_context
+
+    if not items:
+        return []
+    collector = current_batch.get()
+    if collector is None:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+            return list(executor.map(run_in_context(fn), items))
+
+    def child(item):
+        try:
+            return fn(item)
+        finally:
+            collector.leave()
+
+    collector.fork(len(items))
+    try:
+        with ThreadPoolExecutor(max_workers=len(items)) as executor:
+            return list(executor.map(run_in_context(child), items))
+    finally:
+        collector.rejoin()
+
+
+def build_backend(name: Optional[str] = None, client=None) -> BatchBackend:
+    """
+    按 batch.backend 配置创建批处理接口
+
+    Args:
+        name: openai/local，默认取 batch.backend
+        client: OpenAI 客户端。默认 openai 接口按模型接口路由中 batch.endpoint 指定的接口（未指定时为权重最高的接口）
+            的密钥和地址创建；local 接口的请求经模型接口路由选择接口和切换
+    """
+    from utils.config_loader import config
+    from utils.llm_router import get_llm_router
+
+    batch_config = config.get('batch', {}) or {}
+    name = name or batch_config.get('backend', 'openai')
+    if name not in ('openai', 'local'):
+        raise ValueError(f"未知的批处理接口: {name}，可选值: openai, local")
+
+    if name == 'local':
+        # 本地逐个同步调用，与真实批处理的输入输出格式相同
+        def respond(body):
+            if client is not None:
+                return client.chat.completions.create(**body).model_dump()
+            return get_llm_router().call(
+                body.get('model', ''), lambda routed: routed.chat.completions.create(**body).model_dump()
+            )
+
+        return LocalBatchBackend(respond, workers=batch_config.get('local_workers', 4))
+
+    if client is None:
+        from openai import OpenAI
+
+        # 批处理任务的输入文件和结果都属于提交它的接口（账号），整个任务只能使用一个接口
+        endpoint = get_llm_router().primary(batch_config.get('endpoint'))
+        options = {"api_key": endpoint.api_key}
+        if endpoint.base_url:
+            options['base_url'] = endpoint.base_url
+        client = OpenAI(**options)
+    return OpenAIBatchBackend(client, batch_config.get('completion_window', '24h'))
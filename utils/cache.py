@@ -0,0 +1,200 @@
+"""
+跨进程共享缓存模块
+功能：基于SQLite（WAL模式）的键值缓存，多个worker进程共享同一个缓存文件，
+一个进程写入的缓存结果可以被其他所有进程命中
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.config_loader import config
+
+
+class SharedCache:
+    """跨进程共享缓存"""
+
+    # 每写入该数量的条目清理一次过期缓存
+    PURGE_EVERY = 1000
+
+    def __init__(
+        self,
+        path: str,
+        default_ttl: int = 86400,
+        enabled: bool = True,
+        stale_retention: int = 604800
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite缓存文件路径
+            default_ttl: 默认过期时间（秒）
+            enabled: 是否启用缓存
+            stale_retention: 过期后继续保留的时间（秒），期间后端不可用时仍可用旧结果降级（见 get_stale）
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.stale_retention = stale_retention
+        self._local = threading.local()
+        self._writes = 0
+
+        if self.enabled:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connect()
+            self.purge_expired()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        获取当前线程的数据库连接
+
+        SQLite连接不能跨fork和线程复用，因此按(进程ID, 线程)分别建立连接
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )"""
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """根据任意可JSON序列化的参数生成缓存键"""
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        读取缓存
+
+        Returns:
+            缓存值，未命中或已过期时返回None
+        """
+        if not self.enabled:
+            return None
+
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def get_stale(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        读取缓存，忽略过期时间（后端不可用时用旧结果降级）
+
+        Returns:
+            缓存值，从未缓存过（或已被清理）时返回None
+        """
+        if not self.enabled:
+            return None
+
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None):
+        """写入缓存"""
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        self._connect().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, ensure_ascii=False), expires_at)
+        )
+
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: Optional[int] = None
+    ) -> Any:
+        """读取缓存，未命中时调用compute计算并写入"""
+        cached = self.get(namespace, key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        self.set(namespace, key, value, ttl)
+        return value
+
+    def purge_expired(self) -> int:
+        """
+        清理过期超过 stale_retention 的缓存（打开缓存时和每写入 PURGE_EVERY 条后调用）
+
+        Returns:
+            清理的条目数
+        """
+        if not self.enabled:
+            return 0
+        cursor = self._connect().execute(
+            "DELETE FROM cache WHERE expires_at < ?", (time.time() - self.stale_retention,)
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """各命名空间的缓存条目数"""
+        if not self.enabled:
+            return {}
+        rows = self._connect().execute(
+            "SELECT namespace, COUNT(*) FROM cache GROUP BY namespace"
+        ).fetchall()
+        return {namespace: count for namespace, count in rows}
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SharedCache:
+    """获取全局共享缓存实例（按配置懒加载）"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                cache_config = config.get_cache_config()
+                path = cache_config.get('path', 'data/cache.sqlite3')
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+                _cache_instance = SharedCache(
+                    path=path,
+                    default_ttl=cache_config.get('default_ttl', 86400),
+                    enabled=cache_config.get('enabled', True),
+                    stale_retention=cache_config.get('stale_retention', 604800)
+                )
+    return _cache_instance
+
+
+def get_cache_ttl(namespace: str) -> Optional[int]:
+    """获取某个命名空间配置的过期时间"""
+    return config.get(f'cache.ttl.{namespace}')
@@ -0,0 +1,150 @@
+"""
+录制/回放模块
+功能：录制模式下把每次 call_gpt 和 web_search 的请求与结果追加写入录制带文件（JSONL）；
+回放模式下按请求哈希直接从内存返回录制的结果，不调用模型和搜索接口，也不需要API密钥。
+修改提示词或编排逻辑后，可以用录制的几百次真实分析在几秒内重跑，检查输出是否稳定并测量纯编排开销
+
+录制带中每行一条记录：{"kind": "llm"/"search", "key": 请求哈希, "request": 请求参数, "response": 结果}
+"""
+import json
+import os
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from utils.cache import SharedCache
+from utils.metrics import metrics
+
+MODES = ('off', 'record', 'replay')
+
+
+class CassetteMiss(Exception):
+    """回放模式下录制带中没有该请求（提示词或请求参数变化后需要重新录制）"""
+
+    def __init__(self, kind: str, key: str):
+        self.kind = kind
+        self.key = key
+        super().__init__(f"录制带中没有该{'模型' if kind == 'llm' else '搜索'}请求（{key[:12]}），请重新录制")
+
+
+class Cassette:
+    """录制带"""
+
+    def __init__(self, path: str, mode: str):
+        """
+        Args:
+            path: 录制带文件路径
+            mode: record（追加录制，已录制的请求不重复写入）/ replay（只读回放）
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"录制带模式只能是 record 或 replay，实际为 {mode}")
+        self.path = path
+        self.mode = mode
+        self._entries: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+        if os.path.exists(path):
+            self._load()
+        elif mode == 'replay':
+            raise FileNotFoundError(f"录制带文件不存在: {path}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    # 与共享缓存使用相同的请求哈希
+    key = staticmethod(SharedCache.make_key)
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[(entry['kind'], entry['key'])] = entry['response']
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def replay(self, kind: str, key: str) -> Any:
+        """
+        返回录制的结果
+
+        Raises:
+            CassetteMiss: 录制带中没有该请求
+        """
+        with self._lock:
+            if (kind, key) not in self._entries:
+                self.misses += 1
+                metrics.incr('cassette_misses', kind=kind)
+                raise CassetteMiss(kind, key)
+            self.hits += 1
+            return self._entries[(kind, key)]
+
+    def record(self, kind: str, key: str, request: Dict[str, Any], response: Any):
+        """追加一条记录（同一请求只写入第一次的结果）"""
+        line = json.dumps(
+            {"kind": kind, "key": key, "request": request, "response": response},
+            ensure_ascii=False
+        )
+        with self._lock:
+            if (kind, key) in self._entries:
+                return
+            self._entries[(kind, key)] = response
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self.recorded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "path": self.path,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "recorded": self.recorded,
+            }
+
+
+_cassette_instance: Optional[Cassette] = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """获取当前录制带（按 cassette 配置懒加载，mode 为 off 时返回 None）"""
+    global _cassette_instance, _cassette_loaded
+    if not _cassette_loaded:
+        with _cassette_lock:
+            if not _cassette_loaded:
+                from utils.config_loader import config
+
+                cassette_config = config.get('cassette', {}) or {}
+                # YAML 中未加引号的 off 会被解析为 False
+                mode = cassette_config.get('mode') or 'off'
+                if mode not in MODES:
+                    raise ValueError(f"cassette.mode 只能是 {', '.join(MODES)}")
+                if mode != 'off':
+                    path = cassette_config.get('path', 'data/cassettes/default.jsonl')
+                    if not os.path.isabs(path):
+                        path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+                    _cassette_instance = Cassette(path, mode)
+                _cassette_loaded = True
+    return _cassette_instance
+
+
+def use_cassette(cassette: Optional[Cassette]):
+    """替换当前录制带（None 表示关闭），用于回归测试脚本"""
+    global _cassette_instance, _cassette_loaded
+    with _cassette_lock:
+        _cassette_instance = cassette
+        _cassette_loaded = True
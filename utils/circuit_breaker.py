@@ -0,0 +1,243 @@
+"""
+熔断模块
+功能：按后端（openai、serpapi）统计调用失败，连续失败达到阈值后熔断：熔断期间的调用立即失败（或改用缓存中的旧结果），
+不再每个请求都等待超时；冷却时间过后放行少量探测调用（半开），探测成功则恢复，失败则重新熔断
+
+熔断状态保存在进程内存中，每个worker进程独立统计
+"""
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+from utils.metrics import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# 状态在 circuit_state 指标中的取值
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+# 调用方请求本身有误（如超出上下文长度），后端是健康的
+REQUEST_ERROR_STATUS = (400, 422)
+
+
+def is_request_error(error: Exception) -> bool:
+    """错误是否由请求本身引起（按 HTTP 状态码判断，兼容 openai 和 requests 的异常）"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status in REQUEST_ERROR_STATUS
+
+
+class CircuitOpenError(Exception):
+    """后端已熔断，调用被立即拒绝"""
+
+    def __init__(self, backend: str, retry_after: float):
+        """
+        Args:
+            backend: 后端名称
+            retry_after: 距离下一次探测的秒数
+        """
+        self.backend = backend
+        self.retry_after = retry_after
+        super().__init__(f"{backend} 服务暂不可用（已熔断），{retry_after:.1f} 秒后重试")
+
+
+class LocalRejection(Exception):
+    """
+    调用在本地被拒绝（接口额度用完、租户配额用完、没有可用的接口等），请求没有到达后端
+
+    不代表后端故障：不计入熔断器的失败次数，也不改用缓存中的旧结果
+    """
+
+
+class CircuitBreaker:
+    """单个后端的熔断器"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        """
+        Args:
+            name: 后端名称
+            failure_threshold: 连续失败多少次后熔断
+            reset_timeout: 熔断后多久进入半开状态（秒）
+            half_open_max_calls: 半开状态下同时放行的探测调用数
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        metrics.set_gauge('circuit_state', STATE_VALUES[CLOSED], backend=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _transition(self, state: str):
+        """切换状态并记录指标（需持有锁）"""
+        if state == self._state:
+            return
+        metrics.incr('circuit_transitions', backend=self.name, from_state=self._state, to_state=state)
+        metrics.set_gauge('circuit_state', STATE_VALUES[state], backend=self.name)
+        print(f"熔断器 {self.name}: {self._state} -> {state}")
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != CLOSED:
+            self._probes = 0
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+
+    def retry_after(self) -> float:
+        """距离下一次探测的秒数"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """
+        是否放行一次调用（放行后必须调用 record_success 或 record_failure）
+
+        熔断期间返回False并计数 circuit_fast_fails；半开状态下只放行有限个探测调用
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+        metrics.incr('circuit_fast_fails', backend=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+
+    def record_skipped(self):
+        """放行的调用不说明后端是否健康（本地拒绝、请求本身有误）：不计成功或失败，归还半开状态下的探测名额"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN:
+                # 探测失败，重新熔断
+                self._transition(OPEN)
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_after": round(
+                    max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1
+                ) if self._state == OPEN else 0.0,
+                "fast_fails": metrics.counter('circuit_fast_fails', backend=self.name),
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(backend: str) -> CircuitBreaker:
+    """获取后端的熔断器（参数取 circuit_breakers.backends.<backend>，缺省项取 circuit_breakers.default）"""
+    breaker = _breakers.get(backend)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(backend)
+            if breaker is None:
+                from utils.config_loader import config
+
+                breaker_config = config.get('circuit_breakers', {}) or {}
+                settings = dict(
+                    breaker_config.get('default', {}) or {},
+                    **((breaker_config.get('backends', {}) or {}).get(backend, {}) or {})
+                )
+                breaker = CircuitBreaker(
+                    backend,
+                    failure_threshold=settings.get('failure_threshold', 5),
+                    reset_timeout=settings.get('reset_timeout_seconds', 30),
+                    half_open_max_calls=settings.get('half_open_max_calls', 1)
+                )
+                _breakers[backend] = breaker
+    return breaker
+
+
+def breaker_report() -> Dict[str, Any]:
+    """各后端熔断器的状态"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def guarded_call(backend: str, fn: Callable[[], Any], fallback: Optional[Callable[[], Any]] = None):
+    """
+    经过熔断器调用 fn；已熔断或调用失败时改用 fallback 返回的旧结果
+
+    Args:
+        backend: 后端名称
+        fn: 实际调用
+        fallback: 读取缓存中旧结果的函数（没有旧结果时返回None）
+
+    Returns:
+        (结果, 是否为旧结果)
+
+    Raises:
+        CircuitOpenError: 已熔断且没有旧结果
+        LocalRejection: 调用在本地被拒绝（不计入失败，不使用旧结果）
+        Exception: 请求本身有误（400/422，不计入失败，不使用旧结果）
+        Exception: 调用失败且没有旧结果
+    """
+    breaker = get_breaker(backend)
+    if not breaker.allow():
+        stale = fallback() if fallback else None
+        if stale is None:
+            raise CircuitOpenError(backend, breaker.retry_after())
+        metrics.incr('circuit_stale_served', backend=backend)
+        return stale, True
+
+    try:
+        value = fn()
+    except LocalRejection:
+        breaker.record_skipped()
+        raise
+    except Exception as e:
+        if is_request_error(e):
+            # 换成旧结果会掩盖请求本身的问题，也不能让少数超长请求熔断所有租户共用的后端
+            breaker.record_skipped()
+            metrics.incr('circuit_request_errors', backend=backend)
+            raise
+        breaker.record_failure()
+        stale = fallback() if fallback else None
+        if stale is None:
+            raise
+        print(f"{backend} 调用失败，使用缓存中的旧结果: {e}")
+        metrics.incr('circuit_stale_served', backend=backend)
+        return stale, True
+    breaker.record_success()
+    return value, False
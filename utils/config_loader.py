@@ -1,8 +1,8 @@
 """
 配置加载器
 """
-import yaml
 import os
+import threading
 from typing import Dict, Any
 
 
@@ -11,6 +11,7 @@ class ConfigLoader:
 
     _instance = None
     _config = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -18,11 +19,13 @@ class ConfigLoader:
         return cls._instance
 
     def __init__(self):
-        if self._config is None:
-            self.load_config()
+        # 配置文件在第一次读取配置项时才加载，避免导入时解析YAML拖慢冷启动
+        pass
 
     def load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
+        import yaml
+
         config_path = os.path.join(
             os.path.dirname(os.path.dirname(__file__)),
             'config',
@@ -44,7 +47,9 @@ class ConfigLoader:
         支持点号分隔的多层级配置，例如: openai.api_key
         """
         if self._config is None:
-            self.load_config()
+            with self._lock:
+                if self._config is None:
+                    self.load_config()
 
         keys = key.split('.')
         value = self._config
@@ -67,6 +72,10 @@ class ConfigLoader:
         """获取大厂判断标准配置"""
         return self.get('big_company', {})
 
+    def get_google_config(self) -> Dict[str, Any]:
+        """获取Google搜索配置"""
+        return self.get('google', {})
+
     def get_negative_check_config(self) -> Dict[str, Any]:
         """获取负面舆情检索配置"""
         return self.get('negative_check', {})
@@ -79,6 +88,14 @@ class ConfigLoader:
         """获取并发配置"""
         return self.get('concurrent', {})
 
+    def get_server_config(self) -> Dict[str, Any]:
+        """获取生产服务配置"""
+        return self.get('server', {})
+
+    def get_cache_config(self) -> Dict[str, Any]:
+        """获取共享缓存配置"""
+        return self.get('cache', {})
+
 
 # 全局配置实例
 config = ConfigLoader()
@@ -0,0 +1,138 @@
+"""
+加权公平调度模块
+功能：在模型调用之前按租户权重分配并发名额，某个租户的大批量请求不会饿死其他租户
+
+采用按开始标签调度的加权公平排队（SFQ）：每次调用的开始标签为
+max(系统虚拟时间, 该租户上一次调用的结束标签)，结束标签 = 开始标签 + 成本 / 权重，
+有空闲名额时总是放行开始标签最小的调用。空闲的租户不会积累额度
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+from utils.metrics import metrics
+
+
+class _Waiter:
+    __slots__ = ('event', 'tenant')
+
+    def __init__(self, tenant: str):
+        self.event = threading.Event()
+        self.tenant = tenant
+
+
+class FairScheduler:
+    """按租户权重分配并发名额的调度器"""
+
+    def __init__(self, capacity: int, weight: Optional[Callable[[str], float]] = None):
+        """
+        Args:
+            capacity: 同时进行的调用数上限
+            weight: 租户 -> 权重，默认所有租户权重为1
+        """
+        self.capacity = max(1, capacity)
+        self.weight = weight or (lambda tenant: 1.0)
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._queued: Dict[str, int] = {}
+
+    def acquire(self, tenant: str, cost: float = 1.0):
+        """
+        申请一个调用名额，名额不足时排队等待
+
+        Args:
+            tenant: 租户
+            cost: 调用成本（如预估的token数，单位任意但需一致）
+        """
+        started = time.monotonic()
+        with self._lock:
+            start_tag = max(self._virtual_time, self._finish_tags.get(tenant, 0.0))
+            self._finish_tags[tenant] = start_tag + cost / self.weight(tenant)
+
+            if self._running < self.capacity and not self._heap:
+                self._running += 1
+                self._virtual_time = start_tag
+                waiter = None
+            else:
+                waiter = _Waiter(tenant)
+                heapq.heappush(self._heap, (start_tag, next(self._sequence), waiter))
+                self._queued[tenant] = self._queued.get(tenant, 0) + 1
+                metrics.set_gauge('tenant_queued_calls', self._queued[tenant], tenant=tenant)
+
+        if waiter is not None:
+            waiter.event.wait()
+        metrics.observe('tenant_queue_wait_seconds', time.monotonic() - started, tenant=tenant)
+
+    def release(self):
+        """释放名额，放行开始标签最小的排队调用"""
+        with self._lock:
+            self._running -= 1
+            if self._heap:
+                start_tag, _, waiter = heapq.heappop(self._heap)
+                self._virtual_time = max(self._virtual_time, start_tag)
+                self._running += 1
+                self._queued[waiter.tenant] -= 1
+                metrics.set_gauge('tenant_queued_calls', self._queued[waiter.tenant], tenant=waiter.tenant)
+                waiter.event.set()
+            elif self._running == 0:
+                # 系统空闲时重置虚拟时间，避免标签无限增长
+                self._virtual_time = 0.0
+                self._finish_tags.clear()
+
+    def slot(self, tenant: str, cost: float = 1.0):
+        """
+        上下文管理器形式的 acquire/release
+
+        例如：
+            with scheduler.slot('recruiting', cost=1200):
+                client.chat.completions.create(...)
+        """
+        scheduler = self
+
+        class _Slot:
+            def __enter__(self):
+                scheduler.acquire(tenant, cost)
+                return self
+
+            def __exit__(self, *exc):
+                scheduler.release()
+                return False
+
+        return _Slot()
+
+    def stats(self) -> Dict[str, Any]:
+        """当前状态"""
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "running": self._running,
+                "queued": {tenant: count for tenant, count in self._queued.items() if count},
+            }
+
+
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> FairScheduler:
+    """获取全局调度器（容量取 tenants.max_concurrent_calls，权重取租户配置）"""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        with _scheduler_lock:
+            if _scheduler_instance is None:
+                from utils.config_loader import config
+                from utils.tenants import get_tenant_manager
+
+                tenant_config = config.get('tenants', {}) or {}
+                _scheduler_instance = FairScheduler(
+                    capacity=tenant_config.get('max_concurrent_calls', 16),
+                    weight=get_tenant_manager().weight
+                )
+    return _scheduler_instance
@@ -0,0 +1,104 @@
+"""
+增量JSON解析模块
+功能：模型以流式返回JSON时，每收到一段文本就向前扫描，顶层对象的某个字段一旦完整就立即解析并返回，
+不必等待整个响应结束。扫描是线性的，已扫描的文本不会重复处理
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """顶层JSON对象的增量解析器"""
+
+    def __init__(self):
+        self.buffer = ''
+        self._position = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # 当前顶层字段：键的起止位置、值的起始位置
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        """顶层对象是否已经结束"""
+        return self._finished
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        追加一段文本
+
+        Args:
+            text: 新收到的文本
+
+        Returns:
+            本次新完成的顶层字段 [(键, 值)]
+        """
+        self.buffer += text
+        completed = []
+        buffer = self.buffer
+        position = self._position
+
+        while position < len(buffer) and not self._finished:
+            char = buffer[position]
+
+            if not self._started:
+                # 跳过 ```json 等前缀，直到第一个 {
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                position += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None and self._key_start is not None:
+                        self._key = json.loads(buffer[self._key_start:position + 1])
+                position += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = position
+                elif self._depth == 1 and self._value_start is None:
+                    self._value_start = position
+            elif char in '{[':
+                if self._depth == 1 and self._key is not None and self._value_start is None:
+                    self._value_start = position
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buffer, position, completed)
+                    self._finished = True
+            elif char == ',' and self._depth == 1:
+                self._emit(buffer, position, completed)
+            elif not char.isspace() and char != ':' and self._depth == 1 \
+                    and self._key is not None and self._value_start is None:
+                # 数字、true/false/null
+                self._value_start = position
+            position += 1
+
+        self._position = position
+        return completed
+
+    def _emit(self, buffer: str, end: int, completed: List[Tuple[str, Any]]):
+        """当前顶层字段的值在 end 之前结束"""
+        if self._key is not None and self._value_start is not None:
+            try:
+                completed.append((self._key, json.loads(buffer[self._value_start:end])))
+            except json.JSONDecodeError:
+                pass
+        self._key_start = None
+        self._key = None
+        self._value_start = None
@@ -0,0 +1,404 @@
+"""
+模型接口路由模块
+功能：配置多个 OpenAI 兼容的接口地址/密钥（不同区域、不同账号），每个接口有独立的每分钟请求数和token预算。
+每次调用按各接口观测到的延迟（EWMA）、错误率、并发数和剩余额度选择得分最低的接口，
+调用失败时自动切换到其他接口重试；某个区域变慢或某个密钥被限流不再限制整体吞吐量
+
+接口状态保存在进程内存中，每个worker进程独立统计；只配置一个接口时行为与直接调用该接口相同
+"""
+import collections
+import random
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional
+from urllib.parse import urlparse
+
+from utils.circuit_breaker import LocalRejection, is_request_error
+from utils.metrics import metrics
+
+
+class NoEndpointAvailable(LocalRejection):
+    """没有可用的接口（额度在等待时间内没有恢复，或没有提供该模型的接口），不计入熔断"""
+
+    def __init__(self, model: str, reason: str):
+        self.model = model
+        super().__init__(f"没有可用的模型接口（{model}）: {reason}")
+
+
+def should_failover(error: Exception) -> bool:
+    """调用失败后是否换一个接口重试（连接失败、超时、限流、鉴权失败、服务端错误）"""
+    # 请求本身有误时换接口也会失败
+    return not is_request_error(error)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """限流响应中的 Retry-After（秒）"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class Endpoint:
+    """单个模型接口及其健康状态"""
+
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        models: Optional[List[str]] = None,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        weight: float = 1.0,
+        timeout: Optional[float] = None,
+        client: Any = None
+    ):
+        """
+        Args:
+            name: 接口名称（用于指标和健康状态）
+            api_key: API密钥
+            base_url: 接口地址，为空时使用 OpenAI 官方地址
+            models: 该接口提供的模型，为空表示全部
+            requests_per_minute: 每分钟请求数上限（0表示不限）
+            tokens_per_minute: 每分钟token上限（0表示不限，按预估token数计）
+            weight: 权重，越大越优先
+            timeout: 单次调用超时（秒）
+            client: 预先创建的客户端，为空时第一次调用时创建
+        """
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.models = set(models or [])
+        self.requests_per_minute = requests_per_minute or 0
+        self.tokens_per_minute = tokens_per_minute or 0
+        self.weight = max(0.01, weight)
+        self.timeout = timeout
+        self.max_retries: Optional[int] = None
+        self._client = client
+
+        # 以下状态由 LLMRouter 持锁读写
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.window = collections.deque()
+        self.window_tokens = 0
+
+    @property
+    def client(self):
+        """OpenAI 客户端（openai包较重，延迟到第一次调用时再导入）"""
+        if self._client is None:
+            from openai import OpenAI
+
+            options = {"api_key": self.api_key}
+            if self.base_url:
+                options['base_url'] = self.base_url
+            if self.timeout:
+                options['timeout'] = self.timeout
+            if self.max_retries is not None:
+                options['max_retries'] = self.max_retries
+            self._client = OpenAI(**options)
+        return self._client
+
+    def serves(self, model: str) -> bool:
+        return not self.models or model in self.models
+
+    def _trim(self, now: float):
+        while self.window and now - self.window[0][0] >= 60:
+            self.window_tokens -= self.window.popleft()[1]
+
+    def headroom(self, now: float, tokens: int) -> float:
+        """
+        加上本次调用后剩余的额度比例（请求数和token中较小的一个）
+
+        Returns:
+            0~1，额度不足时小于0
+        """
+        self._trim(now)
+        ratios = [1.0]
+        if self.requests_per_minute:
+            ratios.append(1 - (len(self.window) + 1) / self.requests_per_minute)
+        if self.tokens_per_minute:
+            ratios.append(1 - (self.window_tokens + tokens) / self.tokens_per_minute)
+        return min(ratios)
+
+    def next_free(self, now: float) -> float:
+        """额度窗口中最早一条记录过期的时间"""
+        return self.window[0][0] + 60 if self.window else now
+
+    def reserve(self, now: float, tokens: int):
+        self.window.append((now, tokens))
+        self.window_tokens += tokens
+        self.in_flight += 1
+
+    def health(self, now: float) -> Dict[str, Any]:
+        self._trim(now)
+        cooldown = max(0.0, self.cooldown_until - now)
+        return {
+            "host": urlparse(self.base_url).netloc if self.base_url else "api.openai.com",
+            "models": sorted(self.models) or None,
+            "state": "cooldown" if cooldown else "ok",
+            "cooldown_remaining": round(cooldown, 1),
+            "latency_ewma_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 4),
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "requests_last_minute": len(self.window),
+            "requests_per_minute": self.requests_per_minute or None,
+            "tokens_last_minute": self.window_tokens,
+            "tokens_per_minute": self.tokens_per_minute or None,
+        }
+
+
+class LLMRouter:
+    """在多个模型接口之间选择并自动切换"""
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        ewma_alpha: float = 0.3,
+        initial_latency: float = 1.0,
+        error_penalty: float = 4.0,
+        quota_penalty: float = 2.0,
+        explore_rate: float = 0.05,
+        max_attempts: int = 3,
+        cooldown_seconds: float = 5.0,
+        max_wait_seconds: float = 5.0
+    ):
+        """
+        Args:
+            endpoints: 接口列表
+            ewma_alpha: 延迟和错误率EWMA的平滑系数（越大越看重最近的调用）
+            initial_latency: 还没有成功调用过的接口的预估延迟（秒）
+            error_penalty: 错误率对得分的放大系数
+            quota_penalty: 已用额度对得分的放大系数
+            explore_rate: 随机选择接口的比例，使变慢或出错后恢复的接口重新被观测到
+            max_attempts: 单次调用最多尝试的接口数
+            cooldown_seconds: 调用失败后该接口暂停选择的时间（秒），限流响应带 Retry-After 时以其为准
+            max_wait_seconds: 所有接口额度都用完时最多等待的时间（秒）
+        """
+        if not endpoints:
+            raise ValueError("至少需要配置一个模型接口")
+        self.endpoints = endpoints
+        self.ewma_alpha = ewma_alpha
+        self.initial_latency = initial_latency
+        self.error_penalty = error_penalty
+        self.quota_penalty = quota_penalty
+        self.explore_rate = explore_rate
+        self.max_attempts = max(1, max_attempts)
+        self.cooldown_seconds = cooldown_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+
+        if len(endpoints) > 1:
+            # 由路由负责重试和切换，客户端自身不再重试同一个接口
+            for endpoint in endpoints:
+                endpoint.max_retries = 0
+
+    def score(self, endpoint: Endpoint, headroom: float) -> float:
+        """接口得分（预期延迟，越低越优先，需持有锁）"""
+        latency = endpoint.latency if endpoint.latency is not None else self.initial_latency
+        return (
+            latency
+            * (1 + endpoint.in_flight)
+            * (1 + self.error_penalty * endpoint.error_rate)
+            * (1 + self.quota_penalty * (1 - headroom))
+            / endpoint.weight
+        )
+
+    def _select(self, model: str, tokens: int, tried: set) -> Optional[Endpoint]:
+        """
+        选择一个接口并预占额度；额度都用完时等待，超过 max_wait_seconds 返回None
+
+        冷却中的接口只在没有其他接口可选时使用
+        """
+        deadline = time.monotonic() + self.max_wait_seconds
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [
+                    (endpoint, endpoint.headroom(now, tokens))
+                    for endpoint in self.endpoints
+                    if endpoint.name not in tried and endpoint.serves(model)
+                ]
+                if not candidates:
+                    return None
+                within_quota = [(e, h) for e, h in candidates if h >= 0]
+                if within_quota:
+                    ready = [(e, h) for e, h in within_quota if e.cooldown_until <= now]
+                    if not ready:
+                        endpoint = min(within_quota, key=lambda item: item[0].cooldown_until)[0]
+                    elif len(ready) > 1 and random.random() < self.explore_rate:
+                        endpoint = random.choice(ready)[0]
+                    else:
+                        endpoint = min(ready, key=lambda item: self.score(*item))[0]
+                    endpoint.reserve(now, tokens)
+                    return endpoint
+                wait = min(endpoint.next_free(now) for endpoint, _ in candidates) - now
+
+            if time.monotonic() + wait > deadline:
+                return None
+            metrics.incr('llm_endpoint_quota_waits')
+            time.sleep(max(0.01, wait))
+
+    def _record(self, endpoint: Endpoint, latency: float, error: Optional[Exception] = None):
+        alpha = self.ewma_alpha
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.calls += 1
+            if error is None:
+                endpoint.latency = latency if endpoint.latency is None else (1 - alpha) * endpoint.latency + alpha * latency
+                endpoint.error_rate = (1 - alpha) * endpoint.error_rate
+            else:
+                endpoint.failures += 1
+                endpoint.error_rate = (1 - alpha) * endpoint.error_rate + alpha
+                cooldown = _retry_after(error) or self.cooldown_seconds
+                endpoint.cooldown_until = max(endpoint.cooldown_until, time.monotonic() + cooldown)
+        outcome = 'success' if error is None else 'failure'
+        metrics.incr('llm_endpoint_calls', endpoint=endpoint.name, outcome=outcome)
+        if error is None:
+            metrics.observe('llm_endpoint_latency_seconds', latency, endpoint=endpoint.name)
+
+    def call(
+        self,
+        model: str,
+        fn: Callable[[Any], Any],
+        tokens: int = 0,
+        can_retry: Optional[Callable[[], bool]] = None
+    ) -> Any:
+        """
+        选择接口执行 fn(client)，失败时切换到其他接口重试
+
+        Args:
+            model: 模型名称（只选择提供该模型的接口）
+            fn: 用传入的客户端完成一次调用
+            tokens: 本次调用的预估token数，计入接口的每分钟token额度
+            can_retry: 失败后是否还能重试（如流式调用已经回调了部分结果时不能重试）
+
+        Raises:
+            NoEndpointAvailable: 没有提供该模型的接口，或额度在等待时间内没有恢复
+            Exception: 最后一个接口的调用错误
+        """
+        tried = set()
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_attempts):
+            endpoint = self._select(model, tokens, tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint.name)
+            if attempt:
+                metrics.incr('llm_failovers', endpoint=endpoint.name)
+
+            start = time.perf_counter()
+            try:
+                result = fn(endpoint.client)
+            except Exception as e:
+                if not should_failover(e):
+                    # 请求本身有误，不算接口故障
+                    with self._lock:
+                        endpoint.in_flight -= 1
+                    raise
+                self._record(endpoint, time.perf_counter() - start, e)
+                print(f"模型接口 {endpoint.name} 调用失败: {e}")
+                last_error = e
+                if can_retry is not None and not can_retry():
+                    raise
+                continue
+            self._record(endpoint, time.perf_counter() - start)
+            return result
+
+        if last_error is not None:
+            raise last_error
+        serving = any(endpoint.serves(model) for endpoint in self.endpoints)
+        raise NoEndpointAvailable(model, "额度已用完" if serving else "没有提供该模型的接口")
+
+    def primary(self, name: Optional[str] = None) -> Endpoint:
+        """
+        只能使用单个接口的场景（如批处理任务）使用的接口
+
+        Args:
+            name: 接口名称，为空时取权重最高的接口（相同时取配置中靠前的）
+
+        Raises:
+            ValueError: 没有该名称的接口
+        """
+        if not name:
+            return max(self.endpoints, key=lambda endpoint: endpoint.weight)
+        for endpoint in self.endpoints:
+            if endpoint.name == name:
+                return endpoint
+        raise ValueError(f"未配置名为 {name} 的模型接口")
+
+    def report(self) -> Dict[str, Any]:
+        """各接口的健康状态"""
+        with self._lock:
+            now = time.monotonic()
+            return {endpoint.name: endpoint.health(now) for endpoint in self.endpoints}
+
+
+_router_instance: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def build_endpoints(openai_config: Dict[str, Any]) -> List[Endpoint]:
+    """
+    按 openai.endpoints 创建接口列表；未配置时只有一个使用 openai.api_key 的接口
+
+    Raises:
+        ValueError: 没有配置有效的API密钥
+    """
+    entries = openai_config.get('endpoints') or [{"name": "default", "api_key": openai_config.get('api_key')}]
+    endpoints = []
+    for index, entry in enumerate(entries):
+        api_key = entry.get('api_key')
+        if not api_key or api_key.startswith('your-'):
+            continue
+        endpoints.append(Endpoint(
+            name=entry.get('name') or f"endpoint{index}",
+            api_key=api_key,
+            base_url=entry.get('base_url'),
+            models=entry.get('models'),
+            requests_per_minute=entry.get('requests_per_minute', 0),
+            tokens_per_minute=entry.get('tokens_per_minute', 0),
+            weight=entry.get('weight', 1.0),
+            timeout=entry.get('timeout_seconds')
+        ))
+    if not endpoints:
+        raise ValueError("请在config/config.yaml中配置有效的OpenAI API密钥")
+    return endpoints
+
+
+def get_llm_router() -> LLMRouter:
+    """获取全局模型接口路由（按 openai.endpoints 和 openai.routing 配置懒加载）"""
+    global _router_instance
+    if _router_instance is None:
+        with _router_lock:
+            if _router_instance is None:
+                from utils.config_loader import config
+
+                openai_config = config.get_openai_config()
+                routing = openai_config.get('routing', {}) or {}
+                _router_instance = LLMRouter(
+                    build_endpoints(openai_config),
+                    ewma_alpha=routing.get('ewma_alpha', 0.3),
+                    initial_latency=routing.get('initial_latency_seconds', 1.0),
+                    error_penalty=routing.get('error_penalty', 4.0),
+                    quota_penalty=routing.get('quota_penalty', 2.0),
+                    explore_rate=routing.get('explore_rate', 0.05),
+                    max_attempts=routing.get('max_attempts', 3),
+                    cooldown_seconds=routing.get('cooldown_seconds', 5.0),
+                    max_wait_seconds=routing.get('max_wait_seconds', 5.0)
+                )
+    return _router_instance
+
+
+def endpoint_report() -> Dict[str, Any]:
+    """各模型接口的健康状态（路由尚未创建时为空）"""
+    router = _router_instance
+    return router.report() if router is not None else {}
@@ -0,0 +1,117 @@
+"""
+运行指标模块
+功能：线程安全的计数器和耗时统计，供各模块记录指标并通过 /api/metrics 暴露
+"""
+import threading
+from typing import Dict, Any, List, Tuple
+
+
+def _label_key(labels: Dict[str, Any]) -> str:
+    """将标签转换为稳定的字符串键，例如 stage=ipo,tier=fast"""
+    return ','.join(f"{k}={labels[k]}" for k in sorted(labels))
+
+
+class _Summary:
+    """数值分布统计（保留最近的样本用于计算分位数）"""
+
+    MAX_SAMPLES = 1024
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._samples: List[float] = []
+        self._next = 0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._samples) < self.MAX_SAMPLES:
+            self._samples.append(value)
+        else:
+            self._samples[self._next] = value
+            self._next = (self._next + 1) % self.MAX_SAMPLES
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 4) if self.count else 0.0,
+            "min": round(self.min, 4) if self.min is not None else None,
+            "max": round(self.max, 4) if self.max is not None else None,
+            "p50": round(self.percentile(0.5), 4),
+            "p95": round(self.percentile(0.95), 4),
+        }
+
+
+class Metrics:
+    """指标注册表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._summaries: Dict[Tuple[str, str], _Summary] = {}
+        self._gauges: Dict[Tuple[str, str], float] = {}
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """计数器加值"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """记录一个观测值（如耗时）"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary()
+            summary.observe(value)
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """设置瞬时值"""
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def counter(self, name: str, **labels) -> float:
+        """读取计数器"""
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def summary(self, name: str, **labels) -> Dict[str, Any]:
+        """读取观测值统计"""
+        with self._lock:
+            summary = self._summaries.get((name, _label_key(labels)))
+            return summary.to_dict() if summary else _Summary().to_dict()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """所有指标的快照，按指标名分组"""
+        result: Dict[str, Any] = {"counters": {}, "summaries": {}, "gauges": {}}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                result["counters"].setdefault(name, {})[labels] = value
+            for (name, labels), summary in self._summaries.items():
+                result["summaries"].setdefault(name, {})[labels] = summary.to_dict()
+            for (name, labels), value in self._gauges.items():
+                result["gauges"].setdefault(name, {})[labels] = value
+        return result
+
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+            self._gauges.clear()
+
+
+# 全局指标实例
+metrics = Metrics()
@@ -0,0 +1,365 @@
+"""
+网页抓取模块
+功能：为负面舆情检索并发抓取搜索结果中的网页并提取正文：
+- 共用一个带连接池的 requests.Session，每个站点同时进行的请求数有上限
+- 每个网页有连接/读取超时和总耗时上限，超过大小上限的部分直接丢弃
+- 按标签去掉脚本、样式、导航、页眉页脚等模板内容，只保留正文文本
+- 正文按URL写入共享缓存；缓存过期后带 If-None-Match / If-Modified-Since 重新请求，未修改（304）时沿用缓存的正文
+- 搜索结果中的URL不可信：只抓取 http/https，拒绝解析到内网、回环、链路本地等非公网地址的主机，重定向的每一跳同样检查
+"""
+import ipaddress
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Optional
+from urllib.parse import urljoin, urlparse
+
+from utils.cache import get_cache, get_cache_ttl
+from utils.cassette import get_cassette
+from utils.metrics import metrics
+
+# 内容不属于正文的标签（连同其中的文字一起跳过）
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'iframe', 'nav', 'header', 'footer', 'aside', 'form', 'button', 'select'}
+
+# 块级标签，前后断行
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'table', 'tr', 'td', 'th', 'br', 'hr',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'dd', 'dt', 'title',
+}
+
+# 只抓取这些类型的内容
+TEXT_TYPES = ('text/html', 'text/plain', 'application/xhtml+xml')
+
+_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([a-zA-Z0-9_-]+)', re.IGNORECASE)
+_SPACE_PATTERN = re.compile(r'[ \t\r\f\v 　]+')
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.title_parts: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title':
+            self._in_title = True
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == 'title':
+            self._in_title = False
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+
+def extract_text(html: str, min_line_chars: int = 8) -> Dict[str, str]:
+    """
+    提取网页标题和正文
+
+    Args:
+        html: 网页源码
+        min_line_chars: 短于该长度的行（菜单、按钮、版权信息等）丢弃
+
+    Returns:
+        {"title", "text"}，正文按行分隔
+    """
+    extractor = _TextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:
+        # 残缺的HTML尽量保留已解析的部分
+        pass
+    lines = []
+    for line in ''.join(extractor.parts).split('\n'):
+        line = _SPACE_PATTERN.sub(' ', line).strip()
+        if len(line) >= min_line_chars:
+            lines.append(line)
+    title = _SPACE_PATTERN.sub(' ', ''.join(extractor.title_parts)).strip()
+    return {"title": title, "text": '\n'.join(lines)}
+
+
+def _decode(body: bytes, content_type: str) -> str:
+    """按响应头或 <meta charset> 解码，无法识别时按UTF-8"""
+    match = re.search(r'charset=([\w-]+)', content_type or '', re.IGNORECASE)
+    charset = match.group(1) if match else None
+    if charset is None:
+        meta = _CHARSET_PATTERN.search(body[:4096])
+        charset = meta.group(1).decode('ascii') if meta else 'utf-8'
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+class UnsafeURLError(ValueError):
+    """URL的协议或主机不允许抓取"""
+
+
+def check_public_url(url: str):
+    """
+    检查URL是否可以抓取：协议为 http/https，主机解析出的所有地址都是公网地址
+
+    Raises:
+        UnsafeURLError: 协议不支持，或主机为内网、回环、链路本地、保留等地址
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise UnsafeURLError(f"不支持的URL: {url}")
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parsed.hostname, parsed.port or None, proto=socket.IPPROTO_TCP)}
+    except socket.gaierror as e:
+        raise UnsafeURLError(f"无法解析主机 {parsed.hostname}: {e}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if not ip.is_global or ip.is_multicast:
+            raise UnsafeURLError(f"主机 {parsed.hostname} 解析到非公网地址 {address}")
+
+
+class PageFetcher:
+    """并发抓取网页正文"""
+
+    # 最多跟随的重定向次数
+    MAX_REDIRECTS = 5
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        per_host: int = 2,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 5.0,
+        page_deadline: float = 8.0,
+        max_bytes: int = 1_000_000,
+        failure_ttl: int = 300,
+        user_agent: str = 'Mozilla/5.0 (compatible; ResumeSearch/1.0)',
+        allow_private_hosts: bool = False
+    ):
+        """
+        Args:
+            max_workers: 同时抓取的网页数（也是连接池大小）
+            per_host: 同一站点同时进行的请求数
+            connect_timeout: 连接超时（秒）
+            read_timeout: 两次读取之间的超时（秒）
+            page_deadline: 单个网页的总耗时上限（秒），超过后放弃
+            max_bytes: 单个网页读取的最大字节数，超过部分丢弃
+            failure_ttl: 抓取失败的网页在多少秒内不再重试
+            user_agent: 请求头 User-Agent
+            allow_private_hosts: 允许抓取内网和本机地址（只用于本地测试）
+        """
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.timeout = (connect_timeout, read_timeout)
+        self.page_deadline = page_deadline
+        self.max_bytes = max_bytes
+        self.failure_ttl = failure_ttl
+        self.user_agent = user_agent
+        self.allow_private_hosts = allow_private_hosts
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """共用的 requests.Session（requests 延迟到第一次抓取时再导入）"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers['User-Agent'] = self.user_agent
+                    self._session = session
+        return self._session
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def fetch(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        抓取一个网页（先查缓存）
+
+        Returns:
+            {"url", "title", "text"}，抓取失败或不是文本内容时为None
+        """
+        cache = get_cache()
+        key = cache.make_key(url)
+
+        # 回放模式直接返回录制的网页正文；录制模式记录每次抓取（包括缓存命中）
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            return cassette.replay('page', key)
+
+        page = self._fetch_cached(cache, key, url)
+        if cassette is not None and cassette.recording:
+            cassette.record('page', key, {"url": url}, page)
+        return page
+
+    def _fetch_cached(self, cache, key: str, url: str) -> Optional[Dict[str, Any]]:
+        cached = cache.get('page', key)
+        if cached is not None:
+            metrics.incr('page_fetches', outcome='cached')
+            return cached.get('page')
+
+        # 缓存过期时带上次的 ETag / Last-Modified 做条件请求
+        previous = cache.get_stale('page', key) or {}
+        headers = {}
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+        start = time.perf_counter()
+        try:
+            with self._host_slot(urlparse(url).netloc):
+                entry = self._download(url, headers, previous)
+        except Exception as e:
+            print(f"网页抓取失败 {url}: {e}")
+            metrics.incr('page_fetches', outcome='blocked' if isinstance(e, UnsafeURLError) else 'error')
+            if previous.get('page'):
+                # 沿用缓存中已过期的正文
+                return previous['page']
+            # 失败的网页短时间内不再重试
+            cache.set('page', key, {"page": None}, self.failure_ttl)
+            return None
+        finally:
+            metrics.observe('page_fetch_seconds', time.perf_counter() - start)
+
+        cache.set('page', key, entry, get_cache_ttl('page'))
+        return entry['page']
+
+    def _download(self, url: str, headers: Dict[str, str], previous: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        下载并提取正文
+
+        Returns:
+            缓存条目 {"page", "etag", "last_modified"}
+        """
+        deadline = time.monotonic() + self.page_deadline
+        with self._follow_redirects(url, headers) as response:
+            if response.status_code == 304 and previous:
+                metrics.incr('page_fetches', outcome='not_modified')
+                return previous
+            response.raise_for_status()
+
+            entry = {
+                "page": None,
+                "etag": response.headers.get('ETag'),
+                "last_modified": response.headers.get('Last-Modified'),
+            }
+            content_type = response.headers.get('Content-Type', '')
+            if content_type and not content_type.lower().startswith(TEXT_TYPES):
+                metrics.incr('page_fetches', outcome='not_text')
+                return entry
+
+            chunks, size = [], 0
+            for chunk in response.iter_content(chunk_size=16384):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes:
+                    metrics.incr('page_truncated')
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"超过 {self.page_deadline} 秒")
+
+        body = b''.join(chunks)[:self.max_bytes]
+        text = _decode(body, content_type)
+        if 'html' in content_type.lower() or text.lstrip()[:1] == '<':
+            extracted = extract_text(text)
+        else:
+            extracted = {"title": "", "text": text.strip()}
+        entry['page'] = {"url": url, "title": extracted['title'], "text": extracted['text']}
+        metrics.incr('page_fetches', outcome='ok')
+        metrics.incr('page_bytes', len(body))
+        return entry
+
+    def _follow_redirects(self, url: str, headers: Dict[str, str]):
+        """
+        请求URL并逐跳跟随重定向，每一跳请求前检查协议和主机（见 check_public_url）
+
+        Returns:
+            最终的响应（流式读取）
+
+        Raises:
+            UnsafeURLError: 某一跳的URL不允许抓取，或重定向次数过多
+        """
+        for _ in range(self.MAX_REDIRECTS + 1):
+            if not self.allow_private_hosts:
+                check_public_url(url)
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True, allow_redirects=False)
+            location = response.headers.get('Location')
+            if not response.is_redirect or not location:
+                return response
+            response.close()
+            url = urljoin(url, location)
+        raise UnsafeURLError(f"重定向超过 {self.MAX_REDIRECTS} 次")
+
+    def fetch_all(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        并发抓取多个网页（重复的URL只抓取一次）
+
+        Returns:
+            抓取成功的网页，顺序与 urls 一致
+        """
+        from utils.tenants import run_in_context
+
+        urls = list(dict.fromkeys(url for url in urls if url and url.startswith(('http://', 'https://'))))
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            pages = list(executor.map(run_in_context(self.fetch), urls))
+        return [page for page in pages if page and page.get('text')]
+
+
+_fetcher_instance = None
+_fetcher_lock = threading.Lock()
+
+
+def get_page_fetcher() -> PageFetcher:
+    """获取全局网页抓取器（按 negative_check.evidence 配置懒加载）"""
+    global _fetcher_instance
+    if _fetcher_instance is None:
+        with _fetcher_lock:
+            if _fetcher_instance is None:
+                from utils.config_loader import config
+
+                evidence_config = config.get('negative_check.evidence', {}) or {}
+                _fetcher_instance = PageFetcher(
+                    max_workers=evidence_config.get('max_workers', 8),
+                    per_host=evidence_config.get('per_host', 2),
+                    connect_timeout=evidence_config.get('connect_timeout', 3.0),
+                    read_timeout=evidence_config.get('read_timeout', 5.0),
+                    page_deadline=evidence_config.get('page_deadline', 8.0),
+                    max_bytes=evidence_config.get('max_bytes', 1_000_000),
+                    failure_ttl=evidence_config.get('failure_ttl', 300),
+                    user_agent=evidence_config.get('user_agent', 'Mozilla/5.0 (compatible; ResumeSearch/1.0)')
+                )
+    return _fetcher_instance
@@ -0,0 +1,308 @@
+"""
+按需性能剖析模块
+功能：线上延迟变差时定位耗时所在（报告生成中的JSON序列化、提示词拼接、parse_json_response、线程池调度还是网络等待）
+
+- 请求剖析：按采样率或请求头 X-Profile 对单个请求执行 cProfile，请求内通过 run_in_context 提交到线程池的任务
+  在各自线程中同样被剖析，结果合并到该请求；最近的剖析结果保存在内存中，/debug/profile 按时间窗口汇总热点函数
+- 栈采样：/debug/profile?mode=sample 在指定时长内定期采样所有线程的调用栈，统计各函数出现在栈顶和栈中的比例，
+  不需要提前开启，适合观察正在发生的问题
+
+未开启时每个请求只多一次配置判断，每个线程池任务只多一次 ContextVar 读取
+"""
+import contextvars
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Dict, Any, Callable, List, Optional
+
+from utils.metrics import metrics
+
+SORT_KEYS = ('tottime', 'cumtime', 'calls')
+
+# 当前请求的剖析结果（未剖析时为None），随 run_in_context 传递到线程池任务
+current_profile: contextvars.ContextVar = contextvars.ContextVar('current_profile', default=None)
+
+# 当前线程是否已在剖析中（同一线程不能同时启用两个剖析器）
+_thread_state = threading.local()
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _short_path(filename: str) -> str:
+    """项目内的文件显示相对路径，标准库和第三方库只显示最后两级"""
+    if filename.startswith(PROJECT_ROOT + os.sep):
+        return os.path.relpath(filename, PROJECT_ROOT)
+    return os.sep.join(filename.split(os.sep)[-2:])
+
+
+def _function_name(key) -> str:
+    filename, line, name = key
+    if filename == '~':
+        # 内置函数
+        return name
+    return f"{_short_path(filename)}:{line}({name})"
+
+
+class RequestProfile:
+    """单个请求的剖析结果（请求线程和线程池任务的统计合并在一起）"""
+
+    def __init__(self, endpoint: str, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.endpoint = endpoint
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.stats = pstats.Stats()
+        self.tasks = 0
+        self.closed = False
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def add(self, profiler: cProfile.Profile, task: bool = True):
+        """合并一个线程的剖析数据（请求结束后到达的后台任务数据丢弃）"""
+        with self._lock:
+            if self.closed:
+                return
+            self.stats.add(profiler)
+            if task:
+                self.tasks += 1
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self.duration = time.perf_counter() - self._started
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "endpoint": self.endpoint,
+            "trigger": self.trigger,
+            "started_at": round(self.started_at, 3),
+            "duration": round(self.duration, 4),
+            "tasks": self.tasks,
+        }
+
+
+def run_profiled(fn: Callable, *args, **kwargs):
+    """执行 fn；当前上下文属于被剖析的请求时在本线程中启用 cProfile 并把结果合并到该请求"""
+    profile = current_profile.get()
+    if profile is None or getattr(_thread_state, 'active', False):
+        return fn(*args, **kwargs)
+
+    profiler = cProfile.Profile()
+    _thread_state.active = True
+    profiler.enable()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        _thread_state.active = False
+        profile.add(profiler)
+
+
+def hot_functions(stats: pstats.Stats, sort: str = 'tottime', limit: int = 30) -> List[Dict[str, Any]]:
+    """
+    从剖析统计中取出最耗时的函数
+
+    Args:
+        sort: tottime（函数自身耗时）/ cumtime（含调用的函数）/ calls（调用次数）
+        limit: 返回数量
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort 只能是 {', '.join(SORT_KEYS)}")
+    index = {'calls': 1, 'tottime': 2, 'cumtime': 3}[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)[:limit]
+    return [
+        {
+            "function": _function_name(key),
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+            "percall_ms": round(cumtime / calls * 1000, 4) if calls else 0.0,
+        }
+        for key, (_, calls, tottime, cumtime, _) in rows
+    ]
+
+
+def sample_stacks(seconds: float, interval: float = 0.005, limit: int = 30) -> Dict[str, Any]:
+    """
+    在 seconds 秒内每隔 interval 秒采样一次所有线程（当前线程除外）的调用栈
+
+    Returns:
+        采样次数，以及按栈顶出现次数（self）和在栈中出现次数（total）排列的热点函数
+    """
+    own = threading.get_ident()
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    samples = thread_samples = 0
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{_short_path(code.co_filename)}:{code.co_firstlineno}({code.co_name})")
+                frame = frame.f_back
+            self_counts[names[0]] += 1
+            total_counts.update(set(names))
+            thread_samples += 1
+        samples += 1
+        time.sleep(interval)
+
+    def top(counts):
+        return [
+            {"function": name, "samples": count, "ratio": round(count / max(1, thread_samples), 4)}
+            for name, count in counts.most_common(limit)
+        ]
+
+    return {
+        "mode": "sample",
+        "seconds": seconds,
+        "samples": samples,
+        "thread_samples": thread_samples,
+        "self": top(self_counts),
+        "total": top(total_counts),
+    }
+
+
+class Profiler:
+    """请求剖析的开关、采样决策和最近结果"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 0.0,
+        allow_header: bool = True,
+        max_profiles: int = 200,
+        token: str = ''
+    ):
+        """
+        Args:
+            enabled: 是否启用剖析（关闭时请求头和 /debug/profile 均无效）
+            sample_rate: 随机剖析的请求比例
+            allow_header: 是否允许通过请求头 X-Profile: 1 剖析指定请求
+            max_profiles: 内存中保留的最近剖析结果数
+            token: 非空时请求头 X-Profile 和 /debug/profile 需要携带相同的 X-Debug-Token
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.allow_header = allow_header
+        self.token = token
+        self._profiles: deque = deque(maxlen=max(1, max_profiles))
+        self._lock = threading.Lock()
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return not self.token or token == self.token
+
+    def should_profile(self, header: Optional[str], token: Optional[str] = None) -> Optional[str]:
+        """
+        决定是否剖析本次请求
+
+        Returns:
+            触发方式 header/sample，不剖析时为None
+        """
+        if not self.enabled:
+            return None
+        if header and header.strip().lower() in ('1', 'true', 'yes') and self.allow_header and self.authorized(token):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def start(self, endpoint: str, trigger: str) -> Dict[str, Any]:
+        """
+        开始剖析当前线程中的请求
+
+        Returns:
+            传给 finish 的句柄
+        """
+        profile = RequestProfile(endpoint, trigger)
+        profiler = cProfile.Profile()
+        token = current_profile.set(profile)
+        _thread_state.active = True
+        profiler.enable()
+        return {"profile": profile, "profiler": profiler, "token": token}
+
+    def finish(self, handle: Dict[str, Any]) -> RequestProfile:
+        """结束剖析并保存结果"""
+        handle['profiler'].disable()
+        _thread_state.active = False
+        current_profile.reset(handle['token'])
+        profile = handle['profile']
+        profile.add(handle['profiler'], task=False)
+        profile.close()
+        with self._lock:
+            self._profiles.append(profile)
+        metrics.incr('profiled_requests', trigger=profile.trigger)
+        return profile
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def recent(self, window_seconds: Optional[float] = None) -> List[RequestProfile]:
+        cutoff = time.time() - window_seconds if window_seconds else 0
+        with self._lock:
+            return [p for p in self._profiles if p.started_at >= cutoff]
+
+    def aggregate(
+        self,
+        window_seconds: Optional[float] = None,
+        sort: str = 'tottime',
+        limit: int = 30,
+        endpoint: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        汇总时间窗口内各请求的剖析结果
+
+        Args:
+            window_seconds: 只汇总最近多少秒内开始的请求，None 表示全部保留的结果
+            endpoint: 只汇总该接口的请求
+        """
+        profiles = [p for p in self.recent(window_seconds) if endpoint is None or p.endpoint == endpoint]
+        merged = pstats.Stats()
+        for profile in profiles:
+            merged.add(profile.stats)
+        durations = sorted(p.duration for p in profiles)
+        return {
+            "mode": "requests",
+            "window_seconds": window_seconds,
+            "requests": len(profiles),
+            "endpoints": dict(Counter(p.endpoint for p in profiles)),
+            "duration_p50": round(durations[len(durations) // 2], 4) if durations else None,
+            "duration_max": round(durations[-1], 4) if durations else None,
+            "functions": hot_functions(merged, sort, limit),
+        }
+
+
+_profiler_instance = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """获取全局剖析器（按 profiling 配置懒加载）"""
+    global _profiler_instance
+    if _profiler_instance is None:
+        with _profiler_lock:
+            if _profiler_instance is None:
+                from utils.config_loader import config
+
+                profiling_config = config.get('profiling', {}) or {}
+                _profiler_instance = Profiler(
+                    enabled=profiling_config.get('enabled', False),
+                    sample_rate=profiling_config.get('sample_rate', 0.0),
+                    allow_header=profiling_config.get('allow_header', True),
+                    max_profiles=profiling_config.get('max_profiles', 200),
+                    token=profiling_config.get('token', '') or ''
+                )
+    return _profiler_instance
@@ -0,0 +1,83 @@
+"""
+请求合并模块
+功能：相同键的调用同时进行时只执行一次，后到的调用等待第一次调用完成并共享同一个结果
+（异常同样共享）。合并范围为当前进程内的所有线程
+"""
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """去掉首尾空白，连续空白视为一个空格"""
+    return re.sub(r'\s+', ' ', str(text or '')).strip()
+
+
+def request_key(*parts: str) -> str:
+    """
+    由若干文本字段生成合并键（去掉首尾空白、连续空白视为一个空格）
+
+    Returns:
+        sha256 十六进制摘要
+    """
+    normalized = [normalize_text(part) for part in parts]
+    return hashlib.sha256(json.dumps(normalized, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """相同键的并发调用合并为一次"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行调用，若相同键的调用正在进行则等待其结果
+
+        Args:
+            key: 合并键
+            fn: 实际执行的函数
+
+        Returns:
+            (结果, 是否为合并到其他调用上的结果)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # 先移除再通知：结果返回后到达的请求重新执行，而不是拿到已完成的结果
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """进行中的调用数"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,299 @@
+"""
+租户模块
+功能：多个团队共用一个部署时，按请求头 X-Tenant-ID 识别租户，执行每分钟请求数和每日token配额，
+并记录各租户的用量。配额计数保存在SQLite中，所有worker进程共享
+
+当前租户保存在 contextvars 中：提交到线程池的任务需通过 run_in_context 携带上下文
+"""
+import contextvars
+import datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+from utils.circuit_breaker import LocalRejection
+from utils.metrics import metrics
+from utils.profiler import run_profiled
+
+DEFAULT_TENANT = 'default'
+
+_TENANT_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
+current_tenant: contextvars.ContextVar = contextvars.ContextVar('tenant', default=DEFAULT_TENANT)
+
+
+class QuotaExceeded(LocalRejection):
+    """租户超出配额（本地拒绝，不计入熔断）"""
+
+    def __init__(self, tenant: str, kind: str, retry_after: int):
+        """
+        Args:
+            tenant: 租户
+            kind: 配额类型 requests/tokens
+            retry_after: 配额恢复前的秒数
+        """
+        self.tenant = tenant
+        self.kind = kind
+        self.retry_after = retry_after
+        message = "每分钟请求数" if kind == 'requests' else "每日token"
+        super().__init__(f"租户 {tenant} 已超出{message}配额，请 {retry_after} 秒后重试")
+
+
+class UnknownTenant(ValueError):
+    """未登记的租户"""
+
+
+class tenant_scope:
+    """在当前上下文中设置租户，例如 with tenant_scope('recruiting'): ..."""
+
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        self._token = None
+
+    def __enter__(self):
+        self._token = current_tenant.set(self.tenant)
+        return self.tenant
+
+    def __exit__(self, *exc):
+        current_tenant.reset(self._token)
+        return False
+
+
+def run_in_context(fn: Callable) -> Callable:
+    """
+    包装函数，使其在提交时的上下文（包括当前租户）中执行，用于线程池和后台线程
+
+    提交者的请求正在被剖析时，任务在所在线程中同样被剖析（见 utils.profiler）
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return context.copy().run(run_profiled, fn, *args, **kwargs)
+
+    return wrapper
+
+
+def _seconds_to_next_day() -> int:
+    now = datetime.datetime.now()
+    tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+    return max(1, int((tomorrow - now).total_seconds()))
+
+
+class TenantManager:
+    """租户配置与配额"""
+
+    # 每处理多少次请求清理一次过期的计数窗口
+    PURGE_EVERY = 500
+
+    def __init__(
+        self,
+        path: str,
+        tenants: Optional[Dict[str, Dict[str, Any]]] = None,
+        default: Optional[Dict[str, Any]] = None,
+        require_known: bool = False
+    ):
+        """
+        Args:
+            path: 配额计数的SQLite文件路径
+            tenants: 租户ID -> {"weight", "requests_per_minute", "tokens_per_day"}
+            default: 未单独配置的租户使用的配置
+            require_known: 是否拒绝未登记的租户
+        """
+        self.path = path
+        self.tenants = {str(k): dict(v or {}) for k, v in (tenants or {}).items()}
+        self.default = dict({'weight': 1, 'requests_per_minute': 0, 'tokens_per_day': 0}, **(default or {}))
+        self.require_known = require_known
+        self._local = threading.local()
+        self._requests_seen = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """按(进程ID, 线程)获取数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS usage (
+                tenant TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                window TEXT NOT NULL,
+                amount INTEGER NOT NULL,
+                PRIMARY KEY (tenant, kind, window)
+            )"""
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def config(self, tenant: str) -> Dict[str, Any]:
+        """租户的权重和配额（0表示不限）"""
+        return dict(self.default, **self.tenants.get(tenant, {}))
+
+    def weight(self, tenant: str) -> float:
+        return max(float(self.config(tenant).get('weight', 1) or 1), 1e-6)
+
+    def resolve(self, tenant_id: Optional[str]) -> str:
+        """
+        校验请求携带的租户ID
+
+        Raises:
+            UnknownTenant: 格式不合法，或要求登记而未登记
+        """
+        tenant = (tenant_id or '').strip() or DEFAULT_TENANT
+        if not _TENANT_PATTERN.match(tenant):
+            raise UnknownTenant(f"非法的租户ID: {tenant}")
+        if self.require_known and tenant != DEFAULT_TENANT and tenant not in self.tenants:
+            raise UnknownTenant(f"未登记的租户: {tenant}")
+        return tenant
+
+    @staticmethod
+    def _windows() -> Dict[str, str]:
+        now = time.time()
+        return {
+            'requests': str(int(now // 60)),
+            'tokens': datetime.date.today().isoformat(),
+        }
+
+    def _amount(self, conn: sqlite3.Connection, tenant: str, kind: str, window: str) -> int:
+        row = conn.execute(
+            "SELECT amount FROM usage WHERE tenant = ? AND kind = ? AND window = ?",
+            (tenant, kind, window)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _add(self, conn: sqlite3.Connection, tenant: str, kind: str, window: str, amount: int):
+        conn.execute(
+            """INSERT INTO usage (tenant, kind, window, amount) VALUES (?, ?, ?, ?)
+               ON CONFLICT (tenant, kind, window) DO UPDATE SET amount = amount + excluded.amount""",
+            (tenant, kind, window, amount)
+        )
+
+    def check_request(self, tenant: str):
+        """
+        登记一次请求，超出每分钟请求数或当日token已用完时拒绝
+
+        Raises:
+            QuotaExceeded: 超出配额
+        """
+        quota = self.config(tenant)
+        windows = self._windows()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens_per_day = quota.get('tokens_per_day') or 0
+            if tokens_per_day and self._amount(conn, tenant, 'tokens', windows['tokens']) >= tokens_per_day:
+                raise QuotaExceeded(tenant, 'tokens', _seconds_to_next_day())
+
+            requests_per_minute = quota.get('requests_per_minute') or 0
+            used = self._amount(conn, tenant, 'requests', windows['requests'])
+            if requests_per_minute and used >= requests_per_minute:
+                raise QuotaExceeded(tenant, 'requests', max(1, 60 - int(time.time() % 60)))
+
+            self._add(conn, tenant, 'requests', windows['requests'], 1)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._requests_seen += 1
+        if self._requests_seen % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def record_tokens(self, tenant: str, tokens: int):
+        """累计租户当日的token用量"""
+        if tokens > 0:
+            self._add(self._connect(), tenant, 'tokens', self._windows()['tokens'], int(tokens))
+
+    def purge_expired(self):
+        """清理已经过去的计数窗口"""
+        windows = self._windows()
+        conn = self._connect()
+        conn.execute("DELETE FROM usage WHERE kind = 'requests' AND window != ?", (windows['requests'],))
+        conn.execute("DELETE FROM usage WHERE kind = 'tokens' AND window != ?", (windows['tokens'],))
+
+    def report(self) -> Dict[str, Any]:
+        """各租户的配置和当前窗口用量"""
+        windows = self._windows()
+        conn = self._connect()
+        used: Dict[str, Dict[str, int]] = {}
+        for tenant, kind, amount in conn.execute(
+            "SELECT tenant, kind, amount FROM usage WHERE (kind = 'requests' AND window = ?) OR (kind = 'tokens' AND window = ?)",
+            (windows['requests'], windows['tokens'])
+        ):
+            used.setdefault(tenant, {})[kind] = amount
+
+        report = {}
+        for tenant in sorted(set(self.tenants) | set(used) | {DEFAULT_TENANT}):
+            config = self.config(tenant)
+            report[tenant] = {
+                "weight": config.get('weight', 1),
+                "requests_per_minute": config.get('requests_per_minute') or None,
+                "tokens_per_day": config.get('tokens_per_day') or None,
+                "requests_this_minute": used.get(tenant, {}).get('requests', 0),
+                "tokens_today": used.get(tenant, {}).get('tokens', 0),
+            }
+        return report
+
+
+def resolve_tenant(tenant_id: Optional[str]) -> str:
+    """
+    识别API请求的租户（不计入配额）
+
+    Returns:
+        租户ID
+
+    Raises:
+        UnknownTenant: 租户ID非法或未登记
+    """
+    return get_tenant_manager().resolve(tenant_id)
+
+
+def charge_tenant(tenant: str):
+    """
+    为一次通过校验的API请求扣除租户配额（请求体校验失败的请求不计入）
+
+    Raises:
+        QuotaExceeded: 超出配额
+    """
+    try:
+        get_tenant_manager().check_request(tenant)
+    except QuotaExceeded as e:
+        metrics.incr('tenant_rejected', tenant=tenant, reason=e.kind)
+        raise
+    metrics.incr('tenant_requests', tenant=tenant)
+
+
+_manager_instance = None
+_manager_lock = threading.Lock()
+
+
+def get_tenant_manager() -> TenantManager:
+    """获取全局租户管理器（按 tenants 配置懒加载）"""
+    global _manager_instance
+    if _manager_instance is None:
+        with _manager_lock:
+            if _manager_instance is None:
+                from utils.config_loader import config
+
+                tenant_config = config.get('tenants', {}) or {}
+                path = tenant_config.get('usage_path', 'data/tenants.sqlite3')
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+                _manager_instance = TenantManager(
+                    path=path,
+                    tenants=tenant_config.get('tenants'),
+                    default=tenant_config.get('default'),
+                    require_known=tenant_config.get('require_known', False)
+                )
+    return _manager_instance